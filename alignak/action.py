@@ -73,6 +73,7 @@ except ImportError:
 from alignak.property import BoolProp, IntegerProp, FloatProp
 from alignak.property import StringProp, DictProp
 from alignak.alignakobject import AlignakObject
+from alignak.launcher import LauncherProcess
 
 logger = logging.getLogger(__name__)  # pylint: disable=C0103
 
@@ -83,6 +84,10 @@ VALID_EXIT_STATUS = (0, 1, 2, 3)
 ONLY_COPY_PROP = ('uuid', 'status', 'command', 't_to_go', 'timeout',
                   'env', 'module_type', 'execution_time', 'u_time', 's_time')
 
+# Properties of an action result sent back by a worker
+RESULT_PROP = ('status', 'exit_status', 'output', 'long_output', 'perf_data',
+               'check_time', 'execution_time', 'u_time', 's_time')
+
 SHELLCHARS = ('!', '$', '^', '&', '*', '(', ')', '~', '[', ']',
                    '|', '{', '}', ';', '<', '>', '?', '`')
 
@@ -109,7 +114,15 @@ class ActionBase(AlignakObject):
     This abstract class is used just for having a common id for both
     actions and checks.
     """
+    my_type = 'action'
     process = None
+    # Scheduler queue the action belongs to, see alignak.actionsqueue.ActionsQueue
+    actions_queue = None
+    # Launchers of the worker process for the 'launcher' module type actions,
+    # see alignak.launcher.LauncherPool
+    launchers = None
+    # Use the FieldsPlan fast paths of __init__, serialize and fill_default
+    use_fields_plan = True
 
     properties = {
         'is_a':
@@ -165,6 +178,28 @@ class ActionBase(AlignakObject):
         # Fill default parameters
         self.fill_default()
 
+    def __setattr__(self, name, value):
+        """Set an attribute value.
+        The scheduler queue of the action is informed about its status changes and
+        an action which t_to_go changes is pushed again in its launch queue
+
+        :param name: attribute name
+        :type name: str
+        :param value: attribute value
+        :return: None
+        """
+        if name == 'status':
+            previous = getattr(self, 'status', None)
+            super(ActionBase, self).__setattr__(name, value)
+            if self.actions_queue is not None and value != previous:
+                self.actions_queue.set_status(self, previous)
+        elif name == 't_to_go':
+            super(ActionBase, self).__setattr__(name, value)
+            if self.actions_queue is not None:
+                self.actions_queue.push(self)
+        else:
+            super(ActionBase, self).__setattr__(name, value)
+
     def set_type_active(self):
         """Dummy function, only useful for checks"""
         pass
@@ -173,6 +208,37 @@ class ActionBase(AlignakObject):
         """Dummy function, only useful for checks"""
         pass
 
+    def get_work_record(self):
+        """Get the record sent to a worker to execute the action: the action type,
+        its scheduler identifier and the ONLY_COPY_PROP values
+
+        :return: action work record
+        :rtype: tuple
+        """
+        return (self.my_type, getattr(self, 'sched_id', None),
+                tuple([getattr(self, prop) for prop in ONLY_COPY_PROP]))
+
+    def get_result_record(self):
+        """Get the record sent back by a worker when the action is finished: its scheduler
+        identifier, the action uuid and the RESULT_PROP values it has
+
+        :return: action result record
+        :rtype: tuple
+        """
+        return (getattr(self, 'sched_id', None), self.uuid,
+                dict([(prop, getattr(self, prop)) for prop in RESULT_PROP
+                      if hasattr(self, prop)]))
+
+    def set_result(self, values):
+        """Update the action with the values of a worker result record
+
+        :param values: RESULT_PROP values
+        :type values: dict
+        :return: None
+        """
+        for prop, value in values.iteritems():
+            setattr(self, prop, value)
+
     def get_local_environnement(self):
         """
         Mix the environment and the environment variables into a new local
@@ -302,6 +368,7 @@ class ActionBase(AlignakObject):
 
         _, _, child_utime, child_stime, _ = os.times()
 
+        process = self.process
         if self.process.poll() is None:
             logger.debug("Process pid=%d is still alive", self.process.pid)
             # polling every 1/2 s ... for a timeout in seconds, this is enough
@@ -311,7 +378,7 @@ class ActionBase(AlignakObject):
             # If the fcntl is available (unix) we try to read in a
             # asynchronous mode, so we won't block the PIPE at 64K buffer
             # (deadlock...)
-            if fcntl:
+            if fcntl and self.process.stdout is not None:
                 self.stdoutdata += no_block_read(self.process.stdout)
                 self.stderrdata += no_block_read(self.process.stderr)
 
@@ -343,7 +410,7 @@ class ActionBase(AlignakObject):
         # Get standards outputs from the communicate function if we do
         # not have the fcntl module (Windows, and maybe some special
         # unix like AIX)
-        if not fcntl:
+        if not fcntl or self.process.stdout is None:
             (self.stdoutdata, self.stderrdata) = self.process.communicate()
         else:
             # The command was too quick and finished even before we can
@@ -396,6 +463,10 @@ class ActionBase(AlignakObject):
         _, _, n_child_utime, n_child_stime, _ = os.times()
         self.u_time = n_child_utime - child_utime
         self.s_time = n_child_stime - child_stime
+        if isinstance(process, LauncherProcess):
+            # The command is not our child, its launcher measured the times
+            self.u_time = process.u_time
+            self.s_time = process.s_time
 
     def copy_shell__(self, new_i):
         """Copy all attributes listed in 'only_copy_prop' from `self` to
@@ -489,6 +560,12 @@ if os.name != 'nt':
             # logger.debug("Launching: %s" % (self.command.encode('utf8', 'ignore')))
             logger.debug("Action execute, cmd: %s", cmd)
 
+            if self.launchers is not None and self.module_type == 'launcher':
+                # The launchers of our worker fork and exec the command
+                self.process = self.launchers.launch(
+                    cmd, self.command.encode('utf8', 'ignore'), force_shell, self.local_env)
+                return self.process
+
             # The preexec_fn=os.setsid is set to give sons a same
             # process group. See
             # http://www.doughellmann.com/PyMOTW/subprocess/ for
@@ -531,6 +608,9 @@ if os.name != 'nt':
             :return: None
             """
             logger.debug("Action kill, cmd: %s", self.process.pid)
+            if isinstance(self.process, LauncherProcess):
+                self.process.kill()
+                return
 
             # We kill a process group because we launched them with
             # preexec_fn=os.setsid and so we can launch a whole kill
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2016: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+"""This module provides the ActionsQueue class used by the scheduler to store
+its checks and its actions (notifications, event handlers).
+
+"""
+import heapq
+
+from alignak.ageordereddict import AgeOrderedDict
+
+# Launch keys of the actions that are not fetched by a satellite
+INTERNAL_CHECKS = 'internal'
+MASTER_NOTIFICATIONS = 'master'
+
+
+class ActionsQueue(AgeOrderedDict):
+    """Dictionary of actions (checks, notifications or event handlers) indexed by uuid.
+
+    Besides the uuid mapping, the scheduled actions are also stored in time ordered
+    heaps keyed on their t_to_go. There is one heap per launch key:
+
+    * (tag, module type) for the actions fetched by the pollers / reactionners
+    * INTERNAL_CHECKS for the internal checks (business rules, ...)
+    * MASTER_NOTIFICATIONS for the master notifications (no contact)
+
+    so that a satellite poll only pops the launchable actions instead of scanning
+    the whole dictionary.
+
+    The heaps are lazily cleaned: an action is pushed each time it is (re)scheduled,
+    and the obsolete entries are dropped when they get popped.
+
+    The actions are also registered in per-status buckets, updated on each status
+    transition, so that the scheduler recurrent works only iterate over the actions
+    in the status they are interested in (waitconsume, zombie, inpoller, ...).
+
+    The actions are indexed in their insertion order so that the oldest ones can be
+    dropped when the queue is too big (see AgeOrderedDict).
+
+    If a registry dictionary is provided, the actions added to / removed from the queue
+    are also added to / removed from the registry (uuid to object mapping shared with
+    the other scheduler objects).
+    """
+
+    def __init__(self, tag_property='poller_tag', registry=None):
+        super(ActionsQueue, self).__init__()
+        # The action property used as a tag: poller_tag or reactionner_tag
+        self.tag_property = tag_property
+        self.registry = registry
+        self.launch_queues = {}
+        self.by_status = {}
+
+    def __setitem__(self, uuid, action):
+        if uuid in self:
+            del self[uuid]
+        super(ActionsQueue, self).__setitem__(uuid, action)
+        if self.registry is not None:
+            self.registry[uuid] = action
+        action.actions_queue = self
+        self.by_status.setdefault(action.status, {})[uuid] = action
+        self.push(action)
+
+    def __delitem__(self, uuid):
+        action = self[uuid]
+        super(ActionsQueue, self).__delitem__(uuid)
+        if self.registry is not None:
+            self.registry.pop(uuid, None)
+        self.by_status.get(action.status, {}).pop(uuid, None)
+        action.actions_queue = None
+
+    def pop(self, uuid, *default):
+        """Remove an action from the queue and return it
+
+        :param uuid: action uuid
+        :type uuid: str
+        :return: removed action or default value
+        """
+        if uuid not in self and default:
+            return default[0]
+        action = self[uuid]
+        del self[uuid]
+        return action
+
+    def clear(self):
+        """Remove all the actions from the queue
+
+        :return: None
+        """
+        for uuid, action in self.iteritems():
+            action.actions_queue = None
+            if self.registry is not None:
+                self.registry.pop(uuid, None)
+        super(ActionsQueue, self).clear()
+        self.launch_queues.clear()
+        self.by_status.clear()
+
+    def get_by_status(self, status):
+        """Get the actions which status is the provided one
+
+        :param status: actions status
+        :type status: str
+        :return: list of the actions in this status
+        :rtype: list
+        """
+        return list(self.by_status.get(status, {}).values())
+
+    def count_by_status(self, status):
+        """Get the number of actions which status is the provided one
+
+        :param status: actions status
+        :type status: str
+        :return: number of actions in this status
+        :rtype: int
+        """
+        return len(self.by_status.get(status, {}))
+
+    def set_status(self, action, previous):
+        """Move an action from its previous status bucket to its current one
+        Called when the status of an action changes
+
+        :param action: action which status changed
+        :type action: alignak.action.Action
+        :param previous: previous status of the action
+        :type previous: str
+        :return: None
+        """
+        # A copy of an action (same uuid) is not in the queue
+        if self.get(getattr(action, 'uuid', None)) is not action:
+            return
+        self.by_status.get(previous, {}).pop(action.uuid, None)
+        self.by_status.setdefault(action.status, {})[action.uuid] = action
+        self.push(action)
+
+    def get_launch_key(self, action):
+        """Get the key of the launch queue of an action
+
+        :param action: action to get the key of
+        :type action: alignak.action.Action
+        :return: INTERNAL_CHECKS, MASTER_NOTIFICATIONS or a (tag, module_type) tuple
+        :rtype: str | tuple
+        """
+        if getattr(action, 'internal', False):
+            return INTERNAL_CHECKS
+        if action.is_a == 'notification' and not action.contact:
+            return MASTER_NOTIFICATIONS
+        return (getattr(action, self.tag_property, 'None'), action.module_type)
+
+    def push(self, action):
+        """Push a scheduled action in its launch queue
+        Called when the action is added, rescheduled or when its t_to_go changes
+
+        :param action: action to push
+        :type action: alignak.action.Action
+        :return: None
+        """
+        # A copy of an action (same uuid) is not in the queue
+        if self.get(getattr(action, 'uuid', None)) is not action or action.status != 'scheduled':
+            return
+        queue = self.launch_queues.setdefault(self.get_launch_key(action), [])
+        heapq.heappush(queue, (action.t_to_go, action.uuid))
+
+    def pop_launchable(self, keys, timestamp):
+        """Pop the actions that are scheduled and launchable at timestamp from
+        the launch queues matching the provided keys
+
+        :param keys: launch queues keys
+        :type keys: list
+        :param timestamp: time to compare with the actions t_to_go
+        :type timestamp: float
+        :return: launchable actions, ordered by t_to_go in each queue
+        :rtype: list
+        """
+        res = []
+        seen = set()
+        for key in keys:
+            queue = self.launch_queues.get(key)
+            if not queue:
+                continue
+            # Entries scheduled exactly at timestamp may not be launchable yet
+            not_yet = []
+            while queue and queue[0][0] <= timestamp:
+                t_to_go, uuid = heapq.heappop(queue)
+                action = self.get(uuid)
+                # Obsolete entry: deleted, already launched or rescheduled since
+                if action is None or uuid in seen or action.status != 'scheduled' \
+                        or action.t_to_go != t_to_go:
+                    continue
+                if not action.is_launchable(timestamp):
+                    not_yet.append((t_to_go, uuid))
+                    continue
+                seen.add(uuid)
+                res.append(action)
+            for entry in not_yet:
+                heapq.heappush(queue, entry)
+        return res
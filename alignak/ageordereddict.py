@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2016: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+"""This module provides the AgeOrderedDict class, a dictionary that knows the
+insertion order of its values so that the oldest ones can be dropped without
+sorting the whole dictionary. It is used by the scheduler for its checks, actions
+and broks queues.
+
+"""
+from collections import deque
+
+
+class AgeOrderedDict(dict):
+    """Dictionary which values are also stored in an insertion ordered index.
+
+    The index is lazily cleaned: the values removed from the dictionary are
+    only dropped from the index when they reach its head, or when the index
+    gets too big compared to the dictionary.
+    """
+
+    def __init__(self):
+        super(AgeOrderedDict, self).__init__()
+        self.ages = deque()
+
+    def __setitem__(self, key, value):
+        super(AgeOrderedDict, self).__setitem__(key, value)
+        self.ages.append((key, value))
+        if len(self.ages) > 2 * len(self) + 100:
+            self.compact()
+
+    def compact(self):
+        """Remove the index entries of the values that are not in the dictionary anymore
+
+        :return: None
+        """
+        self.ages = deque([(key, value) for (key, value) in self.ages
+                           if self.get(key) is value])
+
+    def clear(self):
+        """Remove all the values
+
+        :return: None
+        """
+        super(AgeOrderedDict, self).clear()
+        self.ages.clear()
+
+    def pop_oldest(self, count=0, accept=None):
+        """Remove the oldest values of the dictionary
+
+        :param count: maximum number of values to remove, 0 to remove all of them
+        :type count: int
+        :param accept: function called with a value, only the values it returns True for
+                       are removed. All values are removed if it is None
+        :type accept: function | None
+        :return: removed values, the oldest first
+        :rtype: list
+        """
+        res = []
+        skipped = []
+        while (not count or len(res) < count) and self.ages:
+            key, value = self.ages.popleft()
+            if self.get(key) is not value:
+                continue
+            if accept is not None and not accept(value):
+                skipped.append((key, value))
+                continue
+            del self[key]
+            res.append(value)
+        # Put back the skipped values at the head of the index
+        self.ages.extendleft(reversed(skipped))
+        return res
+
+    def drop_oldest(self, max_size):
+        """Remove the oldest values so that the dictionary is not bigger than max_size
+
+        :param max_size: maximum size of the dictionary
+        :type max_size: int
+        :return: removed values, the oldest first
+        :rtype: list
+        """
+        if len(self) <= max_size:
+            return []
+        return self.pop_oldest(len(self) - max_size)
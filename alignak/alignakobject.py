@@ -22,9 +22,17 @@
 """
 
 import uuid
+from collections import namedtuple
 from copy import copy
 from alignak.property import SetProp, StringProp
 
+# Fields plan of a class, see AlignakObject.get_fields_plan
+FieldsPlan = namedtuple('FieldsPlan', ['serialized', 'serialized_sets', 'sets', 'defaults',
+                                       'in_dict'])
+
+# Value of the attributes that are not set
+MISSING = object()
+
 
 class AlignakObject(object):
     """This class provide a generic way to instantiate alignak objects.
@@ -34,23 +42,94 @@ class AlignakObject(object):
 
     properties = {'uuid': StringProp(default='')}
     macros = {}
+    # Serialize, un-serialize and fill the default values with the fields plan of the class.
+    # The properties of the class must not change once the plan is built, and the
+    # un-serialization sets the attributes without calling __setattr__
+    use_fields_plan = False
+    # Properties that are not serialized, only when the fields plan is used
+    not_serialized = ()
 
     def __init__(self, params=None, parsing=True):  # pylint: disable=W0613
 
         if params is None:
             return
-        all_props = {}
-        all_props.update(getattr(self, "properties", {}))
-        all_props.update(getattr(self, "running_properties", {}))
-        for key, value in params.iteritems():
-            if key in all_props and isinstance(all_props[key], SetProp):
-                setattr(self, key, set(value))
-            else:
-                setattr(self, key, value)
+        if self.use_fields_plan:
+            self.set_fields(params)
+        else:
+            all_props = {}
+            all_props.update(getattr(self, "properties", {}))
+            all_props.update(getattr(self, "running_properties", {}))
+            for key, value in params.iteritems():
+                if key in all_props and isinstance(all_props[key], SetProp):
+                    setattr(self, key, set(value))
+                else:
+                    setattr(self, key, value)
 
         if not hasattr(self, 'uuid'):
             self.uuid = uuid.uuid4().hex
 
+    @classmethod
+    def get_fields_plan(cls):
+        """Get the fields plan of the class. It is built on its first use, and holds:
+
+        * serialized: names of the properties serialized as is
+        * serialized_sets: names of the set properties, serialized as lists
+        * sets: names of the set properties and running properties, un-serialized as sets
+        * defaults: (name, default value, copy the default value) of the properties
+          that have a default value (and are not class attributes if in_dict)
+        * in_dict: the instances attributes are stored in their __dict__ (no slots)
+
+        :return: fields plan of the class
+        :rtype: alignak.alignakobject.FieldsPlan
+        """
+        plan = cls.__dict__.get('_fields_plan')
+        if plan is not None:
+            return plan
+
+        in_dict = True
+        for klass in cls.__mro__:
+            if '__slots__' in klass.__dict__:
+                in_dict = False
+
+        serialized = []
+        serialized_sets = []
+        defaults = []
+        for prop, entry in cls.properties.iteritems():
+            if prop not in cls.not_serialized:
+                if isinstance(entry, SetProp):
+                    serialized_sets.append(prop)
+                else:
+                    serialized.append(prop)
+            if entry.has_default and not (in_dict and hasattr(cls, prop)):
+                defaults.append((prop, entry.default, hasattr(entry.default, '__iter__')))
+        sets = set(serialized_sets)
+        for prop, entry in getattr(cls, 'running_properties', {}).iteritems():
+            if isinstance(entry, SetProp):
+                sets.add(prop)
+
+        plan = FieldsPlan(tuple(serialized), tuple(serialized_sets), frozenset(sets),
+                          tuple(defaults), in_dict)
+        setattr(cls, '_fields_plan', plan)
+        return plan
+
+    def set_fields(self, params):
+        """Set the attributes of an un-serialized object with its fields plan
+
+        :param params: serialized attributes
+        :type params: dict
+        :return: None
+        """
+        plan = self.get_fields_plan()
+        if plan.in_dict:
+            self.__dict__.update(params)
+            for prop in plan.sets.intersection(params):
+                self.__dict__[prop] = set(params[prop])
+            return
+        for key, value in params.iteritems():
+            if key in plan.sets:
+                value = set(value)
+            object.__setattr__(self, key, value)
+
     def serialize(self):
         """This function serialize into a simple dict object.
         It is used when transferring data to other daemons over the network (http)
@@ -64,6 +143,18 @@ class AlignakObject(object):
         cls = self.__class__
         # id is not in *_properties
         res = {'uuid': self.uuid}
+        if cls.use_fields_plan:
+            plan = cls.get_fields_plan()
+            for prop in plan.serialized:
+                value = getattr(self, prop, MISSING)
+                if value is not MISSING:
+                    res[prop] = value
+            for prop in plan.serialized_sets:
+                value = getattr(self, prop, MISSING)
+                if value is not MISSING:
+                    res[prop] = list(value)
+            return res
+
         for prop in cls.properties:
             if hasattr(self, prop):
                 if isinstance(cls.properties[prop], SetProp):
@@ -81,6 +172,19 @@ class AlignakObject(object):
         """
         cls = self.__class__
 
+        if cls.use_fields_plan:
+            plan = cls.get_fields_plan()
+            if plan.in_dict:
+                attributes = self.__dict__
+                for prop, default, copy_default in plan.defaults:
+                    if prop not in attributes:
+                        setattr(self, prop, copy(default) if copy_default else default)
+                return
+            for prop, default, copy_default in plan.defaults:
+                if not hasattr(self, prop):
+                    setattr(self, prop, copy(default) if copy_default else default)
+            return
+
         for prop, entry in cls.properties.items():
             if not hasattr(self, prop) and entry.has_default:
                 if hasattr(entry.default, '__iter__'):
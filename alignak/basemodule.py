@@ -121,6 +121,13 @@ class BaseModule(object):
         # We want to know where we are load from? (broker, scheduler, etc)
         self.loaded_into = 'unknown'
 
+        # Types of the broks the module wants, empty for all the broks
+        brok_types = getattr(mod_conf, 'brok_types', '')
+        if not isinstance(brok_types, basestring):
+            brok_types = ','.join(brok_types)
+        self.brok_types = set(b_type.strip() for b_type in brok_types.split(',')
+                              if b_type.strip())
+
         # External module force kill delay - default is to wait for
         # 60 seconds before killing a module abruptly
         self.kill_delay = int(getattr(mod_conf, 'kill_delay', '60'))
@@ -301,16 +308,17 @@ class BaseModule(object):
             DeprecationWarning, stacklevel=2)
         return hasattr(self, prop)
 
-    def want_brok(self, b):  # pylint: disable=W0613,R0201
+    def want_brok(self, b):
         """Generic function to check if the module need a specific brok
-        In this case it is always True
+        In this case it is True if the brok type is one of the module brok_types,
+        or if the module did not define its brok_types
 
         :param b: brok to check
         :type b: alignak.brok.Brok
         :return: True if the module wants the brok, False otherwise
         :rtype: bool
         """
-        return True
+        return not self.brok_types or b.type in self.brok_types
 
     def manage_brok(self, brok):
         """Request the module to manage the given brok.
@@ -340,6 +348,20 @@ class BaseModule(object):
         """
         pass
 
+    def manage_broks(self, broks):
+        """Request the module to manage a batch of broks, in their reception order.
+        The broker gives the broks to its internal modules with this function.
+
+        The default implementation calls manage_brok for each brok, a module may
+        override it to process the whole batch at once (eg. one database transaction)
+
+        :param broks: broks to manage
+        :type broks: list
+        :return: None
+        """
+        for brok in broks:
+            self.manage_brok(brok)
+
     def manage_signal(self, sig, frame):  # pylint: disable=W0613
         """Generic function to handle signals
 
@@ -89,8 +89,8 @@ class Brok(object):
         if not parsing:
             if params is None:
                 return
-            for key, value in params.iteritems():
-                setattr(self, key, value)
+            # The serialized broks only hold the attributes of Brok.serialize
+            self.__dict__.update(params)
 
             if not hasattr(self, 'uuid'):
                 self.uuid = uuid.uuid4().hex
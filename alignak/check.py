@@ -96,6 +96,8 @@ class Check(Action):  # pylint: disable=R0902
         'dependency_check':
             BoolProp(default=False),
     })
+    # Only the pollers get the serialized checks, they do not need the dependencies
+    not_serialized = ('depend_on', 'depend_on_me')
 
     def get_return_from(self, check):
         """Update check data from action (notification for instance)
@@ -145,19 +147,3 @@ class Check(Action):  # pylint: disable=R0902
         :rtype: bool
         """
         return self.dependency_check
-
-    def serialize(self):
-        """This function serializes into a simple dict object.
-
-        The only usage is to send to poller, and it does not need to have the
-        depend_on and depend_on_me properties.
-
-        :return: json representation of a Check
-        :rtype: dict
-        """
-        res = super(Check, self).serialize()
-        if 'depend_on' in res:
-            del res['depend_on']
-        if 'depend_on_me' in res:
-            del res['depend_on_me']
-        return res
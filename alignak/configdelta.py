@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2016: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+"""This module provides the functions used to send the configuration changes to a
+scheduler (a configuration delta) instead of a whole new configuration.
+
+The arbiter computes a fingerprint for each host, service, hostgroup and servicegroup
+of a scheduler configuration, and one fingerprint for each other objects type and for
+the global parameters. The objects uuids change each time the configuration is loaded,
+so the objects are identified with their type and name (their key) and the uuids
+referenced by an object are replaced with the referenced objects keys.
+
+When only some hosts, services or groups changed, the arbiter sends the added and changed
+objects and the keys of the removed ones. The scheduler applies them on its current
+configuration, keeping the state, checks and actions of the other objects.
+"""
+
+import re
+import json
+import hashlib
+
+# Objects types that a configuration delta may add, change or remove
+DELTA_TYPES = ('hosts', 'services', 'hostgroups', 'servicegroups')
+
+# Other objects types of a scheduler configuration, any change needs a whole configuration
+OTHER_TYPES = ('commands', 'timeperiods', 'contacts', 'contactgroups', 'notificationways',
+               'checkmodulations', 'macromodulations', 'businessimpactmodulations',
+               'resultmodulations', 'triggers', 'escalations')
+
+# Running properties computed by the arbiter from the configuration. They are updated
+# with the configuration properties of the changed objects
+CONFIG_RUNNING_PROPERTIES = ('act_depend_of', 'act_depend_of_me', 'chk_depend_of',
+                             'chk_depend_of_me', 'child_dependencies', 'parent_dependencies',
+                             'customs', 'business_rule', 'got_business_rule',
+                             'processed_business_rule', 'got_default_realm', 'realm_name',
+                             'pack_id', 'host', 'services', 'tags', 'triggers')
+
+# Properties of the hosts and services dependencies: their topology
+TOPOLOGY_PROPERTIES = ('parents', 'act_depend_of', 'act_depend_of_me', 'chk_depend_of',
+                       'chk_depend_of_me', 'child_dependencies', 'parent_dependencies')
+
+# Global parameters that are not compared: the location of the arbiter configuration files
+IGNORED_PARAMETERS = ('main_config_file', 'config_base_dir')
+
+# Maximum part of the hosts, services and groups that a delta may add, change or remove.
+# Beyond, the whole configuration is sent
+MAX_DELTA_RATIO = 0.5
+
+UUID_REGEX = re.compile(r'^[0-9a-f]{32}$')
+UUIDS_REGEX = re.compile(r'\b[0-9a-f]{32}\b')
+
+
+def get_item_key(items_type, item):
+    """Get the key of an object: its type and name
+
+    :param items_type: objects type (configuration attribute name, eg. hosts)
+    :type items_type: str
+    :param item: object
+    :type item: alignak.objects.item.Item
+    :return: object key
+    :rtype: str
+    """
+    if items_type == 'services':
+        return "%s:%s" % (items_type, item.get_full_name())
+    return "%s:%s" % (items_type, item.get_name())
+
+
+def get_items_keys(conf):
+    """Get the keys of all the objects of a scheduler configuration
+
+    :param conf: scheduler configuration
+    :type conf: alignak.objects.config.Config
+    :return: objects keys indexed by uuid
+    :rtype: dict
+    """
+    keys = {}
+    for items_type in DELTA_TYPES + OTHER_TYPES:
+        for item in getattr(conf, items_type):
+            keys[item.uuid] = get_item_key(items_type, item)
+    return keys
+
+
+def _normalize(value, keys):
+    """Replace the uuids of a serialized value with the objects keys, and sort the lists
+    of references, which order may change from one configuration loading to another
+
+    :param value: serialized value
+    :param keys: objects keys indexed by uuid
+    :type keys: dict
+    :return: normalized value
+    """
+    if isinstance(value, basestring):
+        if UUID_REGEX.match(value):
+            # Not an object of the configuration (eg. a command call or a realm)
+            return keys.get(value, '?')
+        return value
+    if isinstance(value, dict):
+        return dict((_normalize(key, keys), _normalize(val, keys))
+                    for key, val in value.iteritems())
+    if isinstance(value, (list, tuple)):
+        res = [_normalize(val, keys) for val in value]
+        if all(_is_reference(val) for val in value):
+            res.sort()
+        return res
+    return value
+
+
+def _is_reference(value):
+    """Tell if a serialized value is an object reference (uuid) or a tuple beginning with
+    an object reference, as the dependencies are
+
+    :param value: serialized value
+    :return: True if the value is a reference
+    :rtype: bool
+    """
+    if isinstance(value, (list, tuple)) and value:
+        value = value[0]
+    return isinstance(value, basestring) and UUID_REGEX.match(value) is not None
+
+
+def get_item_data(item):
+    """Get the serialized data of an object, with its sets sorted
+
+    :param item: object
+    :type item: alignak.objects.item.Item
+    :return: serialized object
+    :rtype: dict
+    """
+    data = item.serialize()
+    for prop in item.get_fields_plan().sets:
+        if isinstance(data.get(prop), list):
+            data[prop] = sorted(data[prop])
+    return data
+
+
+def get_fingerprint(value, keys):
+    """Get the fingerprint of a serialized value
+
+    :param value: serialized value
+    :param keys: objects keys indexed by uuid
+    :type keys: dict
+    :return: sha1 hexadecimal digest of the normalized value
+    :rtype: str
+    """
+    return hashlib.sha1(json.dumps(_normalize(value, keys), sort_keys=True)).hexdigest()
+
+
+def get_global_parameters(conf):
+    """Get the global parameters of a scheduler configuration
+
+    :param conf: scheduler configuration
+    :type conf: alignak.objects.config.Config
+    :return: serialized parameters and macros
+    :rtype: dict
+    """
+    res = {'macros': conf.macros}
+    for prop in conf.properties:
+        if prop in IGNORED_PARAMETERS:
+            continue
+        value = getattr(conf, prop, None)
+        if hasattr(value, 'serialize'):
+            value = value.serialize()
+        elif isinstance(value, set):
+            value = list(value)
+        res[prop] = value
+    return res
+
+
+def get_conf_fingerprints(conf):
+    """Get the fingerprints of a scheduler configuration
+
+    :param conf: scheduler configuration
+    :type conf: alignak.objects.config.Config
+    :return: fingerprints of the delta types objects indexed by key for each delta type,
+             and one fingerprint for each other objects type and for the global parameters
+             ('config')
+    :rtype: dict
+    """
+    keys = get_items_keys(conf)
+    res = {'config': get_fingerprint(get_global_parameters(conf), keys)}
+    for items_type in DELTA_TYPES:
+        res[items_type] = dict((keys[item.uuid], get_fingerprint(get_item_data(item), keys))
+                               for item in getattr(conf, items_type))
+    for items_type in OTHER_TYPES:
+        fingerprints = sorted([keys[item.uuid], get_fingerprint(get_item_data(item), keys)]
+                              for item in getattr(conf, items_type))
+        res[items_type] = get_fingerprint(fingerprints, keys)
+    return res
+
+
+def get_conf_delta(conf, fingerprints, known):
+    """Get the changes of a scheduler configuration since the configuration which
+    fingerprints are known
+
+    The delta contains the serialized added and changed objects, the keys of the removed
+    objects and the keys of the objects referenced by the added and changed ones.
+
+    :param conf: new scheduler configuration
+    :type conf: alignak.objects.config.Config
+    :param fingerprints: fingerprints of the new configuration
+    :type fingerprints: dict
+    :param known: fingerprints of the configuration managed by the scheduler
+    :type known: dict
+    :return: configuration delta, None if the whole configuration must be sent
+    :rtype: dict | None
+    """
+    if not known:
+        return None
+    for items_type in OTHER_TYPES + ('config',):
+        if known.get(items_type) != fingerprints[items_type]:
+            return None
+
+    keys = get_items_keys(conf)
+    delta = {'added': {}, 'changed': {}, 'removed': {}, 'references': {}}
+    nb_items = nb_changes = 0
+    for items_type in DELTA_TYPES:
+        new = fingerprints[items_type]
+        old = known.get(items_type) or {}
+        added = []
+        changed = []
+        for item in getattr(conf, items_type):
+            key = keys[item.uuid]
+            if key not in old:
+                added.append(item.serialize())
+            elif old[key] != new[key]:
+                changed.append(item.serialize())
+        removed = [key for key in old if key not in new]
+
+        delta['added'][items_type] = added
+        delta['changed'][items_type] = changed
+        delta['removed'][items_type] = removed
+        nb_items += max(len(new), len(old))
+        nb_changes += len(added) + len(changed) + len(removed)
+
+    if nb_changes > MAX_DELTA_RATIO * nb_items:
+        return None
+
+    # The scheduler needs to know which of its objects are referenced
+    for uuid in UUIDS_REGEX.findall(json.dumps([delta['added'], delta['changed']])):
+        if uuid in keys:
+            delta['references'][uuid] = keys[uuid]
+    return delta
+
+
+def get_uuids_mapping(references, keys):
+    """Get the uuids of the current objects matching the references of a delta
+
+    :param references: keys of the objects referenced by a delta, indexed by uuid
+    :type references: dict
+    :param keys: keys of the current configuration objects, indexed by uuid
+    :type keys: dict
+    :return: current objects uuids indexed by the delta uuids
+    :rtype: dict
+    """
+    uuids = dict((key, uuid) for uuid, key in keys.iteritems())
+    return dict((uuid, uuids[key]) for uuid, key in references.iteritems() if key in uuids)
+
+
+def remap_uuids(value, mapping):
+    """Replace the uuids of a serialized value with their mapped uuids
+
+    :param value: serialized value
+    :param mapping: new uuids indexed by old uuids
+    :type mapping: dict
+    :return: value with the mapped uuids
+    """
+    if isinstance(value, basestring):
+        return mapping.get(value, value)
+    if isinstance(value, dict):
+        return dict((remap_uuids(key, mapping), remap_uuids(val, mapping))
+                    for key, val in value.iteritems())
+    if isinstance(value, (list, tuple)):
+        return [remap_uuids(val, mapping) for val in value]
+    return value
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2016: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+"""This module provides the ConfigProfiler class used by the arbiter to measure each
+phase of the configuration loading (reading, objects creation, inheritance, linking,
+cutting into parts, ...).
+
+For each phase, the profiler records the wall time, the CPU time (user and system) of
+the arbiter process, the increase of its peak resident memory and the number of
+objects of the configuration at the end of the phase.
+"""
+
+import os
+import sys
+import time
+import json
+import logging
+from contextlib import contextmanager
+
+from alignak.stats import statsmgr
+
+try:
+    import resource
+except ImportError:  # pragma: no cover, not on Windows
+    resource = None
+
+logger = logging.getLogger(__name__)  # pylint: disable=C0103
+
+# Configuration objects counted at the end of each phase
+COUNTED_TYPES = ('hosts', 'services', 'hostgroups', 'servicegroups', 'contacts',
+                 'contactgroups', 'commands', 'timeperiods', 'realms')
+
+
+def get_peak_rss():
+    """Get the peak resident memory of the process
+
+    :return: peak resident memory in KB, None if unknown
+    :rtype: int | None
+    """
+    if resource is None:  # pragma: no cover, not on Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':  # pragma: no cover, bytes on Mac OS
+        peak //= 1024
+    return peak
+
+
+def get_cpu_time():
+    """Get the CPU time used by the process
+
+    :return: user and system time in seconds
+    :rtype: float
+    """
+    times = os.times()
+    return times[0] + times[1]
+
+
+def count_objects(conf):
+    """Count the objects of a configuration
+
+    :param conf: configuration
+    :type conf: alignak.objects.config.Config
+    :return: number of objects (items and templates) for each counted type
+    :rtype: dict
+    """
+    res = {}
+    for o_type in COUNTED_TYPES:
+        items = getattr(conf, o_type, None)
+        if items is None or not hasattr(items, 'items'):
+            continue
+        res[o_type] = len(items.items) + len(getattr(items, 'templates', {}))
+    return res
+
+
+class ConfigProfiler(object):
+    """Profiler of the configuration loading phases
+
+    The profiled code runs in `with profiler.phase(name):` blocks. The profiler counts the
+    objects of its conf attribute, that the caller updates when the configuration object
+    is replaced. A disabled profiler does not measure anything.
+    """
+
+    def __init__(self, conf, enabled=True):
+        self.conf = conf
+        self.enabled = enabled
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name):
+        """Measure a configuration loading phase
+
+        :param name: phase name
+        :type name: str
+        :return: None
+        """
+        if not self.enabled:
+            yield
+            return
+        start_wall = time.time()
+        start_cpu = get_cpu_time()
+        start_rss = get_peak_rss()
+        try:
+            yield
+        finally:
+            peak_rss = get_peak_rss()
+            self.phases.append({
+                'phase': name,
+                'wall_time': time.time() - start_wall,
+                'cpu_time': get_cpu_time() - start_cpu,
+                'peak_rss_delta': None if peak_rss is None else peak_rss - start_rss,
+                'objects': count_objects(self.conf)
+            })
+
+    def get_report(self):
+        """Get the profiling report
+
+        :return: measured phases, in their execution order, and their total
+        :rtype: dict
+        """
+        total = {'wall_time': 0, 'cpu_time': 0, 'peak_rss_delta': 0}
+        for phase in self.phases:
+            total['wall_time'] += phase['wall_time']
+            total['cpu_time'] += phase['cpu_time']
+            if phase['peak_rss_delta'] is not None:
+                total['peak_rss_delta'] += phase['peak_rss_delta']
+        return {'phases': self.phases, 'total': total}
+
+    def get_table(self):
+        """Get the profiling report as a human readable table
+
+        :return: table lines
+        :rtype: list
+        """
+        report = self.get_report()
+        line = "%-40s %10s %10s %12s  %s"
+        res = [line % ('Phase', 'Wall (s)', 'CPU (s)', 'Peak RSS +KB', 'Objects')]
+        for phase in report['phases'] + [dict(report['total'], phase='Total', objects={})]:
+            res.append(line % (
+                phase['phase'], "%.3f" % phase['wall_time'], "%.3f" % phase['cpu_time'],
+                '-' if phase['peak_rss_delta'] is None else phase['peak_rss_delta'],
+                ', '.join("%s=%d" % (o_type, nb)
+                          for o_type, nb in sorted(phase['objects'].iteritems()))
+            ))
+        return res
+
+    def report(self, path=None):
+        """Log the profiling table, send the phases times as statistics timers and
+        write the JSON report
+
+        :param path: JSON report file path, not written if None
+        :type path: str | None
+        :return: None
+        """
+        if not self.enabled:
+            return
+        logger.info("Configuration loading profile:")
+        for line in self.get_table():
+            logger.info(line)
+
+        for phase in self.phases:
+            statsmgr.timer('configuration.%s.wall' % phase['phase'], phase['wall_time'])
+            statsmgr.timer('configuration.%s.cpu' % phase['phase'], phase['cpu_time'])
+
+        if path:
+            try:
+                with open(path, 'w') as file_d:
+                    json.dump(self.get_report(), file_d, indent=4, sort_keys=True)
+            except IOError as exp:
+                logger.error("Cannot write the configuration profile in %s: %s", path, exp)
+            else:
+                logger.info("Configuration profile written in %s", path)
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2016: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+"""This module provides the functions used by the arbiter to save the compiled
+configuration (linked, cut into parts and prepared for sending) in a snapshot file,
+and to load it back on the next start when the configuration files did not change.
+
+A snapshot is identified with a key computed from the configuration files paths,
+modification times and contents. The file contains the key followed by the
+compressed pickled configuration, so that an outdated snapshot is detected without
+loading the whole configuration.
+
+The snapshot file is written in the arbiter working directory and loaded with pickle,
+it must not be writable by anyone else than the arbiter user.
+"""
+
+import os
+import re
+import sys
+import zlib
+import time
+import logging
+import hashlib
+import cPickle
+
+from alignak.version import VERSION
+
+logger = logging.getLogger(__name__)  # pylint: disable=C0103
+
+IMPORTEDFROM_REGEX = re.compile(r'^# IMPORTEDFROM=(.*)$', re.MULTILINE)
+
+
+def get_files_mtimes(paths):
+    """Get the modification time of some files
+
+    :param paths: files paths
+    :type paths: list
+    :return: (path, modification time) list, the time is None for a missing file
+    :rtype: list
+    """
+    res = []
+    for path in paths:
+        try:
+            res.append((path, os.path.getmtime(path)))
+        except OSError:
+            res.append((path, None))
+    return res
+
+
+def get_triggers_files(triggers_dirs):
+    """Get the trigger files (.trig) of the triggers directories, as Triggers.load_file
+    finds them
+
+    :param triggers_dirs: triggers directories
+    :type triggers_dirs: list
+    :return: trigger files paths
+    :rtype: list
+    """
+    res = []
+    for path in triggers_dirs:
+        for root, _, files in os.walk(path):
+            res.extend(os.path.join(root, t_file) for t_file in sorted(files)
+                       if re.search(r"\.trig$", t_file))
+    return res
+
+
+def get_snapshot_key(buf, triggers_dirs, arbiter_name):
+    """Get the key of the configuration read by Config.read_config
+
+    The key is the sha1 of the configuration buffer (it contains the paths and contents of
+    all the configuration files), of the files modification times, of the trigger files
+    and of the Alignak and Python versions and arbiter name.
+
+    :param buf: buffer returned by Config.read_config
+    :type buf: unicode
+    :param triggers_dirs: triggers directories found by Config.read_config
+    :type triggers_dirs: list
+    :param arbiter_name: arbiter name
+    :type arbiter_name: str
+    :return: hexadecimal key
+    :rtype: str
+    """
+    sha1 = hashlib.sha1()
+    sha1.update("%s:%s:%s" % (VERSION, sys.version, arbiter_name))
+    sha1.update(buf.encode('utf8'))
+    triggers_files = get_triggers_files(triggers_dirs)
+    paths = IMPORTEDFROM_REGEX.findall(buf) + triggers_files
+    sha1.update(repr(get_files_mtimes([path.strip() for path in paths])))
+    for path in triggers_files:
+        try:
+            with open(path, 'rb') as file_d:
+                sha1.update(file_d.read())
+        except IOError:
+            sha1.update(path)
+    return sha1.hexdigest()
+
+
+def save_snapshot(path, key, conf):
+    """Save a configuration in a snapshot file
+
+    The file is written in a temporary file then renamed, so that an interrupted
+    arbiter never leaves a truncated snapshot.
+
+    :param path: snapshot file path
+    :type path: str
+    :param key: configuration key, see get_snapshot_key
+    :type key: str
+    :param conf: configuration prepared for sending
+    :type conf: alignak.objects.config.Config
+    :return: True if the snapshot is saved
+    :rtype: bool
+    """
+    start = time.time()
+    tmp_path = path + '.tmp'
+    try:
+        data = zlib.compress(cPickle.dumps(conf, cPickle.HIGHEST_PROTOCOL))
+        with open(tmp_path, 'wb') as file_d:
+            cPickle.dump(key, file_d, cPickle.HIGHEST_PROTOCOL)
+            file_d.write(data)
+        os.rename(tmp_path, path)
+    except (IOError, OSError, cPickle.PicklingError, TypeError) as exp:
+        logger.warning("Cannot save the configuration snapshot %s: %s", path, exp)
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        return False
+    logger.info("Configuration snapshot saved in %s (%d bytes, %.2f seconds)",
+                path, len(data), time.time() - start)
+    return True
+
+
+def load_snapshot(path, key):
+    """Load a configuration from a snapshot file
+
+    :param path: snapshot file path
+    :type path: str
+    :param key: key of the current configuration, see get_snapshot_key
+    :type key: str
+    :return: configuration prepared for sending, None if there is no snapshot for this key
+    :rtype: alignak.objects.config.Config | None
+    """
+    if not os.path.exists(path):
+        logger.info("No configuration snapshot %s", path)
+        return None
+    start = time.time()
+    try:
+        with open(path, 'rb') as file_d:
+            if cPickle.load(file_d) != key:
+                logger.info("The configuration changed since the snapshot %s", path)
+                return None
+            conf = cPickle.loads(zlib.decompress(file_d.read()))
+    except Exception as exp:  # pylint: disable=W0703
+        logger.warning("Cannot load the configuration snapshot %s: %s", path, exp)
+        return None
+    logger.info("Configuration loaded from the snapshot %s (%.2f seconds)",
+                path, time.time() - start)
+    return conf
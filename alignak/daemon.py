@@ -129,6 +129,7 @@ except ImportError, exp:  # pragma: no cover, not for unit tests...
         return []
 
 from alignak.log import setup_logger, get_logger_fds
+from alignak.http.client import HTTPClient
 from alignak.http.daemon import HTTPDaemon, PortNotFree
 from alignak.stats import statsmgr
 from alignak.modulesmanager import ModulesManager
@@ -235,6 +236,19 @@ class Daemon(object):
             IntegerProp(default=0),
         'daemon_thread_pool_size':
             IntegerProp(default=8),
+        # Connections kept open with each other daemon
+        'http_pool_size':
+            IntegerProp(default=10),
+        'http_keep_alive':
+            BoolProp(default=True),
+        # Maximum number of daemons requested concurrently
+        'max_parallel_requests':
+            IntegerProp(default=8),
+        # Wire format of the checks, results and broks: msgpack if available, else JSON
+        'http_binary_format':
+            BoolProp(default=False),
+        'http_compress':
+            BoolProp(default=True),
     }
 
     def __init__(self, name, config_file, is_daemon, do_replace,
@@ -816,6 +830,9 @@ class Daemon(object):
             logger.debug("- %s", stored)
         del self.debug_output
 
+        HTTPClient.configure_pool(self.http_pool_size, self.http_keep_alive)
+        HTTPClient.configure_wire_format(self.http_binary_format, self.http_compress)
+
         logger.info("Creating synchronization manager...")
         self.sync_manager = self._create_manager()
         logger.info("Created")
@@ -60,17 +60,21 @@
 This module provide Arbiter class used to run a arbiter daemon
 """
 import logging
+import os
 import sys
 import time
 import traceback
 import socket
 import cStringIO
 import json
+import multiprocessing
 
 import subprocess
 
 from alignak.misc.serialization import unserialize, AlignakClassLookupException
 from alignak.objects.config import Config
+from alignak.configsnapshot import get_snapshot_key, load_snapshot, save_snapshot
+from alignak.configprofiler import ConfigProfiler
 from alignak.macroresolver import MacroResolver
 from alignak.external_command import ExternalCommandManager
 from alignak.dispatcher import Dispatcher
@@ -101,12 +105,19 @@ class Arbiter(Daemon):  # pylint: disable=R0902
             IntegerProp(default=7770),
         'local_log':
             PathProp(default='arbiterd.log'),
+        # Compiled configuration snapshot file, relative to the workdir. Empty to disable
+        'config_snapshot':
+            PathProp(default=''),
+        # Processes parsing the configuration files, 0 for the number of CPUs
+        'config_parsing_processes':
+            IntegerProp(default=0),
     })
 
     # pylint: disable=too-many-arguments
     def __init__(self, config_file, monitoring_files, is_daemon, do_replace, verify_only, debug,
                  debug_file, alignak_name, analyse=None,
-                 port=None, local_log=None, daemon_name=None):
+                 port=None, local_log=None, daemon_name=None, rebuild_config=False,
+                 profile_config=None):
         self.daemon_name = 'arbiter'
         if daemon_name:
             self.daemon_name = daemon_name
@@ -116,6 +127,7 @@ class Arbiter(Daemon):  # pylint: disable=R0902
 
         self.config_files = monitoring_files
         self.verify_only = verify_only
+        self.rebuild_config = rebuild_config
         self.analyse = analyse
         self.arbiter_name = alignak_name
         self.alignak_name = None
@@ -136,6 +148,10 @@ class Arbiter(Daemon):  # pylint: disable=R0902
         self.http_interface = ArbiterInterface(self)
         self.conf = Config()
 
+        # Configuration loading profiler, enabled if a report file is given (may be empty)
+        self.profile_config = profile_config
+        self.profiler = ConfigProfiler(self.conf, enabled=profile_config is not None)
+
     def add(self, elt):
         """Generic function to add objects to queues.
         Only manage Broks and ExternalCommand
@@ -239,6 +255,13 @@ class Arbiter(Daemon):  # pylint: disable=R0902
         * Create all objects (Service, Host, Realms ...)
         * "Compile" configuration (Linkify, explode, apply inheritance, fill default values ...)
         * Cut conf into parts and prepare it for sending
+        * Save the prepared configuration in a snapshot file (if config_snapshot is set)
+
+        Each phase is measured by the configuration profiler if it is enabled.
+
+        If config_snapshot is set and the configuration files did not change since the
+        snapshot was saved, the configuration is loaded from the snapshot file instead of
+        being created, compiled and cut into parts.
 
         :return: None
         """
@@ -251,8 +274,24 @@ class Arbiter(Daemon):  # pylint: disable=R0902
 
         logger.info("Loading configuration")
         # REF: doc/alignak-conf-dispatching.png (1)
-        buf = self.conf.read_config(self.config_files)
-        raw_objects = self.conf.read_config_buf(buf)
+        with self.profiler.phase('read_config'):
+            buf = self.conf.read_config(self.config_files)
+
+        snapshot_key = None
+        if self.config_snapshot and not self.verify_only and not self.analyse:
+            snapshot_key = get_snapshot_key(buf, self.conf.triggers_dirs, self.arbiter_name)
+            if self.rebuild_config:
+                logger.info("Rebuilding the configuration, the snapshot is ignored")
+            elif self.conf.conf_is_correct:
+                with self.profiler.phase('load_snapshot'):
+                    loaded = self.load_config_snapshot(snapshot_key)
+                if loaded:
+                    self.profiler.report(self.profile_config)
+                    return
+
+        with self.profiler.phase('read_config_buf'):
+            raw_objects = self.conf.read_config_buf(
+                buf, self.config_parsing_processes or multiprocessing.cpu_count())
         # Maybe conf is already invalid
         if not self.conf.conf_is_correct:
             err = "***> One or more problems was encountered while processing the config files..."
@@ -267,73 +306,45 @@ class Arbiter(Daemon):  # pylint: disable=R0902
 
         # First we need to get arbiters and modules
         # so we can ask them for objects
-        self.conf.create_objects_for_type(raw_objects, 'arbiter')
-        self.conf.create_objects_for_type(raw_objects, 'module')
+        with self.profiler.phase('early_arbiter_linking'):
+            self.conf.create_objects_for_type(raw_objects, 'arbiter')
+            self.conf.create_objects_for_type(raw_objects, 'module')
 
-        self.conf.early_arbiter_linking()
+            self.conf.early_arbiter_linking()
 
-        # Search which arbiter I am in the arbiters list
-        for arbiter in self.conf.arbiters:
-            if arbiter.get_name() in ['Default-Arbiter', self.arbiter_name]:
-                logger.info("I found myself in the configuration: %s", arbiter.get_name())
-                # Arbiter is master one
-                arbiter.need_conf = False
-                self.myself = arbiter
-                self.is_master = not self.myself.spare
-                if self.is_master:
-                    logger.info("I am the master Arbiter: %s", arbiter.get_name())
-                else:
-                    logger.info("I am a spare Arbiter: %s", arbiter.get_name())
-                # export this data to our statsmgr object :)
-                statsd_host = getattr(self.conf, 'statsd_host', 'localhost')
-                statsd_port = getattr(self.conf, 'statsd_port', 8125)
-                statsd_prefix = getattr(self.conf, 'statsd_prefix', 'alignak')
-                statsd_enabled = getattr(self.conf, 'statsd_enabled', False)
-                statsmgr.register(arbiter.get_name(), 'arbiter',
-                                  statsd_host=statsd_host, statsd_port=statsd_port,
-                                  statsd_prefix=statsd_prefix, statsd_enabled=statsd_enabled)
-
-                # Set myself as alive ;)
-                self.myself.alive = True
-            else:  # not me
-                # Arbiter is not me!
-                logger.info("Found another arbiter in the configuration: %s", arbiter.get_name())
-                arbiter.need_conf = True
-
-        if not self.myself:
-            sys.exit("Error: I cannot find my own Arbiter object (%s), I bail out. "
-                     "To solve this, please change the arbiter_name parameter in "
-                     "the arbiter configuration file (certainly arbiter-master.cfg) "
-                     "with the value '%s'."
-                     " Thanks." % (self.arbiter_name, socket.gethostname()))
+        self.find_myself()
 
         # Whether I am a spare arbiter, I will parse the whole configuration. This may be useful
         # if the master fails before sending its configuration to me!
 
         # Ok it's time to load the module manager now!
-        self.load_modules_manager(self.myself.get_name())
-        # we request the instances without them being *started*
-        # (for those that are concerned ("external" modules):
-        # we will *start* these instances after we have been daemonized (if requested)
-        self.do_load_modules(self.myself.modules)
+        with self.profiler.phase('load_modules'):
+            self.load_modules_manager(self.myself.get_name())
+            # we request the instances without them being *started*
+            # (for those that are concerned ("external" modules):
+            # we will *start* these instances after we have been daemonized (if requested)
+            self.do_load_modules(self.myself.modules)
 
         if not self.is_master:
             logger.info("I am not the master arbiter, I stop parsing the configuration")
+            self.profiler.report(self.profile_config)
             return
 
-        # Call modules that manage this read configuration pass
-        self.hook_point('read_configuration')
+        with self.profiler.phase('modules_configuration'):
+            # Call modules that manage this read configuration pass
+            self.hook_point('read_configuration')
 
-        # Call modules get_alignak_configuration() to load Alignak configuration parameters
-        # (example modules: alignak_backend)
-        self.load_modules_alignak_configuration()
+            # Call modules get_alignak_configuration() to load Alignak configuration parameters
+            # (example modules: alignak_backend)
+            self.load_modules_alignak_configuration()
 
-        # Call modules get_objects() to load new objects from them
-        # (example modules: alignak_backend)
-        self.load_modules_configuration_objects(raw_objects)
+            # Call modules get_objects() to load new objects from them
+            # (example modules: alignak_backend)
+            self.load_modules_configuration_objects(raw_objects)
 
         # Resume standard operations
-        self.conf.create_objects(raw_objects)
+        with self.profiler.phase('create_objects'):
+            self.conf.create_objects(raw_objects)
 
         # Maybe conf is already invalid
         if not self.conf.conf_is_correct:
@@ -344,74 +355,93 @@ class Arbiter(Daemon):  # pylint: disable=R0902
             sys.exit(err)
 
         # Manage all post-conf modules
-        self.hook_point('early_configuration')
+        with self.profiler.phase('early_configuration'):
+            self.hook_point('early_configuration')
 
         # Load all file triggers
-        self.conf.load_triggers()
+        with self.profiler.phase('load_triggers'):
+            self.conf.load_triggers()
 
         # Create Template links
-        self.conf.linkify_templates()
+        with self.profiler.phase('linkify_templates'):
+            self.conf.linkify_templates()
 
         # All inheritances
-        self.conf.apply_inheritance()
+        with self.profiler.phase('apply_inheritance'):
+            self.conf.apply_inheritance()
 
         # Explode between types
-        self.conf.explode()
+        with self.profiler.phase('explode'):
+            self.conf.explode()
 
         # Implicit inheritance for services
-        self.conf.apply_implicit_inheritance()
+        with self.profiler.phase('apply_implicit_inheritance'):
+            self.conf.apply_implicit_inheritance()
 
         # Fill default values
-        self.conf.fill_default()
+        with self.profiler.phase('fill_default'):
+            self.conf.fill_default()
 
         # Remove templates from config
-        self.conf.remove_templates()
+        with self.profiler.phase('remove_templates'):
+            self.conf.remove_templates()
 
         # Overrides specific service instances properties
-        self.conf.override_properties()
+        with self.profiler.phase('override_properties'):
+            self.conf.override_properties()
 
         # Linkify objects to each other
-        self.conf.linkify()
+        with self.profiler.phase('linkify'):
+            self.conf.linkify()
 
         # applying dependencies
-        self.conf.apply_dependencies()
+        with self.profiler.phase('apply_dependencies'):
+            self.conf.apply_dependencies()
 
         # Hacking some global parameters inherited from Nagios to create
         # on the fly some Broker modules like for status.dat parameters
         # or nagios.log one if there are none already available
-        self.conf.hack_old_nagios_parameters()
+        with self.profiler.phase('hack_old_nagios_parameters'):
+            self.conf.hack_old_nagios_parameters()
 
         # Raise warning about currently unmanaged parameters
         if self.verify_only:
             self.conf.warn_about_unmanaged_parameters()
 
         # Explode global conf parameters into Classes
-        self.conf.explode_global_conf()
+        with self.profiler.phase('explode_global_conf'):
+            self.conf.explode_global_conf()
 
         # set our own timezone and propagate it to other satellites
-        self.conf.propagate_timezone_option()
+        with self.profiler.phase('propagate_timezone_option'):
+            self.conf.propagate_timezone_option()
 
-        # Look for business rules, and create the dep tree
-        self.conf.create_business_rules()
-        # And link them
-        self.conf.create_business_rules_dependencies()
+        with self.profiler.phase('create_business_rules'):
+            # Look for business rules, and create the dep tree
+            self.conf.create_business_rules()
+            # And link them
+            self.conf.create_business_rules_dependencies()
 
         # Warn about useless parameters in Alignak
         if self.verify_only:
             self.conf.notice_about_useless_parameters()
 
         # Manage all post-conf modules
-        self.hook_point('late_configuration')
+        with self.profiler.phase('late_configuration'):
+            self.hook_point('late_configuration')
 
         # Configuration is correct?
-        self.conf.is_correct()
+        with self.profiler.phase('is_correct'):
+            self.conf.is_correct()
 
         # Maybe some elements were not wrong, so we must clean if possible
-        self.conf.clean()
+        with self.profiler.phase('clean'):
+            self.conf.clean()
 
         # Dump Alignak macros
-        macro_resolver = MacroResolver()
-        macro_resolver.init(self.conf)
+        with self.profiler.phase('macros'):
+            macro_resolver = MacroResolver()
+            macro_resolver.init(self.conf)
 
         logger.info("Alignak global macros:")
         for macro_name in sorted(self.conf.macros):
@@ -429,7 +459,8 @@ class Arbiter(Daemon):  # pylint: disable=R0902
 
         # REF: doc/alignak-conf-dispatching.png (2)
         logger.info("Splitting hosts and services into parts")
-        self.confs = self.conf.cut_into_parts()
+        with self.profiler.phase('cut_into_parts'):
+            self.confs = self.conf.cut_into_parts()
 
         # The conf can be incorrect here if the cut into parts see errors like
         # a realm with hosts and no schedulers for it
@@ -441,7 +472,8 @@ class Arbiter(Daemon):  # pylint: disable=R0902
             sys.exit(err)
 
         # Clean objects of temporary/unnecessary attributes for live work:
-        self.conf.clean()
+        with self.profiler.phase('clean_parts'):
+            self.conf.clean()
 
         logger.info("Things look okay - "
                     "No serious problems were detected during the pre-flight check")
@@ -454,6 +486,7 @@ class Arbiter(Daemon):  # pylint: disable=R0902
             logger.info("Arbiter checked the configuration")
             # Display found warnings and errors
             self.conf.show_errors()
+            self.profiler.report(self.profile_config)
             sys.exit(0)
 
         if self.analyse:  # pragma: no cover, not used currently (see #607)
@@ -474,7 +507,8 @@ class Arbiter(Daemon):  # pylint: disable=R0902
         # Some properties need to be "flatten" (put in strings)
         # before being sent, like realms for hosts for example
         # BEWARE: after the cutting part, because we stringify some properties
-        self.conf.prepare_for_sending()
+        with self.profiler.phase('prepare_for_sending'):
+            self.conf.prepare_for_sending()
 
         # Ignore daemon configuration parameters (port, log, ...) in the monitoring configuration
         # It's better to use daemon default parameters rather than those found in the monitoring
@@ -499,9 +533,103 @@ class Arbiter(Daemon):  # pylint: disable=R0902
             self.conf.show_errors()
             sys.exit(err)
 
+        if snapshot_key:
+            if self.myself.modules or self.conf.missing_daemons:
+                logger.info("The configuration depends on the arbiter modules or launched "
+                            "daemons, it is not saved in a snapshot")
+            else:
+                with self.profiler.phase('save_snapshot'):
+                    save_snapshot(self.get_config_snapshot_path(), snapshot_key, self.conf)
+
         # Display found warnings and errors
         self.conf.show_errors()
 
+        self.profiler.report(self.profile_config)
+
+    def find_myself(self):
+        """Search which arbiter I am in the arbiters list of the configuration
+
+        Exit if my own arbiter is not found
+
+        :return: None
+        """
+        for arbiter in self.conf.arbiters:
+            if arbiter.get_name() in ['Default-Arbiter', self.arbiter_name]:
+                logger.info("I found myself in the configuration: %s", arbiter.get_name())
+                # Arbiter is master one
+                arbiter.need_conf = False
+                self.myself = arbiter
+                self.is_master = not self.myself.spare
+                if self.is_master:
+                    logger.info("I am the master Arbiter: %s", arbiter.get_name())
+                else:
+                    logger.info("I am a spare Arbiter: %s", arbiter.get_name())
+                # export this data to our statsmgr object :)
+                statsd_host = getattr(self.conf, 'statsd_host', 'localhost')
+                statsd_port = getattr(self.conf, 'statsd_port', 8125)
+                statsd_prefix = getattr(self.conf, 'statsd_prefix', 'alignak')
+                statsd_enabled = getattr(self.conf, 'statsd_enabled', False)
+                statsmgr.register(arbiter.get_name(), 'arbiter',
+                                  statsd_host=statsd_host, statsd_port=statsd_port,
+                                  statsd_prefix=statsd_prefix, statsd_enabled=statsd_enabled)
+
+                # Set myself as alive ;)
+                self.myself.alive = True
+            else:  # not me
+                # Arbiter is not me!
+                logger.info("Found another arbiter in the configuration: %s", arbiter.get_name())
+                arbiter.need_conf = True
+
+        if not self.myself:
+            sys.exit("Error: I cannot find my own Arbiter object (%s), I bail out. "
+                     "To solve this, please change the arbiter_name parameter in "
+                     "the arbiter configuration file (certainly arbiter-master.cfg) "
+                     "with the value '%s'."
+                     " Thanks." % (self.arbiter_name, socket.gethostname()))
+
+    def get_config_snapshot_path(self):
+        """Get the configuration snapshot file path
+
+        :return: snapshot file path, relative to the workdir if not absolute
+        :rtype: str
+        """
+        return os.path.join(self.workdir, self.config_snapshot)
+
+    def load_config_snapshot(self, snapshot_key):
+        """Load the configuration prepared for sending from the snapshot file, and set up
+        the arbiter as load_monitoring_config_file does
+
+        :param snapshot_key: key of the configuration files, see get_snapshot_key
+        :type snapshot_key: str
+        :return: True if the configuration is loaded from the snapshot
+        :rtype: bool
+        """
+        conf = load_snapshot(self.get_config_snapshot_path(), snapshot_key)
+        if conf is None:
+            return False
+
+        self.conf = self.profiler.conf = conf
+        self.confs = conf.confs
+        self.alignak_name = getattr(self.conf, "alignak_name", self.arbiter_name)
+        logger.info("Configuration for Alignak: %s", self.alignak_name)
+
+        self.find_myself()
+        self.load_modules_manager(self.myself.get_name())
+        self.do_load_modules(self.myself.modules)
+
+        macro_resolver = MacroResolver()
+        macro_resolver.init(self.conf)
+
+        self.accept_passive_unknown_check_results = BoolProp.pythonize(
+            getattr(self.myself, 'accept_passive_unknown_check_results', '0')
+        )
+        self.host = self.myself.address
+        self.port = self.myself.port
+
+        logger.info("Configuration Loaded")
+        self.conf.show_errors()
+        return True
+
     def manage_missing_daemons(self):
         """Manage the list of detected missing daemons
 
@@ -72,10 +72,9 @@ from alignak.objects import *
 from alignak.misc.serialization import unserialize, AlignakClassLookupException
 from alignak.satellite import BaseSatellite
 from alignak.property import PathProp, IntegerProp, StringProp
-from alignak.util import sort_by_ids
 from alignak.stats import statsmgr
 from alignak.http.client import HTTPClientException, HTTPClientConnectionException, \
-    HTTPClientTimeoutException
+    HTTPClientTimeoutException, fan_out
 from alignak.http.broker_interface import BrokerInterface
 
 logger = logging.getLogger(__name__)  # pylint: disable=C0103
@@ -97,6 +96,15 @@ class Broker(BaseSatellite):
             IntegerProp(default=7772),
         'local_log':
             PathProp(default='brokerd.log'),
+        # Maximum number of broks got from a scheduler in one request
+        'broks_batch_size':
+            IntegerProp(default=1000),
+        # Number of broks given at once to the internal modules
+        'broks_dispatch_batch_size':
+            IntegerProp(default=500),
+        # Do not get new broks while more broks are waiting for the internal modules
+        'max_unmanaged_broks':
+            IntegerProp(default=100000),
     })
 
     def __init__(self, config_file, is_daemon, do_replace, debug, debug_file,
@@ -133,6 +141,10 @@ class Broker(BaseSatellite):
         self.arbiter_broks_lock = threading.RLock()
 
         self.timeout = 1.0
+        # Some broks remain to be got from the schedulers
+        self.broks_backlog = False
+        # Number of broks managed by the internal modules since the daemon started
+        self.broks_managed = 0
 
         self.http_interface = BrokerInterface(self)
 
@@ -193,21 +205,24 @@ class Broker(BaseSatellite):
             statsmgr.counter('message.added', 1)
             # The module death will be looked for elsewhere and restarted.
 
-    def manage_brok(self, brok):
-        """Get a brok.
-        We put brok data to the modules
+    def manage_broks(self, broks):
+        """Give a batch of broks to the internal modules
 
-        :param brok: object with data
-        :type brok: object
+        :param broks: broks to manage
+        :type broks: list
         :return: None
         """
-        # Unserialize the brok before consuming it
-        brok.prepare()
+        # Unserialize the broks before consuming them
+        for brok in broks:
+            brok.prepare()
 
         for module in self.modules_manager.get_internal_instances():
             try:
                 _t0 = time.time()
-                module.manage_brok(brok)
+                if module.brok_types:
+                    module.manage_broks([brok for brok in broks if module.want_brok(brok)])
+                else:
+                    module.manage_broks(broks)
                 statsmgr.timer('manage-broks.internal.%s' % module.get_name(), time.time() - _t0)
             except Exception as exp:  # pylint: disable=broad-except
                 logger.warning("The mod %s raise an exception: %s, "
@@ -215,6 +230,43 @@ class Broker(BaseSatellite):
                 logger.exception(exp)
                 self.modules_manager.set_to_restart(module)
 
+    def manage_internal_broks(self, max_duration=1.0):
+        """Make the internal modules manage the broks, by batches of broks_dispatch_batch_size
+        broks and during max_duration seconds at most. The broks that were not managed
+        are kept, the oldest first, for the next loop turn
+
+        :param max_duration: maximum duration of the broks management
+        :type max_duration: float
+        :return: number of managed broks
+        :rtype: int
+        """
+        if not self.modules_manager.get_internal_instances():
+            # Nobody to give them to, the external modules already got them
+            self.broks = []
+            return 0
+
+        start = time.time()
+        managed = 0
+        batch_size = max(1, self.broks_dispatch_batch_size)
+        while managed < len(self.broks):
+            # Do not 'manage' more than max_duration, we must get new broks
+            if time.time() - start > max_duration:
+                logger.warning("Did not managed all my broks, remaining %d broks...",
+                               len(self.broks) - managed)
+                break
+            self.manage_broks(self.broks[managed:managed + batch_size])
+            managed += batch_size
+        managed = min(managed, len(self.broks))
+        del self.broks[:managed]
+
+        duration = time.time() - start
+        self.broks_managed += managed
+        statsmgr.counter('broks.managed', managed)
+        statsmgr.timer('broks.managed-time', duration)
+        if managed and duration > 0:
+            statsmgr.gauge('broks.managed-rate', int(managed / duration))
+        return managed
+
     def get_internal_broks(self):
         """Get all broks from self.broks_internal_raised and append them to self.broks
 
@@ -254,6 +306,7 @@ class Broker(BaseSatellite):
 
         # We check for new check in each schedulers and put
         # the result in new_checks
+        to_get = []
         for s_id in links:
             logger.debug("Getting broks from %s", links[s_id]['name'])
             link = links[s_id]
@@ -274,10 +327,20 @@ class Broker(BaseSatellite):
                                      "it is not possible to get broks from this daemon.",
                                      s_type, link['name'])
                     continue
+            to_get.append(link)
 
+        # Get the broks of all the daemons at once
+        _t0 = time.time()
+        if s_type == 'scheduler':
+            returns = fan_out(self.get_broks_page, to_get, self.max_parallel_requests)
+        else:
+            returns = fan_out(lambda link: link['con'].get('get_broks', {'bname': self.name},
+                                                           wait='long'),
+                              to_get, self.max_parallel_requests)
+        for link, (tmp_broks, error) in zip(to_get, returns):
             try:
-                _t0 = time.time()
-                tmp_broks = link['con'].get('get_broks', {'bname': self.name}, wait='long')
+                if error is not None:
+                    raise error
                 try:
                     tmp_broks = unserialize(tmp_broks, True)
                 except AlignakClassLookupException as exp:  # pragma: no cover,
@@ -298,17 +361,17 @@ class Broker(BaseSatellite):
             except HTTPClientConnectionException as exp:  # pragma: no cover, simple protection
                 logger.warning("[%s] %s", link['name'], str(exp))
                 link['con'] = None
-                return
+                continue
             except HTTPClientTimeoutException as exp:  # pragma: no cover, simple protection
                 logger.warning("Connection timeout with the %s '%s' when getting broks: %s",
                                s_type, link['name'], str(exp))
                 link['con'] = None
-                return
+                continue
             except HTTPClientException as exp:  # pragma: no cover, simple protection
                 logger.error("Error with the %s '%s' when getting broks: %s",
                              s_type, link['name'], str(exp))
                 link['con'] = None
-                return
+                continue
             # scheduler must not have checks
             #  What the F**k? We do not know what happened,
             # so.. bye bye :)
@@ -316,6 +379,34 @@ class Broker(BaseSatellite):
                 logger.exception(exp)
                 sys.exit(1)
 
+    def get_broks_page(self, link):
+        """Get a page of broks from a scheduler
+
+        The cursor of the last page received from the scheduler is sent to acknowledge
+        this page. If some broks remain in the scheduler, the broker will not wait
+        before its next loop turn.
+
+        The types of the broks wanted by our modules are sent too, the scheduler
+        only sends these broks.
+
+        :param link: scheduler link
+        :type link: dict
+        :return: serialized broks of the page
+        :rtype: dict
+        """
+        brok_types = self.modules_manager.get_brok_types(self.modules_manager.instances)
+        page = link['con'].get('get_broks_page',
+                               {'bname': self.name, 'cursor': link.get('broks_cursor', 0),
+                                'max_count': self.broks_batch_size,
+                                'brok_types': ','.join(sorted(brok_types or []))},
+                               wait='long')
+        link['broks_cursor'] = page['cursor']
+        if page['remaining']:
+            logger.debug("Still %d broks to get from %s", page['remaining'], link['name'])
+            self.broks_backlog = True
+        statsmgr.gauge('get-new-broks-remaining.%s' % link['name'], page['remaining'])
+        return page['broks']
+
     def get_retention_data(self):  # pragma: no cover, useful?
         """Get all broks
 
@@ -398,10 +489,12 @@ class Broker(BaseSatellite):
                                 self.name, old_sched_id, name)
                     broks = self.schedulers[old_sched_id]['broks']
                     running_id = self.schedulers[old_sched_id]['running_id']
+                    broks_cursor = self.schedulers[old_sched_id].get('broks_cursor', 0)
                     del self.schedulers[old_sched_id]
                 else:
                     broks = {}
                     running_id = 0
+                    broks_cursor = 0
                 sched = conf['schedulers'][sched_id]
                 self.schedulers[sched_id] = sched
 
@@ -420,6 +513,7 @@ class Broker(BaseSatellite):
                 self.schedulers[sched_id]['broks'] = broks
                 self.schedulers[sched_id]['instance_id'] = sched['instance_id']
                 self.schedulers[sched_id]['running_id'] = running_id
+                self.schedulers[sched_id]['broks_cursor'] = broks_cursor
                 self.schedulers[sched_id]['active'] = sched['active']
                 self.schedulers[sched_id]['last_connection'] = 0
                 self.schedulers[sched_id]['timeout'] = sched['timeout']
@@ -664,6 +758,7 @@ class Broker(BaseSatellite):
         metrics.append('broker.%s.external-commands.queue %d %d' % (
             self.name, len(self.external_commands), now))
         metrics.append('broker.%s.broks.queue %d %d' % (self.name, len(self.broks), now))
+        metrics.append('broker.%s.broks.managed %d %d' % (self.name, self.broks_managed, now))
         return res
 
     def do_loop_turn(self):
@@ -685,22 +780,32 @@ class Broker(BaseSatellite):
         if self.new_conf:
             self.setup_new_conf()
 
+        # The broks already here were sent to the external modules on the former loop turns
+        new_broks = len(self.broks)
+
         # Maybe the last loop we did raised some broks internally
         self.get_internal_broks()
 
         # Also reap broks sent from the arbiters
         self.get_arbiter_broks()
 
-        # Now get broks from our distant daemons
-        for _type in ['scheduler', 'poller', 'reactionner', 'receiver']:
-            self.get_new_broks(s_type=_type)
-
-        # Sort the brok list by id
-        self.broks.sort(sort_by_ids)
-
-        # Get the list of broks not yet sent to our external modules
+        # Now get broks from our distant daemons, unless the internal modules are late:
+        # the broks wait in the daemons until we can manage them
+        self.broks_backlog = False
+        if len(self.broks) < self.max_unmanaged_broks:
+            for _type in ['scheduler', 'poller', 'reactionner', 'receiver']:
+                self.get_new_broks(s_type=_type)
+        else:
+            logger.warning("Too many broks waiting for the internal modules (%d), "
+                           "I do not get new broks", len(self.broks))
+            statsmgr.counter('broks.backpressure', 1)
+            self.broks_backlog = True
+
+        # Get the list of broks not yet sent to our external modules, the broks are
+        # kept in their reception order
         _t0 = time.time()
-        broks_to_send = [brok for brok in self.broks if getattr(brok, 'to_be_sent', True)]
+        broks_to_send = [brok for brok in self.broks[new_broks:]
+                         if getattr(brok, 'to_be_sent', True)]
         statsmgr.gauge('get-new-broks-count.to_send', len(broks_to_send))
 
         # Send the broks to all external modules to_q queue so they can get the whole packet
@@ -711,7 +816,11 @@ class Broker(BaseSatellite):
                 _t00 = time.time()
                 queue_size = module.to_q.qsize()
                 statsmgr.gauge('queues.external.%s.to.size' % module.get_name(), queue_size)
-                module.to_q.put(broks_to_send)
+                if module.brok_types:
+                    # Only the broks the module wants
+                    module.to_q.put([brok for brok in broks_to_send if module.want_brok(brok)])
+                else:
+                    module.to_q.put(broks_to_send)
                 statsmgr.timer('queues.external.%s.to.put' % module.get_name(), time.time() - _t00)
             except Exception as exp:  # pylint: disable=broad-except
                 # first we must find the modules
@@ -725,28 +834,8 @@ class Broker(BaseSatellite):
             brok.to_be_sent = False
         logger.debug("Time to send %s broks (%d secs)", len(broks_to_send), time.time() - _t0)
 
-        # We must add new broks at the end of the list, so we reverse the list
-        self.broks.reverse()
-
         # Make the internal modules manage the broks
-        start = time.time()
-        while self.broks:
-            now = time.time()
-            # Do not 'manage' more than 1s, we must get new broks
-            # every 1s
-            if now - start > 1:
-                logger.warning("Did not managed all my broks, remaining %d broks...",
-                               len(self.broks))
-                break
-
-            brok = self.broks.pop()
-            if self.modules_manager.get_internal_instances():
-                self.manage_brok(brok)
-                # Make a very short pause to avoid overloading
-                self.make_a_pause(0.01, check_time_change=False)
-            else:
-                if getattr(brok, 'to_be_sent', False):
-                    self.broks.append(brok)
+        self.manage_internal_broks()
 
         # Maybe our external modules raised 'objects', so get them
         if self.get_objects_from_from_queues():
@@ -755,7 +844,7 @@ class Broker(BaseSatellite):
 
         # Maybe we do not have something to do, so we wait a little
         # TODO: redone the diff management....
-        if not self.broks:
+        if not self.broks and not self.broks_backlog:
             while self.timeout > 0:
                 begin = time.time()
                 self.watch_for_new_conf(1.0)
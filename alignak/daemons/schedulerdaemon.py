@@ -149,11 +149,11 @@ class Alignak(BaseSatellite):
             serv.compensate_system_time_change(difference)
 
         # Now all checks and actions
-        for chk in self.sched.checks.values():
+        for chk in self.sched.checks.get_by_status('scheduled'):
             # Already launch checks should not be touch
-            if chk.status == 'scheduled' and chk.t_to_go is not None:
+            if chk.t_to_go is not None:
                 t_to_go = chk.t_to_go
-                ref = self.sched.find_item_by_id(chk.ref)
+                ref = self.sched.get_ref_of(chk)
                 new_t = max(0, t_to_go + difference)
                 timeperiod = timeperiods[ref.check_period]
                 if timeperiod is not None:
@@ -172,35 +172,31 @@ class Alignak(BaseSatellite):
                     ref.next_chk = new_t
 
         # Now all checks and actions
-        for act in self.sched.actions.values():
+        for act in self.sched.actions.get_by_status('scheduled'):
             # Already launch checks should not be touch
-            if act.status == 'scheduled':
-                t_to_go = act.t_to_go
+            t_to_go = act.t_to_go
+            new_t = max(0, t_to_go + difference)
 
-                #  Event handler do not have ref
-                ref_id = getattr(act, 'ref', None)
-                new_t = max(0, t_to_go + difference)
-
-                # Notification should be check with notification_period
-                if act.is_a == 'notification':
-                    ref = self.sched.find_item_by_id(ref_id)
-                    if ref.notification_period:
-                        # But it's no so simple, we must match the timeperiod
-                        notification_period = self.sched.timeperiods[ref.notification_period]
-                        new_t = notification_period.get_next_valid_time_from_t(new_t)
-                    # And got a creation_time variable too
-                    act.creation_time += difference
-
-                # But maybe no there is no more new value! Not good :(
-                # Say as error, with error output
-                if new_t is None:
-                    act.state = 'waitconsume'
-                    act.exit_status = 2
-                    act.output = '(Error: there is no available check time after time change!)'
-                    act.check_time = time.time()
-                    act.execution_time = 0
-                else:
-                    act.t_to_go = new_t
+            # Notification should be check with notification_period
+            if act.is_a == 'notification':
+                ref = self.sched.get_ref_of(act)
+                if ref.notification_period:
+                    # But it's no so simple, we must match the timeperiod
+                    notification_period = self.sched.timeperiods[ref.notification_period]
+                    new_t = notification_period.get_next_valid_time_from_t(new_t)
+                # And got a creation_time variable too
+                act.creation_time += difference
+
+            # But maybe no there is no more new value! Not good :(
+            # Say as error, with error output
+            if new_t is None:
+                act.state = 'waitconsume'
+                act.exit_status = 2
+                act.output = '(Error: there is no available check time after time change!)'
+                act.check_time = time.time()
+                act.execution_time = 0
+            else:
+                act.t_to_go = new_t
 
     def manage_signal(self, sig, frame):
         """Manage signals caught by the daemon
@@ -249,8 +245,12 @@ class Alignak(BaseSatellite):
         :return: None
         """
         with self.conf_lock:
-            self.clean_previous_run()
             new_conf = self.new_conf
+            if 'conf_delta' in new_conf:
+                self.setup_conf_delta()
+                return
+
+            self.clean_previous_run()
             logger.info("[%s] Sending us a configuration", self.name)
             conf_raw = new_conf['conf']
             override_conf = new_conf['override_conf']
@@ -305,38 +305,7 @@ class Alignak(BaseSatellite):
             self.override_conf = override_conf
             self.modules = unserialize(modules, True)
             self.satellites = satellites
-
-            # Now We create our pollers, reactionners and brokers
-            for sat_type in ['pollers', 'reactionners', 'brokers']:
-                if sat_type not in satellites:
-                    continue
-                for sat_id in satellites[sat_type]:
-                    # Must look if we already have it
-                    sats = getattr(self, sat_type)
-                    sat = satellites[sat_type][sat_id]
-
-                    sats[sat_id] = sat
-
-                    if sat['name'] in override_conf['satellitemap']:
-                        sat = dict(sat)  # make a copy
-                        sat.update(override_conf['satellitemap'][sat['name']])
-
-                    proto = 'http'
-                    if sat['use_ssl']:
-                        proto = 'https'
-                    uri = '%s://%s:%s/' % (proto, sat['address'], sat['port'])
-
-                    sats[sat_id]['uri'] = uri
-                    sats[sat_id]['con'] = None
-                    sats[sat_id]['running_id'] = 0
-                    sats[sat_id]['last_connection'] = 0
-                    sats[sat_id]['connection_attempt'] = 0
-                    sats[sat_id]['max_failed_connections'] = 3
-                    setattr(self, sat_type, sats)
-                logger.debug("We have our %s: %s ", sat_type, satellites[sat_type])
-                logger.info("We have our %s:", sat_type)
-                for daemon in satellites[sat_type].values():
-                    logger.info(" - %s ", daemon['name'])
+            self.setup_satellites()
 
             # First mix conf and override_conf to have our definitive conf
             for prop in self.override_conf:
@@ -357,6 +326,7 @@ class Alignak(BaseSatellite):
             self.sched.reset()
             self.sched.load_conf(self.conf)
             self.sched.load_satellites(self.pollers, self.reactionners, self.brokers)
+            self.sched.conf_fingerprints = new_conf.get('fingerprints', {})
 
             # We must update our Config dict macro with good value
             # from the config parameters
@@ -390,6 +360,116 @@ class Alignak(BaseSatellite):
             brok = Brok({'type': 'new_conf', 'data': {}})
             self.sched.add_brok(brok)
 
+    def setup_conf_delta(self):
+        """Setup a configuration delta received for the scheduler: apply the changes on the
+        current configuration instead of loading a whole new one (see alignak.configdelta)
+
+        If the delta is not based on our current configuration, it is dropped as well as
+        our configuration fingerprints, so that the arbiter sends a whole configuration
+
+        :return: None
+        """
+        new_conf = self.new_conf
+        self.new_conf = None
+        delta = new_conf['conf_delta']
+        # The scheduler was asked to die when the configuration was received, it goes on
+        # with its current configuration, it is not reset
+        self.sched.must_run = True
+        if not self.sched.conf_fingerprints or delta['base_flavor'] != self.sched.push_flavor:
+            logger.warning("[%s] Received a configuration delta that is not based on my "
+                           "configuration, waiting for a whole configuration", self.name)
+            self.sched.conf_fingerprints = {}
+            return
+
+        logger.info("[%s] Received a configuration delta, identifiers: %s (%s)",
+                    self.name, new_conf['conf_uuid'], new_conf['push_flavor'])
+        t00 = time.time()
+        statsmgr.register(new_conf['instance_name'], 'scheduler',
+                          statsd_host=new_conf['statsd_host'],
+                          statsd_port=new_conf['statsd_port'],
+                          statsd_prefix=new_conf['statsd_prefix'],
+                          statsd_enabled=new_conf['statsd_enabled'])
+
+        # Tag the conf with our new data
+        self.conf.uuid = new_conf['conf_uuid']
+        self.conf.instance_id = new_conf['instance_id']
+        self.conf.push_flavor = new_conf['push_flavor']
+        self.conf.alignak_name = new_conf['alignak_name']
+        self.conf.instance_name = new_conf['instance_name']
+        self.conf.skip_initial_broks = new_conf['skip_initial_broks']
+        self.conf.accept_passive_unknown_check_results = \
+            new_conf['accept_passive_unknown_check_results']
+        self.cur_conf = self.conf
+        self.sched.external_commands_manager.accept_passive_unknown_check_results = \
+            self.conf.accept_passive_unknown_check_results
+
+        self.override_conf = new_conf['override_conf']
+        for prop in self.override_conf:
+            setattr(self.conf, prop, self.override_conf[prop])
+
+        self.clean_previous_run()
+        self.modules = unserialize(new_conf['modules'], True)
+        self.satellites = new_conf['satellites']
+        self.setup_satellites()
+        self.do_load_modules(self.modules)
+
+        self.sched.apply_conf_delta(delta)
+        self.sched.conf_fingerprints = new_conf['fingerprints']
+        m_solver = MacroResolver()
+        m_solver.init(self.conf)
+
+        # Our brokers get all our initial broks again
+        self.sched.brokers.clear()
+        self.sched.load_satellites(self.pollers, self.reactionners, self.brokers)
+
+        self.schedulers = {self.conf.uuid: self.sched}  # pylint: disable=E1101
+        logger.info("[%s] Configuration delta applied in %.2f seconds",
+                    self.name, time.time() - t00)
+
+        # Create brok new conf
+        brok = Brok({'type': 'new_conf', 'data': {}})
+        self.sched.add_brok(brok)
+
+    def setup_satellites(self):
+        """Create our pollers, reactionners and brokers links from the satellites
+        received with our configuration
+
+        :return: None
+        """
+        satellites = self.satellites
+        override_conf = self.override_conf
+        # Now We create our pollers, reactionners and brokers
+        for sat_type in ['pollers', 'reactionners', 'brokers']:
+            if sat_type not in satellites:
+                continue
+            for sat_id in satellites[sat_type]:
+                # Must look if we already have it
+                sats = getattr(self, sat_type)
+                sat = satellites[sat_type][sat_id]
+
+                sats[sat_id] = sat
+
+                if sat['name'] in override_conf['satellitemap']:
+                    sat = dict(sat)  # make a copy
+                    sat.update(override_conf['satellitemap'][sat['name']])
+
+                proto = 'http'
+                if sat['use_ssl']:
+                    proto = 'https'
+                uri = '%s://%s:%s/' % (proto, sat['address'], sat['port'])
+
+                sats[sat_id]['uri'] = uri
+                sats[sat_id]['con'] = None
+                sats[sat_id]['running_id'] = 0
+                sats[sat_id]['last_connection'] = 0
+                sats[sat_id]['connection_attempt'] = 0
+                sats[sat_id]['max_failed_connections'] = 3
+                setattr(self, sat_type, sats)
+            logger.debug("We have our %s: %s ", sat_type, satellites[sat_type])
+            logger.info("We have our %s:", sat_type)
+            for daemon in satellites[sat_type].values():
+                logger.info(" - %s ", daemon['name'])
+
     def what_i_managed(self):
         # pylint: disable=no-member
         """Get my managed dict (instance id and push_flavor)
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2016: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+"""This module provides the DirtyItems class used by the scheduler to know which
+hosts and services have some pending work (new actions, new broks, topology change,
+downtimes, acknowledgements) without iterating over all of them on each loop turn.
+
+"""
+
+# Names of the dirty sets
+NEW_ACTIONS = 'actions'
+NEW_BROKS = 'broks'
+TOPOLOGY_CHANGE = 'topology_change'
+DOWNTIMES = 'downtimes'
+ACKNOWLEDGEMENTS = 'acknowledgements'
+
+
+class PendingList(list):
+    """List of the actions or broks raised by a scheduling item.
+
+    Adding an element to the list registers its item in the matching dirty set
+    """
+
+    def __init__(self, dirty_items, name, item, iterable=()):
+        super(PendingList, self).__init__(iterable)
+        self.dirty_items = dirty_items
+        self.name = name
+        self.item = item
+
+    def append(self, elt):
+        super(PendingList, self).append(elt)
+        self.dirty_items.register(self.name, self.item)
+
+    def extend(self, iterable):
+        super(PendingList, self).extend(iterable)
+        if self:
+            self.dirty_items.register(self.name, self.item)
+
+    def insert(self, index, elt):
+        super(PendingList, self).insert(index, elt)
+        self.dirty_items.register(self.name, self.item)
+
+    def __iadd__(self, iterable):
+        self.extend(iterable)
+        return self
+
+
+class DirtyItems(object):
+    """Sets of the hosts and services (indexed by uuid) that have some pending work
+    for the scheduler recurrent works:
+
+    * NEW_ACTIONS: items with actions to get (get_new_actions)
+    * NEW_BROKS: items with broks to get (get_new_broks)
+    * TOPOLOGY_CHANGE: items which topology_change flag is set (reset_topology_change_flag)
+    * DOWNTIMES: items which downtimes changed (update_downtimes_and_comments)
+    * ACKNOWLEDGEMENTS: items which got an acknowledgement (check_for_expire_acknowledge)
+
+    The items register themselves in a set when they append to their actions or broks
+    lists, when their topology changes, when they get, start, stop or cancel a downtime
+    or when they get acknowledged.
+    """
+
+    def __init__(self):
+        self.sets = {NEW_ACTIONS: {}, NEW_BROKS: {}, TOPOLOGY_CHANGE: {}, DOWNTIMES: {},
+                     ACKNOWLEDGEMENTS: {}}
+
+    def watch(self, item):
+        """Attach an item to the dirty sets
+
+        Its actions and broks lists are replaced with lists that register the item
+        when an element is added to them.
+
+        :param item: host or service to watch
+        :type item: alignak.objects.schedulingitem.SchedulingItem
+        :return: None
+        """
+        item.dirty_items = self
+        item.actions = PendingList(self, NEW_ACTIONS, item, item.actions)
+        item.broks = PendingList(self, NEW_BROKS, item, item.broks)
+        if item.actions:
+            self.register(NEW_ACTIONS, item)
+        if item.broks:
+            self.register(NEW_BROKS, item)
+        if item.topology_change:
+            self.register(TOPOLOGY_CHANGE, item)
+        if item.downtimes:
+            self.register(DOWNTIMES, item)
+        if item.acknowledgement:
+            self.register(ACKNOWLEDGEMENTS, item)
+
+    def forget(self, item):
+        """Remove an item from all the dirty sets, when it is removed from the configuration
+
+        :param item: host or service
+        :type item: alignak.objects.schedulingitem.SchedulingItem
+        :return: None
+        """
+        for items in self.sets.values():
+            items.pop(item.uuid, None)
+
+    def register(self, name, item):
+        """Register an item in a dirty set
+
+        :param name: dirty set name
+        :type name: str
+        :param item: host or service
+        :type item: alignak.objects.schedulingitem.SchedulingItem
+        :return: None
+        """
+        self.sets[name][item.uuid] = item
+
+    def get(self, name):
+        """Get the items of a dirty set, the set is not modified
+
+        :param name: dirty set name
+        :type name: str
+        :return: items of the set
+        :rtype: list
+        """
+        return self.sets[name].values()
+
+    def drain(self, name):
+        """Get the items of a dirty set and empty the set
+
+        :param name: dirty set name
+        :type name: str
+        :return: items of the set
+        :rtype: list
+        """
+        items = self.sets[name]
+        self.sets[name] = {}
+        return items.values()
+
+    def clear(self):
+        """Empty all the dirty sets
+
+        :return: None
+        """
+        for name in self.sets:
+            self.sets[name] = {}
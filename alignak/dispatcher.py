@@ -64,6 +64,7 @@ import time
 import random
 
 from alignak.util import alive_then_spare_then_deads
+from alignak.configdelta import get_conf_delta
 
 logger = logging.getLogger(__name__)  # pylint: disable=C0103
 
@@ -469,10 +470,12 @@ class Dispatcher:
                         'statsd_port': self.conf.statsd_port,
                         'statsd_prefix': self.conf.statsd_prefix,
                         'statsd_enabled': self.conf.statsd_enabled,
+                        'fingerprints': realm.conf_fingerprints[conf.uuid],
                     }
 
                     sched.conf = conf
                     sched.conf_package = conf_package
+                    sched.conf_delta_package = self.get_conf_delta_package(realm, conf, sched)
                     sched.push_flavor = conf.push_flavor
                     sched.need_conf = False
                     sched.is_sent = False
@@ -517,6 +520,46 @@ class Dispatcher:
                 # "so it do not ask anymore for conf"
                 sched.need_conf = False
 
+    @staticmethod
+    def get_conf_delta_package(realm, conf, sched):
+        """Get the package of the changes of a configuration since the configuration that
+        the scheduler currently manages, to avoid sending it the whole configuration
+
+        The package holds the same information as the whole configuration package,
+        except the configuration replaced with the delta (see alignak.configdelta)
+
+        :param realm: realm of the configuration
+        :type realm: alignak.objects.realm.Realm
+        :param conf: configuration assigned to the scheduler
+        :type conf: alignak.objects.config.Config
+        :param sched: scheduler
+        :type sched: alignak.objects.schedulerlink.SchedulerLink
+        :return: delta package, empty if the whole configuration must be sent
+        :rtype: dict
+        """
+        known = sched.get_conf_fingerprints()
+        if not known:
+            return {}
+
+        delta = get_conf_delta(conf, realm.conf_fingerprints[conf.uuid],
+                               known.get('fingerprints'))
+        if delta is None:
+            logger.info("[%s] the configuration of the scheduler %s changed too much, "
+                        "sending the whole configuration", realm.get_name(), sched.get_name())
+            return {}
+
+        logger.info("[%s] sending the configuration changes to the scheduler %s: "
+                    "%d added, %d changed and %d removed objects", realm.get_name(),
+                    sched.get_name(), sum(len(i) for i in delta['added'].values()),
+                    sum(len(i) for i in delta['changed'].values()),
+                    sum(len(i) for i in delta['removed'].values()))
+        delta['base_flavor'] = known.get('push_flavor')
+        package = dict(sched.conf_package)
+        del package['conf']
+        package['conf_delta'] = delta
+        package['instance_id'] = conf.instance_id
+        return package
+
     def prepare_dispatch_other_satellites(self, sat_type, realm, cfg, arbiters_cfg):
         """
         Prepare dispatch of other satellites: reactionner, poller, broker and receiver
@@ -595,7 +638,7 @@ class Dispatcher:
                 continue
             t01 = time.time()
             logger.info('Sending configuration to scheduler %s', scheduler.get_name())
-            is_sent = scheduler.put_conf(scheduler.conf_package)
+            is_sent = scheduler.put_conf(scheduler.conf_delta_package or scheduler.conf_package)
             logger.debug("Conf is sent in %d", time.time() - t01)
             if not is_sent:
                 logger.warning('Configuration sending error for scheduler %s', scheduler.get_name())
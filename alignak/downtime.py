@@ -57,6 +57,7 @@ from alignak.comment import Comment
 from alignak.property import BoolProp, IntegerProp, StringProp
 from alignak.brok import Brok
 from alignak.alignakobject import AlignakObject
+from alignak.dirtyitems import DOWNTIMES
 
 
 class Downtime(AlignakObject):
@@ -200,6 +201,7 @@ class Downtime(AlignakObject):
         if self.fixed is False:
             now = time.time()
             self.real_end_time = now + self.duration
+        item.set_dirty(DOWNTIMES)
         item.scheduled_downtime_depth += 1
         item.in_scheduled_downtime = True
         if item.scheduled_downtime_depth == 1:
@@ -275,6 +277,7 @@ class Downtime(AlignakObject):
             pass
         item.del_comment(self.comment_id)
         self.can_be_deleted = True
+        item.set_dirty(DOWNTIMES)
         # when a downtime ends and the service was critical
         # a notification is sent with the next critical check
         # So we should set a flag here which signals consume_result
@@ -308,6 +311,7 @@ class Downtime(AlignakObject):
                 broks.append(self.get_expire_brok(item.host_name, item.get_name()))
         self.del_automatic_comment(item)
         self.can_be_deleted = True
+        item.set_dirty(DOWNTIMES)
         item.in_scheduled_downtime_during_last_check = True
         # Nagios does not notify on canceled downtimes
         # res.extend(self.ref.create_notifications('DOWNTIMECANCELLED'))
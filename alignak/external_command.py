@@ -1163,6 +1163,7 @@ class ExternalCommandManager:
         if varname.upper() in contact.customs:
             contact.modified_attributes |= DICT_MODATTR["MODATTR_CUSTOM_VARIABLE"].value
             contact.customs[varname.upper()] = varvalue
+            contact.reset_macros_cache()
             self.daemon.get_and_register_status_brok(contact)
 
     def change_custom_host_var(self, host, varname, varvalue):
@@ -1182,6 +1183,7 @@ class ExternalCommandManager:
         if varname.upper() in host.customs:
             host.modified_attributes |= DICT_MODATTR["MODATTR_CUSTOM_VARIABLE"].value
             host.customs[varname.upper()] = varvalue
+            host.reset_macros_cache()
             self.daemon.get_and_register_status_brok(host)
 
     def change_custom_svc_var(self, service, varname, varvalue):
@@ -1201,6 +1203,7 @@ class ExternalCommandManager:
         if varname.upper() in service.customs:
             service.modified_attributes |= DICT_MODATTR["MODATTR_CUSTOM_VARIABLE"].value
             service.customs[varname.upper()] = varvalue
+            service.reset_macros_cache()
             self.daemon.get_and_register_status_brok(service)
 
     def change_global_host_event_handler(self, event_handler_command):
@@ -1260,6 +1263,7 @@ class ExternalCommandManager:
         host.modified_attributes |= DICT_MODATTR["MODATTR_CHECK_COMMAND"].value
         data = {"commands": self.commands, "call": check_command, "poller_tag": host.poller_tag}
         host.change_check_command(data)
+        host.reset_macros_cache()
         self.daemon.get_and_register_status_brok(host)
 
     def change_host_check_timeperiod(self, host, timeperiod):
@@ -1293,6 +1297,7 @@ class ExternalCommandManager:
         host.modified_attributes |= DICT_MODATTR["MODATTR_EVENT_HANDLER_COMMAND"].value
         data = {"commands": self.commands, "call": event_handler_command}
         host.change_event_handler(data)
+        host.reset_macros_cache()
         self.daemon.get_and_register_status_brok(host)
 
     def change_host_snapshot_command(self, host, snapshot_command):
@@ -1385,6 +1390,7 @@ class ExternalCommandManager:
         """
         host.modified_attributes |= DICT_MODATTR["MODATTR_MAX_CHECK_ATTEMPTS"].value
         host.max_check_attempts = check_attempts
+        host.reset_macros_cache()
         if host.state_type == 'HARD' and host.state == 'UP' and host.attempt > 1:
             host.attempt = host.max_check_attempts
         self.daemon.get_and_register_status_brok(host)
@@ -1403,6 +1409,7 @@ class ExternalCommandManager:
         """
         service.modified_attributes |= DICT_MODATTR["MODATTR_MAX_CHECK_ATTEMPTS"].value
         service.max_check_attempts = check_attempts
+        service.reset_macros_cache()
         if service.state_type == 'HARD' and service.state == 'OK' and service.attempt > 1:
             service.attempt = service.max_check_attempts
         self.daemon.get_and_register_status_brok(service)
@@ -1502,6 +1509,7 @@ class ExternalCommandManager:
         service.modified_attributes |= DICT_MODATTR["MODATTR_CHECK_COMMAND"].value
         data = {"commands": self.commands, "call": check_command, "poller_tag": service.poller_tag}
         service.change_check_command(data)
+        service.reset_macros_cache()
         self.daemon.get_and_register_status_brok(service)
 
     def change_svc_check_timeperiod(self, service, check_timeperiod):
@@ -1535,6 +1543,7 @@ class ExternalCommandManager:
         service.modified_attributes |= DICT_MODATTR["MODATTR_EVENT_HANDLER_COMMAND"].value
         data = {"commands": self.commands, "call": event_handler_command}
         service.change_event_handler(data)
+        service.reset_macros_cache()
         self.daemon.get_and_register_status_brok(service)
 
     def change_svc_snapshot_command(self, service, snapshot_command):
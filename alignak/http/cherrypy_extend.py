@@ -28,6 +28,7 @@ import cherrypy
 from cherrypy._cpcompat import ntou
 
 from alignak.misc.serialization import unserialize, AlignakClassLookupException
+from alignak.misc.serialization import negotiate_wire_format, dump_wire, load_wire
 
 
 def zlib_processor(entity):  # pragma: no cover, not used in the testing environment...
@@ -68,3 +69,46 @@ def zlib_processor(entity):  # pragma: no cover, not used in the testing environ
             entity.params[key].append(value)
         else:
             entity.params[key] = value
+
+
+def wire_processor(entity):
+    """Read data encoded in a wire format (JSON or msgpack, maybe compressed)
+    and put its content into request.json, as the json_in tool does.
+
+    The Content-Encoding header of the request tells if the data is compressed
+    (deflate or gzip).
+
+    :param entity: cherrypy entity
+    :type entity: cherrypy._cpreqbody.Entity
+    :return: None
+    """
+    if not entity.headers.get(ntou("Content-Length"), ntou("")):
+        raise cherrypy.HTTPError(411)
+
+    body = entity.fp.read()
+    encoding = entity.headers.get(ntou("Content-Encoding"), ntou(""))
+    try:
+        if encoding == 'deflate':
+            body = zlib.decompress(body)
+        elif encoding == 'gzip':
+            body = zlib.decompress(body, 16 + zlib.MAX_WBITS)
+    except zlib.error:
+        raise cherrypy.HTTPError(400, 'Invalid %s data' % encoding)
+
+    with cherrypy.HTTPError.handle(ValueError, 400, 'Invalid %s document' %
+                                   entity.content_type.value):
+        cherrypy.serving.request.json = load_wire(body, entity.content_type.value)
+
+
+def wire_handler(*args, **kwargs):
+    """Encode the response in the wire format accepted by the client (Accept header).
+    To be used as the handler of the json_out tool.
+
+    :return: encoded response
+    :rtype: str
+    """
+    request = cherrypy.serving.request
+    value = request._json_inner_handler(*args, **kwargs)  # pylint: disable=protected-access
+    content_type = negotiate_wire_format(request.headers.get('Accept'))
+    cherrypy.serving.response.headers['Content-Type'] = content_type
+    return dump_wire(value, content_type)
@@ -45,12 +45,26 @@
 #  along with Shinken.  If not, see <http://www.gnu.org/licenses/>.
 """This module provides HTTPClient class. Used by daemon to connect to HTTP servers (other daemons)
 
+All the HTTP clients of a daemon share the same requests session, so the connections
+to the other daemons are pooled and kept alive between the requests. The fan_out
+function allows to request several daemons concurrently.
+
+The clients negotiate the wire format of the checks, results and broks with the
+other daemons: msgpack if it is enabled and available on both sides, else JSON. The
+posted results are compressed, the responses are compressed by the HTTP server.
+
 """
+import os
+import zlib
 import logging
+import threading
 import warnings
+from Queue import Queue, Empty
 import requests
+from requests.adapters import HTTPAdapter
 
-from alignak.misc.serialization import serialize
+from alignak.misc.serialization import serialize, get_wire_formats, dump_wire, load_wire
+from alignak.misc.serialization import JSON_CONTENT_TYPE, MSGPACK_CONTENT_TYPE
 
 logger = logging.getLogger(__name__)  # pylint: disable=C0103
 
@@ -101,11 +115,76 @@ class HTTPClientConnectionException(Exception):
         return "Server not available: %s - %s" % (self.uri, self.message)
 
 
+def fan_out(function, items, max_workers=8):
+    """Call a function for each item, concurrently in at most max_workers threads
+
+    The function exceptions are caught and returned to the caller, which is in charge
+    of handling them. The function must not modify some data shared with the
+    other calls; each call timeout is the timeout of its own HTTP requests.
+
+    :param function: function to call with an item as only parameter
+    :type function: function
+    :param items: items to call the function for
+    :type items: list
+    :param max_workers: maximum number of threads
+    :type max_workers: int
+    :return: list of (result, exception) tuples, in the items order. exception is None
+             if the call succeeded, else result is None
+    :rtype: list
+    """
+    results = [None] * len(items)
+
+    def call(idx):
+        """Call the function for an item and store the result"""
+        try:
+            results[idx] = (function(items[idx]), None)
+        except Exception as exp:  # pylint: disable=broad-except
+            results[idx] = (None, exp)
+
+    if max_workers <= 1 or len(items) <= 1:
+        for idx in xrange(len(items)):
+            call(idx)
+        return results
+
+    todo = Queue()
+    for idx in xrange(len(items)):
+        todo.put(idx)
+
+    def worker():
+        """Call the function for the items in the queue until it is empty"""
+        while True:
+            try:
+                idx = todo.get_nowait()
+            except Empty:
+                return
+            call(idx)
+
+    threads = []
+    for _ in xrange(min(max_workers, len(items))):
+        # pylint: disable=bad-thread-instantiation
+        thread = threading.Thread(None, worker, 'fan_out')
+        thread.daemon = True
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+    return results
+
+
 class HTTPClient(object):
     """HTTPClient class use python request to communicate over HTTP
     Basically used to get / post to other daemons
 
     """
+    # Requests session shared by all the clients of the process, and its parameters
+    session = None
+    session_pid = None
+    pool_size = 10
+    keep_alive = True
+    # Wire format parameters of all the clients of the process
+    binary = False
+    compress = True
+
     def __init__(self, address='', port=0, use_ssl=False, timeout=3,
                  data_timeout=120, uri='', strong_ssl=False, proxy=''):
         self.address = address
@@ -118,8 +197,57 @@ class HTTPClient(object):
             protocol = "https" if use_ssl else "http"
             uri = "%s://%s:%s/" % (protocol, self.address, self.port)
         self.uri = uri
-        self._requests_con = requests.Session()
+        self.proxies = None
         self.set_proxy(proxy)
+        # Set if the server does not accept the wire format of the requests
+        self.wire_fallback = False
+
+    @classmethod
+    def configure_pool(cls, pool_size=10, keep_alive=True):
+        """Set the parameters of the shared session. The session is created again
+        with these parameters on the next request
+
+        :param pool_size: maximum number of connections kept for each daemon
+        :type pool_size: int
+        :param keep_alive: keep the connections open between the requests
+        :type keep_alive: bool
+        :return: None
+        """
+        cls.pool_size = pool_size
+        cls.keep_alive = keep_alive
+        cls.session = None
+
+    @classmethod
+    def configure_wire_format(cls, binary=False, compress=True):
+        """Set the wire format parameters of all the clients
+
+        :param binary: use msgpack if it is available on both sides
+        :type binary: bool
+        :param compress: compress the data sent by the clients
+        :type compress: bool
+        :return: None
+        """
+        cls.binary = binary
+        cls.compress = compress
+
+    @classmethod
+    def get_session(cls):
+        """Get the shared session, create it if it does not exist yet or if it was
+        created by the parent process (the connections must not be shared)
+
+        :return: shared session
+        :rtype: requests.Session
+        """
+        if cls.session is None or cls.session_pid != os.getpid():
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=cls.pool_size, pool_maxsize=cls.pool_size)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            if not cls.keep_alive:
+                session.headers['Connection'] = 'close'
+            cls.session = session
+            cls.session_pid = os.getpid()
+        return cls.session
 
     @property
     def con(self):  # pragma: no cover, deprecated
@@ -137,10 +265,10 @@ class HTTPClient(object):
     def connection(self):
         """Get connection attribute
 
-        :return:
-        :rtype:
+        :return: shared requests session
+        :rtype: requests.Session
         """
-        return self._requests_con
+        return self.get_session()
 
     def make_uri(self, path):
         """Create uri from path
@@ -171,14 +299,39 @@ class HTTPClient(object):
         """
         if proxy:
             logger.debug('PROXY SETTING PROXY %s', proxy)
-            self._requests_con.proxies = {
+            self.proxies = {
                 'http': proxy,
                 'https': proxy,
             }
 
+    def get_accept(self):
+        """Get the Accept header of the requests: the wire formats the client accepts
+
+        :return: Accept header
+        :rtype: str
+        """
+        if not self.binary:
+            return JSON_CONTENT_TYPE
+        return ', '.join(get_wire_formats())
+
+    def get_post_format(self):
+        """Get the wire format of the data posted with wire parameter
+
+        :return: content type and content encoding (None if not compressed)
+        :rtype: tuple
+        """
+        if self.wire_fallback:
+            return JSON_CONTENT_TYPE, None
+        content_type = JSON_CONTENT_TYPE
+        if self.binary and MSGPACK_CONTENT_TYPE in get_wire_formats():
+            content_type = MSGPACK_CONTENT_TYPE
+        return content_type, 'deflate' if self.compress else None
+
     def get(self, path, args=None, wait='short'):
         """Do a GET HTTP request
 
+        The response is decoded according to its content type (JSON or msgpack)
+
         :param path: path to do the request
         :type path: str
         :param args: args to add in the request
@@ -192,9 +345,13 @@ class HTTPClient(object):
         uri = self.make_uri(path)
         timeout = self.make_timeout(wait)
         try:
-            rsp = self._requests_con.get(uri, params=args, timeout=timeout, verify=self.strong_ssl)
+            rsp = self.connection.get(uri, params=args, timeout=timeout,
+                                      verify=self.strong_ssl, proxies=self.proxies,
+                                      headers={'Accept': self.get_accept()})
             if rsp.status_code != 200:
                 raise Exception('HTTP GET not OK: %s ; text=%r' % (rsp.status_code, rsp.text))
+            if rsp.headers.get('Content-Type', '').startswith(MSGPACK_CONTENT_TYPE):
+                return load_wire(rsp.content, MSGPACK_CONTENT_TYPE)
             return rsp.json()
         except (requests.Timeout, requests.ConnectTimeout):
             raise HTTPClientTimeoutException(timeout, uri)
@@ -203,15 +360,21 @@ class HTTPClient(object):
         except Exception as err:
             raise HTTPClientException('Request error to %s: %s' % (uri, err))
 
-    def post(self, path, args, wait='short'):
+    def post(self, path, args, wait='short', wire=False):
         """Do a POST HTTP request
 
+        If wire is set, the data is posted in the negotiated wire format. JSON is used
+        if the server does not accept this format (HTTP 400 or 415 error), and for the
+        next requests of the client.
+
         :param path: path to do the request
         :type path: str
         :param args: args to add in the request
         :type args: dict
         :param wait: timeout policy (short / long)
         :type wait: int
+        :param wire: post the data in the wire format, the server must accept it
+        :type wire: bool
         :return: Content of the HTTP response if server returned 200
         :rtype: str
         """
@@ -220,7 +383,17 @@ class HTTPClient(object):
         for (key, value) in args.iteritems():
             args[key] = serialize(value, True)
         try:
-            rsp = self._requests_con.post(uri, json=args, timeout=timeout, verify=self.strong_ssl)
+            post_format = self.get_post_format() if wire else (JSON_CONTENT_TYPE, None)
+            if post_format != (JSON_CONTENT_TYPE, None):
+                rsp = self.post_wire(uri, args, post_format, timeout)
+                if rsp.status_code in (400, 415):
+                    logger.info("%s does not accept %s data, falling back to JSON",
+                                uri, post_format[0])
+                    self.wire_fallback = True
+                    post_format = (JSON_CONTENT_TYPE, None)
+            if post_format == (JSON_CONTENT_TYPE, None):
+                rsp = self.connection.post(uri, json=args, timeout=timeout,
+                                           verify=self.strong_ssl, proxies=self.proxies)
             if rsp.status_code != 200:
                 raise Exception("HTTP POST not OK: %s ; text=%r" % (rsp.status_code, rsp.text))
         except (requests.Timeout, requests.ConnectTimeout):
@@ -231,6 +404,29 @@ class HTTPClient(object):
             raise HTTPClientException('Request error to %s: %s' % (uri, err))
         return rsp.content
 
+    def post_wire(self, uri, args, post_format, timeout):
+        """Post serialized data in a wire format
+
+        :param uri: uri of the request
+        :type uri: str
+        :param args: serialized args of the request
+        :type args: dict
+        :param post_format: content type and content encoding (None if not compressed)
+        :type post_format: tuple
+        :param timeout: timeout of the request
+        :type timeout: int
+        :return: HTTP response
+        :rtype: requests.Response
+        """
+        content_type, encoding = post_format
+        data = dump_wire(args, content_type)
+        headers = {'Content-Type': content_type}
+        if encoding:
+            data = zlib.compress(data)
+            headers['Content-Encoding'] = encoding
+        return self.connection.post(uri, data=data, headers=headers, timeout=timeout,
+                                    verify=self.strong_ssl, proxies=self.proxies)
+
     def put(self, path, data, wait='short'):
         """Do a PUT HTTP request
 
@@ -246,7 +442,8 @@ class HTTPClient(object):
         uri = self.make_uri(path)
         timeout = self.make_timeout(wait)
         try:
-            rsp = self._requests_con.put(uri, data, timeout=timeout, verify=self.strong_ssl)
+            rsp = self.connection.put(uri, data, timeout=timeout,
+                                      verify=self.strong_ssl, proxies=self.proxies)
             if rsp.status_code != 200:
                 raise Exception('HTTP PUT not OK: %s ; text=%r' % (rsp.status_code, rsp.text))
         except (requests.Timeout, requests.ConnectTimeout):
@@ -37,6 +37,7 @@ from cherrypy.wsgiserver.ssl_pyopenssl import pyOpenSSLAdapter  # pylint: disabl
 
 # load global helper objects for logs and stats computation
 from alignak.http.cherrypy_extend import zlib_processor
+from alignak.misc.serialization import JSON_CONTENT_TYPE, MSGPACK_CONTENT_TYPE
 
 logger = logging.getLogger(__name__)  # pylint: disable=C0103
 
@@ -136,7 +137,7 @@ class HTTPDaemon(object):
                                             'multipart': process_multipart,
                                             'application/zlib': zlib_processor},
                 'tools.gzip.on': True,
-                'tools.gzip.mime_types': ['text/*', 'application/json']
+                'tools.gzip.mime_types': ['text/*', JSON_CONTENT_TYPE, MSGPACK_CONTENT_TYPE]
             }
         }
         # disable console logging of cherrypy when not in DEBUG
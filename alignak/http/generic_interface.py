@@ -26,6 +26,7 @@ import random
 import time
 import cherrypy
 
+from alignak.http.cherrypy_extend import wire_handler
 from alignak.misc.serialization import serialize
 
 logger = logging.getLogger(__name__)  # pylint: disable=C0103
@@ -273,7 +274,7 @@ class GenericInterface(object):
             return serialize(ret, True)
 
     @cherrypy.expose
-    @cherrypy.tools.json_out()
+    @cherrypy.tools.json_out(handler=wire_handler)
     def get_broks(self, bname):  # pylint: disable=W0613
         """Get broks from the daemon
 
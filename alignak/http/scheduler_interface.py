@@ -21,9 +21,10 @@
 import logging
 import cherrypy
 
+from alignak.http.cherrypy_extend import wire_handler, wire_processor
 from alignak.http.generic_interface import GenericInterface
 from alignak.util import average_percentile
-from alignak.misc.serialization import serialize, unserialize
+from alignak.misc.serialization import serialize, unserialize, get_wire_formats
 
 logger = logging.getLogger(__name__)  # pylint: disable=C0103
 
@@ -32,7 +33,7 @@ class SchedulerInterface(GenericInterface):
     """This module provide a specific HTTP interface for a Scheduler."""
 
     @cherrypy.expose
-    @cherrypy.tools.json_out()
+    @cherrypy.tools.json_out(handler=wire_handler)
     def get_checks(self, do_checks=False, do_actions=False, poller_tags=None,
                    reactionner_tags=None, worker_name='none',
                    module_types=None):
@@ -59,6 +60,13 @@ class SchedulerInterface(GenericInterface):
             reactionner_tags = ['None']
         if module_types is None:
             module_types = ['fork']
+        # A list with a single value is received as this value
+        if isinstance(poller_tags, basestring):
+            poller_tags = [poller_tags]
+        if isinstance(reactionner_tags, basestring):
+            reactionner_tags = [reactionner_tags]
+        if isinstance(module_types, basestring):
+            module_types = [module_types]
         do_checks = (do_checks == 'True')
         do_actions = (do_actions == 'True')
         res = self.app.sched.get_to_run_checks(do_checks, do_actions, poller_tags, reactionner_tags,
@@ -73,7 +81,7 @@ class SchedulerInterface(GenericInterface):
         return serialize(res, True)
 
     @cherrypy.expose
-    @cherrypy.tools.json_in()
+    @cherrypy.tools.json_in(content_type=get_wire_formats(), processor=wire_processor)
     @cherrypy.tools.json_out()
     def put_results(self):
         """Put results to scheduler, used by poller and reactionners
@@ -115,7 +123,7 @@ class SchedulerInterface(GenericInterface):
         return True
 
     @cherrypy.expose
-    @cherrypy.tools.json_out()
+    @cherrypy.tools.json_out(handler=wire_handler)
     def get_broks(self, bname):
         """Get broks from scheduler, used by brokers
 
@@ -124,14 +132,7 @@ class SchedulerInterface(GenericInterface):
         :return: serialized brok list
         :rtype: dict
         """
-        # Maybe it was not registered as it should, if so,
-        # do it for it
-        if bname not in self.app.sched.brokers:
-            self.fill_initial_broks(bname)
-        elif not self.app.sched.brokers[bname]['initialized']:
-            self.fill_initial_broks(bname)
-
-        if bname not in self.app.sched.brokers:
+        if not self._prepare_broker(bname):
             return {}
 
         # Now get the broks for this specific broker
@@ -141,6 +142,65 @@ class SchedulerInterface(GenericInterface):
         self.app.sched.brokers[bname]['has_full_broks'] = False
         return serialize(res, True)
 
+    @cherrypy.expose
+    @cherrypy.tools.json_out(handler=wire_handler)
+    def get_broks_page(self, bname, cursor=0, max_count=0, brok_types=None):
+        """Get a page of broks from scheduler, used by brokers
+
+        The broker provides the cursor of the last page it received to acknowledge
+        this page. It gets the next page, or the same page again if it did not
+        receive it.
+
+        The broker also provides the types of the broks it wants, the scheduler
+        does not build nor send the broks of the other types.
+
+        :param bname: broker name, used to filter broks
+        :type bname: str
+        :param cursor: cursor of the last page received by the broker
+        :type cursor: int
+        :param max_count: maximum number of broks in the page, 0 for no limit
+        :type max_count: int
+        :param brok_types: comma separated types of the broks wanted by the broker, empty
+                           for all the broks, None to keep the former ones
+        :type brok_types: str
+        :return: dict with the page cursor, the serialized broks and the number of broks
+                 remaining in the scheduler for this broker
+        :rtype: dict
+        """
+        if brok_types is not None:
+            # Before the initial broks are made for this broker
+            brok_types = set(b_type for b_type in brok_types.split(',') if b_type)
+            with self.app.conf_lock:
+                if bname in self.app.sched.brokers:
+                    self.app.sched.set_broker_brok_types(bname, brok_types or None)
+
+        if not self._prepare_broker(bname):
+            return {'cursor': 0, 'broks': {}, 'remaining': 0}
+
+        cursor, res, remaining = self.app.sched.get_broks_page(bname, int(cursor),
+                                                               int(max_count))
+
+        # we do not more have a full broks in queue
+        self.app.sched.brokers[bname]['has_full_broks'] = False
+        return {'cursor': cursor, 'broks': serialize(res, True), 'remaining': remaining}
+
+    def _prepare_broker(self, bname):
+        """Register a broker which is getting broks, if it was not yet registered
+
+        :param bname: broker name
+        :type bname: str
+        :return: True if the broker is known by the scheduler
+        :rtype: bool
+        """
+        # Maybe it was not registered as it should, if so,
+        # do it for it
+        if bname not in self.app.sched.brokers:
+            self.fill_initial_broks(bname)
+        elif not self.app.sched.brokers[bname]['initialized']:
+            self.fill_initial_broks(bname)
+
+        return bname in self.app.sched.brokers
+
     @cherrypy.expose
     @cherrypy.tools.json_out()
     def fill_initial_broks(self, bname):
@@ -215,6 +275,8 @@ class SchedulerInterface(GenericInterface):
     @cherrypy.tools.json_out()
     def put_conf(self, conf=None):
         """Post conf to scheduler (from arbiter)
+        The conf is either a whole configuration or a configuration delta (conf_delta key)
+        applied on the current configuration
 
         :return: None
         """
@@ -222,6 +284,21 @@ class SchedulerInterface(GenericInterface):
         conf = cherrypy.request.json
         super(SchedulerInterface, self).put_conf(conf['conf'])
 
+    @cherrypy.expose
+    @cherrypy.tools.json_out()
+    def get_conf_fingerprints(self):
+        """Get the fingerprints of the configuration managed by the scheduler (from arbiter)
+        The arbiter uses them to send only the changes of a new configuration
+
+        :return: push flavor of the configuration and its fingerprints, empty if none
+        :rtype: dict
+        """
+        with self.app.conf_lock:
+            if not self.app.sched.conf_fingerprints:
+                return {}
+            return {'push_flavor': self.app.sched.push_flavor,
+                    'fingerprints': self.app.sched.conf_fingerprints}
+
     @cherrypy.expose
     @cherrypy.tools.json_out()
     def wait_new_conf(self):
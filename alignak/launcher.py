@@ -0,0 +1,490 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2016: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+"""
+This module provides the launchers used by the workers of the 'launcher' module type.
+
+A launcher is a small process forked once by the worker. It receives the commands to run,
+forks and execs them (or runs the Python plugins in the forked process, without starting
+a new interpreter) and sends back their exit status and outputs. The worker does not fork
+its own (big) process nor closes all its file descriptors for each action.
+
+Unix only.
+"""
+import os
+import re
+import sys
+import errno
+import runpy
+import select
+import signal
+import traceback
+from multiprocessing import Pipe
+
+try:
+    import fcntl  # pylint: disable=C0103
+except ImportError:  # pragma: no cover, not on Unix systems
+    fcntl = None  # pylint: disable=C0103
+
+# Plugins shebang without arguments: interpreter path or /usr/bin/env and interpreter name
+SHEBANG = re.compile(r'#!\s*(/usr/bin/env\s+)?(\S+)\s*$')
+
+
+class LauncherProcess(object):  # pylint: disable=too-few-public-methods
+    """Popen like view of a command run by a launcher.
+    Its outputs are available with communicate once it exited
+    """
+    stdout = None
+    stderr = None
+
+    def __init__(self, pool, key):
+        self.pool = pool
+        self.key = key
+        self.pid = 0
+        self.returncode = None
+        self.outputs = ('', '')
+        self.u_time = 0.0
+        self.s_time = 0.0
+
+    def poll(self):
+        """Check if the command exited
+
+        :return: exit status, None if it is still running
+        :rtype: int | None
+        """
+        if self.returncode is None:
+            self.pool.receive()
+        return self.returncode
+
+    def communicate(self):
+        """Get the command outputs
+
+        :return: standard output and standard error
+        :rtype: tuple
+        """
+        return self.outputs
+
+    def kill(self):
+        """Kill the command and all its process group
+
+        :return: None
+        """
+        self.pool.kill(self)
+
+
+class LauncherPool(object):
+    """Pool of launchers processes of a worker. The commands are sent to the launchers
+    in a round robin way
+    """
+
+    def __init__(self, size=2, max_output_length=8192):
+        self.size = size
+        self.max_output_length = max_output_length
+        # Launchers connections and pids
+        self.launchers = []
+        # Running commands: key -> (launcher connection, LauncherProcess)
+        self.processes = {}
+        self.next_key = 0
+        self.rr_idx = 0
+
+    def start(self):
+        """Fork the launchers processes
+
+        :return: None
+        """
+        while len(self.launchers) < self.size:
+            self.launchers.append(self.fork_launcher())
+
+    def fork_launcher(self):
+        """Fork a launcher process
+
+        :return: launcher connection and pid
+        :rtype: tuple
+        """
+        conn, launcher_conn = Pipe()
+        # Nothing must stay in the buffers, the launcher would write it again
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover, in the launcher process
+            code = 0
+            try:
+                conn.close()
+                run_launcher(launcher_conn, self.max_output_length)
+            except BaseException:  # pylint: disable=broad-except
+                code = 1
+            os._exit(code)  # pylint: disable=protected-access
+        launcher_conn.close()
+        return (conn, pid)
+
+    def stop(self):
+        """Stop the launchers processes
+
+        :return: None
+        """
+        for conn, pid in self.launchers:
+            try:
+                conn.send(('stop',))
+                conn.close()
+                os.waitpid(pid, 0)
+            except (IOError, OSError, EOFError):
+                pass
+        self.launchers = []
+
+    def get_fds(self):
+        """Get the launchers connections file descriptors, readable when a command exits
+
+        :return: file descriptors list
+        :rtype: list
+        """
+        return [conn.fileno() for conn, _ in self.launchers]
+
+    def launch(self, cmd, command, shell, env):
+        """Run a command with the next launcher
+
+        :param cmd: command arguments
+        :type cmd: list | str
+        :param command: command line, used if the command must be run with a shell
+        :type command: str
+        :param shell: run the command with a shell
+        :type shell: bool
+        :param env: command environment
+        :type env: dict
+        :return: the command process
+        :rtype: LauncherProcess
+        """
+        self.next_key += 1
+        process = LauncherProcess(self, self.next_key)
+        self.rr_idx = (self.rr_idx + 1) % len(self.launchers)
+        for _ in range(2):
+            conn = self.launchers[self.rr_idx][0]
+            try:
+                conn.send(('launch', process.key, cmd, command, shell, env))
+            except (IOError, OSError) as exp:
+                # Try again with a new launcher, the command is not one of the
+                # commands of the dead launcher
+                self.replace_launcher(self.launchers[self.rr_idx])
+                continue
+            self.processes[process.key] = (conn, process)
+            break
+        else:
+            process.outputs = ('', 'The launcher is not available: %s' % exp)
+            process.returncode = 2
+        return process
+
+    def kill(self, process):
+        """Kill a command, its result will not be received
+
+        :param process: command process
+        :type process: LauncherProcess
+        :return: None
+        """
+        if process.key not in self.processes:
+            return
+        conn = self.processes.pop(process.key)[0]
+        try:
+            conn.send(('kill', process.key))
+        except (IOError, OSError):
+            pass
+
+    def set_failed(self, key, error):
+        """Set a command as exited because it could not be launched
+
+        :param key: command key
+        :type key: int
+        :param error: error message
+        :type error: str
+        :return: None
+        """
+        process = self.processes.pop(key)[1]
+        process.outputs = ('', error)
+        process.returncode = 2
+
+    def receive(self):
+        """Receive the exited commands results from the launchers
+
+        :return: None
+        """
+        for launcher in self.launchers[:]:
+            conn = launcher[0]
+            try:
+                while conn.poll():
+                    _, key, returncode, stdout, stderr, u_time, s_time = conn.recv()
+                    if key not in self.processes:
+                        # Killed
+                        continue
+                    process = self.processes.pop(key)[1]
+                    process.outputs = (stdout, stderr)
+                    process.u_time = u_time
+                    process.s_time = s_time
+                    process.returncode = returncode
+            except (EOFError, IOError, OSError):
+                self.replace_launcher(launcher)
+
+    def replace_launcher(self, launcher):
+        """Replace a launcher that died, its commands are set as failed
+
+        :param launcher: launcher connection and pid
+        :type launcher: tuple
+        :return: None
+        """
+        conn, pid = launcher
+        for key in [key for key, (k_conn, _) in self.processes.items() if k_conn is conn]:
+            self.set_failed(key, 'The launcher died')
+        conn.close()
+        try:
+            os.waitpid(pid, 0)
+        except OSError:
+            pass
+        self.launchers[self.launchers.index(launcher)] = self.fork_launcher()
+
+
+def is_python_plugin(path):
+    """Check if a plugin is a Python script run by our own interpreter, it can be run
+    without starting a new interpreter
+
+    :param path: plugin path
+    :type path: str
+    :return: True if the plugin can be run in the current interpreter
+    :rtype: bool
+    """
+    if '/' not in path or not os.access(path, os.X_OK):
+        return False
+    try:
+        with open(path) as plugin:
+            match = SHEBANG.match(plugin.readline())
+    except IOError:
+        return False
+    if match is None:
+        return False
+    interpreter = match.group(2)
+    if match.group(1):
+        for directory in os.environ.get('PATH', os.defpath).split(os.pathsep):
+            if os.access(os.path.join(directory, interpreter), os.X_OK):
+                interpreter = os.path.join(directory, interpreter)
+                break
+    return os.path.realpath(interpreter) == os.path.realpath(sys.executable)
+
+
+def run_python_plugin(args, env):  # pragma: no cover, in the command process
+    """Run a Python plugin in the current process as the interpreter would do
+
+    :param args: command arguments
+    :type args: list
+    :param env: command environment
+    :type env: dict
+    :return: exit status
+    :rtype: int
+    """
+    # The plugin writes on the command outputs, whatever the launcher did of sys.stdout
+    sys.stdout = os.fdopen(1, 'w')
+    sys.stderr = os.fdopen(2, 'w')
+    sys.argv = list(args)
+    sys.path[0] = os.path.dirname(args[0])
+    os.environ.clear()
+    os.environ.update(env)
+    code = 0
+    try:
+        runpy.run_path(args[0], run_name='__main__')
+    except SystemExit as exp:
+        code = exp.code
+    except BaseException:  # pylint: disable=broad-except
+        # Print the traceback as the interpreter would, from the plugin frames
+        exc_type, exc_value, exc_tb = sys.exc_info()
+        while exc_tb is not None and exc_tb.tb_frame.f_code.co_filename != args[0]:
+            exc_tb = exc_tb.tb_next
+        traceback.print_exception(exc_type, exc_value, exc_tb)
+        code = 1
+    try:
+        sys.stdout.flush()
+        sys.stderr.flush()
+    except IOError:
+        pass
+    if code is None:
+        return 0
+    if isinstance(code, (int, long)):
+        return code & 0xff
+    sys.stderr.write('%s\n' % code)
+    sys.stderr.flush()
+    return 1
+
+
+def exec_command(cmd, command, shell, env, python):  # pragma: no cover, in the command process
+    """Exec a command, as subprocess.Popen would do, in the command process
+
+    :return: exit status if the command could not be executed
+    :rtype: int
+    """
+    if python:
+        return run_python_plugin(cmd, env)
+    args = ['/bin/sh', '-c', command] if shell else cmd
+    try:
+        os.execvpe(args[0], args, env)
+    except OSError as exp:
+        if not shell and exp.errno == errno.ENOEXEC:
+            # Maybe it's just a shell script without a shebang
+            return exec_command(cmd, command, True, env, False)
+        os.write(2, str(exp))
+    return 2
+
+
+def run_launcher(conn, max_output_length):  # pragma: no cover, in the launcher process
+    """Launcher process main loop: run the commands received on the connection and send
+    back their results: ('done', key, exit status, stdout, stderr, user time, system time)
+
+    :param conn: connection with the worker
+    :type conn: multiprocessing.Connection
+    :param max_output_length: maximum length of the outputs kept
+    :type max_output_length: int
+    :return: None
+    """
+    # Do not keep the worker files descriptors, the commands do not get them
+    keep = conn.fileno()
+    os.closerange(3, keep)
+    os.closerange(keep + 1, os.sysconf('SC_OPEN_MAX'))
+
+    # Wake up when a command exits
+    wakeup = os.pipe()
+    for fd in wakeup:
+        fcntl.fcntl(fd, fcntl.F_SETFL, fcntl.fcntl(fd, fcntl.F_GETFL) | os.O_NONBLOCK)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+    signal.siginterrupt(signal.SIGCHLD, False)
+    signal.set_wakeup_fd(wakeup[1])
+
+    python_plugins = {}
+    # Running commands: pid -> [key, stdout fd, stderr fd, stdout, stderr]
+    running = {}
+    # Commands outputs: fd -> running command
+    outputs = {}
+    while True:
+        try:
+            readable = select.select([keep, wakeup[0]] + outputs.keys(), [], [], 1.0)[0]
+        except select.error as exp:
+            if exp.args[0] != errno.EINTR:
+                raise
+            continue
+
+        if wakeup[0] in readable:
+            try:
+                os.read(wakeup[0], 4096)
+            except OSError:
+                pass
+
+        if keep in readable:
+            try:
+                msg = conn.recv()
+            except EOFError:
+                msg = ('stop',)
+            if msg[0] == 'stop':
+                for command in running:
+                    try:
+                        os.killpg(command, signal.SIGKILL)
+                    except OSError:
+                        pass
+                return
+            elif msg[0] == 'kill':
+                for pid, command in running.items():
+                    if command[0] == msg[1]:
+                        try:
+                            os.killpg(pid, signal.SIGKILL)
+                        except OSError:
+                            pass
+            elif msg[0] == 'launch':
+                _, key, cmd, command, shell, env = msg
+                python = False
+                if not shell:
+                    if cmd[0] not in python_plugins:
+                        python_plugins[cmd[0]] = is_python_plugin(cmd[0])
+                    python = python_plugins[cmd[0]]
+                try:
+                    out_r, out_w = os.pipe()
+                    err_r, err_w = os.pipe()
+                    pid = os.fork()
+                except OSError as exp:
+                    conn.send(('done', key, 2, '', str(exp), 0.0, 0.0))
+                    continue
+                if pid == 0:
+                    code = 2
+                    try:
+                        os.setsid()
+                        os.dup2(out_w, 1)
+                        os.dup2(err_w, 2)
+                        for fd in [keep, out_r, out_w, err_r, err_w] + list(wakeup) + \
+                                outputs.keys():
+                            os.close(fd)
+                        signal.set_wakeup_fd(-1)
+                        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                        signal.signal(signal.SIGINT, signal.SIG_DFL)
+                        code = exec_command(cmd, command, shell, env, python)
+                    finally:
+                        os._exit(code)  # pylint: disable=protected-access
+                os.close(out_w)
+                os.close(err_w)
+                running[pid] = [key, out_r, err_r, '', '']
+                outputs[out_r] = outputs[err_r] = running[pid]
+
+        # Read the commands outputs, keep only the beginning
+        for fd in readable:
+            if fd not in outputs:
+                continue
+            command = outputs[fd]
+            idx = 3 if fd == command[1] else 4
+            try:
+                data = os.read(fd, 65536)
+            except OSError:
+                data = ''
+            if data:
+                if len(command[idx]) < max_output_length:
+                    command[idx] += data[:max_output_length - len(command[idx])]
+            else:
+                os.close(fd)
+                del outputs[fd]
+
+        # Send back the results of the exited commands
+        while running:
+            try:
+                pid, status, rusage = os.wait4(-1, os.WNOHANG)
+            except OSError:
+                break
+            if not pid:
+                break
+            if pid not in running:
+                continue
+            key, out_r, err_r, stdout, stderr = running.pop(pid)
+            # Read what the command wrote before exiting
+            for fd in (out_r, err_r):
+                if fd not in outputs:
+                    continue
+                while select.select([fd], [], [], 0)[0]:
+                    data = os.read(fd, 65536)
+                    if not data:
+                        break
+                    if fd == out_r:
+                        stdout = (stdout + data)[:max_output_length]
+                    else:
+                        stderr = (stderr + data)[:max_output_length]
+                os.close(fd)
+                del outputs[fd]
+            if os.WIFSIGNALED(status):
+                returncode = -os.WTERMSIG(status)
+            else:
+                returncode = os.WEXITSTATUS(status)
+            conn.send(('done', key, returncode, stdout, stderr,
+                       rusage.ru_utime, rusage.ru_stime))
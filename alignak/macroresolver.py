@@ -59,9 +59,17 @@ len(host.services)
 
 import re
 import time
+from collections import namedtuple
 
 from alignak.borg import Borg
 
+# A macro of a compiled command line, see MacroResolver._compile_template
+# type is one of ARGN, CUSTOM, ONDEMAND or object and info holds:
+# * ARGN: index of the argument
+# * CUSTOM: (class name, custom variable name), ex: ('HOST', '_MAC_ADDRESS')
+# * object: the macro is an output macro
+MacroSlot = namedtuple('MacroSlot', ['macro', 'type', 'info'])
+
 
 class MacroResolver(Borg):
     """MacroResolver class is used to resolve macros (in command call). See above for details"""
@@ -157,32 +165,8 @@ class MacroResolver(Borg):
         self.contactgroups = conf.contactgroups
         self.lists_on_demand.append(self.contactgroups)
         self.illegal_macro_output_chars = conf.illegal_macro_output_chars
-
-    @staticmethod
-    def _get_macros(chain):
-        """Get all macros of a chain
-        Cut '$' char and create a dict with the following structure::
-
-        { 'MacroSTR1' : {'val': '', 'type': 'unknown'}
-          'MacroSTR2' : {'val': '', 'type': 'unknown'}
-        }
-
-        :param chain: chain to parse
-        :type chain: str
-        :return: dict with macro parsed as key
-        :rtype: dict
-        """
-        regex = re.compile(r'(\$)')
-        elts = regex.split(chain)
-        macros = {}
-        in_macro = False
-        for elt in elts:
-            if elt == '$':
-                in_macro = not in_macro
-            elif in_macro:
-                macros[elt] = {'val': '', 'type': 'unknown'}
-
-        return macros
+        # Compiled command lines
+        self.templates = {}
 
     def _get_value_from_element(self, elt, prop):
         """Get value from a element's property
@@ -276,15 +260,22 @@ class MacroResolver(Borg):
         return env
 
     def resolve_simple_macros_in_string(self, c_line, data, macromodulations, timeperiods,
-                                        args=None):
+                                        args=None, cache=False):
         """Replace macro in the command line with the real value
 
+        The command line is compiled into a template, see _compile_template. If cache
+        is set, the template is kept and the following calls only get the values of its
+        macros. Only the configuration strings (commands lines) must be cached, not the
+        strings built at run time.
+
         :param c_line: command line to modify
         :type c_line: str
         :param data: objects list, use to look for a specific macro
         :type data:
         :param args: args given to the command line, used to get "ARGN" macros.
         :type args:
+        :param cache: keep the compiled template of the command line
+        :type cache: bool
         :return: command line with '$MACRO$' replaced with values
         :rtype: str
         """
@@ -293,85 +284,32 @@ class MacroResolver(Borg):
         if hasattr(self, 'conf'):
             data.append(self.conf)  # For USERN macros
 
+        templates = getattr(self, 'templates', None)
+        if templates is None or not cache:
+            template = self._compile_template(c_line)
+        else:
+            template = templates.get(c_line)
+            if template is None:
+                template = templates[c_line] = self._compile_template(c_line)
+
         # we should do some loops for nested macros
         # like $USER1$ hiding like a ninja in a $ARG2$ Macro. And if
         # $USER1$ is pointing to $USER34$ etc etc, we should loop
         # until we reach the bottom. So the last loop is when we do
         # not still have macros :)
-        still_got_macros = True
-        nb_loop = 0
-        while still_got_macros:
-            nb_loop += 1
-            # Ok, we want the macros in the command line
-            macros = self._get_macros(c_line)
-
-            # We can get out if we do not have macros this loop
-            still_got_macros = False
-            if macros:
-                still_got_macros = True
-
-            # Put in the macros the type of macro for all macros
-            self._get_type_of_macro(macros, data)
-            # Now we get values from elements
-            for macro in macros:
-                # If type ARGN, look at ARGN cutting
-                if macros[macro]['type'] == 'ARGN' and args is not None:
-                    macros[macro]['val'] = self._resolve_argn(macro, args)
-                    macros[macro]['type'] = 'resolved'
-                # If object type, get value from a property
-                if macros[macro]['type'] == 'object':
-                    obj = macros[macro]['object']
-                    for elt in data:
-                        if elt is None or elt != obj:
-                            continue
-                        prop = obj.macros[macro]
-                        macros[macro]['val'] = self._get_value_from_element(elt, prop)
-                        # Now check if we do not have a 'output' macro. If so, we must
-                        # delete all special characters that can be dangerous
-                        if macro in self.output_macros:
-                            macros[macro]['val'] = \
-                                self._delete_unwanted_caracters(macros[macro]['val'])
-                # If custom type, get value from an object custom variables
-                if macros[macro]['type'] == 'CUSTOM':
-                    cls_type = macros[macro]['class']
-                    # Beware : only cut the first _HOST or _SERVICE or _CONTACT value,
-                    # so the macro name can have it on it..
-                    macro_name = re.split('_' + cls_type, macro, 1)[1].upper()
-                    # Ok, we've got the macro like MAC_ADDRESS for _HOSTMAC_ADDRESS
-                    # Now we get the element in data that have the type HOST
-                    # and we check if it got the custom value
-                    for elt in data:
-                        if not elt or elt.__class__.my_type.upper() != cls_type:
-                            continue
-                        if not getattr(elt, 'customs'):
-                            continue
-                        if '_' + macro_name in elt.customs:
-                            macros[macro]['val'] = elt.customs['_' + macro_name]
-                        # Then look on the macromodulations, in reverse order, so
-                        # the last to set, will be the first to have. (yes, don't want to play
-                        # with break and such things sorry...)
-                        mms = getattr(elt, 'macromodulations', [])
-                        for macromod_id in mms[::-1]:
-                            macromod = macromodulations[macromod_id]
-                            # Look if the modulation got the value,
-                            # but also if it's currently active
-                            if '_' + macro_name in macromod.customs and \
-                                    macromod.is_active(timeperiods):
-                                macros[macro]['val'] = macromod.customs['_' + macro_name]
-                # If on-demand type, get value from an dynamic provided data objects
-                if macros[macro]['type'] == 'ONDEMAND':
-                    macros[macro]['val'] = self._resolve_ondemand(macro, data)
-
-            # We resolved all we can, now replace the macros in the command call
-            for macro in macros:
-                c_line = c_line.replace('$' + macro + '$', macros[macro]['val'])
+        nb_loop = 1
+        while True:
+            c_line = self._fill_template(template, data, macromodulations, timeperiods, args)
 
             # A $$ means we want a $, it's not a macro!
             # We replace $$ by a big dirty thing to be sure to not misinterpret it
             c_line = c_line.replace("$$", "DOUBLEDOLLAR")
 
-            if nb_loop > 32:  # too much loop, we exit
-                still_got_macros = False
+            # The values of the macros may hold some other macros
+            if '$' not in c_line or nb_loop > 32:  # too much loop, we exit
+                break
+            nb_loop += 1
+            template = self._compile_template(c_line)
 
         # We now replace the big dirty token we made by only a simple $
         c_line = c_line.replace("DOUBLEDOLLAR", "$")
@@ -390,80 +328,212 @@ class MacroResolver(Borg):
         """
         c_line = com.command.command_line
         return self.resolve_simple_macros_in_string(c_line, data, macromodulations, timeperiods,
-                                                    args=com.args)
+                                                    args=com.args, cache=True)
 
     @staticmethod
-    def _get_type_of_macro(macros, objs):
-        r"""Set macros types
+    def _compile_template(c_line):
+        r"""Compile a command line into a list of literal strings and macros
 
-        Example::
+        The type of the macros is found once for all. Example::
 
         ARG\d -> ARGN,
-        HOSTBLABLA -> class one and set Host in class)
+        HOSTBLABLA -> object macro, the object is found in the data when resolving
         _HOSTTOTO -> HOST CUSTOM MACRO TOTO
         SERVICESTATEID:srv-1:Load$ -> MACRO SERVICESTATEID of the service Load of host srv-1
 
-        :param macros: macros list
-        :type macros: list[str]
-        :param objs: objects list, used to tag object macros
-        :type objs: list
-        :return: None
+        The macros that are not found in any object are replaced with an empty string, as the
+        empty macro of the '$$' escape sequence.
+
+        :param c_line: command line to compile
+        :type c_line: str
+        :return: literal strings and macros
+        :rtype: tuple
         """
-        for macro in macros:
-            # ARGN Macros
-            if re.match(r'ARG\d', macro):
-                macros[macro]['type'] = 'ARGN'
-                continue
+        template = []
+        in_macro = False
+        for elt in re.split(r'(\$)', c_line):
+            if elt == '$':
+                in_macro = not in_macro
+            elif not in_macro:
+                if elt:
+                    template.append(elt)
+            elif re.match(r'ARG\d', elt):
+                # first, get the number of args
+                template.append(MacroSlot(elt, 'ARGN',
+                                          int(re.search(r'ARG(?P<id>\d+)', elt).group('id')) - 1))
             # USERN macros
             # are managed in the Config class, so no
             # need to look that here
-            elif re.match(r'_HOST\w', macro):
-                macros[macro]['type'] = 'CUSTOM'
-                macros[macro]['class'] = 'HOST'
-                continue
-            elif re.match(r'_SERVICE\w', macro):
-                macros[macro]['type'] = 'CUSTOM'
-                macros[macro]['class'] = 'SERVICE'
-                # value of macro: re.split('_HOST', '_HOSTMAC_ADDRESS')[1]
-                continue
-            elif re.match(r'_CONTACT\w', macro):
-                macros[macro]['type'] = 'CUSTOM'
-                macros[macro]['class'] = 'CONTACT'
-                continue
+            elif re.match(r'_(HOST|SERVICE|CONTACT)\w', elt):
+                cls_type = re.match(r'_(HOST|SERVICE|CONTACT)', elt).group(1)
+                # Beware : only cut the first _HOST or _SERVICE or _CONTACT value,
+                # so the macro name can have it on it..
+                macro_name = re.split('_' + cls_type, elt, 1)[1].upper()
+                template.append(MacroSlot(elt, 'CUSTOM', (cls_type, '_' + macro_name)))
             # On demand macro
-            elif len(macro.split(':')) > 1:
-                macros[macro]['type'] = 'ONDEMAND'
-                continue
+            elif len(elt.split(':')) > 1:
+                template.append(MacroSlot(elt, 'ONDEMAND', None))
             # OK, classical macro...
-            for obj in objs:
-                if macro in obj.macros:
-                    macros[macro]['type'] = 'object'
-                    macros[macro]['object'] = obj
-                    continue
+            else:
+                template.append(MacroSlot(elt, 'object', elt in MacroResolver.output_macros))
+
+        # A not closed macro is not a macro
+        if in_macro:
+            template[-1] = '$' + template[-1].macro
+
+        return tuple(template)
+
+    def _fill_template(self, template, data, macromodulations, timeperiods, args):
+        """Get the command line of a compiled template
+
+        :param template: compiled command line
+        :type template: tuple
+        :param data: objects list, use to look for a specific macro
+        :type data:
+        :param args: args given to the command line, used to get "ARGN" macros.
+        :type args:
+        :return: command line with the macros replaced with their values
+        :rtype: str
+        """
+        values = []
+        for slot in template:
+            if slot.__class__ is not MacroSlot:
+                values.append(slot)
+            elif slot.type == 'object':
+                values.append(self._resolve_object(slot, data))
+            elif slot.type == 'ARGN':
+                values.append(self._resolve_argn(slot, args))
+            elif slot.type == 'CUSTOM':
+                values.append(self._resolve_custom(slot, data, macromodulations, timeperiods))
+            else:
+                values.append(self._resolve_ondemand(slot.macro, data))
+        return ''.join(values)
+
+    def _resolve_object(self, slot, data):
+        """Get an object macro value, from the last object of the data that has this macro
+
+        The values of the object static macros are cached in the object.
+
+        :param slot: object macro
+        :type slot: alignak.macroresolver.MacroSlot
+        :param data: objects list, use to look for a specific macro
+        :type data:
+        :return: macro value, or an empty string if no object has this macro
+        :rtype: str
+        """
+        obj = None
+        for elt in data:
+            if slot.macro in elt.macros:
+                obj = elt
+        if obj is None:
+            return ''
+
+        static = slot.macro in getattr(obj, 'static_macros', ())
+        if static and obj.macros_cache and slot.macro in obj.macros_cache:
+            return obj.macros_cache[slot.macro]
+
+        value = self._get_value_from_element(obj, obj.macros[slot.macro])
+        # Now check if we do not have a 'output' macro. If so, we must
+        # delete all special characters that can be dangerous
+        if slot.info:
+            value = self._delete_unwanted_caracters(value)
+        if static:
+            self._cache_value(obj, slot.macro, value)
+        return value
 
     @staticmethod
-    # pylint: disable=inconsistent-return-statements
-    def _resolve_argn(macro, args):
+    def _resolve_argn(slot, args):
         """Get argument from macro name
         ie : $ARG3$ -> args[2]
 
-        :param macro: macro to parse
-        :type macro:
+        :param slot: ARGN macro
+        :type slot: alignak.macroresolver.MacroSlot
         :param args: args given to command line
         :type args:
         :return: argument at position N-1 in args table (where N is the int parsed)
-        :rtype: None | str
-        """
-        # first, get the number of args
-        _id = None
-        matches = re.search(r'ARG(?P<id>\d+)', macro)
-        if matches is not None:
-            _id = int(matches.group('id')) - 1
-            try:
-                return args[_id]
-            except IndexError:
-                # Required argument not found, returns an empty string
-                return ''
+        :rtype: str
+        """
+        if args is None:
+            return ''
+        try:
+            return args[slot.info]
+        except IndexError:
+            # Required argument not found, returns an empty string
+            return ''
+
+    def _resolve_custom(self, slot, data, macromodulations, timeperiods):
+        """Get a custom macro value from an object custom variables
+
+        :param slot: CUSTOM macro
+        :type slot: alignak.macroresolver.MacroSlot
+        :param data: objects list, use to look for a specific macro
+        :type data:
+        :return: macro value
+        :rtype: str
+        """
+        cls_type, custom = slot.info
+        value = ''
+        # Ok, we've got the macro like MAC_ADDRESS for _HOSTMAC_ADDRESS
+        # Now we get the element in data that have the type HOST
+        # and we check if it got the custom value
+        for elt in data:
+            if not elt or elt.__class__.my_type.upper() != cls_type:
+                continue
+            if not getattr(elt, 'customs'):
+                continue
+            if elt.macros_cache and custom in elt.macros_cache:
+                elt_value = elt.macros_cache[custom]
+            else:
+                elt_value = self._get_custom_value(elt, custom, macromodulations, timeperiods)
+            if elt_value is not None:
+                value = elt_value
+        return value
+
+    def _get_custom_value(self, elt, custom, macromodulations, timeperiods):
+        """Get a custom variable value of an object, modulated by its macro modulations
+
+        The value is cached in the object if no macro modulation changes it.
+
+        :param elt: object having the custom variable
+        :type elt: alignak.objects.item.Item
+        :param custom: custom variable name, ex: _MAC_ADDRESS
+        :type custom: str
+        :return: the value, None if the object does not have this custom variable
+        :rtype: str | None
+        """
+        value = elt.customs.get(custom)
+        modulated = False
+        # Then look on the macromodulations, in reverse order, so
+        # the last to set, will be the first to have. (yes, don't want to play
+        # with break and such things sorry...)
+        mms = getattr(elt, 'macromodulations', [])
+        for macromod_id in mms[::-1]:
+            macromod = macromodulations[macromod_id]
+            # Look if the modulation got the value,
+            # but also if it's currently active
+            if custom in macromod.customs:
+                modulated = True
+                if macromod.is_active(timeperiods):
+                    value = macromod.customs[custom]
+        if not modulated:
+            self._cache_value(elt, custom, value)
+        return value
+
+    @staticmethod
+    def _cache_value(elt, key, value):
+        """Cache a macro value in an object, see alignak.objects.item.Item.reset_macros_cache
+
+        :param elt: object the value belongs to
+        :type elt: alignak.objects.item.Item
+        :param key: macro or custom variable name
+        :type key: str
+        :param value: macro value
+        :type value: str
+        :return: None
+        """
+        if elt.macros_cache is None:
+            elt.macros_cache = {}
+        elt.macros_cache[key] = value
 
     def _resolve_ondemand(self, macro, data):
         """Get on demand macro value
@@ -18,6 +18,9 @@
 # along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
 """
 This module provide object serialization for Alignak objects. It basically converts objects to json
+
+The serialized objects may also be encoded with msgpack, a more compact binary format, for the
+inter-daemons communication (wire format) when the msgpack library is installed.
 """
 import sys
 
@@ -26,6 +29,19 @@ try:
 except ImportError:
     import json
 
+try:
+    import msgpack
+except ImportError:  # pragma: no cover, msgpack is an optional dependency
+    msgpack = None  # pylint: disable=invalid-name
+
+# Content types of the wire formats
+JSON_CONTENT_TYPE = 'application/json'
+MSGPACK_CONTENT_TYPE = 'application/x-msgpack'
+
+# Python paths of the serialized classes, and classes of the un-serialized python paths
+CLASSES_PATHS = {}
+PATHS_CLASSES = {}
+
 
 def serialize(obj, no_dump=False):
     """
@@ -46,9 +62,10 @@ def serialize(obj, no_dump=False):
     """
     if hasattr(obj, "serialize") and callable(obj.serialize):
         o_cls = obj.__class__
-        o_dict = {'__sys_python_module__': '', 'content': {}}
-        o_dict['content'] = obj.serialize()
-        o_dict['__sys_python_module__'] = "%s.%s" % (o_cls.__module__, o_cls.__name__)
+        python_path = CLASSES_PATHS.get(o_cls)
+        if python_path is None:
+            python_path = CLASSES_PATHS[o_cls] = "%s.%s" % (o_cls.__module__, o_cls.__name__)
+        o_dict = {'__sys_python_module__': python_path, 'content': obj.serialize()}
 
     elif isinstance(obj, dict):
         o_dict = {}
@@ -111,6 +128,72 @@ def unserialize(j_obj, no_load=False):
         return data
 
 
+def get_wire_formats():
+    """Get the content types of the available wire formats, the most compact first
+
+    :return: content types list
+    :rtype: list
+    """
+    if msgpack is None:
+        return [JSON_CONTENT_TYPE]
+    return [MSGPACK_CONTENT_TYPE, JSON_CONTENT_TYPE]
+
+
+def negotiate_wire_format(accept):
+    """Get the wire format to use for a response, according to the Accept header of
+    the request. The first content type of the header that is available is used,
+    JSON if none is available.
+
+    :param accept: Accept header of the request, may be None
+    :type accept: str | None
+    :return: content type of the wire format
+    :rtype: str
+    """
+    available = get_wire_formats()
+    for content_type in (accept or '').split(','):
+        content_type = content_type.split(';')[0].strip()
+        if content_type in available:
+            return content_type
+    return JSON_CONTENT_TYPE
+
+
+def dump_wire(data, content_type=JSON_CONTENT_TYPE):
+    """Encode serialized data (see serialize with no_dump) in a wire format
+
+    :param data: serialized data
+    :type data: dict | list
+    :param content_type: content type of the wire format
+    :type content_type: str
+    :return: encoded data
+    :rtype: str
+    """
+    if content_type == MSGPACK_CONTENT_TYPE:
+        return msgpack.packb(data, use_bin_type=True)
+    result = json.dumps(data, ensure_ascii=False)
+    if isinstance(result, unicode):
+        result = result.encode('utf8')
+    return result
+
+
+def load_wire(body, content_type=JSON_CONTENT_TYPE):
+    """Decode data encoded in a wire format, the result must be un-serialized
+    with unserialize and no_load
+
+    :param body: encoded data
+    :type body: str
+    :param content_type: content type of the wire format
+    :type content_type: str
+    :return: serialized data
+    :rtype: dict | list
+    :raise ValueError: if the data is not valid
+    """
+    if content_type == MSGPACK_CONTENT_TYPE:
+        if msgpack is None:
+            raise ValueError("The msgpack library is not installed")
+        return msgpack.unpackb(body, raw=False)
+    return json.loads(body)
+
+
 def get_alignak_class(python_path):
     """ Get the alignak class the in safest way I could imagine.
     Return None if (cumulative conditions) ::
@@ -120,11 +203,16 @@ def get_alignak_class(python_path):
     * above is false and the module does not have the wanted class
     * above is false and the class in not a ClassType
 
+    The found classes are cached.
+
     :param python_path:
     :type python_path: str
     :return: alignak class
     :raise AlignakClassLookupException
     """
+    if python_path in PATHS_CLASSES:
+        return PATHS_CLASSES[python_path]
+
     module, a_class = python_path.rsplit('.', 1)
 
     if not module.startswith('alignak'):
@@ -147,7 +235,8 @@ def get_alignak_class(python_path):
         raise AlignakClassLookupException("Can't recreate object %s in %s module. "
                                           "This type is not a class" % (a_class, module))
 
-    return getattr(pymodule, a_class)
+    PATHS_CLASSES[python_path] = getattr(pymodule, a_class)
+    return PATHS_CLASSES[python_path]
 
 
 class AlignakClassLookupException(Exception):
@@ -435,6 +435,22 @@ class ModulesManager(object):
                 for inst in self.instances
                 if inst.is_external and inst not in self.to_restart]
 
+    @staticmethod
+    def get_brok_types(instances):
+        """Get the types of the broks wanted by some instances
+
+        :param instances: module instances
+        :type instances: list
+        :return: broks types, None if an instance wants all the broks
+        :rtype: set | None
+        """
+        brok_types = set()
+        for inst in instances:
+            if not getattr(inst, 'brok_types', None):
+                return None
+            brok_types.update(inst.brok_types)
+        return brok_types
+
     def stop_all(self):
         """Stop all module instances
 
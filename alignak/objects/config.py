@@ -78,10 +78,11 @@ import tempfile
 import uuid
 import logging
 from StringIO import StringIO
-from multiprocessing import Process, Manager
+from multiprocessing import Process, Manager, Pool
 import json
 
 from alignak.misc.serialization import serialize
+from alignak.configdelta import get_conf_fingerprints
 
 from alignak.commandcall import CommandCall
 from alignak.objects.item import Item
@@ -131,6 +132,9 @@ NO_LONGER_USED = ('This parameter is not longer take from the main file, but mus
 NOT_INTERESTING = 'We do not think such an option is interesting to manage.'
 NOT_MANAGED = ('This Nagios legacy parameter is not managed by Alignak. Ignoring...')
 
+# Minimum number of configuration files for each process when they are parsed in parallel
+PARSING_FILES_PER_PROCESS = 16
+
 
 class Config(Item):  # pylint: disable=R0904,R0902
     """Config is the class to read, load and manipulate the user
@@ -716,6 +720,8 @@ class Config(Item):  # pylint: disable=R0904,R0902
         'ADMINPAGER':           ''
         # 'USERn': '$USERn$' # Add at run time
     }
+    # The configuration macros, USERn included, do not change
+    static_macros = macros
 
     # We create dict of objects
     # Type: 'name in objects': {Class of object, Class of objects,
@@ -1072,11 +1078,18 @@ class Config(Item):  # pylint: disable=R0904,R0902
         res.close()
         return config
 
-    def read_config_buf(self, buf):  # pylint: disable=R0912
+    def read_config_buf(self, buf, processes=1):
         """The config buffer (previously returned by Config.read_config())
 
+        The buffer is split into the configuration files (the parts beginning with an
+        IMPORTEDFROM line) which are parsed with parse_config_file_buf. When several
+        processes are allowed and there are enough files, the files are parsed by a pool of
+        processes. The objects are merged in the files order.
+
         :param buf: buffer containing all data from config files
         :type buf: str
+        :param processes: maximum number of processes parsing the configuration files
+        :type processes: int
         :return: dict of alignak objects with the following structure ::
         { type1 : [{key: value, ..}, {..}],
           type2 : [ ... ]
@@ -1092,108 +1105,36 @@ class Config(Item):  # pylint: disable=R0904,R0902
 
         :rtype: dict
         """
-        params = []
-        objectscfg = {}
-        types = self.__class__.configuration_types
-        for o_type in types:
-            objectscfg[o_type] = []
-
-        tmp = []
-        tmp_type = 'void'
-        in_define = False
-        almost_in_define = False
-        continuation_line = False
-        tmp_line = ''
-        lines = buf.split('\n')
-        line_nb = 0  # Keep the line number for the file path
-        filefrom = ''
-        for line in lines:
-            if line.startswith("# IMPORTEDFROM="):
-                filefrom = line.split('=')[1]
-                line_nb = 0  # reset the line number too
-                continue
-
-            line_nb += 1
-            # Remove comments
-            line = split_semicolon(line)[0].strip()
-
-            # A backslash means, there is more to come
-            if re.search(r"\\\s*$", line) is not None:
-                continuation_line = True
-                line = re.sub(r"\\\s*$", "", line)
-                line = re.sub(r"^\s+", " ", line)
-                tmp_line += line
-                continue
-            elif continuation_line:
-                # Now the continuation line is complete
-                line = re.sub(r"^\s+", "", line)
-                line = tmp_line + line
-                tmp_line = ''
-                continuation_line = False
-            # } alone in a line means stop the object reading
-            if re.search(r"^\s*}\s*$", line) is not None:
-                in_define = False
-
-            # { alone in a line can mean start object reading
-            if re.search(r"^\s*\{\s*$", line) is not None and almost_in_define:
-                almost_in_define = False
-                in_define = True
-                continue
-
-            if re.search(r"^\s*#|^\s*$|^\s*}", line) is not None:
-                pass
-            # A define must be catched and the type saved
-            # The old entry must be saved before
-            elif re.search("^define", line) is not None:
-                if re.search(r".*\{.*$", line) is not None:  # pylint: disable=R0102
-                    in_define = True
-                else:
-                    almost_in_define = True
-
-                if tmp_type not in objectscfg:
-                    objectscfg[tmp_type] = []
-                objectscfg[tmp_type].append(tmp)
-                tmp = []
-                tmp.append("imported_from %s:%s" % (filefrom, line_nb))
-                # Get new type
-                elts = re.split(r'\s', line)
-                # Maybe there was space before and after the type
-                # so we must get all and strip it
-                tmp_type = ' '.join(elts[1:]).strip()
-                tmp_type = tmp_type.split('{')[0].strip()
-            else:
-                if in_define:
-                    tmp.append(line)
-                else:
-                    params.append(line)
-
-        # Maybe the type of the last element is unknown, declare it
-        if tmp_type not in objectscfg:
-            objectscfg[tmp_type] = []
+        files_bufs = split_config_buf(buf)
+        processes = min(processes, len(files_bufs) // PARSING_FILES_PER_PROCESS)
+        if processes > 1 and os.name != 'nt':
+            logger.info("Parsing %d configuration files with %d processes",
+                        len(files_bufs), processes)
+            pool = Pool(processes)
+            try:
+                files_objects = pool.map(parse_config_file_buf, files_bufs,
+                                         PARSING_FILES_PER_PROCESS)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            files_objects = [parse_config_file_buf(file_buf) for file_buf in files_bufs]
 
-        objectscfg[tmp_type].append(tmp)
+        params = []
         objects = {}
+        for o_type in self.__class__.configuration_types:
+            objects[o_type] = []
+        for file_params, file_objects in files_objects:
+            params.extend(file_params)
+            for o_type, tmp_obj in file_objects:
+                if o_type not in objects:
+                    objects[o_type] = []
+                objects[o_type].append(tmp_obj)
 
         self.load_params(params)
         # And then update our MACRO dict
         self.fill_resource_macros_names_macros()
 
-        for o_type in objectscfg:
-            objects[o_type] = []
-            for items in objectscfg[o_type]:
-                tmp_obj = {}
-                for line in items:
-                    elts = self._cut_line(line)
-                    if elts == []:
-                        continue
-                    prop = elts[0]
-                    if prop not in tmp_obj:
-                        tmp_obj[prop] = []
-                    value = ' '.join(elts[1:])
-                    tmp_obj[prop].append(value)
-                if tmp_obj != {}:
-                    objects[o_type].append(tmp_obj)
-
         return objects
 
     @staticmethod
@@ -1462,6 +1403,7 @@ class Config(Item):  # pylint: disable=R0904,R0902
                     t00 = time.time()
                     conf_id = conf.uuid
                     realm.serialized_confs[conf_id] = serialize(conf)
+                    realm.conf_fingerprints[conf_id] = get_conf_fingerprints(conf)
                     logger.debug("[config] time to serialize the conf %s:%s is %s (size:%s)",
                                  realm.get_name(), i, time.time() - t00,
                                  len(realm.serialized_confs[conf_id]))
@@ -1509,6 +1451,8 @@ class Config(Item):  # pylint: disable=R0904,R0902
                                    args=(child_q, realm.get_name(), i, conf))
                     proc.start()
                     processes.append((i, proc))
+                    conf.hostgroups.prepare_for_sending()
+                    realm.conf_fingerprints[conf.uuid] = get_conf_fingerprints(conf)
 
                 # Here all sub-processes are launched for this realm, now wait for them to finish
                 while processes:
@@ -2866,6 +2810,121 @@ class Config(Item):  # pylint: disable=R0904,R0902
             dfile.close()
 
 
+def split_config_buf(buf):
+    """Split the buffer returned by Config.read_config into the configuration files buffers,
+    each one beginning with its IMPORTEDFROM line
+
+    :param buf: buffer containing all data from config files
+    :type buf: str
+    :return: configuration files buffers
+    :rtype: list
+    """
+    starts = [match.start() for match in re.finditer(r"^# IMPORTEDFROM=", buf, re.MULTILINE)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    return [buf[start:end] for start, end in zip(starts, starts[1:] + [len(buf)])]
+
+
+def parse_config_file_buf(buf):  # pylint: disable=R0912
+    """Parse a configuration file buffer (see split_config_buf)
+
+    Each object gets an imported_from property with the file path and line number.
+
+    :param buf: buffer of a configuration file
+    :type buf: str
+    :return: the global parameters lines and the (type, {key: [values]}) objects list
+    :rtype: tuple
+    """
+    params = []
+    objects = []
+
+    tmp = []
+    tmp_type = 'void'
+    in_define = False
+    almost_in_define = False
+    continuation_line = False
+    tmp_line = ''
+    lines = buf.split('\n')
+    line_nb = 0  # Keep the line number for the file path
+    filefrom = ''
+    for line in lines:
+        if line.startswith("# IMPORTEDFROM="):
+            filefrom = line.split('=')[1]
+            line_nb = 0  # reset the line number too
+            continue
+
+        line_nb += 1
+        # Remove comments
+        line = split_semicolon(line)[0].strip()
+
+        # A backslash means, there is more to come
+        if re.search(r"\\\s*$", line) is not None:
+            continuation_line = True
+            line = re.sub(r"\\\s*$", "", line)
+            line = re.sub(r"^\s+", " ", line)
+            tmp_line += line
+            continue
+        elif continuation_line:
+            # Now the continuation line is complete
+            line = re.sub(r"^\s+", "", line)
+            line = tmp_line + line
+            tmp_line = ''
+            continuation_line = False
+        # } alone in a line means stop the object reading
+        if re.search(r"^\s*}\s*$", line) is not None:
+            in_define = False
+
+        # { alone in a line can mean start object reading
+        if re.search(r"^\s*\{\s*$", line) is not None and almost_in_define:
+            almost_in_define = False
+            in_define = True
+            continue
+
+        if re.search(r"^\s*#|^\s*$|^\s*}", line) is not None:
+            pass
+        # A define must be catched and the type saved
+        # The old entry must be saved before
+        elif re.search("^define", line) is not None:
+            if re.search(r".*\{.*$", line) is not None:  # pylint: disable=R0102
+                in_define = True
+            else:
+                almost_in_define = True
+
+            objects.append((tmp_type, tmp))
+            tmp = []
+            tmp.append("imported_from %s:%s" % (filefrom, line_nb))
+            # Get new type
+            elts = re.split(r'\s', line)
+            # Maybe there was space before and after the type
+            # so we must get all and strip it
+            tmp_type = ' '.join(elts[1:]).strip()
+            tmp_type = tmp_type.split('{')[0].strip()
+        else:
+            if in_define:
+                tmp.append(line)
+            else:
+                params.append(line)
+
+    objects.append((tmp_type, tmp))
+
+    res = []
+    for o_type, items in objects:
+        tmp_obj = {}
+        for line in items:
+            elts = Config._cut_line(line)  # pylint: disable=W0212
+            if elts == []:
+                continue
+            prop = elts[0]
+            if prop not in tmp_obj:
+                tmp_obj[prop] = []
+            value = ' '.join(elts[1:])
+            tmp_obj[prop].append(value)
+        if tmp_obj != {}:
+            res.append((o_type, tmp_obj))
+
+    return params, res
+
+
 def lazy():
     """Generate 256 User macros
 
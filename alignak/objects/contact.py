@@ -163,6 +163,9 @@ class Contact(Item):
         'CONTACTGROUPNAME': 'get_groupname',
         'CONTACTGROUPNAMES': 'get_groupnames'
     }
+    static_macros = ('CONTACTNAME', 'CONTACTALIAS', 'CONTACTEMAIL', 'CONTACTPAGER',
+                     'CONTACTADDRESS1', 'CONTACTADDRESS2', 'CONTACTADDRESS3',
+                     'CONTACTADDRESS4', 'CONTACTADDRESS5', 'CONTACTADDRESS6')
 
     special_properties = (
         'service_notification_commands', 'host_notification_commands',
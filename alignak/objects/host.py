@@ -244,6 +244,8 @@ class Host(SchedulingItem):  # pylint: disable=R0904
         'TOTALHOSTSERVICESUNREACHABLE': ('get_total_services_unreachable', ['services']),
         'HOSTBUSINESSIMPACT':  'business_impact',
     })
+    static_macros = ('HOSTNAME', 'HOSTDISPLAYNAME', 'HOSTALIAS', 'HOSTADDRESS', 'MAXHOSTATTEMPTS',
+                     'HOSTACTIONURL', 'HOSTNOTESURL', 'HOSTNOTES', 'HOSTREALM')
     # Todo: really unuseful ... should be removed, but let's discuss!
     # Currently, this breaks the macro resolver because the corresponding properties do not exit!
     # Manage ADDRESSX macros by adding them dynamically
@@ -119,6 +119,10 @@ class Item(AlignakObject):
 
     macros = {
     }
+    # Macros which values do not change while the item is scheduled. Their values are
+    # cached in macros_cache by the macro resolver, see reset_macros_cache
+    static_macros = ()
+    macros_cache = None
 
     my_type = ''
     ok_up = ''
@@ -271,6 +275,15 @@ class Item(AlignakObject):
             i.templates = copy(self.templates)
         return i
 
+    def reset_macros_cache(self):
+        """
+        Forget the cached macros values, must be called when a static macro
+        or a custom variable of the item is changed
+
+        :return: None
+        """
+        self.macros_cache = None
+
     def clean(self):
         """
         Clean properties only need when initialize & configure
@@ -1219,6 +1232,76 @@ class Items(object):
             res[key] = item.serialize()
         return res
 
+    def get_templates_order(self):
+        """
+        Get the templates sorted so that each template comes after the templates it uses
+
+        :return: templates uuids
+        :rtype: list
+        """
+        order = []
+        visited = set()
+
+        def visit(tpl_id):
+            """Add the templates used by a template, then the template itself"""
+            if tpl_id in visited or tpl_id not in self.templates:
+                return
+            # Marked before its parents, so that a templates loop stops here
+            visited.add(tpl_id)
+            for t_id in self.templates[tpl_id].templates:
+                visit(t_id)
+            order.append(tpl_id)
+
+        for tpl_id in self.templates:
+            visit(tpl_id)
+        return order
+
+    def apply_properties_inheritance(self, props):
+        """
+        Define some properties with their inheritance value, for all templates and items
+
+        The templates are resolved once, each one after the templates it uses, and the
+        resolved values are kept to be inherited by the other templates and by the items.
+        An item only resolves the properties that its templates define and its '+' values.
+
+        :param props: properties to inherit
+        :type props: set | dict
+        :return: None
+        """
+        cache = {}
+        # Properties defined by each template or by the templates it uses
+        defined = {}
+        for t_id in self.get_templates_order():
+            template = self.templates[t_id]
+            tpl_props = set(prop for prop in props
+                            if hasattr(template, prop) or template.has_plus(prop))
+            for parent_id in template.templates:
+                tpl_props.update(defined.get(parent_id, ()))
+            defined[t_id] = tpl_props
+            for prop in tpl_props:
+                if (t_id, prop) not in cache:
+                    cache[(t_id, prop)] = self.get_property_by_inheritance(template, prop, cache)
+
+        for item in self.items.itervalues():
+            # The item own values are kept as is, except the '+' ones
+            item_props = set(prop for prop in item.plus if prop in props)
+            for t_id in item.templates:
+                item_props.update(defined.get(t_id, ()))
+            for prop in item_props:
+                self.get_property_by_inheritance(item, prop, cache)
+
+            # If a "null" attribute was inherited, delete it
+            for prop in props:
+                if getattr(item, prop, None) == 'null':
+                    delattr(item, prop)
+
+        # The templates "null" attributes are kept until all the items inherited them
+        for t_id, tpl_props in defined.iteritems():
+            template = self.templates[t_id]
+            for prop in tpl_props:
+                if getattr(template, prop, None) == 'null':
+                    delattr(template, prop)
+
     def apply_partial_inheritance(self, prop):
         """
         Define property with inheritance value of the property
@@ -1227,15 +1310,7 @@ class Items(object):
         :type prop: str
         :return: None
         """
-        for i in itertools.chain(self.items.itervalues(),
-                                 self.templates.itervalues()):
-            self.get_property_by_inheritance(i, prop)
-            # If a "null" attribute was inherited, delete it
-            try:
-                if getattr(i, prop) == 'null':
-                    delattr(i, prop)
-            except AttributeError:  # pragma: no cover, simple protection
-                pass
+        self.apply_properties_inheritance(set([prop]))
 
     def apply_inheritance(self):
         """
@@ -1246,11 +1321,12 @@ class Items(object):
         # We check for all Class properties if the host has it
         # if not, it check all host templates for a value
         cls = self.inner_class
-        for prop in cls.properties:
-            self.apply_partial_inheritance(prop)
-        for i in itertools.chain(self.items.itervalues(),
-                                 self.templates.itervalues()):
-            self.get_customs_properties_by_inheritance(i)
+        self.apply_properties_inheritance(cls.properties)
+        cache = {}
+        for t_id in self.get_templates_order():
+            self.get_customs_properties_by_inheritance(self.templates[t_id], cache)
+        for i in self.items.itervalues():
+            self.get_customs_properties_by_inheritance(i, cache)
 
     def linkify_with_contacts(self, contacts):
         """
@@ -1671,13 +1747,17 @@ class Items(object):
 
         return parents.loop_check()
 
-    def get_property_by_inheritance(self, obj, prop):
+    def get_property_by_inheritance(self, obj, prop, cache=None):
         """
         Get the property asked in parameter to this object or from defined templates of this
         object
 
+        :param obj: object (item or template)
+        :type obj: alignak.objects.item.Item
         :param prop: name of property
         :type prop: str
+        :param cache: values of the already resolved templates, indexed by (uuid, property)
+        :type cache: dict | None
         :return: Value of property of this object or of a template
         :rtype: str or None
         """
@@ -1703,7 +1783,15 @@ class Items(object):
         # the least defined template wins (if property is set).
         for t_id in obj.templates:
             template = self.templates[t_id]
-            value = self.get_property_by_inheritance(template, prop)
+            if cache is None:
+                value = self.get_property_by_inheritance(template, prop)
+            elif (t_id, prop) in cache:
+                value = cache[(t_id, prop)]
+            else:
+                # Set before resolving, so that a templates loop stops here
+                cache[(t_id, prop)] = None
+                value = cache[(t_id, prop)] = \
+                    self.get_property_by_inheritance(template, prop, cache)
 
             if value is not None and value != []:
                 # If our template give us a '+' value, we should continue to loop
@@ -1771,16 +1859,27 @@ class Items(object):
         # Not even a plus... so None :)
         return getattr(obj, prop, None)
 
-    def get_customs_properties_by_inheritance(self, obj):
+    def get_customs_properties_by_inheritance(self, obj, cache=None):
         """
         Get custom properties from the templates defined in this object
 
+        :param obj: object (item or template)
+        :type obj: alignak.objects.item.Item
+        :param cache: custom properties of the already resolved templates, indexed by uuid
+        :type cache: dict | None
         :return: list of custom properties
         :rtype: list
         """
         for t_id in obj.templates:
             template = self.templates[t_id]
-            tpl_cv = self.get_customs_properties_by_inheritance(template)
+            if cache is None:
+                tpl_cv = self.get_customs_properties_by_inheritance(template)
+            elif t_id in cache:
+                tpl_cv = cache[t_id]
+            else:
+                # Set before resolving, so that a templates loop stops here
+                cache[t_id] = {}
+                tpl_cv = cache[t_id] = self.get_customs_properties_by_inheritance(template, cache)
             if tpl_cv:
                 for prop in tpl_cv:
                     if prop not in obj.customs:
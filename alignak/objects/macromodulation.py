@@ -80,6 +80,9 @@ class MacroModulation(Item):
 
     macros = {}
 
+    # (active, computed at, valid until), see is_active
+    activity_cache = None
+
     def get_name(self):
         """
         Get the name of the macromodulation
@@ -95,14 +98,26 @@ class MacroModulation(Item):
         """
         Know if this macro is active for this correct period
 
+        The result is cached until the modulation period starts or ends.
+
         :return: True is we are in the period, otherwise False
         :rtype: bool
         """
         now = int(time.time())
+        if self.activity_cache is not None:
+            active, since, until = self.activity_cache
+            if since <= now and (until is None or now < until):
+                return active
+
         timperiod = timperiods[self.modulation_period]
-        if not timperiod or timperiod.is_time_valid(now):
-            return True
-        return False
+        if not timperiod:
+            active, until = True, None
+        elif timperiod.is_time_valid(now):
+            active, until = True, timperiod.get_next_invalid_time_from_t(now)
+        else:
+            active, until = False, timperiod.get_next_valid_time_from_t(now)
+        self.activity_cache = (active, now, until)
+        return active
 
     def is_correct(self):
         """
@@ -72,7 +72,9 @@ class Module(Item):
         'python_name': StringProp(),
         'module_alias': StringProp(),
         'module_types': ListProp(default=[''], split_on_coma=True),
-        'modules': ListProp(default=[''], split_on_coma=True)
+        'modules': ListProp(default=[''], split_on_coma=True),
+        # Types of the broks the module wants, empty for all the broks
+        'brok_types': ListProp(default=[], split_on_coma=True)
     })
 
     macros = {}
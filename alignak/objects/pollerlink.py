@@ -45,7 +45,7 @@ between the modules Arbiter and Poller
 """
 
 from alignak.objects.satellitelink import SatelliteLink, SatelliteLinks
-from alignak.property import IntegerProp, StringProp, ListProp
+from alignak.property import IntegerProp, StringProp, ListProp, FloatProp
 
 
 class PollerLink(SatelliteLink):
@@ -62,6 +62,13 @@ class PollerLink(SatelliteLink):
         'min_workers':  IntegerProp(default=0, fill_brok=['full_status'], to_send=True),
         'max_workers':  IntegerProp(default=30, fill_brok=['full_status'], to_send=True),
         'processes_by_worker': IntegerProp(default=256, fill_brok=['full_status'], to_send=True),
+        'worker_batch_size': IntegerProp(default=64, fill_brok=['full_status'], to_send=True),
+        'worker_flush_interval':
+            FloatProp(default=0.1, fill_brok=['full_status'], to_send=True),
+        'max_processes_by_worker':
+            IntegerProp(default=0, fill_brok=['full_status'], to_send=True),
+        'worker_target_latency':
+            FloatProp(default=2.0, fill_brok=['full_status'], to_send=True),
         'poller_tags':  ListProp(default=['None'], to_send=True),
     })
 
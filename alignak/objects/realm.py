@@ -92,6 +92,7 @@ class Realm(Itemgroup):
     running_properties = Item.running_properties.copy()
     running_properties.update({
         'serialized_confs': DictProp(default={}),
+        'conf_fingerprints': DictProp(default={}),
         'unknown_higher_realms': ListProp(default=[]),
         'all_sub_members': ListProp(default=[]),
     })
@@ -74,6 +74,7 @@ class SchedulerLink(SatelliteLink):
     running_properties.update({
         'conf': StringProp(default=None),
         'conf_package': DictProp(default={}),
+        'conf_delta_package': DictProp(default={}),
         'need_conf': StringProp(default=True),
         'external_commands': StringProp(default=[]),
         'push_flavor': IntegerProp(default=0),
@@ -121,6 +122,27 @@ class SchedulerLink(SatelliteLink):
 
         return False
 
+    def get_conf_fingerprints(self):
+        """Get the fingerprints of the configuration managed by the scheduler
+        HTTP request to the scheduler (GET /get_conf_fingerprints)
+
+        :return: dict with the push_flavor of the configuration and its fingerprints,
+                 None on failure
+        :rtype: dict | None
+        """
+        if not self.reachable or self.con is None:
+            return None
+
+        try:
+            return self.con.get('get_conf_fingerprints', wait='long')
+        except (HTTPClientException, HTTPClientConnectionException,
+                HTTPClientTimeoutException) as exp:
+            # Not a problem, the whole configuration will be sent
+            logger.warning("[%s] Error when getting the configuration fingerprints: %s",
+                           self.get_name(), str(exp))
+
+        return None
+
     def register_to_my_realm(self):  # pragma: no cover, seems not to be used anywhere
         """
         Add this reactionner to the realm
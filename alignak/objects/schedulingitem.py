@@ -86,6 +86,7 @@ from alignak.dependencynode import DependencyNodeFactory
 from alignak.acknowledge import Acknowledge
 from alignak.comment import Comment
 from alignak.commandcall import CommandCall
+from alignak.dirtyitems import DOWNTIMES, TOPOLOGY_CHANGE, ACKNOWLEDGEMENTS
 
 logger = logging.getLogger(__name__)  # pylint: disable=C0103
 
@@ -99,6 +100,9 @@ class SchedulingItem(Item):  # pylint: disable=R0902
     current_event_id = 0
     current_problem_id = 0
 
+    # Scheduler dirty sets the item registers in when it has some pending work
+    dirty_items = None
+
     properties = Item.properties.copy()
     properties.update({
         'uuid':
@@ -503,6 +507,37 @@ class SchedulingItem(Item):  # pylint: disable=R0902
 
         return res
 
+    def add_downtime(self, downtime):
+        """
+        Add a downtime in this object and register it in the scheduler downtimes dirty set
+
+        :param downtime: a Downtime object
+        :type downtime: object
+        :return: None
+        """
+        super(SchedulingItem, self).add_downtime(downtime)
+        self.set_dirty(DOWNTIMES)
+
+    def set_topology_change(self):
+        """
+        Set the topology_change flag, it is reset by the scheduler on its next loop turn
+
+        :return: None
+        """
+        self.topology_change = True
+        self.set_dirty(TOPOLOGY_CHANGE)
+
+    def set_dirty(self, name):
+        """
+        Register this object in a scheduler dirty set, if it is watched by a scheduler
+
+        :param name: dirty set name
+        :type name: str
+        :return: None
+        """
+        if self.dirty_items is not None:
+            self.dirty_items.register(name, self)
+
     def change_check_command(self, command_params):
         """
 
@@ -2810,6 +2845,7 @@ class SchedulingItem(Item):  # pylint: disable=R0902
                     'end_time': end_time, 'notify': notify}
             ack = Acknowledge(data)
             self.acknowledgement = ack
+            self.set_dirty(ACKNOWLEDGEMENTS)
             if self.my_type == 'host':
                 comment_type = 1
                 self.broks.append(self.acknowledgement.get_raise_brok(self.get_name()))
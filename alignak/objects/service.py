@@ -230,6 +230,8 @@ class Service(SchedulingItem):
         'SERVICENOTES':           'notes',
         'SERVICEBUSINESSIMPACT':  'business_impact',
     })
+    static_macros = ('SERVICEDESC', 'SERVICEDISPLAYNAME', 'MAXSERVICEATTEMPTS', 'SERVICEISVOLATILE',
+                     'SERVICEACTIONURL', 'SERVICENOTESURL', 'SERVICENOTES')
 
     # This tab is used to transform old parameters name into new ones
     # so from Nagios2 format, to Nagios3 ones.
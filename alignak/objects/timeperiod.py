@@ -122,6 +122,7 @@ import logging
 import time
 import re
 import warnings
+from bisect import bisect_right
 
 from alignak.objects.item import Item, Items
 
@@ -162,6 +163,9 @@ class Timeperiod(Item):
     })
     running_properties = Item.running_properties.copy()
 
+    # Time range of the validity transitions table, see get_transition
+    transitions_horizon = 7 * 24 * 3600
+
     def __init__(self, params=None, parsing=True):
 
         if params is None:
@@ -188,8 +192,12 @@ class Timeperiod(Item):
             del standard_params['dateranges']
         # Handle standard params
         super(Timeperiod, self).__init__(params=standard_params, parsing=parsing)
-        self.cache = {}  # For tuning purpose only
-        self.invalid_cache = {}  # same but for invalid search
+        # Validity transitions table, see get_transition
+        self.transitions = None
+        self.transitions_start = 0
+        self.transitions_end = 0
+        self.transitions_valid = False
+        self.transitions_done = False
 
         # We use the uuid presence to assume we are reserializing
         if 'uuid' in params:
@@ -303,34 +311,6 @@ class Timeperiod(Item):
         """
         pass
 
-    def find_next_valid_time_from_cache(self, timestamp):
-        """
-        Get the next valid time from cache
-
-        :param timestamp: number of seconds
-        :type timestamp: int
-        :return: Nothing or time in seconds
-        :rtype: None or int
-        """
-        try:
-            return self.cache[timestamp]
-        except KeyError:
-            return None
-
-    def find_next_invalid_time_from_cache(self, timestamp):
-        """
-        Get the next invalid time from cache
-
-        :param timestamp: number of seconds
-        :type timestamp: int
-        :return: Nothing or time in seconds
-        :rtype: None or int
-        """
-        try:
-            return self.invalid_cache[timestamp]
-        except KeyError:
-            return None
-
     def check_and_log_activation_change(self):
         """
         Will look for active/un-active change of timeperiod.
@@ -371,29 +351,91 @@ class Timeperiod(Item):
 
     def clean_cache(self):
         """
-        Clean cache with entries older than now because not used in future ;)
+        Clean the validity transitions table when it is out of date
 
         :return: None
         """
-        now = int(time.time())
-        t_to_del = []
-        for timestamp in self.cache:
-            if timestamp < now:
-                t_to_del.append(timestamp)
-        for timestamp in t_to_del:
-            del self.cache[timestamp]
-
-        # same for the invalid cache
-        t_to_del = []
-        for timestamp in self.invalid_cache:
-            if timestamp < now:
-                t_to_del.append(timestamp)
-        for timestamp in t_to_del:
-            del self.invalid_cache[timestamp]
+        if self.transitions is not None and \
+                int(time.time()) >= self.transitions_start + self.transitions_horizon:
+            self.transitions = None
+
+    def get_transition(self, timestamp):
+        """
+        Get the validity of the timeperiod at a time and the next time it changes.
+
+        The timeperiod keeps a table of its validity changes, from a start time up to
+        transitions_horizon seconds later. The table is computed up to the wanted time,
+        and it is built again from the wanted time when the time is out of its range.
+
+        The table stops early if the next valid and next invalid times computations do not
+        agree (nested excludes), the times after are not in the table.
+
+        :param timestamp: number of seconds
+        :type timestamp: int
+        :return: the timeperiod is valid at timestamp, and the next change time
+                 (None if it does not change within the next year),
+                 or None if the time is not in the table
+        :rtype: tuple | None
+        """
+        if self.transitions is None or \
+                not self.transitions_start <= timestamp < \
+                self.transitions_start + self.transitions_horizon:
+            self.transitions = []
+            self.transitions_start = timestamp
+            self.transitions_end = timestamp + self.transitions_horizon
+            self.transitions_valid = True
+            self.transitions_done = False
+            next_valid = self._compute_next_valid_time_from_t(timestamp)
+            if next_valid != timestamp:
+                self.transitions_valid = False
+                self._add_transition(next_valid)
+
+        transitions = self.transitions
+        while not self.transitions_done and (not transitions or transitions[-1] <= timestamp):
+            # Valid after the last transition?
+            if self.transitions_valid != (len(transitions) % 2 == 1):
+                self._add_transition(
+                    self._compute_next_invalid_time_from_t(transitions[-1] if transitions
+                                                           else self.transitions_start))
+            else:
+                self._add_transition(self._compute_next_valid_time_from_t(transitions[-1]))
+
+        if timestamp >= self.transitions_end:
+            return None
+
+        index = bisect_right(transitions, timestamp)
+        valid = self.transitions_valid != (index % 2 == 1)
+        if index < len(transitions):
+            return valid, transitions[index]
+        return valid, None
+
+    def _add_transition(self, timestamp):
+        """
+        Add a validity change time in the transitions table
+
+        :param timestamp: change time, None if there is no more change
+        :type timestamp: int | None
+        :return: None
+        """
+        if self.transitions:
+            last = self.transitions[-1]
+        else:
+            last = self.transitions_start
+        if timestamp is None:
+            self.transitions_done = True
+            return
+        if timestamp <= last:
+            # The table is only valid until there
+            self.transitions_done = True
+            self.transitions_end = last
+            return
+        self.transitions.append(timestamp)
+        if timestamp >= self.transitions_start + self.transitions_horizon:
+            self.transitions_done = True
 
     def get_next_valid_time_from_t(self, timestamp):
         """
-        Get next valid time. If it's in cache, get it, otherwise define it.
+        Get next valid time, from the validity transitions table.
         The limit to find it is 1 year.
 
         :param timestamp: number of seconds
@@ -402,19 +444,50 @@ class Timeperiod(Item):
         :rtype: None or int
         """
         timestamp = int(timestamp)
-        original_t = timestamp
+        transition = self.get_transition(timestamp)
+        if transition is None:
+            return self._compute_next_valid_time_from_t(timestamp)
+        valid, next_change = transition
+        if valid:
+            return timestamp
+        return next_change
 
-        res_from_cache = self.find_next_valid_time_from_cache(timestamp)
-        if res_from_cache is not None:
-            return res_from_cache
+    def get_next_invalid_time_from_t(self, timestamp):
+        """
+        Get the next invalid time, from the validity transitions table
+
+        :param timestamp: timestamp in seconds (of course)
+        :type timestamp: int or float
+        :return: timestamp of next invalid time
+        :rtype: int or float
+        """
+        timestamp = int(timestamp)
+        transition = self.get_transition(timestamp)
+        if transition is not None:
+            valid, next_change = transition
+            if not valid:
+                return timestamp
+            if next_change is not None:
+                return next_change
+        return self._compute_next_invalid_time_from_t(timestamp)
+
+    def _compute_next_valid_time_from_t(self, timestamp):
+        """
+        Compute the next valid time from the dateranges and the excluded timeperiods.
+        The limit to find it is 1 year.
 
+        :param timestamp: number of seconds
+        :type timestamp: int or float
+        :return: Nothing or time in seconds
+        :rtype: None or int
+        """
+        original_t = timestamp
         still_loop = True
 
         # Loop for all minutes...
         while still_loop:
             local_min = None
 
-            # Ok, not in cache...
             dr_mins = []
 
             for daterange in self.dateranges:
@@ -422,24 +495,20 @@ class Timeperiod(Item):
 
             s_dr_mins = sorted([d for d in dr_mins if d is not None])
 
-            for t01 in s_dr_mins:
-                if not self.exclude and still_loop:
-                    # No Exclude so we are good
-                    local_min = t01
+            excludes = []
+            if s_dr_mins != []:
+                excludes = [timeperiod for timeperiod in self.exclude
+                            if timeperiod.is_time_valid(s_dr_mins[0])]
+                if not excludes:
+                    # OK we found a date that is not valid in any exclude timeperiod
+                    local_min = s_dr_mins[0]
                     still_loop = False
-                else:
-                    for timeperiod in self.exclude:
-                        if not timeperiod.is_time_valid(t01) and still_loop:
-                            # OK we found a date that is not valid in any exclude timeperiod
-                            local_min = t01
-                            still_loop = False
 
             if local_min is None:
-                # Looking for next invalid date
+                # Looking for next invalid date of the excludes
                 exc_mins = []
-                if s_dr_mins != []:
-                    for timeperiod in self.exclude:
-                        exc_mins.append(timeperiod.get_next_invalid_time_from_t(s_dr_mins[0]))
+                for timeperiod in excludes:
+                    exc_mins.append(timeperiod.get_next_invalid_time_from_t(s_dr_mins[0]))
 
                 s_exc_mins = sorted([d for d in exc_mins if d is not None])
 
@@ -455,20 +524,17 @@ class Timeperiod(Item):
                     still_loop = False
                     local_min = None
 
-        # Ok, we update the cache...
-        self.cache[original_t] = local_min
         return local_min
 
-    def get_next_invalid_time_from_t(self, timestamp):
+    def _compute_next_invalid_time_from_t(self, timestamp):
         """
-        Get the next invalid time
+        Compute the next invalid time from the dateranges and the excluded timeperiods
 
         :param timestamp: timestamp in seconds (of course)
         :type timestamp: int or float
         :return: timestamp of next invalid time
         :rtype: int or float
         """
-        timestamp = int(timestamp)
         original_t = timestamp
 
         dr_mins = []
@@ -871,6 +937,7 @@ class Timeperiod(Item):
         for entry in self.unresolved:
             self.resolve_daterange(self.dateranges, entry)
         self.unresolved = []
+        self.transitions = None
 
     def linkify(self, timeperiods):
         """
@@ -892,6 +959,7 @@ class Timeperiod(Item):
                     msg = "[timeentry::%s] unknown %s timeperiod" % (self.get_name(), tp_name)
                     self.configuration_errors.append(msg)
         self.exclude = new_exclude
+        self.transitions = None
 
     def check_exclude_rec(self):
         """
@@ -91,6 +91,26 @@ class Trigger(Item):
         del res['code_bin']
         return res
 
+    def __getstate__(self):
+        """Get the trigger attributes to pickle it, without the compiled code
+
+        :return: trigger attributes
+        :rtype: dict
+        """
+        res = self.__dict__.copy()
+        res['code_bin'] = None
+        return res
+
+    def __setstate__(self, state):
+        """Restore the pickled trigger attributes and compile the trigger code
+
+        :param state: trigger attributes
+        :type state: dict
+        :return: None
+        """
+        self.__dict__.update(state)
+        self.compile()
+
     def get_name(self):
         """Accessor to trigger_name attribute
 
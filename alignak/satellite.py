@@ -74,7 +74,7 @@ import traceback
 import threading
 
 from alignak.http.client import HTTPClient, HTTPClientException, HTTPClientConnectionException
-from alignak.http.client import HTTPClientTimeoutException
+from alignak.http.client import HTTPClientTimeoutException, fan_out
 from alignak.http.generic_interface import GenericInterface
 
 from alignak.misc.serialization import unserialize, AlignakClassLookupException
@@ -82,6 +82,7 @@ from alignak.misc.serialization import unserialize, AlignakClassLookupException
 from alignak.message import Message
 from alignak.worker import Worker
 from alignak.load import Load
+from alignak.workerpool import WorkerPoolController
 from alignak.daemon import Daemon
 from alignak.stats import statsmgr
 from alignak.check import Check  # pylint: disable=W0611
@@ -419,6 +420,19 @@ class Satellite(BaseSatellite):  # pylint: disable=R0902
         # round robin queue ic
         self.rr_qid = 0
 
+        # Actions work records waiting to be sent to the workers, by worker id:
+        # (worker queue, records)
+        self.actions_batches = {}
+        self.worker_batch_size = 64
+        self.worker_flush_interval = 0.1
+
+        # Workers pools controllers, by module name
+        self.pools = {}
+        self.worker_target_latency = 2.0
+        self.max_processes_by_worker = 0
+        # Workers asked to stop because the pool shrank
+        self.retired_workers = set()
+
     def manage_action_return(self, action):
         """Manage action return from Workers
         We just put them into the corresponding sched
@@ -435,6 +449,11 @@ class Satellite(BaseSatellite):  # pylint: disable=R0902
             self.add(action)
             return
 
+        # Feed the workers pool controller
+        pool = self.pools.get(getattr(action, 'module_type', 'fork'))
+        if pool is not None and action.check_time:
+            pool.add_result(action.check_time - action.t_to_go, action.execution_time)
+
         # Ok, it's a result. We get it, and fill verifs of the good sched_id
         sched_id = action.sched_id
         logger.debug("Got action return: %s / %s", sched_id, action.uuid)
@@ -461,6 +480,26 @@ class Satellite(BaseSatellite):  # pylint: disable=R0902
             logger.error("KeyError Add home run action: %s / %s - %s",
                          sched_id, action.uuid, str(exp))
 
+    def manage_action_result(self, sched_id, uuid, values):
+        """Manage an action result record from Workers, see
+        alignak.action.ActionBase.get_result_record
+
+        :param sched_id: scheduler identifier of the action
+        :type sched_id: str
+        :param uuid: action uuid
+        :type uuid: str
+        :param values: action result values
+        :type values: dict
+        :return: None
+        """
+        try:
+            action = self.schedulers[sched_id]['actions'][uuid]
+        except KeyError:
+            logger.warning("Got a result for an unknown action: %s / %s", sched_id, uuid)
+            return
+        action.set_result(values)
+        self.manage_action_return(action)
+
     def manage_returns(self):
         """ Wrapper function of do_manage_returns()
 
@@ -480,6 +519,7 @@ class Satellite(BaseSatellite):  # pylint: disable=R0902
         """
         # For all schedulers, we check for wait_homerun
         # and we send back results
+        to_send = []
         for sched_id in self.schedulers:
             sched = self.schedulers[sched_id]
             # todo: perharps a warning log here?
@@ -514,10 +554,17 @@ class Satellite(BaseSatellite):  # pylint: disable=R0902
                                      "this scheduler.", sched['name'])
                     continue
             logger.debug("manage returns, scheduler: %s", sched['name'])
+            to_send.append(sched)
 
+        # Send the results to all the schedulers at once
+        returns = fan_out(lambda sched: sched['con'].post(
+            'put_results', {'from': self.name, 'results': sched['wait_homerun'].values()},
+            wire=True), to_send, self.max_parallel_requests)
+        for sched, (_, error) in zip(to_send, returns):
             try:
-                sched['con'].post('put_results', {'from': self.name, 'results': results.values()})
-                results.clear()
+                if error is not None:
+                    raise error
+                sched['wait_homerun'].clear()
             except HTTPClientConnectionException as exp:  # pragma: no cover, simple protection
                 logger.warning("Connection error with the scheduler '%s' when managing returns",
                                sched['name'])
@@ -570,7 +617,8 @@ class Satellite(BaseSatellite):  # pylint: disable=R0902
         # If we are in the fork module, we do not specify a target
         target = None
         __warned = []
-        if module_name == 'fork':
+        if module_name in ['fork', 'launcher']:
+            # The 'launcher' workers launch their actions with pre-forked processes
             target = None
         else:
             for module in self.modules_manager.instances:
@@ -588,10 +636,15 @@ class Satellite(BaseSatellite):  # pylint: disable=R0902
                 return
         # We give to the Worker the instance name of the daemon (eg. poller-master)
         # and not the daemon type (poller)
+        processes_by_worker = self.processes_by_worker
+        if module_name in self.pools:
+            processes_by_worker = self.pools[module_name].processes_by_worker
         queue = Queue()
-        worker = Worker(module_name, queue, self.returns_queue, self.processes_by_worker,
+        worker = Worker(module_name, queue, self.returns_queue, processes_by_worker,
                         max_plugins_output_length=self.max_plugins_output_length,
-                        target=target, loaded_into=self.name)
+                        target=target, loaded_into=self.name,
+                        batch_size=self.worker_batch_size,
+                        flush_interval=self.worker_flush_interval)
         # worker.module_name = module_name
         # save this worker
         self.workers[worker.get_id()] = worker
@@ -677,7 +730,20 @@ class Satellite(BaseSatellite):  # pylint: disable=R0902
             # So we del it
             logger.debug("[%s] checking if worker %s (pid=%d) is alive",
                          self.name, worker.get_id(), worker.get_pid())
-            if not self.interrupted and not worker.is_alive():
+            if not self.interrupted and not worker.is_alive() and \
+                    worker.get_id() in self.retired_workers:
+                worker.join(timeout=1)
+                self.retired_workers.discard(worker.get_id())
+                if worker.get_exitcode() == 0:
+                    logger.info("[%s] The worker %s (pid=%d) stopped",
+                                self.name, worker.get_id(), worker.get_pid())
+                    # Its queue is already removed and all its actions returned
+                    del self.workers[worker.get_id()]
+                else:
+                    logger.warning("[%s] The stopping worker %s (pid=%d) went down "
+                                   "unexpectedly!", self.name, worker.get_id(), worker.get_pid())
+                    w_to_del.append(worker.get_id())
+            elif not self.interrupted and not worker.is_alive():
                 logger.warning("[%s] The worker %s (pid=%d) went down unexpectedly!",
                                self.name, worker.get_id(), worker.get_pid())
                 # Terminate immediately
@@ -690,8 +756,10 @@ class Satellite(BaseSatellite):  # pylint: disable=R0902
         for w_id in w_to_del:
             worker = self.workers[w_id]
 
-            # Del the queue of the module queue
-            del self.q_by_mod[worker.module_name][worker.get_id()]
+            # Del the queue of the module queue (a stopping worker has no more queue)
+            # and the records not yet sent to it, its actions are requeued below
+            self.q_by_mod[worker.module_name].pop(worker.get_id(), None)
+            self.actions_batches.pop(w_id, None)
 
             for sched_id in self.schedulers:
                 sched = self.schedulers[sched_id]
@@ -699,12 +767,14 @@ class Satellite(BaseSatellite):  # pylint: disable=R0902
                     if act.status == 'queue' and act.worker_id == w_id:
                         # Got a check that will NEVER return if we do not restart it
                         self.assign_to_a_queue(act)
+            self.flush_actions_batches()
 
             # So now we can really forgot it
             del self.workers[w_id]
 
     def adjust_worker_number_by_load(self):
-        """Try to create the minimum workers specified in the configuration
+        """Create or stop workers to get the workers count decided by the workers pool
+        controller of each module (at least min_workers, at most max_workers)
 
         :return: None
         """
@@ -718,10 +788,22 @@ class Satellite(BaseSatellite):  # pylint: disable=R0902
                      " Currently: %d workers, min per module : %d, max per module : %d",
                      self.name, len(self.workers), self.min_workers, self.max_workers)
 
-        # I want at least min_workers by module then if I can, I add worker for load balancing
+        # The pools controllers decide how many workers each module needs
+        self.update_pools()
+
         for mod in self.q_by_mod:
-            # At least min_workers
-            todo = max(0, self.min_workers - len(self.q_by_mod[mod]))
+            if mod not in self.pools:
+                self.pools[mod] = WorkerPoolController(
+                    self.min_workers, self.max_workers, self.processes_by_worker,
+                    max_processes_by_worker=self.max_processes_by_worker,
+                    target_latency=self.worker_target_latency)
+            pool = self.pools[mod]
+
+            # Too many workers, ask the last ones to stop
+            for _ in range(len(self.q_by_mod[mod]) - pool.workers):
+                self.stop_worker(mod, self.q_by_mod[mod].keys()[-1])
+
+            todo = max(0, pool.workers - len(self.q_by_mod[mod]))
             for _ in range(todo):
                 try:
                     self.create_and_launch_worker(module_name=mod)
@@ -735,7 +817,70 @@ class Satellite(BaseSatellite):  # pylint: disable=R0902
             logger.warning("[%s] The module %s is not a worker one, "
                            "I remove it from the worker list.", self.name, mod)
             del self.q_by_mod[mod]
-        # TODO: if len(workers) > 2*wish, maybe we can kill a worker?
+            del self.pools[mod]
+
+    def update_pools(self):
+        """Feed the workers pools controllers with the number of actions waiting for
+        a result and apply their decisions about the processes by worker
+
+        :return: None
+        """
+        now = time.time()
+        if not [pool for pool in self.pools.values() if pool.is_due(now)]:
+            return
+
+        queued = {}
+        for sched in self.schedulers.values():
+            for action in sched['actions'].values():
+                mod = getattr(action, 'module_type', 'fork')
+                queued[mod] = queued.get(mod, 0) + 1
+
+        for mod, pool in self.pools.items():
+            processes_by_worker = pool.processes_by_worker
+            decision = pool.update(queued.get(mod, 0), now)
+            if decision is None:
+                continue
+            if decision != 'hold':
+                logger.info("[%s] Workers pool '%s' decision: %s, latency: %.2f, "
+                            "execution time: %.2f, workers: %d, processes by worker: %d",
+                            self.name, mod, decision, pool.latency, pool.execution_time,
+                            pool.workers, pool.processes_by_worker)
+                statsmgr.counter('core.pool-%s.%s' % (mod, decision), 1)
+            statsmgr.gauge('core.pool-%s.workers' % mod, pool.workers)
+            statsmgr.gauge('core.pool-%s.processes-by-worker' % mod, pool.processes_by_worker)
+            statsmgr.gauge('core.pool-%s.queued' % mod, queued.get(mod, 0))
+            statsmgr.gauge('core.pool-%s.busy' % mod, pool.busy)
+            statsmgr.timer('core.pool-%s.latency' % mod, pool.latency)
+            statsmgr.timer('core.pool-%s.execution-time' % mod, pool.execution_time)
+
+            if pool.processes_by_worker != processes_by_worker:
+                msg = Message(_type='Processes', data=pool.processes_by_worker,
+                              source=self.name)
+                for queue in self.q_by_mod.get(mod, {}).values():
+                    try:
+                        queue.put_nowait(msg)
+                    except (IOError, EOFError):
+                        pass
+
+    def stop_worker(self, module_name, worker_id):
+        """Ask a worker to stop once its current actions are finished.
+        It does not get new actions anymore
+
+        :param module_name: the module name related to the worker
+        :type module_name: str
+        :param worker_id: worker identifier
+        :type worker_id: str
+        :return: None
+        """
+        logger.info("[%s] Stopping '%s' worker: %s", self.name, module_name, worker_id)
+        if worker_id in self.actions_batches:
+            self.flush_actions_batches(worker_id)
+        queue = self.q_by_mod[module_name].pop(worker_id)
+        self.retired_workers.add(worker_id)
+        try:
+            queue.put_nowait(Message(_type='Stop', source=self.name))
+        except (IOError, EOFError):
+            pass
 
     def _get_queue_for_the_action(self, action):
         """Find action queue for the action depending on the module.
@@ -748,6 +893,10 @@ class Satellite(BaseSatellite):  # pylint: disable=R0902
         """
         # get the module name, if not, take fork
         mod = getattr(action, 'module_type', 'fork')
+        if mod == 'launcher' and mod not in self.q_by_mod:
+            # Built-in module type, its workers are created on demand
+            self.q_by_mod[mod] = {}
+            self.create_and_launch_worker(module_name=mod)
         queues = self.q_by_mod[mod].items()
 
         # Maybe there is no more queue, it's very bad!
@@ -790,6 +939,7 @@ class Satellite(BaseSatellite):  # pylint: disable=R0902
             self.schedulers[sched_id]['actions'][action.uuid] = action
             self.assign_to_a_queue(action)
             logger.debug("Added action %s to a worker queue", action.uuid)
+        self.flush_actions_batches()
 
     def assign_to_a_queue(self, action):
         """Take an action and put it to a worker actions queue
@@ -806,10 +956,39 @@ class Satellite(BaseSatellite):  # pylint: disable=R0902
         action.worker_id = worker_id
         action.status = 'queue'
 
-        msg = Message(_type='Do', data=action, source=self.name)
-        logger.debug("Queuing message: %s", msg)
-        queue.put_nowait(msg)
-        logger.debug("Queued")
+        if getattr(action, 'module_type', 'fork') not in ['fork', 'launcher']:
+            # The modules workers get the whole action
+            msg = Message(_type='Do', data=action, source=self.name)
+            logger.debug("Queuing message: %s", msg)
+            queue.put_nowait(msg)
+            logger.debug("Queued")
+            return
+
+        records = self.actions_batches.setdefault(worker_id, (queue, []))[1]
+        records.append(action.get_work_record())
+        if len(records) >= self.worker_batch_size:
+            self.flush_actions_batches(worker_id)
+
+    def flush_actions_batches(self, worker_id=None):
+        """Send the actions work records waiting to be sent to a worker
+
+        :param worker_id: worker identifier, all the workers if None
+        :type worker_id: str
+        :return: None
+        """
+        if worker_id is None:
+            workers_ids = self.actions_batches.keys()
+        else:
+            workers_ids = [worker_id]
+        for w_id in workers_ids:
+            queue, records = self.actions_batches.pop(w_id)
+            msg = Message(_type='DoBatch', data=records, source=self.name)
+            logger.debug("Queuing %d actions for the worker %s", len(records), w_id)
+            try:
+                queue.put_nowait(msg)
+            except (IOError, EOFError) as exp:
+                logger.warning("The worker %s actions queue is no more available: %s",
+                               w_id, str(exp))
 
     def get_new_actions(self):
         """ Wrapper function for do_get_new_actions
@@ -837,6 +1016,7 @@ class Satellite(BaseSatellite):  # pylint: disable=R0902
         do_actions = self.__class__.do_actions
 
         # We check for new check in each schedulers and put the result in new_checks
+        links = []
         for sched_id, sched in self.schedulers.iteritems():
             if not sched['active']:
                 logger.debug("My scheduler '%s' is not active currently", sched['name'])
@@ -854,16 +1034,27 @@ class Satellite(BaseSatellite):  # pylint: disable=R0902
                                      "this scheduler.", sched['name'])
                     continue
             logger.debug("get new actions, scheduler: %s", sched['name'])
-
+            links.append((sched_id, sched))
+
+        # The built-in 'launcher' module type workers are created on demand
+        module_types = self.q_by_mod.keys()
+        if 'launcher' not in module_types:
+            module_types.append('launcher')
+
+        # OK, go for it :) Get the actions of all the schedulers at once
+        args = {
+            'do_checks': do_checks, 'do_actions': do_actions,
+            'poller_tags': self.poller_tags,
+            'reactionner_tags': self.reactionner_tags,
+            'worker_name': self.name,
+            'module_types': module_types
+        }
+        returns = fan_out(lambda link: link[1]['con'].get('get_checks', args, wait='long'),
+                          links, self.max_parallel_requests)
+        for (sched_id, sched), (tmp, error) in zip(links, returns):
             try:
-                # OK, go for it :)
-                tmp = sched['con'].get('get_checks', {
-                    'do_checks': do_checks, 'do_actions': do_actions,
-                    'poller_tags': self.poller_tags,
-                    'reactionner_tags': self.reactionner_tags,
-                    'worker_name': self.name,
-                    'module_types': self.q_by_mod.keys()
-                }, wait='long')
+                if error is not None:
+                    raise error
                 # Explicit serialization
                 tmp = unserialize(tmp, True)
                 if tmp:
@@ -1015,6 +1206,10 @@ class Satellite(BaseSatellite):  # pylint: disable=R0902
                     logger.debug("Got an action result: %s", msg.get_data())
                     self.manage_action_return(msg.get_data())
                     logger.debug("Managed action result")
+                elif msg.get_type() == 'DoneBatch':
+                    logger.debug("Got %d actions results", len(msg.get_data()))
+                    for sched_id, uuid, values in msg.get_data():
+                        self.manage_action_result(sched_id, uuid, values)
                 else:
                     logger.warning("Ignoring message of type: %s", msg.get_type())
         except Full:
@@ -1182,6 +1377,12 @@ class Satellite(BaseSatellite):  # pylint: disable=R0902
                         self.min_workers, self.max_workers)
 
             self.processes_by_worker = g_conf['processes_by_worker']
+            self.worker_batch_size = g_conf.get('worker_batch_size', 64)
+            self.worker_flush_interval = g_conf.get('worker_flush_interval', 0.1)
+            self.worker_target_latency = g_conf.get('worker_target_latency', 2.0)
+            self.max_processes_by_worker = g_conf.get('max_processes_by_worker', 0)
+            # New bounds, new controllers
+            self.pools = {}
             self.polling_interval = g_conf['polling_interval']
             self.timeout = self.polling_interval
 
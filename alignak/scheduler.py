@@ -77,6 +77,12 @@ from Queue import Queue
 from collections import defaultdict
 
 from alignak.external_command import ExternalCommand
+from alignak.ageordereddict import AgeOrderedDict
+from alignak.actionsqueue import ActionsQueue, INTERNAL_CHECKS, MASTER_NOTIFICATIONS
+from alignak.dirtyitems import DirtyItems, NEW_ACTIONS, NEW_BROKS, TOPOLOGY_CHANGE, DOWNTIMES, \
+    ACKNOWLEDGEMENTS
+from alignak.timerheap import TimerHeap, DOWNTIME_START, DOWNTIME_END, ACKNOWLEDGEMENT_EXPIRY, \
+    MAINTENANCE_PERIOD
 from alignak.check import Check
 from alignak.notification import Notification
 from alignak.eventhandler import EventHandler
@@ -91,6 +97,8 @@ from alignak.stats import statsmgr
 from alignak.misc.common import DICT_MODATTR
 from alignak.misc.serialization import unserialize, AlignakClassLookupException
 from alignak.acknowledge import Acknowledge
+from alignak.configdelta import DELTA_TYPES, CONFIG_RUNNING_PROPERTIES, TOPOLOGY_PROPERTIES, \
+    get_items_keys, get_uuids_mapping, remap_uuids
 from alignak.log import make_monitoring_log
 
 if 'TEST_LOG_MONITORING' in os.environ:
@@ -271,9 +279,22 @@ class Scheduler(object):  # pylint: disable=R0902
         # Temporary set. Will be updated with received configuration
         self.instance_id = 0
 
+        # Registry of our objects (hosts, services, groups, contacts, checks and actions)
+        # indexed by uuid
+        self.items_by_uuid = {}
+
         # Ours queues
-        self.checks = {}
-        self.actions = {}
+        self.checks = ActionsQueue('poller_tag', self.items_by_uuid)
+        self.actions = ActionsQueue('reactionner_tag', self.items_by_uuid)
+
+        # Hosts and services with some pending work
+        self.dirty_items = DirtyItems()
+        # Hosts and services time based events
+        self.downtimes_timers = TimerHeap()
+        self.acknowledgements_timers = TimerHeap()
+        self.maintenance_timers = TimerHeap()
+        # Maintenance period of the hosts and services which maintenance timer is scheduled
+        self.maintenance_periods = {}
 
         # Our external commands manager
         self.external_commands_manager = None
@@ -285,12 +306,20 @@ class Scheduler(object):  # pylint: disable=R0902
 
         # And a dummy push flavor
         self.push_flavor = 0
+        # Fingerprints of our configuration objects, see alignak.configdelta
+        self.conf_fingerprints = {}
 
         # Alignak instance name
         self.alignak_name = None
 
         # Now fake initialize for our satellites
         self.brokers = {}
+        # Types of the broks wanted by the brokers and the external modules, None for all.
+        # The broks of the other types are not even built
+        self.brok_types = None
+        self.modules_brok_types = None
+        # Broks not yet sent to the external modules
+        self.modules_broks = []
         self.pollers = {}
         self.reactionners = {}
 
@@ -310,6 +339,8 @@ class Scheduler(object):  # pylint: disable=R0902
             self.waiting_results.queue.clear()
         for obj in self.checks, self.actions, self.brokers:
             obj.clear()
+        del self.modules_broks[:]
+        self.brok_types = self.modules_brok_types = None
 
     def iter_hosts_and_services(self):
         """Create an iterator for hosts and services
@@ -378,11 +409,22 @@ class Scheduler(object):  # pylint: disable=R0902
         # From the Arbiter configuration. Used for satellites to differentiate the schedulers
         self.instance_id = conf.uuid
         logger.info("Set my instance id as '%s'", self.instance_id)
-        # Tag our hosts with our instance_id
-        for host in self.hosts:
-            host.instance_id = conf.instance_id
-        for serv in self.services:
-            serv.instance_id = conf.instance_id
+        # Register our objects
+        self.items_by_uuid.clear()
+        for items in (self.hosts, self.services, self.hostgroups, self.servicegroups,
+                      self.contacts, self.contactgroups):
+            self.items_by_uuid.update(items.items)
+        self.items_by_uuid.update(self.checks)
+        self.items_by_uuid.update(self.actions)
+
+        # Watch our hosts/services pending work
+        self.dirty_items = DirtyItems()
+        for timers in (self.downtimes_timers, self.acknowledgements_timers,
+                       self.maintenance_timers):
+            timers.clear()
+        self.maintenance_periods = {}
+        for elt in self.iter_hosts_and_services():
+            self.prepare_item(elt)
         # self for instance_name
         self.instance_name = conf.instance_name
         # and push flavor
@@ -390,21 +432,115 @@ class Scheduler(object):  # pylint: disable=R0902
         # and Alignak instance name
         self.alignak_name = conf.alignak_name
 
-        # Update our hosts/services freshness threshold
-        if self.conf.check_host_freshness and self.conf.host_freshness_check_interval >= 0:
-            for host in self.hosts:
-                if host.freshness_threshold == -1:
-                    host.freshness_threshold = self.conf.host_freshness_check_interval
-            for service in self.services:
-                if service.freshness_threshold == -1:
-                    service.freshness_threshold = self.conf.service_freshness_check_interval
-
         # Now we can update our 'ticks' for special calls
         # like the retention one, etc
         self.update_recurrent_works_tick('update_retention_file',
                                          self.conf.retention_update_interval * 60)
         self.update_recurrent_works_tick('clean_queues', self.conf.cleaning_queues_interval)
 
+    def prepare_item(self, elt):
+        """Prepare a host or service of our configuration to be scheduled:
+
+        * tag it with our instance_id
+        * watch its pending work
+        * set its default freshness threshold
+
+        :param elt: host or service
+        :type elt: alignak.objects.schedulingitem.SchedulingItem
+        :return: None
+        """
+        elt.instance_id = self.conf.instance_id
+        self.dirty_items.watch(elt)
+
+        # Update our hosts/services freshness threshold
+        if self.conf.check_host_freshness and self.conf.host_freshness_check_interval >= 0:
+            if elt.freshness_threshold == -1:
+                if elt.my_type == 'host':
+                    elt.freshness_threshold = self.conf.host_freshness_check_interval
+                else:
+                    elt.freshness_threshold = self.conf.service_freshness_check_interval
+
+    def apply_conf_delta(self, delta):
+        """Apply a configuration delta received from the arbiter on our configuration
+        (see alignak.configdelta)
+
+        The changed objects are updated in place with their new configuration, so
+        they keep their state, checks and actions. The changed hosts and services
+        which dependencies changed get their topology_change flag set. The added
+        objects are registered and scheduled, and the removed ones are forgotten
+        with their checks and actions.
+
+        :param delta: configuration delta
+        :type delta: dict
+        :return: None
+        """
+        keys = get_items_keys(self.conf)
+        uuids = dict((key, uuid) for uuid, key in keys.iteritems())
+        # The changed objects and the referenced ones keep their current uuid
+        mapping = get_uuids_mapping(delta['references'], keys)
+
+        # Removed objects
+        removed = set()
+        for items_type in DELTA_TYPES:
+            items = getattr(self, items_type)
+            for key in delta['removed'][items_type]:
+                item = items.items.get(uuids.get(key))
+                if item is None:
+                    continue
+                items.remove_item(item)
+                self.items_by_uuid.pop(item.uuid, None)
+                self.maintenance_periods.pop(item.uuid, None)
+                if items_type in ('hosts', 'services'):
+                    self.dirty_items.forget(item)
+                removed.add(item.uuid)
+        for queue in (self.checks, self.actions):
+            for action in [a for a in queue.values() if a.ref in removed]:
+                del queue[action.uuid]
+
+        # Changed objects
+        new_items = []
+        for items_type in DELTA_TYPES:
+            items = getattr(self, items_type)
+            for data in delta['changed'][items_type]:
+                new = items.inner_class(remap_uuids(data, mapping), parsing=False)
+                item = items.items.get(new.uuid)
+                if item is None:
+                    # Never received, or removed since the delta was computed
+                    new_items.append((items_type, new))
+                    continue
+                topology = [getattr(item, prop, None) for prop in TOPOLOGY_PROPERTIES]
+                for prop in item.__class__.properties.keys() + list(CONFIG_RUNNING_PROPERTIES):
+                    if hasattr(new, prop):
+                        setattr(item, prop, getattr(new, prop))
+                item.reset_macros_cache()
+                if items_type in ('hosts', 'services') and \
+                        topology != [getattr(item, prop, None) for prop in TOPOLOGY_PROPERTIES]:
+                    item.set_topology_change()
+
+        # Added objects
+        for items_type in DELTA_TYPES:
+            items = getattr(self, items_type)
+            for data in delta['added'][items_type]:
+                new_items.append((items_type,
+                                  items.inner_class(remap_uuids(data, mapping), parsing=False)))
+        for items_type, item in new_items:
+            getattr(self, items_type).add_item(item)
+            self.items_by_uuid[item.uuid] = item
+            if items_type in ('hosts', 'services'):
+                self.prepare_item(item)
+
+        # We may have a new instance_id and push flavor
+        self.instance_id = self.conf.uuid
+        for elt in self.iter_hosts_and_services():
+            elt.instance_id = self.conf.instance_id
+        self.push_flavor = self.conf.push_flavor
+        self.alignak_name = self.conf.alignak_name
+
+        statsmgr.gauge('configuration.hosts', len(self.hosts))
+        statsmgr.gauge('configuration.services', len(self.services))
+        statsmgr.gauge('configuration.hostgroups', len(self.hostgroups))
+        statsmgr.gauge('configuration.servicegroups', len(self.servicegroups))
+
     def update_recurrent_works_tick(self, f_name, new_tick):
         """Modify the tick value for a recurrent work
         A tick is an amount of loop of the scheduler before executing the recurrent work
@@ -435,8 +571,10 @@ class Scheduler(object):  # pylint: disable=R0902
         self.pollers = pollers
         self.reactionners = reactionners
         for broker in brokers.values():
-            self.brokers[broker['name']] = {'broks': {}, 'has_full_broks': False,
-                                            'initialized': False}
+            self.brokers[broker['name']] = {'broks': AgeOrderedDict(), 'has_full_broks': False,
+                                            'initialized': False, 'cursor': 0, 'pending': {},
+                                            'brok_types': None}
+        self.update_brok_types()
 
     def die(self):
         """Set must_run attribute to False
@@ -538,16 +676,80 @@ class Scheduler(object):  # pylint: disable=R0902
         :type bname: str
         :return: None
         """
+        if self.brok_types is not None and brok.type not in self.brok_types:
+            # Nobody wants this brok
+            return
+
         # For brok, we TAG brok with our instance_id
         brok.instance_id = self.instance_id
         self.nb_broks += 1
         if bname:
             # it's just for one broker
-            self.brokers[bname]['broks'][brok.uuid] = brok
+            brokers = [self.brokers[bname]]
         else:
             # add brok to all brokers
-            for name in self.brokers:
-                self.brokers[name]['broks'][brok.uuid] = brok
+            brokers = self.brokers.values()
+        for broker in brokers:
+            if broker['brok_types'] is None or brok.type in broker['brok_types']:
+                broker['broks'][brok.uuid] = brok
+
+        if self.modules_brok_types is None or brok.type in self.modules_brok_types:
+            self.modules_broks.append(brok)
+        else:
+            # No external module wants it, the brokers can get it now
+            brok.sent_to_sched_externals = True
+
+    def wants_brok_type(self, brok_type):
+        """Check if a broker or an external module wants the broks of a type,
+        so that the broks nobody wants are not built
+
+        :param brok_type: brok type
+        :type brok_type: str
+        :return: True if the broks of this type are wanted
+        :rtype: bool
+        """
+        return self.brok_types is None or brok_type in self.brok_types
+
+    def set_broker_brok_types(self, bname, brok_types):
+        """Set the types of the broks a broker wants
+
+        :param bname: broker name
+        :type bname: str
+        :param brok_types: broks types, None for all the broks
+        :type brok_types: set | None
+        :return: None
+        """
+        if self.brokers[bname]['brok_types'] == brok_types:
+            return
+        logger.info("The broker %s wants the broks: %s", bname,
+                    'all' if brok_types is None else ', '.join(sorted(brok_types)))
+        self.brokers[bname]['brok_types'] = brok_types
+        if brok_types is not None:
+            # Forget the queued broks the broker does not want anymore
+            broks = self.brokers[bname]['broks']
+            for brok in [brok for brok in broks.values() if brok.type not in brok_types]:
+                del broks[brok.uuid]
+        self.update_brok_types()
+
+    def update_brok_types(self):
+        """Update the types of the broks wanted by the brokers and the external modules
+
+        :return: None
+        """
+        modules_manager = getattr(self.sched_daemon, 'modules_manager', None)
+        if modules_manager is None:
+            self.modules_brok_types = set()
+        else:
+            self.modules_brok_types = modules_manager.get_brok_types(
+                modules_manager.get_external_instances())
+
+        brok_types = self.modules_brok_types
+        for broker in self.brokers.values():
+            if brok_types is None or broker['brok_types'] is None:
+                brok_types = None
+                break
+            brok_types = brok_types | broker['brok_types']
+        self.brok_types = brok_types
 
     def add_notification(self, notif):
         """Add a notification into actions list
@@ -587,8 +789,8 @@ class Scheduler(object):  # pylint: disable=R0902
 
         # Raise a brok to inform about a next check is to come ...
         # but only for items that are actively checked
-        item = self.find_item_by_id(check.ref)
-        if item.active_checks_enabled:
+        item = self.get_ref_of(check)
+        if item.active_checks_enabled and self.wants_brok_type(item.my_type + '_next_schedule'):
             brok = item.get_next_schedule_brok()
             self.add(brok)
 
@@ -693,61 +895,46 @@ class Scheduler(object):  # pylint: disable=R0902
         # For checks, it's not very simple:
         # For checks, they may be referred to their host/service
         # We do not just del them in the check list, but also in their service/host
-        # We want id of lower than max_id - 2*max_checks
-        self.nb_checks_dropped = 0
-        if max_checks and len(self.checks) > max_checks:
-            # keys does not ensure sorted keys. Max is slow but we have no other way.
-            to_del_checks = [c for c in self.checks.values()]
-            to_del_checks.sort(key=lambda x: x.creation_time)
-            to_del_checks = to_del_checks[:-max_checks]
-            self.nb_checks_dropped = len(to_del_checks)
-            if to_del_checks:
-                logger.warning("I have to drop some checks (%d)..., sorry :(",
-                               self.nb_checks_dropped)
-            for chk in to_del_checks:
-                c_id = chk.uuid
-                items = getattr(self, chk.ref_type + 's')
-                elt = items[chk.ref]
-                # First remove the link in host/service
-                elt.remove_in_progress_check(chk)
-                # Then in dependent checks (I depend on, or check
-                # depend on me)
-                for dependent_checks in chk.depend_on_me:
-                    dependent_checks.depend_on.remove(chk.uuid)
-                for c_temp in chk.depend_on:
-                    c_temp.depend_on_me.remove(chk)
-                del self.checks[c_id]  # Final Bye bye ...
+        # The oldest checks are dropped first
+        to_del_checks = self.checks.drop_oldest(max_checks) if max_checks else []
+        self.nb_checks_dropped = len(to_del_checks)
+        if to_del_checks:
+            logger.warning("I have to drop some checks (%d)..., sorry :(",
+                           self.nb_checks_dropped)
+            statsmgr.counter('dropped.checks', self.nb_checks_dropped)
+        for chk in to_del_checks:
+            # First remove the link in host/service
+            self.get_ref_of(chk).remove_in_progress_check(chk)
+            # Then in dependent checks (I depend on, or check
+            # depend on me)
+            for dependent_checks in chk.depend_on_me:
+                dependent_checks.depend_on.remove(chk.uuid)
+            for c_temp in chk.depend_on:
+                c_temp.depend_on_me.remove(chk)
 
         # For broks and actions, it's more simple
         # or broks, manage global but also all brokers
         self.nb_broks_dropped = 0
-        for broker in self.brokers.values():
+        for broker_name, broker in self.brokers.iteritems():
             if max_broks and len(broker['broks']) > max_broks:
                 logger.warning("I have to drop some broks (%d > %d) for the broker %s "
-                               "..., sorry :(", len(broker['broks']), max_broks, broker)
-                for brok in broker['broks'].values():
-                    logger.warning("- dropping: %s / %s", brok.type, brok.data)
-
-                to_del_broks = [c for c in broker['broks'].values()]
-                to_del_broks.sort(key=lambda x: x.creation_time)
-                to_del_broks = to_del_broks[:-max_broks]
-                self.nb_broks_dropped = len(to_del_broks)
+                               "..., sorry :(", len(broker['broks']), max_broks, broker_name)
+                to_del_broks = broker['broks'].drop_oldest(max_broks)
+                self.nb_broks_dropped += len(to_del_broks)
+                statsmgr.counter('dropped.broks.%s' % broker_name, len(to_del_broks))
                 for brok in to_del_broks:
                     logger.warning("- dropped a %s brok: %s", brok.type, brok.data)
-                    del broker['broks'][brok.uuid]
 
         self.nb_actions_dropped = 0
         if max_actions and len(self.actions) > max_actions:
             logger.warning("I have to del some actions (currently: %d, max: %d)..., sorry :(",
                            len(self.actions), max_actions)
-            to_del_actions = [c for c in self.actions.values()]
-            to_del_actions.sort(key=lambda x: x.creation_time)
-            to_del_actions = to_del_actions[:-max_actions]
+            to_del_actions = self.actions.drop_oldest(max_actions)
             self.nb_actions_dropped = len(to_del_actions)
+            statsmgr.counter('dropped.actions', self.nb_actions_dropped)
             for act in to_del_actions:
                 if act.is_a == 'notification':
-                    self.find_item_by_id(act.ref).remove_in_progress_notification(act)
-                del self.actions[act.uuid]
+                    self.get_ref_of(act).remove_in_progress_notification(act)
 
     def clean_caches(self):
         """Clean timperiods caches
@@ -764,8 +951,9 @@ class Scheduler(object):  # pylint: disable=R0902
         :type item: alignak.objects.item.Item
         :return: None
         """
-        brok = item.get_update_status_brok()
-        self.add(brok)
+        if self.wants_brok_type('update_%s_status' % item.my_type):
+            brok = item.get_update_status_brok()
+            self.add(brok)
 
     def get_and_register_check_result_brok(self, item):
         """Get a check result brok for item and add it
@@ -774,16 +962,31 @@ class Scheduler(object):  # pylint: disable=R0902
         :type item: alignak.objects.schedulingitem.SchedulingItem
         :return: None
         """
-        brok = item.get_check_result_brok()
-        self.add(brok)
+        if self.wants_brok_type(item.my_type + '_check_result'):
+            brok = item.get_check_result_brok()
+            self.add(brok)
 
     def check_for_expire_acknowledge(self):
-        """Iter over host and service and check if any acknowledgement has expired
+        """Check if any acknowledgement of the hosts and services has expired
 
         :return: None
         """
-        for elt in self.iter_hosts_and_services():
+        now = time.time()
+        for elt in self.dirty_items.drain(ACKNOWLEDGEMENTS):
+            if elt.acknowledgement and elt.acknowledgement.end_time != 0:
+                self.acknowledgements_timers.push(elt.acknowledgement.end_time,
+                                                  ACKNOWLEDGEMENT_EXPIRY, elt.uuid)
+
+        for timer in self.acknowledgements_timers.pop_due(now):
+            elt = self.items_by_uuid.get(timer[2])
+            if elt is None or not elt.acknowledgement or \
+                    elt.acknowledgement.end_time != timer[0]:
+                # Obsolete timer
+                continue
             elt.check_for_expire_acknowledge()
+            if elt.acknowledgement:
+                # Not yet expired
+                self.acknowledgements_timers.push(*timer)
 
     def update_business_values(self):
         """Iter over host and service and update business_impact
@@ -823,75 +1026,72 @@ class Scheduler(object):  # pylint: disable=R0902
         :return: None
         """
         now = time.time()
-        for act in self.actions.values():
-            # We only want notifications
-            if act.is_a != 'notification':
-                continue
-            if act.status == 'scheduled' and act.is_launchable(now):
-                if not act.contact:
-                    logger.debug("Scheduler got a master notification: %s", repr(act))
-                    logger.debug("No contact for this notification")
-                    # This is a "master" notification created by create_notifications.
-                    # It wont sent itself because it has no contact.
-                    # We use it to create "child" notifications (for the contacts and
-                    # notification_commands) which are executed in the reactionner.
-                    item = self.find_item_by_id(act.ref)
-                    childnotifs = []
-                    notif_period = self.timeperiods.items.get(item.notification_period, None)
-                    if not item.notification_is_blocked_by_item(notif_period, self.hosts,
-                                                                self.services, act.type,
-                                                                t_wished=now):
-                        # If it is possible to send notifications
-                        # of this type at the current time, then create
-                        # a single notification for each contact of this item.
-                        childnotifs = item.scatter_notification(
-                            act, self.contacts, self.notificationways, self.timeperiods,
-                            self.macromodulations, self.escalations,
-                            self.find_item_by_id(getattr(item, "host", None))
-                        )
-                        for notif in childnotifs:
-                            logger.debug(" - child notification: %s", notif)
-                            notif.status = 'scheduled'
-                            self.add(notif)  # this will send a brok
-
-                    # If we have notification_interval then schedule
-                    # the next notification (problems only)
-                    if act.type == 'PROBLEM':
-                        # Update the ref notif number after raise the one of the notification
-                        if childnotifs:
-                            # notif_nb of the master notification
-                            # was already current_notification_number+1.
-                            # If notifications were sent,
-                            # then host/service-counter will also be incremented
-                            item.current_notification_number = act.notif_nb
-
-                        if item.notification_interval != 0 and act.t_to_go is not None:
-                            # We must continue to send notifications.
-                            # Just leave it in the actions list and set it to "scheduled"
-                            # and it will be found again later
-                            # Ask the service/host to compute the next notif time. It can be just
-                            # a.t_to_go + item.notification_interval*item.__class__.interval_length
-                            # or maybe before because we have an
-                            # escalation that need to raise up before
-                            act.t_to_go = item.get_next_notification_time(act, self.escalations,
-                                                                          self.timeperiods)
-
-                            act.notif_nb = item.current_notification_number + 1
-                            logger.debug("Repeat master notification: %s", str(act))
-                            act.status = 'scheduled'
-                        else:
-                            # Wipe out this master notification. One problem notification is enough.
-                            item.remove_in_progress_notification(act)
-                            logger.debug("Remove master notification (no repeat): %s", str(act))
-                            act.status = 'zombie'
-
+        # Only the launchable master notifications are popped from the queue
+        for act in self.actions.pop_launchable([MASTER_NOTIFICATIONS], now):
+            if not act.contact:
+                logger.debug("Scheduler got a master notification: %s", repr(act))
+                logger.debug("No contact for this notification")
+                # This is a "master" notification created by create_notifications.
+                # It wont sent itself because it has no contact.
+                # We use it to create "child" notifications (for the contacts and
+                # notification_commands) which are executed in the reactionner.
+                item = self.get_ref_of(act)
+                childnotifs = []
+                notif_period = self.timeperiods.items.get(item.notification_period, None)
+                if not item.notification_is_blocked_by_item(notif_period, self.hosts,
+                                                            self.services, act.type,
+                                                            t_wished=now):
+                    # If it is possible to send notifications
+                    # of this type at the current time, then create
+                    # a single notification for each contact of this item.
+                    childnotifs = item.scatter_notification(
+                        act, self.contacts, self.notificationways, self.timeperiods,
+                        self.macromodulations, self.escalations,
+                        self.get_host(getattr(item, "host", None))
+                    )
+                    for notif in childnotifs:
+                        logger.debug(" - child notification: %s", notif)
+                        notif.status = 'scheduled'
+                        self.add(notif)  # this will send a brok
+
+                # If we have notification_interval then schedule
+                # the next notification (problems only)
+                if act.type == 'PROBLEM':
+                    # Update the ref notif number after raise the one of the notification
+                    if childnotifs:
+                        # notif_nb of the master notification
+                        # was already current_notification_number+1.
+                        # If notifications were sent,
+                        # then host/service-counter will also be incremented
+                        item.current_notification_number = act.notif_nb
+
+                    if item.notification_interval != 0 and act.t_to_go is not None:
+                        # We must continue to send notifications.
+                        # Just leave it in the actions list and set it to "scheduled"
+                        # and it will be found again later
+                        # Ask the service/host to compute the next notif time. It can be just
+                        # a.t_to_go + item.notification_interval*item.__class__.interval_length
+                        # or maybe before because we have an
+                        # escalation that need to raise up before
+                        act.t_to_go = item.get_next_notification_time(act, self.escalations,
+                                                                      self.timeperiods)
+
+                        act.notif_nb = item.current_notification_number + 1
+                        logger.debug("Repeat master notification: %s", str(act))
+                        act.status = 'scheduled'
                     else:
-                        # Wipe out this master notification.
-                        logger.debug("Remove master notification (no repeat): %s", str(act))
-                        # We don't repeat recover/downtime/flap/etc...
+                        # Wipe out this master notification. One problem notification is enough.
                         item.remove_in_progress_notification(act)
+                        logger.debug("Remove master notification (no repeat): %s", str(act))
                         act.status = 'zombie'
 
+                else:
+                    # Wipe out this master notification.
+                    logger.debug("Remove master notification (no repeat): %s", str(act))
+                    # We don't repeat recover/downtime/flap/etc...
+                    item.remove_in_progress_notification(act)
+                    act.status = 'zombie'
+
     def get_to_run_checks(self, do_checks=False, do_actions=False,
                           poller_tags=None, reactionner_tags=None,
                           worker_name='none', module_types=None):
@@ -930,36 +1130,24 @@ class Scheduler(object):  # pylint: disable=R0902
         if do_checks:
             logger.debug("%d checks for poller tags: %s and module types: %s",
                          len(self.checks), poller_tags, module_types)
-            for chk in self.checks.values():
-                logger.debug("Check: %s (%s / %s)", chk.uuid, chk.poller_tag, chk.module_type)
-                #  If the command is untagged, and the poller too, or if both are tagged
-                #  with same name, go for it
-                # if do_check, call for poller, and so poller_tags by default is ['None']
-                # by default poller_tag is 'None' and poller_tags is ['None']
-                # and same for module_type, the default is the 'fork' type
-                if chk.poller_tag not in poller_tags:
-                    logger.debug(" -> poller tag do not match")
-                    continue
-                if chk.module_type not in module_types:
-                    logger.debug(" -> module type do not match")
-                    continue
-
-                logger.debug(" -> : %s %s (%s)",
-                             'worker' if not chk.internal else 'internal',
-                             chk.status,
-                             'now' if chk.is_launchable(now) else 'not yet')
-                # must be ok to launch, and not an internal one (business rules based)
-                if chk.status == 'scheduled' and chk.is_launchable(now) and not chk.internal:
-                    logger.debug("Check to run: %s", chk)
-                    chk.status = 'inpoller'
-                    chk.worker_id = worker_name
-                    res.append(chk)
-
-                    self.nb_checks_launched += 1
-
-                    self.counters["check"]["total"]["launched"] += 1
-                    self.counters["check"]["loop"]["launched"] += 1
-                    self.counters["check"]["active"]["launched"] += 1
+            #  If the command is untagged, and the poller too, or if both are tagged
+            #  with same name, go for it
+            # if do_check, call for poller, and so poller_tags by default is ['None']
+            # by default poller_tag is 'None' and poller_tags is ['None']
+            # and same for module_type, the default is the 'fork' type
+            # The internal checks (business rules based) are not in those launch queues
+            keys = [(tag, module_type) for tag in poller_tags for module_type in module_types]
+            for chk in self.checks.pop_launchable(keys, now):
+                logger.debug("Check to run: %s", chk)
+                chk.status = 'inpoller'
+                chk.worker_id = worker_name
+                res.append(chk)
+
+                self.nb_checks_launched += 1
+
+                self.counters["check"]["total"]["launched"] += 1
+                self.counters["check"]["loop"]["launched"] += 1
+                self.counters["check"]["active"]["launched"] += 1
 
             if res:
                 logger.debug("-> %d checks to start now", len(res))
@@ -969,39 +1157,23 @@ class Scheduler(object):  # pylint: disable=R0902
         # If a reactionner wants its actions
         if do_actions:
             logger.debug("%d actions for reactionner tags: %s", len(self.actions), reactionner_tags)
-            for act in self.actions.values():
-                is_master = (act.is_a == 'notification' and not act.contact)
-                logger.debug("Action: %s (%s / %s)", act.uuid, act.reactionner_tag, act.module_type)
-
-                if not is_master:
-                    # if do_action, call the reactionner,
-                    # and so reactionner_tags by default is ['None']
-                    # by default reactionner_tag is 'None' and reactionner_tags is ['None'] too
-                    # So if not the good one, loop for next :)
-                    if act.reactionner_tag not in reactionner_tags:
-                        logger.error(" -> reactionner tag do not match")
-                        continue
-
-                    # same for module_type
-                    if act.module_type not in module_types:
-                        logger.error(" -> module type do not match")
-                        continue
-
-                # And now look if we can launch or not :)
-                logger.debug(" -> : worker %s (%s)",
-                             act.status, 'now' if act.is_launchable(now) else 'not yet')
-                if act.status == 'scheduled' and act.is_launchable(now):
-                    if not is_master:
-                        # This is for child notifications and eventhandlers
-                        act.status = 'inpoller'
-                        act.worker_id = worker_name
-                        res.append(act)
-
-                        self.nb_actions_launched += 1
-
-                        self.counters[act.is_a]["total"]["launched"] += 1
-                        self.counters[act.is_a]["loop"]["launched"] += 1
-                        self.counters[act.is_a]["active"]["launched"] += 1
+            # if do_action, call the reactionner,
+            # and so reactionner_tags by default is ['None']
+            # by default reactionner_tag is 'None' and reactionner_tags is ['None'] too
+            # Master notifications are not launched by the reactionners, they are
+            # not in those launch queues
+            keys = [(tag, module_type) for tag in reactionner_tags for module_type in module_types]
+            for act in self.actions.pop_launchable(keys, now):
+                # This is for child notifications and eventhandlers
+                act.status = 'inpoller'
+                act.worker_id = worker_name
+                res.append(act)
+
+                self.nb_actions_launched += 1
+
+                self.counters[act.is_a]["total"]["launched"] += 1
+                self.counters[act.is_a]["loop"]["launched"] += 1
+                self.counters[act.is_a]["active"]["launched"] += 1
 
             if res:
                 logger.info("-> %d actions to start now", len(res))
@@ -1040,7 +1212,7 @@ class Scheduler(object):  # pylint: disable=R0902
                     action.output = action.output.decode('utf8', 'ignore')
 
                 self.actions[action.uuid].get_return_from(action)
-                item = self.find_item_by_id(self.actions[action.uuid].ref)
+                item = self.get_ref_of(self.actions[action.uuid])
                 item.remove_in_progress_notification(action)
                 self.actions[action.uuid].status = 'zombie'
                 item.last_notification = action.check_time
@@ -1063,7 +1235,7 @@ class Scheduler(object):  # pylint: disable=R0902
                 # If we' ve got a problem with the notification, raise a Warning log
                 if timeout:
                     contact = self.find_item_by_id(self.actions[action.uuid].contact)
-                    item = self.find_item_by_id(self.actions[action.uuid].ref)
+                    item = self.get_ref_of(self.actions[action.uuid])
 
                     self.nb_actions_results_timeout += 1
                     self.counters[action.is_a]["total"]["timeout"] += 1
@@ -1110,7 +1282,7 @@ class Scheduler(object):  # pylint: disable=R0902
                 self.counters[action.is_a]["loop"]["results"][action.status] += 1
 
                 if action.status == 'timeout':
-                    ref = self.find_item_by_id(self.checks[action.uuid].ref)
+                    ref = self.get_ref_of(self.checks[action.uuid])
                     action.output = "(%s %s check timed out)" % (
                         ref.my_type, ref.get_full_name()
                     )  # pylint: disable=E1101
@@ -1163,7 +1335,7 @@ class Scheduler(object):  # pylint: disable=R0902
                     _type = 'event handler'
                     if action.is_snapshot:
                         _type = 'snapshot'
-                    ref = self.find_item_by_id(self.checks[action.uuid].ref)
+                    ref = self.get_ref_of(self.checks[action.uuid])
                     logger.info("%s %s command '%s' timed out after %d seconds",
                                 ref.__class__.my_type.capitalize(),  # pylint: disable=E1101
                                 _type, self.actions[action.uuid].command,
@@ -1180,9 +1352,11 @@ class Scheduler(object):  # pylint: disable=R0902
                 # If it's a snapshot we should get the output and export it
                 if action.is_snapshot:
                     old_action.get_return_from(action)
-                    s_item = self.find_item_by_id(old_action.ref)
-                    brok = s_item.get_snapshot_brok(old_action.output, old_action.exit_status)
-                    self.add(brok)
+                    s_item = self.get_ref_of(old_action)
+                    if self.wants_brok_type(s_item.my_type + '_snapshot'):
+                        brok = s_item.get_snapshot_brok(old_action.output,
+                                                        old_action.exit_status)
+                        self.add(brok)
             except (ValueError, AttributeError) as exp:  # pragma: no cover, simple protection
                 # bad object, drop it
                 logger.warning('put_results:: got bad event handler: %s ', str(exp))
@@ -1216,16 +1390,19 @@ class Scheduler(object):  # pylint: disable=R0902
                                          s_type, link['name'], s_type)
                         continue
 
-                # Get actions to execute
+                # Get actions to execute, the passive satellites run the actions of
+                # the built-in module types
                 lst = []
                 if s_type == 'poller':
                     lst = self.get_to_run_checks(do_checks=True, do_actions=False,
                                                  poller_tags=link['poller_tags'],
-                                                 worker_name=link['name'])
+                                                 worker_name=link['name'],
+                                                 module_types=['fork', 'launcher'])
                 elif s_type == 'reactionner':
                     lst = self.get_to_run_checks(do_checks=False, do_actions=True,
                                                  reactionner_tags=link['reactionner_tags'],
-                                                 worker_name=link['name'])
+                                                 worker_name=link['name'],
+                                                 module_types=['fork', 'launcher'])
                 if not lst:
                     logger.debug("Nothing to do...")
                     continue
@@ -1348,60 +1525,87 @@ class Scheduler(object):  # pylint: disable=R0902
         if os.getenv('ALIGNAK_MANAGE_INTERNAL', '1') != '1':
             return
         now = time.time()
-        for chk in self.checks.values():
-            # must be ok to launch, and not an internal one (business rules based)
-            if chk.internal and chk.status == 'scheduled' and chk.is_launchable(now):
-                item = self.find_item_by_id(chk.ref)
-                # Only if active checks are enabled
-                if not item.active_checks_enabled:
-                    # Ask to remove the check
-                    chk.status = 'zombie'
-                    continue
+        # Only the launchable internal checks (business rules based) are popped
+        for chk in self.checks.pop_launchable([INTERNAL_CHECKS], now):
+            item = self.get_ref_of(chk)
+            # Only if active checks are enabled
+            if not item.active_checks_enabled:
+                # Ask to remove the check
+                chk.status = 'zombie'
+                continue
+
+            # Count and execute only if active checks is enabled
+            self.nb_internal_checks += 1
+            self.counters["check"]["total"]["results"]["total"] += 1
+            if "internal" not in self.counters["check"]["total"]["results"]:
+                self.counters["check"]["total"]["results"]["internal"] = 0
+            self.counters["check"]["total"]["results"]["internal"] += 1
 
-                # Count and execute only if active checks is enabled
-                self.nb_internal_checks += 1
-                self.counters["check"]["total"]["results"]["total"] += 1
-                if "internal" not in self.counters["check"]["total"]["results"]:
-                    self.counters["check"]["total"]["results"]["internal"] = 0
-                self.counters["check"]["total"]["results"]["internal"] += 1
+            self.counters["check"]["loop"]["results"]["total"] += 1
+            if "internal" not in self.counters["check"]["loop"]["results"]:
+                self.counters["check"]["loop"]["results"]["internal"] = 0
+            self.counters["check"]["loop"]["results"]["internal"] += 1
 
-                self.counters["check"]["loop"]["results"]["total"] += 1
-                if "internal" not in self.counters["check"]["loop"]["results"]:
-                    self.counters["check"]["loop"]["results"]["internal"] = 0
-                self.counters["check"]["loop"]["results"]["internal"] += 1
+            item.manage_internal_check(self.hosts, self.services, chk, self.hostgroups,
+                                       self.servicegroups, self.macromodulations,
+                                       self.timeperiods)
+            # Ask to consume the check result
+            chk.status = 'waitconsume'
 
-                item.manage_internal_check(self.hosts, self.services, chk, self.hostgroups,
-                                           self.servicegroups, self.macromodulations,
-                                           self.timeperiods)
-                # Ask to consume the check result
-                chk.status = 'waitconsume'
+    def get_broks(self, bname, max_count=0):
+        """Send broks to a specific broker, the oldest first
 
-    def get_broks(self, bname):
-        """Send broks to a specific broker
+        Only the broks already sent to the scheduler external modules are sent
 
         :param bname: broker name to send broks
         :type bname: str
+        :param max_count: maximum number of broks to send, 0 to send all of them
+        :type max_count: int
         :greturn: dict of brok for this broker
         :rtype: dict[alignak.brok.Brok]
         """
-        to_send = [b for b in self.brokers[bname]['broks'].values()
-                   if getattr(b, 'sent_to_sched_externals', False)]
+        to_send = self.brokers[bname]['broks'].pop_oldest(
+            max_count, lambda brok: getattr(brok, 'sent_to_sched_externals', False))
 
         res = {}
         for brok in to_send:
             res[brok.uuid] = brok
-            del self.brokers[bname]['broks'][brok.uuid]
         return res
 
+    def get_broks_page(self, bname, cursor, max_count):
+        """Send a page of broks to a specific broker
+
+        The broker provides the cursor of the last page it received. If it is the
+        cursor of the last page sent, this page is acknowledged and a new page is
+        built, else the last page is sent again (the broker did not receive it).
+
+        :param bname: broker name to send broks
+        :type bname: str
+        :param cursor: cursor of the last page received by the broker
+        :type cursor: int
+        :param max_count: maximum number of broks in the page, 0 for no limit
+        :type max_count: int
+        :return: tuple with the page cursor, the page broks and the number of
+                 broks remaining for this broker
+        :rtype: tuple
+        """
+        broker = self.brokers[bname]
+        if cursor == broker['cursor']:
+            broker['pending'] = self.get_broks(bname, max_count)
+            broker['cursor'] += 1
+        else:
+            logger.info("Sending again the broks page %d to the broker %s (got cursor %d)",
+                        broker['cursor'], bname, cursor)
+        return broker['cursor'], broker['pending'], len(broker['broks'])
+
     def reset_topology_change_flag(self):
-        """Set topology_change attribute to False in all hosts and services
+        """Set topology_change attribute to False in the hosts and services
+        which topology changed
 
         :return: None
         """
-        for i in self.hosts:
-            i.topology_change = False
-        for i in self.services:
-            i.topology_change = False
+        for elt in self.dirty_items.drain(TOPOLOGY_CHANGE):
+            elt.topology_change = False
 
     def update_retention_file(self, forced=False):
         """Call hook point 'save_retention'.
@@ -1619,6 +1823,7 @@ class Scheduler(object):  # pylint: disable=R0902
                 # we just bypass this
                 if prop in data:
                     setattr(item, prop, data[prop])
+        item.reset_macros_cache()
         # Now manage all linked objects load from/ previous run
         for notif_uuid, notif in item.notifications_in_progress.iteritems():
             notif['ref'] = item.uuid
@@ -1638,6 +1843,7 @@ class Scheduler(object):  # pylint: disable=R0902
         if item.acknowledgement is not None:
             item.acknowledgement = Acknowledge(item.acknowledgement)
             item.acknowledgement.ref = item.uuid
+            item.set_dirty(ACKNOWLEDGEMENTS)
         # Relink the notified_contacts as a set() of true contacts objects
         # if it was loaded from the retention, it's now a list of contacts
         # names
@@ -1722,6 +1928,8 @@ class Scheduler(object):  # pylint: disable=R0902
 
         :return: None
         """
+        if not self.wants_brok_type('update_program_status'):
+            return
         brok = self.get_program_status_brok()
         brok.type = 'update_program_status'
         self.add(brok)
@@ -1796,40 +2004,38 @@ class Scheduler(object):  # pylint: disable=R0902
             self.put_results(self.waiting_results.get())
 
         # Then we consume them
-        for chk in self.checks.values():
-            if chk.status == 'waitconsume':
-                item = self.find_item_by_id(chk.ref)
+        for chk in self.checks.get_by_status('waitconsume'):
+            item = self.get_ref_of(chk)
 
-                notif_period = self.timeperiods.items.get(item.notification_period, None)
-                depchks = item.consume_result(chk, notif_period, self.hosts, self.services,
-                                              self.timeperiods, self.macromodulations,
-                                              self.checkmodulations, self.businessimpactmodulations,
-                                              self.resultmodulations, self.triggers, self.checks)
+            notif_period = self.timeperiods.items.get(item.notification_period, None)
+            depchks = item.consume_result(chk, notif_period, self.hosts, self.services,
+                                          self.timeperiods, self.macromodulations,
+                                          self.checkmodulations, self.businessimpactmodulations,
+                                          self.resultmodulations, self.triggers, self.checks)
 
-                for dep in depchks:
-                    self.add(dep)
+            for dep in depchks:
+                self.add(dep)
 
-                if self.conf.log_active_checks and not chk.passive_check:
-                    item.raise_check_result()
+            if self.conf.log_active_checks and not chk.passive_check:
+                item.raise_check_result()
 
         # loop to resolve dependencies
         have_resolved_checks = True
         while have_resolved_checks:
             have_resolved_checks = False
             # All 'finished' checks (no more dep) raise checks they depend on
-            for chk in self.checks.values():
-                if chk.status == 'havetoresolvedep':
-                    for dependent_checks in chk.depend_on_me:
-                        # Ok, now dependent will no more wait
-                        dependent_checks.depend_on.remove(chk.uuid)
-                        have_resolved_checks = True
-                    # REMOVE OLD DEP CHECK -> zombie
-                    chk.status = 'zombie'
+            for chk in self.checks.get_by_status('havetoresolvedep'):
+                for dependent_checks in chk.depend_on_me:
+                    # Ok, now dependent will no more wait
+                    dependent_checks.depend_on.remove(chk.uuid)
+                    have_resolved_checks = True
+                # REMOVE OLD DEP CHECK -> zombie
+                chk.status = 'zombie'
 
             # Now, reinteger dep checks
-            for chk in self.checks.values():
-                if chk.status == 'waitdep' and not chk.depend_on:
-                    item = self.find_item_by_id(chk.ref)
+            for chk in self.checks.get_by_status('waitdep'):
+                if not chk.depend_on:
+                    item = self.get_ref_of(chk)
                     notif_period = self.timeperiods.items.get(item.notification_period, None)
                     depchks = item.consume_result(chk, notif_period, self.hosts, self.services,
                                                   self.timeperiods, self.macromodulations,
@@ -1845,67 +2051,39 @@ class Scheduler(object):  # pylint: disable=R0902
 
         :return: None
         """
-        id_to_del = []
-        for chk in self.checks.values():
-            if chk.status == 'zombie':
-                id_to_del.append(chk.uuid)
         # une petite tape dans le dos et tu t'en vas, merci...
         # *pat pat* GFTO, thks :)
-        for c_id in id_to_del:
-            del self.checks[c_id]  # ZANKUSEN!
+        for chk in self.checks.get_by_status('zombie'):
+            del self.checks[chk.uuid]  # ZANKUSEN!
 
     def delete_zombie_actions(self):
         """Remove actions that have a zombie status (usually timeouts)
 
         :return: None
         """
-        id_to_del = []
-        for act in self.actions.values():
-            if act.status == 'zombie':
-                id_to_del.append(act.uuid)
         # une petite tape dans le dos et tu t'en vas, merci...
         # *pat pat* GFTO, thks :)
-        for a_id in id_to_del:
-            del self.actions[a_id]  # ZANKUSEN!
+        for act in self.actions.get_by_status('zombie'):
+            del self.actions[act.uuid]  # ZANKUSEN!
 
     def update_downtimes_and_comments(self):
-        """Iter over all hosts and services::
+        """Update the hosts and services downtimes::
 
         TODO: add some unit tests for the maintenance period feature.
 
         * Update downtime status (start / stop) regarding maintenance period
         * Register new comments in comments list
 
+        The downtimes start / stop and the maintenance periods are managed with timers
+        so that only the due events are handled on each loop turn.
+
         :return: None
         """
         broks = []
         now = time.time()
 
         # Check maintenance periods
-        for elt in self.iter_hosts_and_services():
-            if elt.maintenance_period == '':
-                continue
-
-            if elt.in_maintenance == -1:
-                timeperiod = self.timeperiods[elt.maintenance_period]
-                if timeperiod.is_time_valid(now):
-                    start_dt = timeperiod.get_next_valid_time_from_t(now)
-                    end_dt = timeperiod.get_next_invalid_time_from_t(start_dt + 1) - 1
-                    data = {'ref': elt.uuid, 'ref_type': elt.my_type, 'start_time': start_dt,
-                            'end_time': end_dt, 'fixed': 1, 'trigger_id': '',
-                            'duration': 0, 'author': "Alignak",
-                            'comment': "This downtime was automatically scheduled by Alignak "
-                                       "because of a maintenance period."}
-                    downtime = Downtime(data)
-                    self.add(downtime.add_automatic_comment(elt))
-                    elt.add_downtime(downtime)
-                    self.add(downtime)
-                    self.get_and_register_status_brok(elt)
-                    elt.in_maintenance = downtime.uuid
-            else:
-                if elt.in_maintenance not in elt.downtimes:
-                    # the main downtimes has expired or was manually deleted
-                    elt.in_maintenance = -1
+        self.update_maintenance_periods(now)
 
         #  Check the validity of contact downtimes
         for elt in self.contacts:
@@ -1915,13 +2093,20 @@ class Scheduler(object):  # pylint: disable=R0902
 
         # A loop where those downtimes are removed
         # which were marked for deletion (mostly by dt.exit())
-        for elt in self.iter_hosts_and_services():
+        # and where the start and stop times of the others are scheduled
+        for elt in self.dirty_items.drain(DOWNTIMES):
             for downtime in elt.downtimes.values():
                 if downtime.can_be_deleted is True:
                     logger.info("Downtime to delete: %s", downtime.__dict__)
-                    ref = self.find_item_by_id(downtime.ref)
+                    ref = self.get_ref_of(downtime)
                     elt.del_downtime(downtime.uuid)
                     broks.append(ref.get_update_status_brok())
+                    continue
+                if downtime.fixed and not downtime.is_in_effect:
+                    self.downtimes_timers.push(downtime.start_time, DOWNTIME_START,
+                                               elt.uuid, downtime.uuid)
+                self.downtimes_timers.push(downtime.real_end_time, DOWNTIME_END,
+                                           elt.uuid, downtime.uuid)
 
         # Same for contact downtimes:
         for elt in self.contacts:
@@ -1932,19 +2117,97 @@ class Scheduler(object):  # pylint: disable=R0902
                     broks.append(ref.get_update_status_brok())
 
         # Check start and stop times
-        for elt in self.iter_hosts_and_services():
-            for downtime in elt.downtimes.values():
-                if downtime.real_end_time < now:
+        for timer in self.downtimes_timers.pop_due(now):
+            when, kind, elt_uuid, downtime_uuid = timer
+            if elt_uuid not in self.items_by_uuid:
+                # Obsolete timer, the item was removed from the configuration
+                continue
+            downtime = self.items_by_uuid[elt_uuid].downtimes.get(downtime_uuid)
+            if downtime is None or downtime.can_be_deleted:
+                # Obsolete timer
+                continue
+            if kind == DOWNTIME_END:
+                if downtime.real_end_time != when:
+                    # Obsolete timer, the downtime end changed
+                    continue
+                if when < now:
                     # this one has expired
                     broks.extend(downtime.exit(self.timeperiods, self.hosts, self.services))
-                elif now >= downtime.start_time and downtime.fixed and not downtime.is_in_effect:
-                    # this one has to start now
-                    broks.extend(downtime.enter(self.timeperiods, self.hosts, self.services))
-                    broks.append(self.find_item_by_id(downtime.ref).get_update_status_brok())
+                else:
+                    self.downtimes_timers.push(*timer)
+            elif downtime.real_end_time >= now and downtime.fixed and \
+                    not downtime.is_in_effect and downtime.start_time == when:
+                # this one has to start now
+                broks.extend(downtime.enter(self.timeperiods, self.hosts, self.services))
+                broks.append(self.get_ref_of(downtime).get_update_status_brok())
 
         for brok in broks:
             self.add(brok)
 
+    def update_maintenance_periods(self, now):
+        """Schedule the maintenance period timers of the hosts and services and
+        add a downtime to the hosts and services which maintenance period started
+
+        :param now: current time
+        :type now: float
+        :return: None
+        """
+        for elt in self.iter_hosts_and_services():
+            if elt.maintenance_period == '':
+                continue
+
+            if elt.in_maintenance == -1:
+                if self.maintenance_periods.get(elt.uuid) != elt.maintenance_period:
+                    self.push_maintenance_timer(elt, now)
+            else:
+                if elt.in_maintenance not in elt.downtimes:
+                    # the main downtimes has expired or was manually deleted
+                    elt.in_maintenance = -1
+                    self.maintenance_periods.pop(elt.uuid, None)
+
+        for _, _, elt_uuid, tp_uuid in self.maintenance_timers.pop_due(now):
+            elt = self.items_by_uuid.get(elt_uuid)
+            if elt is None or elt.in_maintenance != -1 \
+                    or self.maintenance_periods.get(elt.uuid) != tp_uuid \
+                    or elt.maintenance_period != tp_uuid:
+                # Obsolete timer
+                continue
+            timeperiod = self.timeperiods[elt.maintenance_period]
+            if not timeperiod.is_time_valid(now):
+                self.push_maintenance_timer(elt, now)
+                continue
+            start_dt = timeperiod.get_next_valid_time_from_t(now)
+            end_dt = timeperiod.get_next_invalid_time_from_t(start_dt + 1) - 1
+            data = {'ref': elt.uuid, 'ref_type': elt.my_type, 'start_time': start_dt,
+                    'end_time': end_dt, 'fixed': 1, 'trigger_id': '',
+                    'duration': 0, 'author': "Alignak",
+                    'comment': "This downtime was automatically scheduled by Alignak "
+                               "because of a maintenance period."}
+            downtime = Downtime(data)
+            self.add(downtime.add_automatic_comment(elt))
+            elt.add_downtime(downtime)
+            self.add(downtime)
+            self.get_and_register_status_brok(elt)
+            elt.in_maintenance = downtime.uuid
+            del self.maintenance_periods[elt.uuid]
+
+    def push_maintenance_timer(self, elt, now):
+        """Schedule the next maintenance period check of an host / service,
+        at the next valid time of its maintenance period
+
+        :param elt: host or service with a maintenance period
+        :type elt: alignak.objects.schedulingitem.SchedulingItem
+        :param now: current time
+        :type now: float
+        :return: None
+        """
+        self.maintenance_periods[elt.uuid] = elt.maintenance_period
+        timeperiod = self.timeperiods[elt.maintenance_period]
+        next_valid = timeperiod.get_next_valid_time_from_t(now)
+        if next_valid is not None:
+            self.maintenance_timers.push(next_valid, MAINTENANCE_PERIOD,
+                                         elt.uuid, elt.maintenance_period)
+
     def schedule(self, elems=None):
         """Iter over all hosts and services and call schedule method
         (schedule next check)
@@ -1964,31 +2227,33 @@ class Scheduler(object):  # pylint: disable=R0902
 
     def get_new_actions(self):
         """Call 'get_new_actions' hook point
-        Iter over all hosts and services to add new actions in internal lists
+        Iter over the hosts and services that raised some actions
+        to add new actions in internal lists
 
         :return: None
         """
         self.hook_point('get_new_actions')
         # ask for service and hosts their next check
-        for elt in self.iter_hosts_and_services():
+        for elt in self.dirty_items.drain(NEW_ACTIONS):
             for act in elt.actions:
                 logger.debug("Got a new action for %s: %s", elt, act)
                 self.add(act)
             # We take all, we can clear it
-            elt.actions = []
+            del elt.actions[:]
 
     def get_new_broks(self):
-        """Iter over all hosts and services to add new broks in internal lists
+        """Iter over the hosts and services that raised some broks
+        to add new broks in internal lists
 
         :return: None
         """
         # ask for service and hosts their broks waiting
         # be eaten
-        for elt in self.iter_hosts_and_services():
+        for elt in self.dirty_items.drain(NEW_BROKS):
             for brok in elt.broks:
                 self.add(brok)
             # We take all, we can clear it
-            elt.broks = []
+            del elt.broks[:]
 
         # Also fetch broks from contact (like contactdowntime)
         for contact in self.contacts:
@@ -2044,30 +2309,28 @@ class Scheduler(object):  # pylint: disable=R0902
         """
         orphans_count = {}
         now = int(time.time())
-        for chk in self.checks.values():
-            if chk.status == 'inpoller':
-                time_to_orphanage = self.find_item_by_id(chk.ref).get_time_to_orphanage()
-                if time_to_orphanage:
-                    if chk.t_to_go < now - time_to_orphanage:
-                        logger.info("Orphaned check (%d s / %s / %s) check for: %s (%s)",
-                                    time_to_orphanage, chk.t_to_go, now,
-                                    self.find_item_by_id(chk.ref).get_full_name(), chk)
-                        chk.status = 'scheduled'
-                        if chk.worker_id not in orphans_count:
-                            orphans_count[chk.worker_id] = 0
-                        orphans_count[chk.worker_id] += 1
-        for act in self.actions.values():
-            if act.status == 'inpoller':
-                time_to_orphanage = self.find_item_by_id(act.ref).get_time_to_orphanage()
-                if time_to_orphanage:
-                    if act.t_to_go < now - time_to_orphanage:
-                        logger.info("Orphaned action (%d s / %s / %s) action for: %s (%s)",
-                                    time_to_orphanage, act.t_to_go, now,
-                                    self.find_item_by_id(act.ref).get_full_name(), act)
-                        act.status = 'scheduled'
-                        if act.worker_id not in orphans_count:
-                            orphans_count[act.worker_id] = 0
-                        orphans_count[act.worker_id] += 1
+        for chk in self.checks.get_by_status('inpoller'):
+            time_to_orphanage = self.get_ref_of(chk).get_time_to_orphanage()
+            if time_to_orphanage:
+                if chk.t_to_go < now - time_to_orphanage:
+                    logger.info("Orphaned check (%d s / %s / %s) check for: %s (%s)",
+                                time_to_orphanage, chk.t_to_go, now,
+                                self.get_ref_of(chk).get_full_name(), chk)
+                    chk.status = 'scheduled'
+                    if chk.worker_id not in orphans_count:
+                        orphans_count[chk.worker_id] = 0
+                    orphans_count[chk.worker_id] += 1
+        for act in self.actions.get_by_status('inpoller'):
+            time_to_orphanage = self.get_ref_of(act).get_time_to_orphanage()
+            if time_to_orphanage:
+                if act.t_to_go < now - time_to_orphanage:
+                    logger.info("Orphaned action (%d s / %s / %s) action for: %s (%s)",
+                                time_to_orphanage, act.t_to_go, now,
+                                self.get_ref_of(act).get_full_name(), act)
+                    act.status = 'scheduled'
+                    if act.worker_id not in orphans_count:
+                        orphans_count[act.worker_id] = 0
+                    orphans_count[act.worker_id] += 1
 
         for sta_name in orphans_count:
             logger.warning("%d actions never came back for the satellite '%s'. "
@@ -2083,29 +2346,25 @@ class Scheduler(object):  # pylint: disable=R0902
         """
         t00 = time.time()
         nb_sent = 0
-        broks = {}
-        for broker in self.brokers.values():
-            for brok in broker['broks'].values():
-                if not getattr(brok, 'sent_to_sched_externals', False):
-                    broks[brok.uuid] = brok
+        broks = self.modules_broks
+        self.modules_broks = []
 
         for mod in self.sched_daemon.modules_manager.get_external_instances():
             logger.debug("Look for sending to module %s", mod.get_name())
             queue = mod.to_q
             if queue is not None:
-                to_send = [b for b in broks.values() if mod.want_brok(b)]
+                to_send = [b for b in broks if mod.want_brok(b)]
                 queue.put(to_send)
                 nb_sent += len(to_send)
 
         # No more need to send them
-        for brok in broks.values():
-            for broker in self.brokers.values():
-                try:
-                    broker['broks'][brok.uuid].sent_to_sched_externals = True
-                except KeyError:
-                    logger.debug("Issue #959 - should not have happened")
+        for brok in broks:
+            brok.sent_to_sched_externals = True
         logger.debug("Time to send %s broks (after %d secs)", nb_sent, time.time() - t00)
 
+        # The external modules may have changed
+        self.update_brok_types()
+
     def get_objects_from_from_queues(self):
         """Same behavior than Daemon.get_objects_from_from_queues().
 
@@ -2143,10 +2402,15 @@ class Scheduler(object):  # pylint: disable=R0902
         :return:
         :rtype: defaultdict(int)
         """
+        res = defaultdict(int)
         if checks is None:
-            checks = self.checks
+            # Our checks are already counted in their status buckets
+            res["total"] = len(self.checks)
+            for status, bucket in self.checks.by_status.iteritems():
+                if bucket:
+                    res[status] = len(bucket)
+            return res
 
-        res = defaultdict(int)
         res["total"] = len(checks)
         for chk in checks.itervalues():
             res[chk.status] += 1
@@ -2169,13 +2433,44 @@ class Scheduler(object):  # pylint: disable=R0902
         if not isinstance(o_id, int) and not isinstance(o_id, basestring):
             return o_id
 
-        for items in [self.hosts, self.services, self.actions, self.checks, self.hostgroups,
-                      self.servicegroups, self.contacts, self.contactgroups]:
-            if o_id in items:
-                return items[o_id]
+        try:
+            return self.items_by_uuid[o_id]
+        except KeyError:  # pragma: no cover, simple protection this should never happen
+            raise AttributeError("Item with id %s not found" % o_id)
+
+    def get_host(self, uuid):
+        """Get an host based on its uuid
+
+        :param uuid: host uuid
+        :type uuid: str
+        :return: the host or None if not found
+        :rtype: alignak.objects.host.Host | None
+        """
+        return self.hosts.items.get(uuid)
+
+    def get_service(self, uuid):
+        """Get a service based on its uuid
 
-        raise AttributeError("Item with id %s not found" % o_id)  # pragma: no cover,
-        # simple protection this should never happen
+        :param uuid: service uuid
+        :type uuid: str
+        :return: the service or None if not found
+        :rtype: alignak.objects.service.Service | None
+        """
+        return self.services.items.get(uuid)
+
+    def get_ref_of(self, action):
+        """Get the host or service an action (check, notification, event handler, downtime)
+        is related to
+
+        :param action: action which ref is wanted
+        :type action: alignak.action.Action | alignak.downtime.Downtime
+        :return: the host or service of the action
+        :rtype: alignak.objects.schedulingitem.SchedulingItem
+        """
+        item = self.hosts.items.get(action.ref)
+        if item is None:
+            item = self.services.items[action.ref]
+        return item
 
     def get_stats_struct(self):  # pragma: no cover, seems never called!
         """Get state of modules and create a scheme for stats data of daemon
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2016: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+"""This module provides the TimerHeap class used by the scheduler to fire the
+time based events of the hosts and services (downtimes start and end,
+acknowledgements expiry, maintenance periods) only when they are due.
+
+"""
+import heapq
+
+# Timers kinds
+DOWNTIME_START = 'downtime_start'
+DOWNTIME_END = 'downtime_end'
+ACKNOWLEDGEMENT_EXPIRY = 'acknowledgement_expiry'
+MAINTENANCE_PERIOD = 'maintenance_period'
+
+
+class TimerHeap(object):
+    """Time ordered heap of timers. A timer is a (timestamp, kind, item uuid, ref) tuple
+    where ref is the uuid of the timer object (downtime, maintenance period, ...)
+
+    The timers are never removed from the heap before they are due: the timers
+    that became obsolete (deleted downtime, rescheduled event, ...) must be
+    ignored by the caller when they get popped.
+    """
+
+    def __init__(self):
+        self.timers = []
+
+    def __len__(self):
+        return len(self.timers)
+
+    def push(self, timestamp, kind, item_uuid, ref=None):
+        """Add a timer in the heap
+
+        :param timestamp: time when the timer is due
+        :type timestamp: float
+        :param kind: timer kind
+        :type kind: str
+        :param item_uuid: uuid of the host / service of the timer
+        :type item_uuid: str
+        :param ref: uuid of the timer object
+        :type ref: str | None
+        :return: None
+        """
+        heapq.heappush(self.timers, (timestamp, kind, item_uuid, ref))
+
+    def pop_due(self, timestamp):
+        """Pop the timers due at timestamp
+
+        :param timestamp: current time
+        :type timestamp: float
+        :return: due timers, ordered by time
+        :rtype: list
+        """
+        res = []
+        while self.timers and self.timers[0][0] <= timestamp:
+            res.append(heapq.heappop(self.timers))
+        return res
+
+    def clear(self):
+        """Remove all the timers
+
+        :return: None
+        """
+        del self.timers[:]
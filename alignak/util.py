@@ -1279,6 +1279,10 @@ def parse_daemon_args(arbiter=False):
             (multiple -a can be used, and they will be concatenated to make a global configuration
             file)
             "-V", "--verify-config": Verify configuration file(s) and exit
+            "-R", "--rebuild-config": Build the configuration even if it did not change since
+            the configuration snapshot was saved
+            "-P", "--profile-config": Profile the configuration loading phases and write the
+            profile in the JSON file if one is given
             "-n", "--config-name": Set the name of the arbiter to pick in the configuration files.
             This allows an arbiter to find its own configuration in the whole Alignak configuration
             Using this parameter is mandatory when several arbiters are existing in the
@@ -1305,6 +1309,13 @@ def parse_daemon_args(arbiter=False):
                                  'to make a global configuration file)')
         parser.add_argument('-V', '--verify-config', dest='verify_only', action='store_true',
                             help='Verify configuration file(s) and exit')
+        parser.add_argument('-R', '--rebuild-config', dest='rebuild_config', action='store_true',
+                            help='Build the configuration rather than loading the configuration '
+                                 'snapshot (config_snapshot daemon parameter)')
+        parser.add_argument('-P', '--profile-config', dest='profile_config', nargs='?',
+                            const='', metavar='FILE',
+                            help='Profile the configuration loading phases (time, CPU, memory '
+                                 'and objects count) and write the profile in FILE (JSON)')
         parser.add_argument('-k', '--alignak-name', dest='alignak_name',
                             default='arbiter-master',
                             help='Set the name of the arbiter to pick in the configuration files '
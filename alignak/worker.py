@@ -49,15 +49,29 @@
 This module provide Worker class. It is used to spawn new processes in Poller and Reactionner
 """
 from Queue import Empty, Full
+from collections import deque
 from multiprocessing import Process
 
 import os
 import time
+import errno
+import select
 import signal
 import traceback
 import cStringIO
 import logging
 
+# The event driven loop is only available on Unix systems
+try:
+    import fcntl  # pylint: disable=C0103
+except ImportError:
+    fcntl = None  # pylint: disable=C0103
+
+from alignak.action import ActionBase, ONLY_COPY_PROP
+from alignak.check import Check
+from alignak.eventhandler import EventHandler
+from alignak.launcher import LauncherPool
+from alignak.notification import Notification
 from alignak.message import Message
 from alignak.misc.common import setproctitle
 
@@ -67,6 +81,12 @@ SIGNALS_TO_NAMES_DICT = dict((k, v) for v, k in reversed(sorted(signal.__dict__.
 
 logger = logging.getLogger(__name__)  # pylint: disable=C0103
 
+# Launchers processes of a 'launcher' module type worker
+LAUNCHERS_BY_WORKER = 2
+
+# Actions classes, by type, to build the actions of the work records
+ACTIONS_CLASSES = dict((cls.my_type, cls) for cls in (Check, EventHandler, Notification))
+
 
 class Worker(object):
     """This class is used for poller and reactionner to work.
@@ -83,11 +103,13 @@ class Worker(object):
     _process = None
     _idletime = None
     _timeout = None
+    # Pipe written to when a signal is received, see set_child_exit_handler
+    _wakeup_fds = None
 
     # pylint: disable=too-many-arguments
     def __init__(self, module_name, actions_queue, returns_queue, processes_by_worker,
                  timeout=300, max_plugins_output_length=8192, target=None,
-                 loaded_into='unknown'):
+                 loaded_into='unknown', batch_size=64, flush_interval=0.1):
         """
 
         :param module_name:
@@ -98,6 +120,8 @@ class Worker(object):
         :param max_plugins_output_length:
         :param target:
         :param loaded_into:
+        :param batch_size: maximum number of results sent back in a message
+        :param flush_interval: maximum time a result waits to be sent back
         """
         # Set our own identifier
         cls = self.__class__
@@ -115,7 +139,20 @@ class Worker(object):
         self.actions_launched = 0
         self.actions_finished = 0
 
+        # Actions got as work records, their results are sent back as result records
+        self.batched_actions = set()
+        # Work records got but not yet taken because processes_by_worker actions are running
+        self.pending_actions = deque()
+        self.results = []
+        self.results_time = 0
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
         self.interrupted = False
+        # Launchers of the 'launcher' module type workers
+        self.launchers = None
+        # Asked to stop once the current actions are finished
+        self.stopping = False
 
         self._idletime = 0
         self._timeout = timeout
@@ -165,6 +202,14 @@ class Worker(object):
         """
         return self._process.pid
 
+    def get_exitcode(self):
+        """Accessor to get the worker process exit code
+
+        :return: the worker exit code, None if it is still running
+        :rtype: int
+        """
+        return self._process.exitcode
+
     def start(self):
         """Start the worker. Wrapper for calling start method of the process attribute
 
@@ -200,6 +245,39 @@ class Worker(object):
         signal.signal(signal.SIGHUP, self.manage_signal)
         signal.signal(signal.SIGQUIT, self.manage_signal)
 
+    @staticmethod
+    def manage_child_signal(sig, frame):  # pylint: disable=W0613
+        """Manage the SIGCHLD signal: nothing to do, the signal only wakes up
+        the worker waiting in wait_for_events
+
+        :param sig: signal caught by daemon
+        :type sig: str
+        :param frame: current stack frame
+        :type frame:
+        :return: None
+        """
+        pass
+
+    def set_child_exit_handler(self):
+        """Get notified when an action process exits
+
+        Python writes in the wakeup pipe when a signal is received, so a SIGCHLD
+        makes the select of wait_for_events return
+
+        :return: None
+        """
+        if fcntl is None:
+            return
+        read_fd, write_fd = os.pipe()
+        for o_fd in (read_fd, write_fd):
+            o_fl = fcntl.fcntl(o_fd, fcntl.F_GETFL)
+            fcntl.fcntl(o_fd, fcntl.F_SETFL, o_fl | os.O_NONBLOCK)
+        signal.signal(signal.SIGCHLD, self.manage_child_signal)
+        # Do not interrupt the system calls, the select is interrupted anyway
+        signal.siginterrupt(signal.SIGCHLD, False)
+        signal.set_wakeup_fd(write_fd)
+        self._wakeup_fds = (read_fd, write_fd)
+
     def terminate(self):
         """Wrapper for calling terminate method of the process attribute
         Also close queues (input and output) and terminate queues thread
@@ -232,15 +310,39 @@ class Worker(object):
         """
         return self._process.is_alive()
 
+    @staticmethod
+    def get_action_from_record(record):
+        """Build an action from its work record, see alignak.action.ActionBase.get_work_record
+
+        :param record: work record
+        :type record: tuple
+        :return: the action to execute
+        :rtype: alignak.action.Action
+        """
+        my_type, sched_id, values = record
+        action = ACTIONS_CLASSES[my_type](dict(zip(ONLY_COPY_PROP, values)))
+        action.sched_id = sched_id
+        return action
+
+    def take_pending_actions(self):
+        """Take the pending work records actions, up to processes_by_worker actions
+
+        :return: None
+        """
+        while self.pending_actions and len(self.checks) < self.processes_by_worker:
+            action = self.get_action_from_record(self.pending_actions.popleft())
+            self.batched_actions.add(action.uuid)
+            self.checks.append(action)
+
     def get_new_checks(self, queue, return_queue):
         """Get new checks if less than nb_checks_max
-        If no new checks got and no check in queue, sleep for 1 sec
         REF: doc/alignak-action-queues.png (3)
 
         :return: None
         """
         try:
             logger.debug("get_new_checks: %s / %s", len(self.checks), self.processes_by_worker)
+            self.take_pending_actions()
             while len(self.checks) < self.processes_by_worker:
                 msg = queue.get_nowait()
                 if msg is not None:
@@ -249,6 +351,17 @@ class Worker(object):
                         logger.debug("Got an action: %s", msg.get_data())
                         self.checks.append(msg.get_data())
                         self.actions_got += 1
+                    elif msg.get_type() == 'DoBatch':
+                        logger.debug("Got %d actions", len(msg.get_data()))
+                        self.pending_actions.extend(msg.get_data())
+                        self.take_pending_actions()
+                        self.actions_got += len(msg.get_data())
+                    elif msg.get_type() == 'Processes':
+                        logger.info("Now launching up to %d actions", msg.get_data())
+                        self.processes_by_worker = msg.get_data()
+                    elif msg.get_type() == 'Stop':
+                        logger.info("I am no more needed, stopping after my current actions")
+                        self.stopping = True
                     elif msg.get_type() == 'ping':
                         msg = Message(_type='pong', data='pong!', source=self._id)
                         logger.debug("Queuing message: %s", msg)
@@ -262,7 +375,6 @@ class Worker(object):
             logger.debug("Actions queue is empty")
             if not self.checks:
                 self._idletime += 1
-                time.sleep(0.5)
         # Maybe the Queue() has been deleted by our master ?
         except (IOError, EOFError) as exp:
             logger.warning("My actions queue is no more available: %s", str(exp))
@@ -302,20 +414,22 @@ class Worker(object):
         :return: None
         """
         to_del = []
-        wait_time = 1.0
-        now = time.time()
         logger.debug("--- manage finished checks")
         for action in self.checks:
-            logger.debug("--- checking: last poll: %s, now: %s, wait_time: %s, action: %s",
-                         action.last_poll, now, action.wait_time, action)
-            if action.status == 'launched' and action.last_poll < now - action.wait_time:
+            logger.debug("--- checking: %s", action)
+            if action.status == 'launched':
                 action.check_finished(self.max_plugins_output_length)
-                wait_time = min(wait_time, action.wait_time)
             # If action done, we can launch a new one
             if action.status in ['done', 'timeout']:
                 logger.debug("--- check done/timeout: %s", action.uuid)
                 self.actions_finished += 1
                 to_del.append(action)
+                if action.uuid in self.batched_actions:
+                    self.batched_actions.discard(action.uuid)
+                    if not self.results:
+                        self.results_time = time.time()
+                    self.results.append(action.get_result_record())
+                    continue
                 # We answer to the master
                 try:
                     msg = Message(_type='Done', data=action, source=self._id)
@@ -334,9 +448,104 @@ class Worker(object):
             logger.debug("--- delete check: %s", chk.uuid)
             self.checks.remove(chk)
 
-        # Little sleep
-        logger.debug("--- manage finished checks terminated, I will wait: %s", wait_time)
-        time.sleep(wait_time)
+        self.flush_results(queue)
+
+    def flush_results(self, queue, force=False):
+        """Send back the pending results records, by batches of batch_size results,
+        if there are enough of them or if the first of them waits for flush_interval
+
+        :param queue: queue managed by manager
+        :type queue: Queue.Queue
+        :param force: send all the pending results
+        :type force: bool
+        :return: None
+        """
+        if not self.results:
+            return
+        if not force and len(self.results) < self.batch_size and \
+                time.time() < self.results_time + self.flush_interval:
+            return
+
+        results, self.results = self.results, []
+        for idx in xrange(0, len(results), self.batch_size):
+            try:
+                msg = Message(_type='DoneBatch', data=results[idx:idx + self.batch_size],
+                              source=self._id)
+                logger.debug("Queuing message: %s", msg)
+                queue.put_nowait(msg)
+                logger.debug("Queued")
+            except (IOError, EOFError) as exp:
+                logger.warning("My returns queue is no more available: %s", str(exp))
+            except Exception as exp:  # pylint: disable=W0703
+                logger.error("Failed putting messages in returns queue: %s", str(exp))
+
+    def wait_for_events(self, queue, timeout=1.0):
+        """Wait until an action process writes its outputs or exits, an action
+        times out, a new message is available in the actions queue or the pending
+        results must be sent back
+
+        Without the wakeup pipe (not an Unix system), the launched actions are
+        polled every 0.1 second
+
+        :param queue: Global Queue Master->Slave
+        :type queue: Queue.Queue
+        :param timeout: maximum time to wait for
+        :type timeout: float
+        :return: None
+        """
+        if self.pending_actions and len(self.checks) < self.processes_by_worker:
+            # Some pending actions can be launched now
+            return
+        fds = []
+        launched = False
+        now = time.time()
+        if self.results:
+            timeout = min(timeout, self.results_time + self.flush_interval - now)
+        for action in self.checks:
+            if action.status != 'launched':
+                continue
+            launched = True
+            timeout = min(timeout, action.check_time + action.timeout - now)
+            if action.process is not None:
+                fds.extend([output.fileno() for output in
+                            (action.process.stdout, action.process.stderr)
+                            if output is not None and not output.closed])
+        if launched and self.launchers is not None:
+            fds.extend(self.launchers.get_fds())
+
+        # The actions queue reader, only if we can take new actions
+        reader = getattr(queue, '_reader', None)
+        if reader is not None and not self.i_am_dying and \
+                len(self.checks) < self.processes_by_worker:
+            fds.append(reader.fileno())
+        elif not launched:
+            timeout = min(timeout, 0.5)
+
+        if self._wakeup_fds is None:
+            if launched:
+                timeout = min(timeout, 0.1)
+        else:
+            fds.append(self._wakeup_fds[0])
+
+        if timeout <= 0:
+            return
+        logger.debug("--- wait for events: %d fds, timeout: %s", len(fds), timeout)
+        if not fds:
+            time.sleep(timeout)
+            return
+
+        try:
+            readable, _, _ = select.select(fds, [], [], timeout)
+        except select.error as exp:
+            if exp.args[0] != errno.EINTR:
+                raise
+            return
+
+        if self._wakeup_fds is not None and self._wakeup_fds[0] in readable:
+            try:
+                os.read(self._wakeup_fds[0], 4096)
+            except OSError:
+                pass
 
     def check_for_system_time_change(self):  # pragma: no cover, hardly testable with unit tests...
         """Check if our system time change. If so, change our
@@ -386,6 +595,7 @@ class Worker(object):
         * Get checks
         * Launch new checks
         * Manage finished checks
+        * Wait for an action to finish or a new action to come
 
         :param actions_queue: Global Queue Master->Slave
         :type actions_queue: Queue.Queue
@@ -397,9 +607,16 @@ class Worker(object):
         # signal.signal(signal.SIGTERM, signal.SIG_DFL)
         self.interrupted = False
         self.set_exit_handler()
+        self.set_child_exit_handler()
 
         self.set_proctitle()
 
+        if self.module_name == 'launcher':
+            # Our actions are launched by pre-forked launchers processes
+            self.launchers = LauncherPool(LAUNCHERS_BY_WORKER, self.max_plugins_output_length)
+            self.launchers.start()
+            ActionBase.launchers = self.launchers
+
         timeout = 1.0
         self.checks = []
         self.t_each_loop = time.time()
@@ -428,10 +645,20 @@ class Worker(object):
             # if so, we really die, our master poller will launch a new
             # worker because we were too weak to manage our job :(
             if not self.checks and self.i_am_dying:
+                self.flush_results(returns_queue, True)
                 logger.warning("I die because I cannot do my job as I should "
                                "(too many open files?)... forgive me please.")
                 break
 
+            # Our master does not need us anymore, stop once all our actions are finished
+            if not self.checks and not self.pending_actions and self.stopping:
+                self.flush_results(returns_queue, True)
+                logger.info("I stop because I am no more needed")
+                break
+
+            # REF: doc/alignak-action-queues.png (5)
+            self.wait_for_events(actions_queue)
+
             # Manage a possible time change (our avant will be change with the diff)
             diff = self.check_for_system_time_change()
             begin += diff
@@ -447,6 +674,9 @@ class Worker(object):
 
             logger.debug("+++ loop stop: timeout = %s", timeout)
 
+        if self.launchers is not None:
+            self.launchers.stop()
+
     def set_proctitle(self):  # pragma: no cover, not with unit tests
         """Set the proctitle of this worker for readability purpose
 
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2016: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+"""
+This module provides the controller that sizes the workers pool of a satellite module
+"""
+import math
+import time
+
+
+class WorkerPoolController(object):
+    """Feedback controller for the workers pool of a satellite module.
+
+    The satellite feeds it with the results of the actions (latency and plugin execution time)
+    and, on each loop turn, with the number of actions waiting for a result. Once per period,
+    the controller decides the number of workers and of processes by worker:
+
+    * when the actions latency is over the target, the pool grows: one more worker if
+      the workers are not all busy, else enough workers (then processes) to run the
+      waiting actions,
+    * when the latency is far under the target and the pool could manage the load
+      (busy processes computed from the throughput and the execution time) with one worker
+      less, for several periods in a row, the pool shrinks: processes first, then workers.
+
+    Workers count stays in [min_workers, max_workers] and processes by worker in
+    [processes_by_worker, max_processes_by_worker].
+    """
+
+    def __init__(self, min_workers, max_workers, processes_by_worker,
+                 max_processes_by_worker=0, target_latency=2.0, period=10, shrink_periods=3):
+        self.min_workers = min_workers
+        self.max_workers = max(min_workers, max_workers)
+        self.min_processes = processes_by_worker
+        self.max_processes = max(processes_by_worker, max_processes_by_worker)
+        self.target_latency = target_latency
+        self.period = period
+        self.shrink_periods = shrink_periods
+
+        # Current decision
+        self.workers = min_workers
+        self.processes_by_worker = processes_by_worker
+        self.decision = 'hold'
+
+        # Measures of the current period
+        self.period_start = 0
+        self.results = 0
+        self.latency_sum = 0.0
+        self.execution_sum = 0.0
+
+        # Measures of the last period
+        self.latency = 0.0
+        self.execution_time = 0.0
+        self.busy = 0.0
+        self.idle_periods = 0
+
+    def add_result(self, latency, execution_time):
+        """Account for an action result
+
+        :param latency: time between the action planned launch time and its real launch
+        :type latency: float
+        :param execution_time: plugin execution time
+        :type execution_time: float
+        :return: None
+        """
+        self.results += 1
+        self.latency_sum += max(0.0, latency)
+        self.execution_sum += max(0.0, execution_time)
+
+    def is_due(self, now):
+        """Check if the period is over and a decision is to be taken
+
+        :param now: current time
+        :type now: float
+        :return: True if the period is over
+        :rtype: bool
+        """
+        if not self.period_start or now < self.period_start:
+            # First call or time change, start a new period
+            self.period_start = now
+            return False
+        return now - self.period_start >= self.period
+
+    def update(self, queued, now=None):
+        """Decide the workers and processes count if the period is over
+
+        :param queued: number of actions sent to the workers and still waiting for a result
+        :type queued: int
+        :param now: current time
+        :type now: float
+        :return: the decision ('grow-workers', 'grow-processes', 'shrink-workers',
+                 'shrink-processes' or 'hold'), None if the period is not over
+        :rtype: str | None
+        """
+        if now is None:
+            now = time.time()
+        if not self.is_due(now):
+            return None
+        elapsed = now - self.period_start
+
+        if self.results:
+            self.latency = self.latency_sum / self.results
+            self.execution_time = self.execution_sum / self.results
+        elif not queued:
+            self.latency = 0.0
+        # Busy processes (Little's law): throughput * execution time
+        self.busy = self.results / elapsed * self.execution_time
+        self.period_start = now
+        self.results = 0
+        self.latency_sum = self.execution_sum = 0.0
+
+        capacity = self.workers * self.processes_by_worker
+        if self.latency > self.target_latency and queued:
+            self.idle_periods = 0
+            self.decision = self._grow(queued, capacity)
+        elif self.latency < self.target_latency / 2 and \
+                max(queued, 2 * self.busy) < capacity - self.processes_by_worker:
+            self.idle_periods += 1
+            self.decision = 'hold'
+            if self.idle_periods >= self.shrink_periods:
+                self.idle_periods = 0
+                self.decision = self._shrink()
+        else:
+            self.idle_periods = 0
+            self.decision = 'hold'
+        return self.decision
+
+    def _grow(self, queued, capacity):
+        """Grow the pool to lower the latency
+
+        :param queued: number of actions waiting for a result
+        :type queued: int
+        :param capacity: number of actions the pool runs at once
+        :type capacity: int
+        :return: decision
+        :rtype: str
+        """
+        if queued <= capacity:
+            # Processes are available, the workers are too slow to launch the actions
+            if self.workers < self.max_workers:
+                self.workers += 1
+                return 'grow-workers'
+            return 'hold'
+
+        # The actions are waiting for a free process
+        wanted = int(math.ceil(float(queued) / self.processes_by_worker))
+        if self.workers < self.max_workers:
+            self.workers = min(self.max_workers, wanted)
+            return 'grow-workers'
+        if self.processes_by_worker < self.max_processes:
+            wanted = int(math.ceil(float(queued) / self.workers))
+            self.processes_by_worker = min(self.max_processes, wanted)
+            return 'grow-processes'
+        return 'hold'
+
+    def _shrink(self):
+        """Shrink the pool, its load is low
+
+        :return: decision
+        :rtype: str
+        """
+        if self.processes_by_worker > self.min_processes:
+            self.processes_by_worker = max(self.min_processes, self.processes_by_worker // 2)
+            return 'shrink-processes'
+        if self.workers > self.min_workers:
+            self.workers -= 1
+            return 'shrink-workers'
+        return 'hold'
@@ -565,7 +565,7 @@ class AlignakTest(unittest2.TestCase):
         @verified
         :return:
         """
-        self.schedulers['scheduler-master'].sched.actions = {}
+        self.schedulers['scheduler-master'].sched.actions.clear()
 
     def assert_actions_count(self, number):
         """
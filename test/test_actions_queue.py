@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2016: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+This file test the scheduler actions queues
+"""
+
+import time
+from alignak_test import AlignakTest
+from alignak.actionsqueue import ActionsQueue, INTERNAL_CHECKS, MASTER_NOTIFICATIONS
+from alignak.check import Check
+from alignak.notification import Notification
+
+
+class TestActionsQueue(AlignakTest):
+    """
+    This class test the scheduler actions queues
+    """
+
+    def test_pop_launchable(self):
+        """ Only the scheduled and launchable checks are popped, ordered by t_to_go
+
+        :return: None
+        """
+        self.print_header()
+        now = time.time()
+        queue = ActionsQueue('poller_tag')
+        late = Check({'command': 'late', 't_to_go': now - 10})
+        early = Check({'command': 'early', 't_to_go': now - 20})
+        future = Check({'command': 'future', 't_to_go': now + 3600})
+        tagged = Check({'command': 'tagged', 't_to_go': now - 5, 'poller_tag': 'north'})
+        internal = Check({'command': '_internal', 't_to_go': now - 5, 'internal': True})
+        for chk in (late, early, future, tagged, internal):
+            queue[chk.uuid] = chk
+        assert 5 == len(queue)
+
+        assert [early, late] == queue.pop_launchable([('None', 'fork')], now)
+        # Already popped
+        assert [] == queue.pop_launchable([('None', 'fork')], now)
+        assert [tagged] == queue.pop_launchable([('north', 'fork')], now)
+        assert [internal] == queue.pop_launchable([INTERNAL_CHECKS], now)
+        assert [] == queue.pop_launchable([('None', 'worldmap')], now)
+
+        # The popped checks are still in the queue
+        assert 5 == len(queue)
+
+    def test_reschedule(self):
+        """ A check is pushed again when it is rescheduled or its t_to_go changes
+
+        :return: None
+        """
+        self.print_header()
+        now = time.time()
+        queue = ActionsQueue('poller_tag')
+        chk = Check({'command': 'check', 't_to_go': now + 3600})
+        queue[chk.uuid] = chk
+        assert [] == queue.pop_launchable([('None', 'fork')], now)
+
+        # Forced check
+        chk.t_to_go = now - 1
+        assert [chk] == queue.pop_launchable([('None', 'fork')], now)
+
+        # Orphaned check
+        chk.status = 'inpoller'
+        assert [] == queue.pop_launchable([('None', 'fork')], now)
+        chk.status = 'scheduled'
+        assert [chk] == queue.pop_launchable([('None', 'fork')], now)
+
+        # Not scheduled anymore
+        chk.status = 'inpoller'
+        chk.t_to_go = now - 2
+        assert [] == queue.pop_launchable([('None', 'fork')], now)
+
+        # Deleted checks are not popped and not pushed anymore
+        chk.status = 'scheduled'
+        del queue[chk.uuid]
+        assert chk.actions_queue is None
+        chk.t_to_go = now - 3
+        assert [] == queue.pop_launchable([('None', 'fork')], now)
+
+    def test_notifications(self):
+        """ Master and children notifications are in different launch queues
+
+        :return: None
+        """
+        self.print_header()
+        now = time.time()
+        queue = ActionsQueue('reactionner_tag')
+        master = Notification({'command': 'VOID', 't_to_go': now - 1, 'contact': None})
+        child = Notification({'command': 'notify', 't_to_go': now - 1, 'contact': 'uuid',
+                              'reactionner_tag': 'south'})
+        queue[master.uuid] = master
+        queue[child.uuid] = child
+
+        assert [] == queue.pop_launchable([('None', 'fork')], now)
+        assert [child] == queue.pop_launchable([('south', 'fork')], now)
+        assert [master] == queue.pop_launchable([MASTER_NOTIFICATIONS], now)
+
+        # Repeated master notification
+        master.t_to_go = now + 60
+        assert [] == queue.pop_launchable([MASTER_NOTIFICATIONS], now)
+        assert [master] == queue.pop_launchable([MASTER_NOTIFICATIONS], now + 61)
+
+        queue.clear()
+        assert master.actions_queue is None
+        assert {} == queue.launch_queues
+
+    def test_status_buckets(self):
+        """ The checks are registered in the bucket of their current status
+
+        :return: None
+        """
+        self.print_header()
+        queue = ActionsQueue('poller_tag')
+        chk1 = Check({'command': 'check1'})
+        chk2 = Check({'command': 'check2'})
+        queue[chk1.uuid] = chk1
+        queue[chk2.uuid] = chk2
+        assert 2 == queue.count_by_status('scheduled')
+        assert 0 == queue.count_by_status('zombie')
+
+        chk1.status = 'inpoller'
+        assert [chk2] == queue.get_by_status('scheduled')
+        assert [chk1] == queue.get_by_status('inpoller')
+
+        chk1.status = 'waitconsume'
+        chk2.status = 'zombie'
+        assert [] == queue.get_by_status('scheduled')
+        assert [] == queue.get_by_status('inpoller')
+        assert [chk1] == queue.get_by_status('waitconsume')
+        assert [chk2] == queue.get_by_status('zombie')
+
+        # A copy of a check is not registered in the queue
+        other = Check({'command': 'check1', 'uuid': chk1.uuid})
+        other.actions_queue = queue
+        other.status = 'zombie'
+        assert [chk2] == queue.get_by_status('zombie')
+
+        del queue[chk2.uuid]
+        assert [] == queue.get_by_status('zombie')
+        chk2.status = 'scheduled'
+        assert [] == queue.get_by_status('scheduled')
+
+    def test_scheduler_status_buckets(self):
+        """ The scheduler recurrent works use the checks status buckets
+
+        :return: None
+        """
+        self.print_header()
+        self.setup_with_file('cfg/cfg_default.cfg')
+        sched = self.schedulers['scheduler-master'].sched
+
+        host = sched.hosts.find_by_name("test_host_0")
+        host.checks_in_progress = []
+        host.act_depend_of = []  # ignore the router
+        host.event_handler_enabled = False
+
+        sched.schedule()
+        counts = sched.get_checks_status_counts()
+        assert len(sched.checks) == counts['total']
+        assert len(sched.checks) == counts['scheduled']
+        assert counts == sched.get_checks_status_counts(dict(sched.checks))
+
+        self.scheduler_loop(1, [[host, 0, 'UP']])
+        assert 0 == sched.checks.count_by_status('waitconsume')
+        assert 0 == sched.checks.count_by_status('zombie')
+        assert 0 == sched.actions.count_by_status('zombie')
+
+    def test_registry(self):
+        """ The actions are registered in the registry of the queue
+
+        :return: None
+        """
+        self.print_header()
+        registry = {'other': 'object'}
+        queue = ActionsQueue('poller_tag', registry)
+        chk1 = Check({'command': 'check1'})
+        chk2 = Check({'command': 'check2'})
+        queue[chk1.uuid] = chk1
+        queue[chk2.uuid] = chk2
+        assert chk1 is registry[chk1.uuid]
+        assert chk2 is registry[chk2.uuid]
+
+        assert chk1 is queue.pop(chk1.uuid)
+        assert chk1.uuid not in registry
+        queue.clear()
+        assert {'other': 'object'} == registry
+
+    def test_find_item_by_id(self):
+        """ The scheduler objects are found with their uuid
+
+        :return: None
+        """
+        self.print_header()
+        self.setup_with_file('cfg/cfg_default.cfg')
+        sched = self.schedulers['scheduler-master'].sched
+        host = sched.hosts.find_by_name("test_host_0")
+        svc = sched.services.find_srv_by_name_and_hostname("test_host_0", "test_ok_0")
+        sched.schedule()
+        chk = sched.checks[svc.checks_in_progress[0]]
+
+        assert host is sched.find_item_by_id(host.uuid)
+        assert svc is sched.find_item_by_id(svc.uuid)
+        assert chk is sched.find_item_by_id(chk.uuid)
+        for contact in sched.contacts:
+            assert contact is sched.find_item_by_id(contact.uuid)
+        assert host is sched.get_host(host.uuid)
+        assert None is sched.get_host(svc.uuid)
+        assert svc is sched.get_service(svc.uuid)
+        assert svc is sched.get_ref_of(chk)
+
+        del sched.checks[chk.uuid]
+        with self.assertRaises(AttributeError):
+            sched.find_item_by_id(chk.uuid)
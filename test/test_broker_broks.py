@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2016: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+This file tests the broks given by the broker to its internal modules
+"""
+
+import time
+
+from alignak_test import AlignakTest
+from alignak.basemodule import BaseModule
+from alignak.brok import Brok
+from alignak.daemons.brokerdaemon import Broker
+from alignak.modulesmanager import ModulesManager
+from alignak.objects.module import Module
+
+
+class BatchModule(BaseModule):
+    """Internal module keeping the batches of broks it got"""
+
+    def __init__(self, mod_conf, duration=0):
+        BaseModule.__init__(self, mod_conf)
+        self.batches = []
+        self.duration = duration
+
+    def manage_broks(self, broks):
+        self.batches.append([brok.type for brok in broks])
+        time.sleep(self.duration)
+
+
+class TestBrokerBroks(AlignakTest):
+    """
+    This class tests the broks management of the broker internal modules
+    """
+
+    def setUp(self):
+        self.broker = Broker(None, False, False, False, False)
+        self.broker.modules_manager = ModulesManager('broker', None)
+        self.broker.broks_dispatch_batch_size = 3
+
+    def add_module(self, duration=0, brok_types=None):
+        """Add an internal module to the broker
+
+        :return: the module
+        """
+        params = {'module_alias': 'batch', 'module_types': 'batch', 'python_name': 'batch'}
+        if brok_types is not None:
+            params['brok_types'] = brok_types
+        module = BatchModule(Module(params), duration)
+        self.broker.modules_manager.instances.append(module)
+        return module
+
+    def test_batches(self):
+        """ The internal modules get the broks by batches, in their reception order
+
+        :return: None
+        """
+        self.print_header()
+        module = self.add_module()
+        self.broker.broks = [Brok({'type': 'brok_%d' % idx, 'data': {}}) for idx in range(7)]
+
+        assert 7 == self.broker.manage_internal_broks()
+        assert [['brok_0', 'brok_1', 'brok_2'], ['brok_3', 'brok_4', 'brok_5'],
+                ['brok_6']] == module.batches
+        assert [] == self.broker.broks
+        assert 7 == self.broker.broks_managed
+
+    def test_late_modules(self):
+        """ The broks the internal modules did not have time to manage are kept
+
+        :return: None
+        """
+        self.print_header()
+        module = self.add_module(duration=0.2)
+        self.broker.broks = [Brok({'type': 'brok_%d' % idx, 'data': {}}) for idx in range(7)]
+
+        assert 3 == self.broker.manage_internal_broks(max_duration=0.1)
+        assert [['brok_0', 'brok_1', 'brok_2']] == module.batches
+        assert ['brok_3', 'brok_4', 'brok_5', 'brok_6'] == \
+            [brok.type for brok in self.broker.broks]
+
+    def test_brok_types(self):
+        """ The internal modules only get the broks types they want
+
+        :return: None
+        """
+        self.print_header()
+        module = self.add_module()
+        checks_module = self.add_module(brok_types='brok_1, brok_4')
+        assert set(['brok_1', 'brok_4']) == checks_module.brok_types
+        assert set(['brok_1', 'brok_4']) == \
+            self.broker.modules_manager.get_brok_types([checks_module])
+        assert None is self.broker.modules_manager.get_brok_types([module, checks_module])
+        self.broker.broks = [Brok({'type': 'brok_%d' % idx, 'data': {}}) for idx in range(7)]
+
+        assert 7 == self.broker.manage_internal_broks()
+        assert 3 == len(module.batches)
+        assert [['brok_1'], ['brok_4'], []] == checks_module.batches
+
+    def test_no_internal_module(self):
+        """ Without internal modules, the broks are not kept
+
+        :return: None
+        """
+        self.print_header()
+        self.broker.broks = [Brok({'type': 'brok_%d' % idx, 'data': {}}) for idx in range(7)]
+
+        assert 0 == self.broker.manage_internal_broks()
+        assert [] == self.broker.broks
@@ -0,0 +1,268 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2016: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+This file test the configuration changes sent to the schedulers (configuration delta)
+"""
+
+import cherrypy
+
+from alignak_test import AlignakTest
+from alignak.configdelta import DELTA_TYPES, get_conf_fingerprints, get_conf_delta
+from alignak.dirtyitems import TOPOLOGY_CHANGE
+from alignak.dispatcher import Dispatcher
+from alignak.http.scheduler_interface import SchedulerInterface
+
+
+class TestConfigDelta(AlignakTest):
+    """
+    This class tests the configuration delta
+    """
+
+    def get_delta_package(self, sched_daemon):
+        """Get the configuration delta package of the arbiter configuration for a
+        scheduler daemon that got a former configuration
+
+        :param sched_daemon: scheduler daemon
+        :return: the arbiter configuration and the delta package
+        """
+        link = self.arbiter.dispatcher.schedulers.find_by_name('scheduler-master')
+        link.get_conf_fingerprints = lambda: {
+            'push_flavor': sched_daemon.sched.push_flavor,
+            'fingerprints': sched_daemon.sched.conf_fingerprints
+        }
+        realm = self.arbiter.conf.realms.find_by_name('All')
+        conf = link.conf
+        return conf, Dispatcher.get_conf_delta_package(realm, conf, link)
+
+    def test_same_configuration(self):
+        """ The fingerprints of a configuration do not change when it is loaded again
+
+        :return: None
+        """
+        self.print_header()
+        self.setup_with_file('cfg/cfg_default.cfg')
+        fingerprints = get_conf_fingerprints(self.arbiter.conf.confs.values()[0])
+
+        self.setup_with_file('cfg/cfg_default.cfg')
+        conf = self.arbiter.conf.confs.values()[0]
+        assert fingerprints == get_conf_fingerprints(conf)
+
+        delta = get_conf_delta(conf, fingerprints, fingerprints)
+        for items_type in DELTA_TYPES:
+            assert [] == delta['added'][items_type]
+            assert [] == delta['changed'][items_type]
+            assert [] == delta['removed'][items_type]
+
+        # Global parameters changed, the whole configuration must be sent
+        self.setup_with_file('cfg/cfg_default_alignak_name.cfg')
+        conf = self.arbiter.conf.confs.values()[0]
+        assert get_conf_delta(conf, get_conf_fingerprints(conf), fingerprints) is None
+
+    def test_add_and_remove_objects(self):
+        """ Add then remove a host and some services with configuration deltas
+
+        :return: None
+        """
+        self.print_header()
+        self.setup_with_file('cfg/cfg_default.cfg')
+        sched_daemon = self.schedulers['scheduler-master']
+        scheduler = sched_daemon.sched
+
+        host = scheduler.hosts.find_by_name('test_host_0')
+        host.checks_in_progress = []
+        host.act_depend_of = []  # ignore the router
+        router = scheduler.hosts.find_by_name('test_router_0')
+        router.checks_in_progress = []
+        router.act_depend_of = []  # ignore the router
+        svc = scheduler.services.find_srv_by_name_and_hostname('test_host_0', 'test_ok_0')
+        svc.checks_in_progress = []
+        svc.act_depend_of = []  # no hostchecks on critical checkresults
+        self.scheduler_loop(2, [[host, 2, 'DOWN'], [svc, 2, 'CRITICAL']])
+        assert 'DOWN' == host.state
+        assert 'CRITICAL' == svc.state
+        nb_hosts = len(scheduler.hosts)
+        nb_services = len(scheduler.services)
+
+        # A host and two services are added
+        self.setup_with_file('cfg/cfg_config_delta.cfg')
+        conf, package = self.get_delta_package(sched_daemon)
+        assert 'conf' not in package
+        delta = package['conf_delta']
+        assert ['test_host_delta'] == [h['host_name'] for h in delta['added']['hosts']]
+        assert 2 == len(delta['added']['services'])
+        # The services list of the host changed, and the host group got a new member
+        assert ['test_host_0'] == [h['host_name'] for h in delta['changed']['hosts']]
+        assert ['hostgroup_01'] == [g['hostgroup_name'] for g in delta['changed']['hostgroups']]
+
+        sched_daemon.new_conf = package
+        sched_daemon.setup_new_conf()
+        assert scheduler is sched_daemon.sched
+        assert conf.uuid == sched_daemon.conf.uuid
+        assert {conf.uuid: conf.push_flavor} == sched_daemon.what_i_managed()
+        assert scheduler.conf_fingerprints == package['fingerprints']
+        assert nb_hosts + 1 == len(scheduler.hosts)
+        assert nb_services + 2 == len(scheduler.services)
+
+        # The changed host kept its state
+        assert host is scheduler.hosts.find_by_name('test_host_0')
+        assert 'DOWN' == host.state
+        assert 'CRITICAL' == svc.state
+        new_svc = scheduler.services.find_srv_by_name_and_hostname('test_host_0',
+                                                                    'test_ok_delta')
+        assert new_svc.uuid in host.services
+        assert host.uuid == new_svc.host
+        hostgroup = scheduler.hostgroups.find_by_name('hostgroup_01')
+
+        # The new objects are registered and scheduled
+        new_host = scheduler.hosts.find_by_name('test_host_delta')
+        assert new_host.uuid in hostgroup.members
+        assert new_host.uuid in scheduler.items_by_uuid
+        assert new_host.instance_id == conf.instance_id
+        assert host.instance_id == conf.instance_id
+        new_host_svc = scheduler.services.find_srv_by_name_and_hostname('test_host_delta',
+                                                                         'test_ok_delta')
+        assert new_host_svc.uuid in new_host.services
+        assert new_host_svc.check_period in scheduler.timeperiods.items
+        scheduler.schedule()
+        assert new_host_svc.checks_in_progress
+        check_uuid = new_host_svc.checks_in_progress[0]
+        assert check_uuid in scheduler.checks
+
+        # Back to the former configuration: the objects are removed
+        self.setup_with_file('cfg/cfg_default.cfg')
+        conf, package = self.get_delta_package(sched_daemon)
+        sched_daemon.new_conf = package
+        sched_daemon.setup_new_conf()
+        assert nb_hosts == len(scheduler.hosts)
+        assert nb_services == len(scheduler.services)
+        assert scheduler.hosts.find_by_name('test_host_delta') is None
+        assert scheduler.services.find_srv_by_name_and_hostname('test_host_delta',
+                                                                 'test_ok_delta') is None
+        assert new_host.uuid not in scheduler.items_by_uuid
+        assert new_host.uuid not in hostgroup.members
+        assert new_svc.uuid not in host.services
+        assert check_uuid not in scheduler.checks
+        assert host is scheduler.hosts.find_by_name('test_host_0')
+        assert 'DOWN' == host.state
+
+    def test_topology_change(self):
+        """ The changed hosts which dependencies changed get their topology_change flag set
+
+        :return: None
+        """
+        self.print_header()
+        self.setup_with_file('cfg/cfg_default.cfg')
+        sched_daemon = self.schedulers['scheduler-master']
+        scheduler = sched_daemon.sched
+
+        # A child host is added to test_host_0
+        self.setup_with_file('cfg/cfg_config_delta_parents.cfg')
+        _, package = self.get_delta_package(sched_daemon)
+        assert ['test_host_child'] == \
+            [h['host_name'] for h in package['conf_delta']['added']['hosts']]
+        assert 'test_host_0' in \
+            [h['host_name'] for h in package['conf_delta']['changed']['hosts']]
+        sched_daemon.new_conf = package
+        sched_daemon.setup_new_conf()
+
+        host = scheduler.hosts.find_by_name('test_host_0')
+        child = scheduler.hosts.find_by_name('test_host_child')
+        assert child.uuid in host.child_dependencies
+        assert host.topology_change
+        assert not scheduler.hosts.find_by_name('test_router_0').topology_change
+        assert host in scheduler.dirty_items.get(TOPOLOGY_CHANGE)
+
+        scheduler.reset_topology_change_flag()
+        assert not host.topology_change
+        assert [] == scheduler.dirty_items.get(TOPOLOGY_CHANGE)
+
+    def put_conf_and_run(self, sched_daemon, package):
+        """Put a configuration package as the arbiter does, then run a scheduler daemon
+        loop turn, stopped after the first scheduler loop turn
+
+        :param sched_daemon: scheduler daemon
+        :param package: configuration package
+        :return: True if the scheduler ran its loop
+        """
+        scheduler = sched_daemon.sched
+        cherrypy.request.json = {'conf': package}
+        SchedulerInterface(sched_daemon).put_conf()
+        assert not scheduler.must_run
+
+        turns = []
+
+        def one_turn():
+            turns.append(scheduler.must_run)
+            scheduler.die()
+        recurrent_works = scheduler.recurrent_works
+        scheduler.recurrent_works = {0: ('one_turn', one_turn, 1)}
+        try:
+            sched_daemon.do_loop_turn()
+        finally:
+            scheduler.recurrent_works = recurrent_works
+        return [True] == turns
+
+    def test_put_conf_delta(self):
+        """ The scheduler goes on scheduling after a configuration delta is put, applied or not
+
+        :return: None
+        """
+        self.print_header()
+        self.setup_with_file('cfg/cfg_default.cfg')
+        sched_daemon = self.schedulers['scheduler-master']
+        scheduler = sched_daemon.sched
+        push_flavor = scheduler.push_flavor
+
+        self.setup_with_file('cfg/cfg_config_delta.cfg')
+        _, package = self.get_delta_package(sched_daemon)
+        assert 'conf_delta' in package
+        assert self.put_conf_and_run(sched_daemon, package)
+        assert scheduler is sched_daemon.sched
+        assert scheduler.hosts.find_by_name('test_host_delta') is not None
+
+        # A dropped delta, the scheduler goes on with its configuration
+        self.setup_with_file('cfg/cfg_default.cfg')
+        _, package = self.get_delta_package(sched_daemon)
+        package['conf_delta']['base_flavor'] = push_flavor
+        assert self.put_conf_and_run(sched_daemon, package)
+        assert scheduler.hosts.find_by_name('test_host_delta') is not None
+
+    def test_not_based_delta(self):
+        """ A delta which is not based on the scheduler configuration is dropped
+
+        :return: None
+        """
+        self.print_header()
+        self.setup_with_file('cfg/cfg_default.cfg')
+        sched_daemon = self.schedulers['scheduler-master']
+        scheduler = sched_daemon.sched
+        push_flavor = scheduler.push_flavor
+
+        self.setup_with_file('cfg/cfg_config_delta.cfg')
+        _, package = self.get_delta_package(sched_daemon)
+        package['conf_delta']['base_flavor'] = push_flavor + 1
+        sched_daemon.new_conf = package
+        sched_daemon.setup_new_conf()
+        assert scheduler.hosts.find_by_name('test_host_delta') is None
+        assert push_flavor == scheduler.push_flavor
+        # The arbiter will send the whole configuration
+        assert {} == scheduler.conf_fingerprints
+        assert {} == self.get_delta_package(sched_daemon)[1]
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2016: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+This file test the parsing of the configuration files, serial and in parallel
+"""
+
+import os
+import shutil
+import logging
+import tempfile
+
+from alignak_test import AlignakTest
+from alignak.daemons.arbiterdaemon import Arbiter
+from alignak.objects.config import Config, split_config_buf, PARSING_FILES_PER_PROCESS
+
+
+class TestConfigParsing(AlignakTest):
+    """
+    This class tests the configuration files parsing
+    """
+
+    def setUp(self):
+        self.setup_logger()
+        self.logger.setLevel(logging.INFO)
+
+        # Enough generated files to be parsed by 3 processes
+        self.nb_files = 3 * PARSING_FILES_PER_PROCESS
+        self.tmp_dir = tempfile.mkdtemp()
+        shutil.copytree('cfg/default', os.path.join(self.tmp_dir, 'default'))
+        os.mkdir(os.path.join(self.tmp_dir, 'generated'))
+        for i in range(self.nb_files):
+            with open(os.path.join(self.tmp_dir, 'generated', 'host_%02d.cfg' % i), 'w') as cfg:
+                cfg.write("# Generated host\n"
+                          "define host{\n"
+                          "    host_name    test_host_gen_%02d\n"
+                          "    alias        Generated \\\n"
+                          "                 host %d\n"
+                          "    use          generic-host\n"
+                          "}\n"
+                          "define service {\n"
+                          "    host_name             test_host_gen_%02d\n"
+                          "    service_description   test_ok_gen\n"
+                          "    use                   generic-service\n"
+                          "    check_command         check_service!ok\n"
+                          "}\n" % (i, i, i))
+        self.cfg_file = os.path.join(self.tmp_dir, 'cfg_generated.cfg')
+        with open(self.cfg_file, 'w') as cfg:
+            cfg.write("cfg_dir=default\ncfg_dir=generated\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_split_config_buf(self):
+        """ The configuration buffer is split into the configuration files
+
+        :return: None
+        """
+        self.print_header()
+        assert ['define host{\n}\n'] == split_config_buf('define host{\n}\n')
+        assert ['\n', '# IMPORTEDFROM=a.cfg\nline\n', '# IMPORTEDFROM=b.cfg\n'] == \
+            split_config_buf('\n# IMPORTEDFROM=a.cfg\nline\n# IMPORTEDFROM=b.cfg\n')
+
+        conf = Config()
+        files_bufs = split_config_buf(conf.read_config([self.cfg_file]))
+        # The main file, its files and the generated files (and the line return before all)
+        assert len(files_bufs) > self.nb_files + 1
+
+    def test_parallel_parsing(self):
+        """ The configuration files parsed in parallel give the same objects, in the same order
+
+        :return: None
+        """
+        self.print_header()
+        conf = Config()
+        objects = conf.read_config_buf(conf.read_config([self.cfg_file]))
+        parallel_conf = Config()
+        parallel_objects = parallel_conf.read_config_buf(
+            parallel_conf.read_config([self.cfg_file]), 3)
+        self.assert_any_log_match(r'Parsing \d+ configuration files with 3 processes')
+        assert objects == parallel_objects
+        assert conf.cfg_dir == parallel_conf.cfg_dir
+
+        # The objects location is the line of their define
+        host = [h for h in parallel_objects['host']
+                if h.get('host_name') == ['test_host_gen_07']][0]
+        assert ['%s:2' % os.path.join(self.tmp_dir, 'generated', 'host_07.cfg')] == \
+            host['imported_from']
+        assert ['Generated host 7'] == host['alias']
+        service = [s for s in parallel_objects['service']
+                   if s.get('host_name') == ['test_host_gen_07']][0]
+        assert ['%s:8' % os.path.join(self.tmp_dir, 'generated', 'host_07.cfg')] == \
+            service['imported_from']
+
+    def test_arbiter_parallel_parsing(self):
+        """ The arbiter loads a configuration parsed in parallel
+
+        :return: None
+        """
+        self.print_header()
+        arbiter = Arbiter(None, [self.cfg_file], False, False, False, False,
+                          '/tmp/arbiter.log', 'arbiter-master')
+        arbiter.config_parsing_processes = 2
+        arbiter.load_monitoring_config_file()
+        assert arbiter.conf.conf_is_correct
+        self.assert_any_log_match(r'Parsing \d+ configuration files with 2 processes')
+        for i in range(self.nb_files):
+            assert arbiter.conf.hosts.find_by_name('test_host_gen_%02d' % i) is not None
+            assert arbiter.conf.services.find_srv_by_name_and_hostname(
+                'test_host_gen_%02d' % i, 'test_ok_gen') is not None
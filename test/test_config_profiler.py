@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2016: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+This file test the profiling of the arbiter configuration loading
+"""
+
+import os
+import json
+import shutil
+import logging
+import tempfile
+
+from alignak_test import AlignakTest
+from alignak.daemons.arbiterdaemon import Arbiter
+from alignak.stats import statsmgr
+
+
+class TestConfigProfiler(AlignakTest):
+    """
+    This class tests the configuration loading profiler
+    """
+
+    def setUp(self):
+        self.setup_logger()
+        self.logger.setLevel(logging.INFO)
+        self.tmp_dir = tempfile.mkdtemp()
+        self.profile = os.path.join(self.tmp_dir, 'profile.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_profile(self):
+        """ The configuration loading phases are profiled and reported
+
+        :return: None
+        """
+        self.print_header()
+        arbiter = Arbiter(None, ['cfg/cfg_default.cfg'], False, False, False, False,
+                          '/tmp/arbiter.log', 'arbiter-master', profile_config=self.profile)
+        arbiter.load_monitoring_config_file()
+        assert arbiter.conf.conf_is_correct
+
+        phases = [phase['phase'] for phase in arbiter.profiler.phases]
+        assert phases.index('read_config') < phases.index('apply_inheritance') < \
+            phases.index('linkify') < phases.index('cut_into_parts')
+        for phase in arbiter.profiler.phases:
+            assert phase['wall_time'] >= 0
+            assert phase['cpu_time'] >= 0
+        # The objects are counted at the end of each phase
+        profile = dict((phase['phase'], phase) for phase in arbiter.profiler.phases)
+        assert 'hosts' not in profile['read_config']['objects']
+        assert len(arbiter.conf.hosts) == profile['cut_into_parts']['objects']['hosts']
+
+        # The profile is logged, sent as statistics and written in the JSON file
+        self.assert_any_log_match('Configuration loading profile:')
+        self.assert_any_log_match(r'apply_inheritance\s+\d+\.\d+\s+\d+\.\d+')
+        assert 'configuration.apply_inheritance.wall' in statsmgr.stats
+        assert 'configuration.cut_into_parts.cpu' in statsmgr.stats
+        with open(self.profile) as profile_file:
+            report = json.load(profile_file)
+        assert phases == [phase['phase'] for phase in report['phases']]
+        assert abs(report['total']['wall_time'] -
+                   sum(phase['wall_time'] for phase in report['phases'])) < 0.001
+
+    def test_no_profile(self):
+        """ The configuration loading is not profiled by default
+
+        :return: None
+        """
+        self.print_header()
+        arbiter = Arbiter(None, ['cfg/cfg_default.cfg'], False, False, False, False,
+                          '/tmp/arbiter.log', 'arbiter-master')
+        arbiter.load_monitoring_config_file()
+        assert arbiter.conf.conf_is_correct
+        assert [] == arbiter.profiler.phases
+        self.assert_no_log_match('Configuration loading profile:')
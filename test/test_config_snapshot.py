@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2016: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+This file test the compiled configuration snapshot of the arbiter
+"""
+
+import os
+import time
+import shutil
+import tempfile
+
+from alignak_test import AlignakTest
+from alignak.daemons.arbiterdaemon import Arbiter
+from alignak.daemons.schedulerdaemon import Alignak
+from alignak.dispatcher import Dispatcher
+
+
+class TestConfigSnapshot(AlignakTest):
+    """
+    This class tests the configuration snapshot
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cfg_dir = os.path.join(self.tmp_dir, 'cfg')
+        shutil.copytree('cfg/default', os.path.join(self.cfg_dir, 'default'))
+        shutil.copytree('cfg/triggers', os.path.join(self.cfg_dir, 'triggers'))
+        shutil.copy('cfg/cfg_default.cfg', self.cfg_dir)
+        shutil.copy('cfg/cfg_config_snapshot.cfg', self.cfg_dir)
+        self.snapshot = os.path.join(self.tmp_dir, 'arbiterd.snapshot')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def load_arbiter(self, configuration_file, rebuild_config=False):
+        """Load the configuration with an arbiter which configuration snapshot is enabled
+
+        :param configuration_file: configuration file name
+        :param rebuild_config: arbiter rebuild_config parameter
+        :return: the arbiter and True if the configuration was built (not from the snapshot)
+        """
+        arbiter = Arbiter(None, [os.path.join(self.cfg_dir, configuration_file)], False, False,
+                          False, False, '/tmp/arbiter.log', 'arbiter-master',
+                          rebuild_config=rebuild_config)
+        arbiter.config_snapshot = self.snapshot
+        # The configuration loaded from the snapshot replaces the arbiter one
+        conf = arbiter.conf
+        arbiter.load_monitoring_config_file()
+        assert arbiter.conf.conf_is_correct
+        return arbiter, arbiter.conf is conf
+
+    def test_snapshot(self):
+        """ An unchanged configuration is loaded from the snapshot
+
+        :return: None
+        """
+        self.print_header()
+        assert not os.path.exists(self.snapshot)
+        arbiter, built = self.load_arbiter('cfg_default.cfg')
+        assert built
+        assert os.path.exists(self.snapshot)
+        hosts = sorted(h.get_name() for h in arbiter.conf.hosts)
+
+        arbiter, built = self.load_arbiter('cfg_default.cfg')
+        assert not built
+        assert hosts == sorted(h.get_name() for h in arbiter.conf.hosts)
+        assert arbiter.myself.get_name() == 'arbiter-master'
+        assert arbiter.is_master
+        assert arbiter.myself.alive
+        assert arbiter.conf.confs is arbiter.confs
+        assert arbiter.port == arbiter.myself.port
+
+        # The configuration is dispatched as a built one
+        dispatcher = Dispatcher(arbiter.conf, arbiter.myself)
+        dispatcher.prepare_dispatch()
+        link = dispatcher.schedulers.find_by_name('scheduler-master')
+        sched_daemon = Alignak([], False, False, True, '/tmp/scheduler.log')
+        sched_daemon.load_modules_manager(link.name)
+        sched_daemon.new_conf = link.conf_package
+        sched_daemon.setup_new_conf()
+        assert hosts == sorted(h.get_name() for h in sched_daemon.sched.hosts)
+
+        # Rebuild the configuration on demand
+        arbiter, built = self.load_arbiter('cfg_default.cfg', rebuild_config=True)
+        assert built
+        arbiter, built = self.load_arbiter('cfg_default.cfg')
+        assert not built
+
+    def test_changed_configuration(self):
+        """ The configuration is built when a configuration file changed
+
+        :return: None
+        """
+        self.print_header()
+        self.load_arbiter('cfg_default.cfg')
+        _, built = self.load_arbiter('cfg_default.cfg')
+        assert not built
+
+        # Only the modification time changed
+        hosts_file = os.path.join(self.cfg_dir, 'default', 'hosts.cfg')
+        os.utime(hosts_file, (time.time() + 10, time.time() + 10))
+        _, built = self.load_arbiter('cfg_default.cfg')
+        assert built
+        _, built = self.load_arbiter('cfg_default.cfg')
+        assert not built
+
+        # A new configuration file
+        with open(os.path.join(self.cfg_dir, 'default', 'new_host.cfg'), 'w') as cfg_file:
+            cfg_file.write("define host{\n"
+                           "    host_name    test_host_new\n"
+                           "    use          generic-host\n"
+                           "}\n")
+        arbiter, built = self.load_arbiter('cfg_default.cfg')
+        assert built
+        assert arbiter.conf.hosts.find_by_name('test_host_new') is not None
+
+        # Another configuration
+        _, built = self.load_arbiter('cfg_config_snapshot.cfg')
+        assert built
+
+    def test_triggers(self):
+        """ The triggers are compiled again when they are loaded from the snapshot
+
+        :return: None
+        """
+        self.print_header()
+        self.load_arbiter('cfg_config_snapshot.cfg')
+        arbiter, built = self.load_arbiter('cfg_config_snapshot.cfg')
+        assert not built
+        assert len(arbiter.conf.triggers) > 0
+        for trigger in arbiter.conf.triggers:
+            assert trigger.code_bin is not None
+
+        # A trigger file changed
+        trigger_file = os.path.join(self.cfg_dir, 'triggers', 'triggers.d', 'simple_cpu.trig')
+        os.utime(trigger_file, (time.time() + 10, time.time() + 10))
+        _, built = self.load_arbiter('cfg_config_snapshot.cfg')
+        assert built
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2016: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+This file test the scheduler dirty items sets
+"""
+
+import time
+from alignak_test import AlignakTest
+from alignak.dirtyitems import NEW_ACTIONS, NEW_BROKS, TOPOLOGY_CHANGE, DOWNTIMES
+from alignak.downtime import Downtime
+
+
+class TestDirtyItems(AlignakTest):
+    """
+    This class test the scheduler dirty items sets
+    """
+
+    def setUp(self):
+        self.setup_with_file('cfg/cfg_default.cfg')
+        assert self.conf_is_correct
+        self._sched = self.schedulers['scheduler-master'].sched
+
+    def test_actions_and_broks(self):
+        """ Only the items that raised actions or broks are registered
+
+        :return: None
+        """
+        self.print_header()
+        dirty = self._sched.dirty_items
+        host = self._sched.hosts.find_by_name("test_host_0")
+        svc = self._sched.services.find_srv_by_name_and_hostname("test_host_0", "test_ok_0")
+        self._sched.get_new_actions()
+        self._sched.get_new_broks()
+        assert [] == dirty.get(NEW_ACTIONS)
+        assert [] == dirty.get(NEW_BROKS)
+
+        svc.broks.append(svc.get_update_status_brok())
+        host.broks.extend([host.get_update_status_brok()])
+        assert set([host, svc]) == set(dirty.get(NEW_BROKS))
+        assert [] == dirty.get(NEW_ACTIONS)
+
+        nb_broks = len(self._sched.brokers['broker-master']['broks'])
+        self._sched.get_new_broks()
+        assert [] == dirty.get(NEW_BROKS)
+        assert [] == svc.broks
+        assert [] == host.broks
+        assert nb_broks + 2 == len(self._sched.brokers['broker-master']['broks'])
+
+        # The emptied lists still register their item
+        svc.broks.append(svc.get_update_status_brok())
+        assert [svc] == dirty.get(NEW_BROKS)
+
+        # An event handler is an action
+        svc.get_event_handlers(self._sched.hosts, self._sched.macromodulations,
+                               self._sched.timeperiods, ext_cmd=True)
+        assert [svc] == dirty.get(NEW_ACTIONS)
+        self._sched.get_new_actions()
+        assert [] == dirty.get(NEW_ACTIONS)
+        assert [] == svc.actions
+
+    def test_topology_change(self):
+        """ Only the items which topology changed are reset
+
+        :return: None
+        """
+        self.print_header()
+        host = self._sched.hosts.find_by_name("test_host_0")
+        host.set_topology_change()
+        assert host.topology_change
+        assert [host] == self._sched.dirty_items.get(TOPOLOGY_CHANGE)
+
+        self._sched.reset_topology_change_flag()
+        assert not host.topology_change
+        assert [] == self._sched.dirty_items.get(TOPOLOGY_CHANGE)
+
+    def test_downtimes(self):
+        """ The items are registered when their downtimes change
+
+        :return: None
+        """
+        self.print_header()
+        host = self._sched.hosts.find_by_name("test_host_0")
+        now = time.time()
+        downtime = Downtime({'ref': host.uuid, 'ref_type': host.my_type, 'start_time': now,
+                             'end_time': now + 3600, 'fixed': True, 'trigger_id': '',
+                             'duration': 0, 'author': 'me', 'comment': 'downtime'})
+        downtime.add_automatic_comment(host)
+        host.add_downtime(downtime)
+        assert [host] == self._sched.dirty_items.get(DOWNTIMES)
+
+        # The downtime started
+        self._sched.update_downtimes_and_comments()
+        assert downtime.is_in_effect
+        assert [host] == self._sched.dirty_items.get(DOWNTIMES)
+        self._sched.update_downtimes_and_comments()
+        assert [] == self._sched.dirty_items.get(DOWNTIMES)
+
+        # The downtime is cancelled
+        downtime.cancel(self._sched.timeperiods, self._sched.hosts, self._sched.services)
+        assert [host] == self._sched.dirty_items.get(DOWNTIMES)
+        self._sched.update_downtimes_and_comments()
+        assert {} == host.downtimes
+        assert [] == self._sched.dirty_items.get(DOWNTIMES)
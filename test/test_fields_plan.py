@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2016: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+This file test the serialization of the actions and broks with their fields plan
+"""
+
+from alignak_test import AlignakTest
+from alignak.brok import Brok
+from alignak.check import Check
+from alignak.notification import Notification
+from alignak.misc.serialization import serialize, unserialize
+
+
+class TestFieldsPlan(AlignakTest):
+    """
+    This class test the serialization of the actions and broks with their fields plan
+    """
+
+    def test_plan(self):
+        """ The plan is built once per class
+
+        :return: None
+        """
+        self.print_header()
+        plan = Check.get_fields_plan()
+        assert plan is Check.get_fields_plan()
+        assert plan is not Notification.get_fields_plan()
+        assert 'depend_on' not in plan.serialized
+        assert 'depend_on_me' not in plan.serialized
+        assert 'command' in plan.serialized
+        assert plan.in_dict
+        assert not Notification.get_fields_plan().in_dict
+        assert 'already_start_escalations' in Notification.get_fields_plan().serialized_sets
+
+    def test_check(self):
+        """ The checks are the same after a round trip, without their dependencies
+
+        :return: None
+        """
+        self.print_header()
+        chk = Check({'command': 'check_ping', 'ref': 'host-uuid', 't_to_go': 1234.5})
+        chk.depend_on = ['other-check']
+        assert 'scheduled' == chk.status
+        assert 'depend_on' not in chk.serialize()
+
+        res = unserialize(serialize(chk))
+        assert isinstance(res, Check)
+        assert chk.uuid == res.uuid
+        assert 'check_ping' == res.command
+        assert 1234.5 == res.t_to_go
+        assert 'scheduled' == res.status
+        # The missing attributes get their default value
+        assert [] == res.depend_on
+        assert {} == res.env
+        assert res.env is not Check({}).env
+
+    def test_notification(self):
+        """ The notifications, which have slots, are the same after a round trip
+
+        :return: None
+        """
+        self.print_header()
+        notif = Notification({'command': 'notify-host', 'ref': 'host-uuid',
+                              'already_start_escalations': set(['esc1'])})
+        data = notif.serialize()
+        assert ['esc1'] == data['already_start_escalations']
+
+        res = unserialize(serialize(notif))
+        assert isinstance(res, Notification)
+        assert notif.uuid == res.uuid
+        assert 'notify-host' == res.command
+        assert set(['esc1']) == res.already_start_escalations
+        assert notif.type == res.type
+
+    def test_brok(self):
+        """ The broks are the same after a round trip
+
+        :return: None
+        """
+        self.print_header()
+        brok = Brok({'type': 'log', 'data': {'log': 'test'}})
+        res = unserialize(serialize(brok))
+        assert brok.uuid == res.uuid
+        assert 'log' == res.type
+        res.prepare()
+        assert {'log': 'test'} == res.data
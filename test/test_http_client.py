@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2016: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+This file test the HTTP client connections pool and the requests fan-out
+"""
+
+import time
+import requests_mock
+from alignak_test import AlignakTest
+from alignak.http.client import HTTPClient, HTTPClientException, fan_out
+
+
+class TestHTTPClient(AlignakTest):
+    """
+    This class test the HTTP client connections pool and the requests fan-out
+    """
+
+    def tearDown(self):
+        HTTPClient.configure_pool()
+
+    def test_shared_session(self):
+        """ The HTTP clients share the same session
+
+        :return: None
+        """
+        self.print_header()
+        client1 = HTTPClient(address='localhost', port=7768)
+        client2 = HTTPClient(address='localhost', port=7771, proxy='http://proxy:3128')
+        assert client1.connection is client2.connection
+        assert None is client1.proxies
+        assert {'http': 'http://proxy:3128', 'https': 'http://proxy:3128'} == client2.proxies
+        assert 'keep-alive' == client1.connection.headers['Connection']
+
+        session = client1.connection
+        HTTPClient.configure_pool(pool_size=2, keep_alive=False)
+        assert session is not client1.connection
+        assert client1.connection is client2.connection
+        assert 'close' == client1.connection.headers['Connection']
+        assert 2 == client1.connection.get_adapter('http://localhost:7768/')._pool_maxsize
+
+    def test_fan_out(self):
+        """ The function is called concurrently and its exceptions are returned
+
+        :return: None
+        """
+        self.print_header()
+
+        def slow(value):
+            """Sleep a while and fail for the odd values"""
+            time.sleep(0.2)
+            if value % 2:
+                raise ValueError(value)
+            return value * 10
+
+        _t0 = time.time()
+        res = fan_out(slow, range(6), max_workers=6)
+        assert time.time() - _t0 < 1
+        assert [0, 20, 40] == [result for result, error in res if error is None]
+        errors = [error for result, error in res if error is not None]
+        assert [1, 3, 5] == [error.args[0] for error in errors]
+        for error in errors:
+            assert isinstance(error, ValueError)
+
+        # Sequential calls
+        assert [(0, None)] == fan_out(slow, [0])
+        assert [(0, None), (20, None)] == fan_out(slow, [0, 2], max_workers=1)
+        assert [] == fan_out(slow, [])
+
+    def test_fan_out_requests(self):
+        """ The daemons are requested concurrently
+
+        :return: None
+        """
+        self.print_header()
+        clients = [HTTPClient(address='localhost', port=port) for port in (7768, 17768, 27768)]
+        with requests_mock.mock() as mockreq:
+            mockreq.get('http://localhost:7768/get_running_id', json=1)
+            mockreq.get('http://localhost:17768/get_running_id', json=2)
+
+            res = fan_out(lambda client: client.get('get_running_id'), clients)
+        assert [(1, None), (2, None)] == res[:2]
+        # Not mocked address
+        assert None is res[2][0]
+        assert isinstance(res[2][1], HTTPClientException)
@@ -190,6 +190,54 @@ class TestInheritanceAndPlus(AlignakTest):
         # variables are always stored in upper case
         assert '_CUSTOM_123' in service.customs
 
+    def test_inheritance_null(self):
+        """Test properties inheritance with null values
+        """
+        self.setup_with_file('cfg/cfg_inheritance_null.cfg')
+        assert self.conf_is_correct
+        self._sched = self.schedulers['scheduler-master'].sched
+
+        # The null value of the template cancels the value of its own template,
+        # whatever the order the templates are resolved in
+        host = self._sched.hosts.find_by_name('test_host_null_0')
+        assert '' == host.notes_url
+        assert 'http://alignak.net/action' == host.action_url
+
+        host = self._sched.hosts.find_by_name('test_host_null_1')
+        assert 'http://alignak.net/notes' == host.notes_url
+        assert '' == host.action_url
+
+    def test_templates_resolved_once(self):
+        """Test the templates properties are resolved once, parents first
+        """
+        self.setup_with_file('cfg/cfg_inheritance_null.cfg')
+        assert self.conf_is_correct
+
+        conf = Config()
+        raw_objects = conf.read_config_buf(conf.read_config(['cfg/cfg_inheritance_null.cfg']))
+        conf.create_objects_for_type(raw_objects, 'host')
+        conf.hosts.linkify_templates()
+        order = [conf.hosts.templates[t_id].name for t_id in conf.hosts.get_templates_order()]
+        assert order.index('generic-host') < order.index('tpl_with_notes') < \
+            order.index('tpl_null_notes')
+
+        resolved = []
+        get_property_by_inheritance = conf.hosts.get_property_by_inheritance
+
+        def get_property_by_inheritance_spy(obj, prop, cache=None):
+            resolved.append((obj.uuid, prop))
+            return get_property_by_inheritance(obj, prop, cache)
+        conf.hosts.get_property_by_inheritance = get_property_by_inheritance_spy
+        conf.hosts.apply_inheritance()
+        # Each template and host resolved each of its properties once
+        assert len(resolved) == len(set(resolved))
+        host = conf.hosts.find_by_name('test_host_null_0')
+        assert 'http://alignak.net/action' == host.action_url
+        assert not hasattr(host, 'notes_url')
+        # Only the properties defined by the host or its templates are resolved
+        assert (host.uuid, 'action_url') in resolved
+        assert (host.uuid, 'parents') not in resolved
+
 
 if __name__ == '__main__':
     AlignakTest.main()
@@ -0,0 +1,314 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2016: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+This file tests the 'launcher' module type: actions launched by pre-forked processes
+"""
+
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import time
+from multiprocessing import Queue
+
+from alignak_test import AlignakTest
+from alignak.action import ActionBase
+from alignak.check import Check
+from alignak.daemons.pollerdaemon import Poller
+from alignak.http.scheduler_interface import SchedulerInterface
+from alignak.launcher import LauncherPool
+from alignak.message import Message
+from alignak.worker import Worker
+
+PYTHON_PLUGIN = '''#!{python}
+import os
+import sys
+print("Arguments: %s, variable: %s | args=%d" % (' '.join(sys.argv[1:]),
+                                                os.environ.get('PLUGIN_VARIABLE'),
+                                                len(sys.argv) - 1))
+print("Second line")
+sys.exit(int(sys.argv[1]))
+'''.format(python=sys.executable)
+
+PYTHON_PLUGIN_EXCEPTION = '''#!%s
+raise ValueError('bad plugin')
+''' % sys.executable
+
+
+class SchedulerConnection(object):
+    """A connection to a scheduler HTTP interface, its parameters are received
+    as they are in the query string of an HTTP GET"""
+
+    def __init__(self, scheduler):
+        self.interface = SchedulerInterface(scheduler)
+        self.posted = []
+
+    def get(self, path, args=None, wait='short'):
+        params = {}
+        for key, value in (args or {}).items():
+            if isinstance(value, list) and len(value) == 1:
+                value = value[0]
+            params[key] = value if isinstance(value, list) else str(value)
+        return getattr(self.interface, path)(**params)
+
+    def post(self, path, args, wait='short'):
+        self.posted.append((path, args))
+
+
+class TestLauncher(AlignakTest):
+    """
+    This class tests the 'launcher' module type
+    """
+
+    def setUp(self):
+        self.to_queue = Queue()
+        self.from_queue = Queue()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.worker = Worker('launcher', self.to_queue, self.from_queue, 10,
+                             max_plugins_output_length=100)
+        self.worker.checks = []
+        self.worker.set_child_exit_handler()
+        # As in do_work
+        self.worker.launchers = LauncherPool(2, self.worker.max_plugins_output_length)
+        self.worker.launchers.start()
+        ActionBase.launchers = self.worker.launchers
+
+    def tearDown(self):
+        self.worker.launchers.stop()
+        ActionBase.launchers = None
+        signal.set_wakeup_fd(-1)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        self.to_queue.close()
+        self.from_queue.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def write_plugin(self, name, content):
+        """Write an executable plugin in the temporary directory
+
+        :return: plugin path
+        """
+        path = os.path.join(self.tmp_dir, name)
+        with open(path, 'w') as plugin:
+            plugin.write(content)
+        os.chmod(path, 0o755)
+        return path
+
+    def run_checks(self, commands, module_type, timeout=5):
+        """Run the commands with the worker
+
+        :return: the checks, in the commands order
+        """
+        checks = []
+        for command in commands:
+            check = Check({'command': command, 'timeout': timeout, 'module_type': module_type,
+                           'env': {'PLUGIN_VARIABLE': 'value'}})
+            check.status = 'queue'
+            checks.append(check)
+            self.to_queue.put(Message(_type='Do', data=check))
+        time.sleep(0.1)
+
+        start = time.time()
+        finished = self.worker.actions_finished + len(commands)
+        while self.worker.actions_finished < finished and time.time() - start < 10:
+            self.worker.get_new_checks(self.to_queue, self.from_queue)
+            self.worker.launch_new_checks()
+            self.worker.manage_finished_checks(self.from_queue)
+            if self.worker.checks:
+                self.worker.wait_for_events(self.to_queue)
+
+        results = {}
+        for _ in commands:
+            result = self.from_queue.get(timeout=5).get_data()
+            results[result.uuid] = result
+        return [results[check.uuid] for check in checks]
+
+    def test_same_results(self):
+        """ The launched actions results are the same as the forked ones
+
+        :return: None
+        """
+        self.print_header()
+        python_plugin = self.write_plugin('check_python', PYTHON_PLUGIN)
+        commands = [
+            'libexec/dummy_command.sh',
+            'libexec/dummy_command_nobang.sh',
+            'libexec/sleep_command.sh 0.2',
+            'echo "Output | perf=1" ; echo "Long output" ; exit 2',
+            'echo Output to stderr >&2 ; exit 1',
+            'exit 7',
+            'echo $PLUGIN_VARIABLE',
+            '/bin/echo %s' % ('x' * 200),
+            '/nonexistent/plugin',
+            '%s 1 2 3' % python_plugin,
+            '%s 5' % python_plugin,
+            self.write_plugin('check_exception', PYTHON_PLUGIN_EXCEPTION),
+        ]
+        launched = self.run_checks(commands, 'launcher')
+        forked = self.run_checks(commands, 'fork')
+
+        for command, launched_check, forked_check in zip(commands, launched, forked):
+            for prop in ['status', 'exit_status', 'output', 'long_output', 'perf_data']:
+                assert getattr(forked_check, prop) == getattr(launched_check, prop), \
+                    "%s: %s" % (command, prop)
+            assert launched_check.execution_time > 0
+
+        # Python plugins arguments and environment
+        assert 1 == launched[9].exit_status
+        assert 'Arguments: 1 2 3, variable: value' == launched[9].output
+        assert 'Second line\n' == launched[9].long_output
+        assert 'args=3' == launched[9].perf_data
+        assert 3 == launched[10].exit_status
+        assert 1 == launched[11].exit_status
+        assert launched[11].output.startswith('Traceback')
+        assert 'check_exception' in launched[11].long_output
+        # Output truncation
+        assert 100 == len(launched[7].output)
+        # Launch errors
+        assert 2 == launched[8].exit_status
+        assert 'No such file or directory' in launched[8].output
+
+        assert {} == self.worker.launchers.processes
+
+    def test_python_plugin_exception(self):
+        """ The Python plugins run in the launched process report their exceptions
+
+        :return: None
+        """
+        self.print_header()
+        # The whole traceback is kept
+        self.worker.launchers.stop()
+        self.worker.max_plugins_output_length = 8192
+        self.worker.launchers = LauncherPool(2, self.worker.max_plugins_output_length)
+        self.worker.launchers.start()
+        ActionBase.launchers = self.worker.launchers
+
+        plugin = self.write_plugin('check_exception', PYTHON_PLUGIN_EXCEPTION)
+        launched, forked = [self.run_checks([plugin], module_type)[0]
+                            for module_type in ['launcher', 'fork']]
+        assert 1 == launched.exit_status
+        assert launched.output.startswith('Traceback')
+        assert "raise ValueError('bad plugin')" in launched.long_output
+        assert launched.long_output.endswith('ValueError: bad plugin\n')
+        assert forked.long_output == launched.long_output
+
+    def test_timeout(self):
+        """ The launched actions are killed on timeout
+
+        :return: None
+        """
+        self.print_header()
+        start = time.time()
+        check = self.run_checks(['libexec/sleep_command.sh 5'], 'launcher', timeout=1)[0]
+        assert 1 <= time.time() - start < 2
+        assert 'timeout' == check.status
+        assert 3 == check.exit_status
+        assert {} == self.worker.launchers.processes
+
+        # The launchers still work
+        check = self.run_checks(['libexec/dummy_command.sh'], 'launcher')[0]
+        assert 'done' == check.status
+        assert 0 == check.exit_status
+
+    def test_launcher_died(self):
+        """ A launcher that died is replaced
+
+        :return: None
+        """
+        self.print_header()
+        pids = [pid for _, pid in self.worker.launchers.launchers]
+        os.kill(pids[0], signal.SIGKILL)
+        time.sleep(0.1)
+
+        checks = self.run_checks(['libexec/dummy_command.sh'] * 4, 'launcher')
+        for check in checks:
+            assert 'done' == check.status
+            assert 0 == check.exit_status
+        assert 2 == len(self.worker.launchers.launchers)
+        assert pids[0] not in [pid for _, pid in self.worker.launchers.launchers]
+
+
+class TestLauncherModuleType(AlignakTest):
+    """
+    This class tests that the 'launcher' module type actions are got by the satellites
+    """
+
+    def setUp(self):
+        self.setup_with_file('cfg/cfg_launcher.cfg')
+        assert self.conf_is_correct
+        self._sched = self.schedulers['scheduler-master'].sched
+        self.host = self._sched.hosts.find_by_name('test_host_launcher')
+        self.host.checks_in_progress = []
+        self.host.act_depend_of = []
+        self.host.event_handler_enabled = False
+
+    def get_launcher_checks(self):
+        """Get the scheduled checks of the launcher module type, ready to be launched
+
+        :return: checks list
+        """
+        self.external_command_loop()
+        checks = [check for check in self._sched.checks.values()
+                  if check.module_type == 'launcher']
+        for check in checks:
+            check.t_to_go = 0
+        return checks
+
+    def test_active_poller(self):
+        """ An active poller gets the launcher actions, even without a launcher worker
+
+        :return: None
+        """
+        self.print_header()
+        checks = self.get_launcher_checks()
+        assert 1 == len(checks)
+
+        poller = Poller('cfg/setup_new_conf/daemons/pollerd.ini', False, False, False,
+                        '/tmp/poller.log')
+        poller.q_by_mod = {'fork': {}}
+        poller.poller_tags = ['None']
+        poller.reactionner_tags = ['None']
+        con = SchedulerConnection(self.schedulers['scheduler-master'])
+        poller.schedulers = {'sched-uuid': {'active': True, 'con': con,
+                                            'name': 'scheduler-master'}}
+        added = []
+        poller.add_actions = lambda actions, sched_id: added.extend(actions)
+        poller.get_new_actions()
+        assert [checks[0].uuid] == [action.uuid for action in added]
+        assert 'launcher' == added[0].module_type
+
+    def test_passive_poller(self):
+        """ The scheduler pushes the launcher actions to a passive poller
+
+        :return: None
+        """
+        self.print_header()
+        checks = self.get_launcher_checks()
+        assert 1 == len(checks)
+
+        link = self._sched.pollers.values()[0]
+        link['passive'] = True
+        link['con'] = SchedulerConnection(self.schedulers['scheduler-master'])
+        self._sched.push_actions_to_passives_satellites()
+        assert 1 == len(link['con'].posted)
+        path, args = link['con'].posted[0]
+        assert 'push_actions' == path
+        assert [checks[0].uuid] == [action.uuid for action in args['actions']]
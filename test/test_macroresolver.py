@@ -377,6 +377,46 @@ class MacroResolverTester(object):
         # Not a macro but $$ is transformed as $
         assert 'plugins/nothing $' == com
 
+    def test_compiled_command_line(self):
+        """
+        The command lines are compiled once and the compiled template is used again
+        :return:
+        """
+        self.print_header()
+
+        mr = self.get_mr()
+        (svc, hst) = self.get_hst_svc()
+        data = [hst, svc]
+        # special_macro is defined as: $USER1$/nothing $ARG1$
+        dummy_call = "special_macro!$HOSTNAME$"
+        cc = CommandCall({"commands": self.arbiter.conf.commands, "call": dummy_call})
+        com = mr.resolve_command(cc, data, self._sched.macromodulations, self._sched.timeperiods)
+        # The argument holds a macro that is resolved in a second pass
+        assert 'plugins/nothing test_host_0' == com
+
+        template = mr.templates[cc.command.command_line]
+        assert ('USER1', 'object') == template[0][:2]
+        assert '/nothing ' == template[1]
+        assert ('ARG1', 'ARGN', 0) == template[2]
+
+        dummy_call = "special_macro!$HOSTADDRESS$"
+        cc = CommandCall({"commands": self.arbiter.conf.commands, "call": dummy_call})
+        com = mr.resolve_command(cc, [hst, svc], self._sched.macromodulations,
+                                 self._sched.timeperiods)
+        assert 'plugins/nothing 127.0.0.1' == com
+        assert template is mr.templates[cc.command.command_line]
+
+        # A not closed macro is kept as is
+        assert 'plugins/nothing test_host_0 $HOSTNAME' == \
+            mr.resolve_simple_macros_in_string("$USER1$/nothing $HOSTNAME$ $HOSTNAME",
+                                               [hst, svc], None, None)
+
+        # The strings built at run time (business rules outputs) are not cached
+        templates = dict(mr.templates)
+        assert 'output of test_host_0' == \
+            mr.resolve_simple_macros_in_string("output of $HOSTNAME$", [hst, svc], None, None)
+        assert templates == mr.templates
+
     def test_unicode_macro(self):
         """
         Call the resolver with a unicode content
@@ -750,6 +790,40 @@ class MacroResolverTester(object):
         com = mr.resolve_command(cc, data, self._sched.macromodulations, self._sched.timeperiods)
         assert 'plugins/nothing test_macro_host' == com
 
+    def test_macros_cache(self):
+        """
+        The static macros and the custom variables values are cached in the items
+        :return:
+        """
+        self.print_header()
+        mr = self.get_mr()
+
+        hst = self._sched.hosts.find_by_name("test_macro_host")
+        hst.reset_macros_cache()
+        hst.state = 'UP'
+
+        dummy_call = "special_macro!$HOSTADDRESS$ $_HOSTCUSTOM1$ $HOSTSTATE$"
+        cc = CommandCall({"commands": self.arbiter.conf.commands, "call": dummy_call})
+        com = mr.resolve_command(cc, [hst], self._sched.macromodulations, self._sched.timeperiods)
+        assert 'plugins/nothing 127.0.0.1 value UP' == com
+        assert '127.0.0.1' == hst.macros_cache['HOSTADDRESS']
+        assert 'value' == hst.macros_cache['_CUSTOM1']
+        # The state is not a static macro
+        assert 'HOSTSTATE' not in hst.macros_cache
+
+        # The cached values are used
+        hst.address = '127.0.0.2'
+        hst.state = 'DOWN'
+        com = mr.resolve_command(cc, [hst], self._sched.macromodulations, self._sched.timeperiods)
+        assert 'plugins/nothing 127.0.0.1 value DOWN' == com
+
+        # The external commands that change the custom variables reset the cache
+        excmd = '[%d] CHANGE_CUSTOM_HOST_VAR;test_macro_host;_CUSTOM1;other' % time.time()
+        self._sched.run_external_command(excmd)
+        self.external_command_loop()
+        com = mr.resolve_command(cc, [hst], self._sched.macromodulations, self._sched.timeperiods)
+        assert 'plugins/nothing 127.0.0.2 other DOWN' == com
+
     def test_service_custom_macros(self):
         """
         Test on-demand macros with custom variables for services
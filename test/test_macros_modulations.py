@@ -47,6 +47,7 @@
 #
 
 from alignak_test import *
+from alignak.macroresolver import MacroResolver
 
 
 class TestMacroModulations(AlignakTest):
@@ -94,6 +95,26 @@ class TestMacroModulations(AlignakTest):
             # Both are currently active, but we want to get the first one
             assert 'plugins/nothing MODULATED' == self._sched.checks[c].command
 
+        # The modulations activity is cached until their period starts or ends
+        active, _, valid_until = mod.activity_cache
+        assert active
+        assert valid_until > time.time()
+        # but not the modulated values
+        assert '_VALUE' not in host.macros_cache
+
+        mr = MacroResolver()
+        mod.customs['_VALUE'] = 'MODULATED_AGAIN'
+        assert 'plugins/nothing MODULATED_AGAIN' == \
+            mr.resolve_command(host.check_command, [host], self._sched.macromodulations,
+                               self._sched.timeperiods)
+
+        # The modulation period ended
+        mod.activity_cache = (True, 0, time.time() - 1)
+        self._sched.timeperiods[mod.modulation_period].is_time_valid = lambda t: False
+        assert 'plugins/nothing NOT_THE_GOOD' == \
+            mr.resolve_command(host.check_command, [host], self._sched.macromodulations,
+                               self._sched.timeperiods)
+        assert not mod.activity_cache[0]
 
 if __name__ == '__main__':
     AlignakTest.main()
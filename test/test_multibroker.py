@@ -24,7 +24,10 @@
 This file test the multibroker in schedulers
 """
 
+import threading
+import time
 import requests_mock
+from alignak.brok import Brok
 from alignak.http.scheduler_interface import SchedulerInterface
 from alignak_test import AlignakTest
 
@@ -84,6 +87,106 @@ class TestMultibroker(AlignakTest):
         self.assertItemsEqual(mysched.sched.brokers['broker-master']['broks'].keys(),
                               mysched.sched.brokers['broker-master2']['broks'].keys())
 
+    def test_broks_pages(self):
+        """ Test the broker gets the broks in acknowledged pages
+
+        :return: None
+        """
+        self.print_header()
+        self.setup_with_file('cfg/cfg_multi_broker_one_scheduler.cfg')
+
+        mysched = self.schedulers['scheduler-master']
+        sched_interface = SchedulerInterface(mysched)
+        res = sched_interface.get_broks_page('broker-master', 0, 0)
+        assert 1 == res['cursor']
+        assert 0 == res['remaining']
+
+        broks = mysched.sched.brokers['broker-master']['broks']
+        for _ in xrange(5):
+            brok = Brok({'type': 'none', 'data': {}})
+            brok.sent_to_sched_externals = True
+            broks[brok.uuid] = brok
+        res = sched_interface.get_broks_page('broker-master', 1, 2)
+        assert 2 == res['cursor']
+        assert 2 == len(res['broks'])
+        assert 3 == res['remaining']
+
+        # Page not received, it is sent again
+        again = sched_interface.get_broks_page('broker-master', 1, 2)
+        assert again == res
+        assert 3 == len(broks)
+
+        # Page acknowledged, the last broks are sent
+        res = sched_interface.get_broks_page('broker-master', 2, 0)
+        assert 3 == res['cursor']
+        assert 3 == len(res['broks'])
+        assert 0 == res['remaining']
+
+        # Unknown broker
+        res = sched_interface.get_broks_page('broker-master3', 0, 0)
+        assert {'cursor': 0, 'broks': {}, 'remaining': 0} == res
+
+    def test_broks_types(self):
+        """ Test the scheduler only builds and sends the broks types the brokers want
+
+        :return: None
+        """
+        self.print_header()
+        self.setup_with_file('cfg/cfg_multi_broker_one_scheduler.cfg')
+
+        mysched = self.schedulers['scheduler-master']
+        host = mysched.sched.hosts.find_by_name("test_host_0")
+        host.checks_in_progress = []
+        host.act_depend_of = []  # ignore the router
+        svc = mysched.sched.services.find_srv_by_name_and_hostname("test_host_0", "test_ok_0")
+        svc.checks_in_progress = []
+        svc.act_depend_of = []  # no hostchecks on critical checkresults
+
+        # The broker-master only wants the checks results, even the initial broks are filtered
+        sched_interface = SchedulerInterface(mysched)
+        sched_interface.get_broks_page('broker-master', 0, 0,
+                                       'host_check_result,service_check_result')
+        assert {} == mysched.sched.brokers['broker-master']['pending']
+        assert mysched.sched.wants_brok_type('host_next_schedule')
+
+        self.scheduler_loop(1, [[host, 0, 'UP'], [svc, 0, 'OK']])
+        types = set(brok.type for brok in mysched.sched.brokers['broker-master']['broks'].values())
+        assert set(['host_check_result', 'service_check_result']) == types
+        assert 'host_next_schedule' in \
+            [brok.type for brok in mysched.sched.brokers['broker-master2']['broks'].values()]
+
+        # Nobody wants the next schedule broks, they are not built anymore
+        mysched.sched.set_broker_brok_types('broker-master2', set(['service_check_result']))
+        assert not mysched.sched.wants_brok_type('host_next_schedule')
+        assert mysched.sched.wants_brok_type('host_check_result')
+        for broker in mysched.sched.brokers.values():
+            broker['broks'].clear()
+        self.scheduler_loop(1, [[host, 0, 'UP'], [svc, 0, 'OK']])
+        assert ['service_check_result'] == \
+            [brok.type for brok in mysched.sched.brokers['broker-master2']['broks'].values()]
+        types = set(brok.type for brok in mysched.sched.brokers['broker-master']['broks'].values())
+        assert set(['host_check_result', 'service_check_result']) == types
+
+        # An empty subscription is for all the broks
+        sched_interface.get_broks_page('broker-master', 1, 0, '')
+        assert mysched.sched.wants_brok_type('host_next_schedule')
+
+        # The subscription is changed under the scheduler configuration lock
+        locked = threading.Event()
+
+        def hold_lock():
+            with mysched.conf_lock:
+                locked.set()
+                time.sleep(0.3)
+        thread = threading.Thread(target=hold_lock)
+        thread.start()
+        locked.wait()
+        start = time.time()
+        sched_interface.get_broks_page('broker-master', 1, 0, 'host_check_result')
+        assert time.time() - start >= 0.25
+        assert set(['host_check_result']) == mysched.sched.brokers['broker-master']['brok_types']
+        thread.join()
+
     def test_multibroker_multisched(self):
         """ Test with 2 brokers and 2 schedulers
 
@@ -21,6 +21,8 @@
  This file is used to test poller tags
 """
 from alignak_test import AlignakTest
+from alignak.http.scheduler_interface import SchedulerInterface
+from alignak.misc.serialization import unserialize
 
 
 class TestPollerTag(AlignakTest):
@@ -179,6 +181,28 @@ class TestPollerTag(AlignakTest):
         for check in checks:
             assert check.poller_tag == 'south'
 
+    def test_poller_http_get_checks(self):
+        """
+        Test the checks got by a poller through the scheduler HTTP interface, where the
+        lists with a single value are received as this value
+
+        :return: None
+        """
+        self.print_header()
+        self.external_command_loop()
+        for check in self._sched.checks.values():
+            check.t_to_go = 0
+        sched_interface = SchedulerInterface(self.schedulers['scheduler-master'])
+        checks = unserialize(sched_interface.get_checks(do_checks='True', poller_tags='north',
+                                                        module_types='fork'), True)
+        assert len(checks) == 3
+        for check in checks:
+            assert check.poller_tag == 'north'
+        checks = unserialize(sched_interface.get_checks(do_checks='True',
+                                                        poller_tags=['None', 'south'],
+                                                        module_types=['fork', 'nrpe']), True)
+        assert len(checks) == 7
+
 
 if __name__ == '__main__':
     AlignakTest.main()
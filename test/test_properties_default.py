@@ -611,6 +611,7 @@ class TestModule(PropertiesTester, AlignakTest):
         ('name', ''),
         ('module_types', ['']),
         ('modules', ['']),
+        ('brok_types', []),
         ])
 
     def setUp(self):
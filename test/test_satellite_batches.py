@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2016: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+This file tests the actions records batches exchanged by the satellites with their workers
+"""
+
+import logging
+from Queue import Queue, Empty
+
+from alignak_test import AlignakTest
+from alignak.action import ONLY_COPY_PROP
+from alignak.check import Check
+from alignak.daemons.pollerdaemon import Poller
+from alignak.worker import Worker
+
+
+class DeadWorker(object):
+    """A worker which process went down unexpectedly"""
+    module_name = 'fork'
+
+    def __init__(self, worker_id, exitcode=-9):
+        self.worker_id = worker_id
+        self.exitcode = exitcode
+
+    def get_id(self):
+        return self.worker_id
+
+    def get_pid(self):
+        return 0
+
+    def get_exitcode(self):
+        return self.exitcode
+
+    def is_alive(self):
+        return False
+
+    def terminate(self):
+        pass
+
+    def join(self, timeout=None):
+        pass
+
+
+class TestSatelliteBatches(AlignakTest):
+    """
+    This class tests the satellite side of the actions records batches
+    """
+
+    def setUp(self):
+        self.setup_logger()
+        self.logger.setLevel(logging.INFO)
+        self.poller = Poller('cfg/setup_new_conf/daemons/pollerd.ini', False, False, False,
+                             '/tmp/poller.log')
+        self.poller.worker_batch_size = 3
+        self.poller.schedulers = {'sched-uuid': {'actions': {}, 'wait_homerun': {}}}
+        self.queues = {'fork_1': Queue(), 'fork_2': Queue()}
+        self.poller.q_by_mod = {'fork': dict(self.queues)}
+
+    def get_messages(self, worker_id):
+        """Get the messages sent to a worker
+
+        :return: messages list
+        """
+        res = []
+        try:
+            while True:
+                res.append(self.queues[worker_id].get_nowait())
+        except Empty:
+            return res
+
+    def get_checks(self, count):
+        """Get new checks to be launched by a fork worker
+
+        :return: checks list
+        """
+        checks = []
+        for idx in range(count):
+            check = Check({'command': 'libexec/dummy_command.sh', 'timeout': 5,
+                           'ref': 'host-%d' % idx})
+            check.t_to_go = check.creation_time
+            checks.append(check)
+        return checks
+
+    def test_batches(self):
+        """ The actions records are sent by batches of worker_batch_size records,
+        and the remaining ones at the end of add_actions
+
+        :return: None
+        """
+        self.print_header()
+        checks = self.get_checks(8)
+        self.poller.add_actions(checks, 'sched-uuid')
+        assert {} == self.poller.actions_batches
+        assert 8 == len(self.poller.schedulers['sched-uuid']['actions'])
+
+        records = {}
+        for worker_id in self.queues:
+            messages = self.get_messages(worker_id)
+            # The actions are sent in a round robin way
+            assert ['DoBatch', 'DoBatch'] == [msg.get_type() for msg in messages]
+            assert [3, 1] == [len(msg.get_data()) for msg in messages]
+            for msg in messages:
+                for record in msg.get_data():
+                    records[record[2][ONLY_COPY_PROP.index('uuid')]] = worker_id
+        for check in checks:
+            assert 'queue' == check.status
+            assert records[check.uuid] == check.worker_id
+
+        # The records give the same actions to the workers
+        action = Worker.get_action_from_record(checks[0].get_work_record())
+        assert checks[0].uuid == action.uuid
+        assert checks[0].command == action.command
+        assert 'sched-uuid' == action.sched_id
+
+    def test_results(self):
+        """ The results records update the actions kept by the satellite,
+        the unknown actions results are ignored
+
+        :return: None
+        """
+        self.print_header()
+        checks = self.get_checks(2)
+        self.poller.add_actions(checks, 'sched-uuid')
+
+        # As the worker does
+        action = Worker.get_action_from_record(checks[0].get_work_record())
+        action.status = 'done'
+        action.exit_status = 2
+        action.output = 'Critical output'
+        action.check_time = action.t_to_go + 1
+        action.execution_time = 0.5
+        sched_id, uuid, values = action.get_result_record()
+        self.poller.manage_action_result(sched_id, uuid, values)
+
+        sched = self.poller.schedulers['sched-uuid']
+        assert checks[0].uuid not in sched['actions']
+        assert checks[1].uuid in sched['actions']
+        assert checks[0] is sched['wait_homerun'][checks[0].uuid]
+        assert 'done' == checks[0].status
+        assert 2 == checks[0].exit_status
+        assert 'Critical output' == checks[0].output
+        assert 0.5 == checks[0].execution_time
+        assert not hasattr(checks[0], 'sched_id')
+        assert not hasattr(checks[0], 'worker_id')
+
+        # The result of an unknown action (already got or the scheduler is gone) is ignored
+        self.poller.manage_action_result(sched_id, uuid, values)
+        self.poller.manage_action_result('unknown-sched', checks[1].uuid, values)
+        self.assert_any_log_match('Got a result for an unknown action')
+        assert 1 == len(sched['wait_homerun'])
+        assert 'queue' == checks[1].status
+
+    def test_dead_worker(self):
+        """ The actions of a dead worker, sent or not yet sent to it, are requeued
+
+        :return: None
+        """
+        self.print_header()
+        self.poller.workers = {'fork_1': DeadWorker('fork_1'), 'fork_2': DeadWorker('fork_2')}
+        checks = self.get_checks(2)
+        self.poller.add_actions(checks, 'sched-uuid')
+        # Not yet sent, as in the middle of add_actions
+        unflushed = self.get_checks(1)[0]
+        unflushed.sched_id = 'sched-uuid'
+        self.poller.schedulers['sched-uuid']['actions'][unflushed.uuid] = unflushed
+        self.poller.assign_to_a_queue(unflushed)
+        dead_id = unflushed.worker_id
+        alive_id = [w_id for w_id in self.queues if w_id != dead_id][0]
+        assert dead_id in self.poller.actions_batches
+        for worker_id in self.queues:
+            self.get_messages(worker_id)
+
+        # Only one of the workers died
+        self.poller.workers[alive_id].is_alive = lambda: True
+        self.poller.check_and_del_zombie_workers()
+        assert [alive_id] == self.poller.workers.keys()
+        assert {} == self.poller.actions_batches
+
+        assert [] == self.get_messages(dead_id)
+        messages = self.get_messages(alive_id)
+        requeued = [record[2][ONLY_COPY_PROP.index('uuid')]
+                    for msg in messages for record in msg.get_data()]
+        assert 2 == len(requeued)
+        assert unflushed.uuid in requeued
+        for check in checks + [unflushed]:
+            assert alive_id == check.worker_id
+            assert 'queue' == check.status
+
+    def test_stopping_worker(self):
+        """ The actions of a stopping worker which crashed are requeued,
+        a stopping worker which exited normally is just forgotten
+
+        :return: None
+        """
+        self.print_header()
+        self.poller.workers = {'fork_1': DeadWorker('fork_1'), 'fork_2': DeadWorker('fork_2')}
+        self.poller.workers['fork_2'].is_alive = lambda: True
+        checks = self.get_checks(4)
+        self.poller.add_actions(checks, 'sched-uuid')
+        for worker_id in self.queues:
+            self.get_messages(worker_id)
+
+        # The worker is asked to stop, then it crashes
+        self.poller.stop_worker('fork', 'fork_1')
+        assert ['fork_2'] == self.poller.q_by_mod['fork'].keys()
+        self.poller.check_and_del_zombie_workers()
+        assert ['fork_2'] == self.poller.workers.keys()
+        assert set() == self.poller.retired_workers
+        self.assert_any_log_match('The stopping worker fork_1 .* went down unexpectedly')
+
+        messages = self.get_messages('fork_2')
+        requeued = [record[2][ONLY_COPY_PROP.index('uuid')]
+                    for msg in messages for record in msg.get_data()]
+        assert 2 == len(requeued)
+        for check in checks:
+            assert 'fork_2' == check.worker_id
+
+        # The worker is asked to stop, and it stops once its actions are finished
+        for check in checks:
+            check.status = 'done'
+        self.clear_logs()
+        self.poller.workers['fork_1'] = DeadWorker('fork_1', exitcode=0)
+        self.poller.retired_workers.add('fork_1')
+        self.poller.check_and_del_zombie_workers()
+        assert ['fork_2'] == self.poller.workers.keys()
+        assert set() == self.poller.retired_workers
+        self.assert_any_log_match('The worker fork_1 .* stopped')
+        self.assert_no_log_match('went down unexpectedly')
+        assert [] == self.get_messages('fork_2')
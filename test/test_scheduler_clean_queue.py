@@ -24,6 +24,9 @@ This file test the cleaning queue in scheduler
 
 import time
 from alignak_test import AlignakTest
+from alignak.ageordereddict import AgeOrderedDict
+from alignak.brok import Brok
+from alignak.stats import statsmgr
 
 
 class TestSchedulerCleanQueue(AlignakTest):
@@ -157,3 +160,59 @@ class TestSchedulerCleanQueue(AlignakTest):
         self.schedulers['scheduler-master'].sched.update_recurrent_works_tick('clean_queues', 1)
         self.scheduler_loop(1, [[host, 0, 'UP'], [svc, 1, 'WARNING']])
         assert len(self.schedulers['scheduler-master'].sched.actions) <= action_limit
+
+    def test_age_ordered_dict(self):
+        """ Test the oldest values are dropped first
+
+        :return: None
+        """
+        queue = AgeOrderedDict()
+        for idx in xrange(10):
+            queue['key%d' % idx] = idx
+        # Removed and updated values are ignored
+        del queue['key0']
+        queue['key1'] = 'updated'
+
+        assert [2, 3] == queue.pop_oldest(2)
+        assert [] == queue.drop_oldest(7)
+        assert [4, 5] == queue.drop_oldest(5)
+        assert set(['key1', 'key6', 'key7', 'key8', 'key9']) == set(queue.keys())
+        assert [6, 7, 8, 9, 'updated'] == queue.pop_oldest(10)
+        assert {} == queue
+
+        # The index does not grow with the removed values
+        for idx in xrange(1000):
+            queue['key'] = idx
+        assert len(queue.ages) < 200
+
+        # Only the accepted values are removed, the others keep their age
+        for idx in xrange(6):
+            queue['key%d' % idx] = idx
+        queue.pop('key')
+        assert [1, 3] == queue.pop_oldest(2, lambda value: value % 2)
+        assert [0, 2, 4] == queue.pop_oldest(3)
+        assert [5] == queue.pop_oldest()
+
+    def test_dropped_broks_counters(self):
+        """ Test the oldest broks are dropped and the drop counters are updated
+
+        :return: None
+        """
+        self.setup_with_file('cfg/cfg_default.cfg')
+        sched = self.schedulers['scheduler-master'].sched
+        broks = sched.brokers['broker-master']['broks']
+        broks.clear()
+        brok_limit = 5 * (len(sched.hosts) + len(sched.services))
+        added = []
+        for _ in xrange(brok_limit + 10):
+            added.append(Brok({'type': 'none', 'data': {}}))
+            sched.add(added[-1])
+        oldest = added[:10]
+        _, _, count, total = statsmgr.stats.get('dropped.broks.broker-master', (0, 0, 0, 0))
+
+        sched.clean_queues()
+        assert brok_limit == len(broks)
+        assert 10 == sched.nb_broks_dropped
+        for brok in oldest:
+            assert brok.uuid not in broks
+        assert (count + 1, total + 10) == statsmgr.stats['dropped.broks.broker-master'][2:]
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2016: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+This file test the scheduler timers of the downtimes and acknowledgements
+"""
+
+import time
+from freezegun import freeze_time
+from alignak_test import AlignakTest
+from alignak.downtime import Downtime
+from alignak.timerheap import TimerHeap, DOWNTIME_START, DOWNTIME_END
+
+
+class TestSchedulerTimers(AlignakTest):
+    """
+    This class test the scheduler timers
+    """
+
+    def test_timer_heap(self):
+        """ Only the due timers are popped, ordered by time
+
+        :return: None
+        """
+        self.print_header()
+        timers = TimerHeap()
+        timers.push(30, DOWNTIME_END, 'host', 'dt1')
+        timers.push(10, DOWNTIME_START, 'host', 'dt1')
+        timers.push(20, DOWNTIME_START, 'svc', 'dt2')
+        assert 3 == len(timers)
+
+        assert [] == timers.pop_due(5)
+        assert [(10, DOWNTIME_START, 'host', 'dt1'), (20, DOWNTIME_START, 'svc', 'dt2')] == \
+            timers.pop_due(20)
+        assert 1 == len(timers)
+        timers.clear()
+        assert [] == timers.pop_due(100)
+
+    def test_downtime_and_acknowledgement_expiry(self):
+        """ The downtimes start and end and the acknowledgements expire when their timer is due
+
+        :return: None
+        """
+        self.print_header()
+        self.setup_with_file('cfg/cfg_default.cfg')
+        sched = self.schedulers['scheduler-master'].sched
+        host = sched.hosts.find_by_name("test_host_0")
+        host.checks_in_progress = []
+        host.act_depend_of = []  # ignore the router
+        host.event_handler_enabled = False
+        svc = sched.services.find_srv_by_name_and_hostname("test_host_0", "test_ok_0")
+        svc.checks_in_progress = []
+        svc.act_depend_of = []  # no hostchecks on critical checkresults
+        svc.event_handler_enabled = False
+
+        with freeze_time("2016-10-10 12:00:00") as frozen_datetime:
+            now = time.time()
+            self.scheduler_loop(1, [[host, 0, 'UP'], [svc, 2, 'CRITICAL']])
+            svc.acknowledge_problem(sched.timeperiods[svc.notification_period],
+                                    sched.hosts, sched.services, 1, 0, 'me', 'ack',
+                                    end_time=now + 60)
+            downtime = Downtime({'ref': svc.uuid, 'ref_type': svc.my_type,
+                                 'start_time': now + 30, 'end_time': now + 90, 'fixed': True,
+                                 'trigger_id': '', 'duration': 0, 'author': 'me',
+                                 'comment': 'downtime'})
+            downtime.add_automatic_comment(svc)
+            svc.add_downtime(downtime)
+
+            sched.update_downtimes_and_comments()
+            sched.check_for_expire_acknowledge()
+            assert not downtime.is_in_effect
+            assert svc.problem_has_been_acknowledged
+            # start and end of the downtime, ack expiry
+            assert 2 == len(sched.downtimes_timers)
+            assert 1 == len(sched.acknowledgements_timers)
+
+            frozen_datetime.tick(31)
+            sched.update_downtimes_and_comments()
+            sched.check_for_expire_acknowledge()
+            assert downtime.is_in_effect
+            assert svc.in_scheduled_downtime
+            assert svc.problem_has_been_acknowledged
+
+            frozen_datetime.tick(30)
+            sched.update_downtimes_and_comments()
+            sched.check_for_expire_acknowledge()
+            assert downtime.is_in_effect
+            assert not svc.problem_has_been_acknowledged
+            assert 0 == len(sched.acknowledgements_timers)
+
+            frozen_datetime.tick(30)
+            sched.update_downtimes_and_comments()
+            assert not downtime.is_in_effect
+            assert not svc.in_scheduled_downtime
+            assert downtime.can_be_deleted
+            sched.update_downtimes_and_comments()
+            assert {} == svc.downtimes
+            assert 0 == len(sched.downtimes_timers)
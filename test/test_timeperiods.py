@@ -290,7 +290,7 @@ class TestTimeperiods(AlignakTest):
         # It will be 21:00:01 (first second after invalid is valid)
 
         # we clean the cache of previous calc of t ;)
-        timeperiod.cache = {}
+        timeperiod.transitions = None
         t_next = timeperiod.get_next_valid_time_from_t(july_the_12)
         t_next = time.asctime(time.localtime(t_next))
         print "T nxt with exclude:", t_next
@@ -323,7 +323,7 @@ class TestTimeperiods(AlignakTest):
         timeperiod.exclude = [t2]
         # We are a bad boy: first time period want a tuesday
         # but exclude do not want it until 23:58. So next is 58 + 1 second :)
-        timeperiod.cache = {}
+        timeperiod.transitions = None
         t_next = timeperiod.get_next_valid_time_from_t(july_the_12)
         t_next = time.asctime(time.localtime(t_next))
         self.assertEqual('Tue Jul 13 23:58:01 2010', t_next)
@@ -363,7 +363,7 @@ class TestTimeperiods(AlignakTest):
         t2.timeperiod_name = 'T2'
         t2.resolve_daterange(t2.dateranges, 'april 1 - august 23 00:00-24:00')
         timeperiod.exclude = [t2]
-        timeperiod.cache = {}
+        timeperiod.transitions = None
         t_next = timeperiod.get_next_valid_time_from_t(july_the_12)
         t_next = time.asctime(time.localtime(t_next))
         self.assertEqual('Tue Sep 21 16:30:00 2010', t_next)
@@ -401,7 +401,7 @@ class TestTimeperiods(AlignakTest):
         t2.timeperiod_name = 'T2'
         t2.resolve_daterange(t2.dateranges, 'april 1 - august 16 00:00-24:00')
         timerange.exclude = [t2]
-        timerange.cache = {}
+        timerange.transitions = None
         t_next = timerange.get_next_valid_time_from_t(july_the_12)
         t_next = time.asctime(time.localtime(t_next))
         self.assertEqual('Tue Aug 31 16:30:00 2010', t_next)
@@ -449,7 +449,7 @@ class TestTimeperiods(AlignakTest):
         t2.resolve_daterange(t2.dateranges, 'april 1 - august 16 00:00-24:00')
         t2.resolve_daterange(t2.dateranges, 'saturday -1 - monday 1  16:00-24:00')
         timeperiod.exclude = [t2]
-        timeperiod.cache = {}
+        timeperiod.transitions = None
         t_next = timeperiod.get_next_valid_time_from_t(july_the_12)
         t_next = time.asctime(time.localtime(t_next))
         self.assertEqual('Tue Oct 26 16:30:00 2010', t_next)
@@ -486,7 +486,7 @@ class TestTimeperiods(AlignakTest):
         t2.timeperiod_name = 'T2'
         t2.resolve_daterange(t2.dateranges, 'thursday 1 april - monday 3 august 00:00-24:00')
         timeperiod.exclude = [t2]
-        timeperiod.cache = {}
+        timeperiod.transitions = None
         t_next = timeperiod.get_next_valid_time_from_t(july_the_12)
         t_next = time.asctime(time.localtime(t_next))
         self.assertEqual('Tue Aug 17 16:30:00 2010', t_next)
@@ -658,5 +658,70 @@ class TestTimeperiods(AlignakTest):
         ]
         self.assertItemsEqual(ref, mydateranges)
 
+    def test_transitions_table(self):
+        """
+        Test the timeperiod validity transitions table
+
+        :return: None
+        """
+        self.print_header()
+        # Monday 12 of july 2010 at 10:00
+        july_the_12 = time.mktime(time.strptime("12 Jul 2010 10:00:00", "%d %b %Y %H:%M:%S"))
+        july_the_12 = int(july_the_12)
+
+        timeperiod = Timeperiod()
+        timeperiod.resolve_daterange(timeperiod.dateranges, 'monday 09:00-17:00')
+        timeperiod.resolve_daterange(timeperiod.dateranges, 'tuesday 09:00-17:00')
+        t2 = Timeperiod()
+        t2.resolve_daterange(t2.dateranges, 'monday 12:00-13:00')
+        timeperiod.exclude = [t2]
+
+        # Valid now, invalid at 12:00
+        assert (True, july_the_12 + 7200) == timeperiod.get_transition(july_the_12)
+        assert timeperiod.transitions_start == july_the_12
+        assert timeperiod.transitions_valid
+        assert [july_the_12 + 7200] == timeperiod.transitions
+
+        # Valid again at the end of the exclusion, not the next day
+        assert july_the_12 + 3 * 3600 + 1 == \
+            timeperiod.get_next_valid_time_from_t(july_the_12 + 2 * 3600)
+
+        # The table is extended up to the wanted time
+        assert july_the_12 + 86400 - 3600 == \
+            timeperiod.get_next_valid_time_from_t(july_the_12 + 8 * 3600)
+        assert timeperiod.transitions_start == july_the_12
+        assert 4 == len(timeperiod.transitions)
+
+        # Same results than the full computation, all along the table range
+        for timestamp in range(july_the_12, july_the_12 + timeperiod.transitions_horizon, 1800):
+            assert timeperiod._compute_next_valid_time_from_t(timestamp) == \
+                timeperiod.get_next_valid_time_from_t(timestamp)
+            assert timeperiod._compute_next_invalid_time_from_t(timestamp) == \
+                timeperiod.get_next_invalid_time_from_t(timestamp)
+        assert timeperiod.transitions_start == july_the_12
+
+        # Nested excludes, the table stops where the computations do not agree
+        t3 = Timeperiod()
+        t3.resolve_daterange(t3.dateranges, 'monday 12:30-12:45')
+        t2.exclude = [t3]
+        timeperiod.transitions = None
+        t2.transitions = None
+        for timestamp in range(july_the_12, july_the_12 + 86400, 600):
+            assert timeperiod._compute_next_valid_time_from_t(timestamp) == \
+                timeperiod.get_next_valid_time_from_t(timestamp)
+            assert timeperiod._compute_next_invalid_time_from_t(timestamp) == \
+                timeperiod.get_next_invalid_time_from_t(timestamp)
+        assert timeperiod.transitions_end < july_the_12 + timeperiod.transitions_horizon
+        t2.exclude = []
+        timeperiod.transitions = None
+
+        # Out of the table range, it is built again
+        assert july_the_12 - 3600 == timeperiod.get_next_valid_time_from_t(july_the_12 - 3600)
+        assert timeperiod.transitions_start == july_the_12 - 3600
+
+        # The table is out of date
+        timeperiod.clean_cache()
+        assert timeperiod.transitions is None
+
 if __name__ == '__main__':
     AlignakTest.main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2016: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+This file test the wire formats negotiated between the daemons
+"""
+
+import socket
+import threading
+import time
+import pytest
+import requests_mock
+from alignak_test import AlignakTest
+from alignak.check import Check
+from alignak.http.client import HTTPClient
+from alignak.http.daemon import HTTPDaemon
+from alignak.http.scheduler_interface import SchedulerInterface
+from alignak.misc.serialization import serialize, unserialize, get_wire_formats, \
+    negotiate_wire_format, dump_wire, load_wire, JSON_CONTENT_TYPE, MSGPACK_CONTENT_TYPE
+
+no_msgpack = pytest.mark.skipif(MSGPACK_CONTENT_TYPE not in get_wire_formats(),
+                                reason="msgpack is not installed")
+
+
+def get_free_port(on_ip='127.0.0.1'):
+    """Get a free port for an IP address"""
+    sock = socket.socket()
+    try:
+        sock.bind((on_ip, 0))
+        return sock.getsockname()[1]
+    finally:
+        sock.close()
+
+
+class TestWireFormat(AlignakTest):
+    """
+    This class test the wire formats negotiated between the daemons
+    """
+
+    def tearDown(self):
+        HTTPClient.configure_wire_format()
+
+    def test_negotiate(self):
+        """ The first accepted and available format is used, JSON by default
+
+        :return: None
+        """
+        self.print_header()
+        assert JSON_CONTENT_TYPE == negotiate_wire_format(None)
+        assert JSON_CONTENT_TYPE == negotiate_wire_format('text/html, */*')
+        assert JSON_CONTENT_TYPE == negotiate_wire_format('application/json; q=0.9')
+        assert get_wire_formats()[0] == \
+            negotiate_wire_format('application/x-msgpack, application/json')
+
+    def test_dump_and_load(self):
+        """ The serialized objects are the same after a round trip in each wire format
+
+        :return: None
+        """
+        self.print_header()
+        chk = Check({'command': u'check_ping -H h\xf4te', 't_to_go': 1234.5})
+        data = serialize([chk], True)
+        for content_type in get_wire_formats():
+            body = dump_wire(data, content_type)
+            assert isinstance(body, str)
+            res = unserialize(load_wire(body, content_type), True)
+            assert chk.uuid == res[0].uuid
+            assert chk.command == res[0].command
+            assert chk.t_to_go == res[0].t_to_go
+
+        with pytest.raises(ValueError):
+            load_wire('not a document', JSON_CONTENT_TYPE)
+
+    @no_msgpack
+    def test_msgpack_is_smaller(self):
+        """ msgpack payloads are smaller than JSON ones
+
+        :return: None
+        """
+        self.print_header()
+        data = serialize([Check({'command': 'check_%d' % idx}) for idx in xrange(100)], True)
+        assert len(dump_wire(data, MSGPACK_CONTENT_TYPE)) < len(dump_wire(data))
+
+    def test_http_exchange(self):
+        """ The checks and results are exchanged in the negotiated format
+
+        :return: None
+        """
+        self.print_header()
+        self.setup_with_file('cfg/cfg_default.cfg')
+        sched_daemon = self.schedulers['scheduler-master']
+        sched = sched_daemon.sched
+        sched.schedule()
+        for chk in sched.checks.values():
+            chk.t_to_go = time.time()
+
+        port = get_free_port()
+        http_daemon = HTTPDaemon('127.0.0.1', port, SchedulerInterface(sched_daemon),
+                                 False, None, None, None, None, 4)
+        thread = threading.Thread(None, http_daemon.run, 'http_thread')
+        thread.daemon = True
+        thread.start()
+        for _ in xrange(50):
+            if http_daemon.srv.ready:
+                break
+            time.sleep(0.1)
+        try:
+            HTTPClient.configure_wire_format(binary=True)
+            client = HTTPClient(address='127.0.0.1', port=port)
+            raw = client.connection.get(client.make_uri('get_checks'),
+                                        params={'do_checks': True},
+                                        headers={'Accept': client.get_accept()})
+            assert get_wire_formats()[0] == raw.headers['Content-Type']
+            checks = unserialize(load_wire(raw.content, raw.headers['Content-Type']), True)
+            assert checks
+            for chk in checks:
+                assert 'inpoller' == sched.checks[chk.uuid].status
+
+            # Results are posted compressed, in the wire format
+            for chk in checks:
+                chk.status = 'waitconsume'
+                chk.exit_status = 0
+                chk.output = u'OK - \xe9t\xe9'
+            assert 'true' == client.post('put_results', {'from': 'poller', 'results': checks},
+                                         wire=True)
+            assert False is client.wire_fallback
+            assert len(checks) == sched.waiting_results.qsize()
+
+            # Only JSON
+            HTTPClient.configure_wire_format(binary=False, compress=False)
+            raw = client.connection.get(client.make_uri('get_checks'),
+                                        params={'do_checks': True},
+                                        headers={'Accept': client.get_accept()})
+            assert JSON_CONTENT_TYPE == raw.headers['Content-Type']
+            assert [] == client.get('get_checks', {'do_checks': True})
+        finally:
+            http_daemon.request_stop()
+            thread.join(5)
+
+    def test_fallback(self):
+        """ The client falls back to JSON if the server does not accept the wire format
+
+        :return: None
+        """
+        self.print_header()
+        client = HTTPClient(address='localhost', port=7768)
+        with requests_mock.mock() as mockreq:
+            mockreq.post('http://localhost:7768/put_results',
+                         [{'status_code': 415}, {'json': True}, {'json': True}])
+            client.post('put_results', {'from': 'poller', 'results': []}, wire=True)
+            assert True is client.wire_fallback
+            client.post('put_results', {'from': 'poller', 'results': []}, wire=True)
+
+            history = mockreq.request_history
+            assert 3 == len(history)
+            assert 'deflate' == history[0].headers['Content-Encoding']
+            for request in history[1:]:
+                assert 'Content-Encoding' not in request.headers
+                assert {'from': 'poller', 'results': []} == request.json()
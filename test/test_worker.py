@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2016: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+This file tests the worker events loop
+"""
+
+import signal
+import time
+from multiprocessing import Queue
+
+from alignak_test import AlignakTest
+from alignak.check import Check
+from alignak.message import Message
+from alignak.worker import Worker
+
+
+class TestWorker(AlignakTest):
+    """
+    This class tests the worker events loop
+    """
+
+    def setUp(self):
+        self.to_queue = Queue()
+        self.from_queue = Queue()
+        self.worker = Worker('fork', self.to_queue, self.from_queue, 4)
+        self.worker.checks = []
+        self.worker.set_child_exit_handler()
+
+    def tearDown(self):
+        signal.set_wakeup_fd(-1)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        self.to_queue.close()
+        self.from_queue.close()
+
+    def loop(self):
+        """Run one worker loop, as in do_work, but do not wait when there is nothing to do
+
+        :return: None
+        """
+        self.worker.get_new_checks(self.to_queue, self.from_queue)
+        self.worker.launch_new_checks()
+        self.worker.manage_finished_checks(self.from_queue)
+        if self.worker.checks:
+            self.worker.wait_for_events(self.to_queue)
+
+    def test_wait_for_events(self):
+        """ The worker wakes up as soon as an action comes or finishes
+
+        :return: None
+        """
+        self.print_header()
+
+        # Nothing to do, the worker waits for the timeout
+        start = time.time()
+        self.worker.wait_for_events(self.to_queue, 0.3)
+        assert time.time() - start >= 0.25
+
+        # A new action wakes the worker up
+        check = Check({'command': 'libexec/sleep_command.sh 0.3', 'timeout': 5})
+        check.status = 'queue'
+        self.to_queue.put(Message(_type='Do', data=check))
+        time.sleep(0.1)
+        start = time.time()
+        self.worker.wait_for_events(self.to_queue)
+        assert time.time() - start < 0.2
+
+        # The action is launched, then the worker sleeps until the plugin exits
+        start = time.time()
+        while not self.worker.actions_finished and time.time() - start < 5:
+            self.loop()
+        elapsed = time.time() - start
+        assert 0.3 <= elapsed < 0.6
+
+        msg = self.from_queue.get()
+        assert 'Done' == msg.get_type()
+        result = msg.get_data()
+        assert 'done' == result.status
+        assert 0 == result.exit_status
+        assert 'I awoke after sleeping 0.3 seconds' == result.output
+        assert [] == self.worker.checks
+
+    def test_wait_for_events_timeout(self):
+        """ The worker wakes up when an action times out
+
+        :return: None
+        """
+        self.print_header()
+
+        check = Check({'command': 'libexec/sleep_command.sh 5', 'timeout': 1})
+        check.status = 'queue'
+        self.to_queue.put(Message(_type='Do', data=check))
+        time.sleep(0.1)
+
+        start = time.time()
+        while not self.worker.actions_finished and time.time() - start < 5:
+            self.loop()
+        elapsed = time.time() - start
+        assert 1 <= elapsed < 1.5
+
+        result = self.from_queue.get().get_data()
+        assert 'timeout' == result.status
+        assert 3 == result.exit_status
+
+    def test_batched_actions(self):
+        """ The actions are sent to and from the worker as batches of records
+
+        :return: None
+        """
+        self.print_header()
+        self.worker.batch_size = 2
+        self.worker.flush_interval = 0.2
+
+        checks = []
+        for idx in range(3):
+            check = Check({'command': 'libexec/sleep_command.sh 0.%d' % idx, 'timeout': 5,
+                           'ref': 'host-%d' % idx})
+            check.sched_id = 'sched-uuid'
+            check.status = 'queue'
+            checks.append(check)
+        self.to_queue.put(Message(_type='DoBatch',
+                                  data=[check.get_work_record() for check in checks]))
+        time.sleep(0.1)
+
+        start = time.time()
+        while self.worker.actions_finished < 3 and time.time() - start < 5:
+            self.loop()
+        assert 3 == self.worker.actions_got
+        # The two first results are sent together, the last one waits
+        assert 1 == len(self.worker.results)
+        msg = self.from_queue.get()
+        assert 'DoneBatch' == msg.get_type()
+        assert 2 == len(msg.get_data())
+
+        # ... up to the flush interval
+        results_time = self.worker.results_time
+        while self.worker.results and time.time() - start < 5:
+            self.worker.wait_for_events(self.to_queue)
+            self.worker.manage_finished_checks(self.from_queue)
+        assert time.time() - results_time >= 0.2
+        results = msg.get_data() + self.from_queue.get().get_data()
+
+        for sched_id, uuid, values in results:
+            assert 'sched-uuid' == sched_id
+            check = [check for check in checks if check.uuid == uuid][0]
+            check.set_result(values)
+            assert 'done' == check.status
+            assert 0 == check.exit_status
+            assert check.output.startswith('I awoke after sleeping 0.')
+            assert 'sleep=0.' in check.perf_data
+            assert check.execution_time > 0
+
+    def test_batched_actions_limit(self):
+        """ The worker does not launch more than processes_by_worker actions of a batch
+
+        :return: None
+        """
+        self.print_header()
+        self.worker.processes_by_worker = 2
+
+        checks = []
+        for idx in range(10):
+            check = Check({'command': 'libexec/sleep_command.sh 0.1', 'timeout': 5,
+                           'ref': 'host-%d' % idx})
+            check.sched_id = 'sched-uuid'
+            check.status = 'queue'
+            checks.append(check)
+        self.to_queue.put(Message(_type='DoBatch',
+                                  data=[check.get_work_record() for check in checks]))
+        time.sleep(0.1)
+
+        self.worker.get_new_checks(self.to_queue, self.from_queue)
+        assert 10 == self.worker.actions_got
+        assert 2 == len(self.worker.checks)
+        assert 8 == len(self.worker.pending_actions)
+
+        start = time.time()
+        while self.worker.actions_finished < 10 and time.time() - start < 5:
+            self.loop()
+            assert len(self.worker.checks) <= 2
+            assert self.worker.actions_launched - self.worker.actions_finished <= 2
+        assert 10 == self.worker.actions_finished
+        assert 0 == len(self.worker.pending_actions)
+
+        # More processes allowed, more pending actions taken
+        self.worker.pending_actions.extend(check.get_work_record() for check in checks)
+        self.worker.processes_by_worker = 4
+        self.worker.get_new_checks(self.to_queue, self.from_queue)
+        assert 4 == len(self.worker.checks)
+        assert 6 == len(self.worker.pending_actions)
+
+    def test_pool_messages(self):
+        """ The worker changes its processes count and stops when its master asks for
+
+        :return: None
+        """
+        self.print_header()
+
+        self.to_queue.put(Message(_type='Processes', data=8))
+        self.to_queue.put(Message(_type='Stop'))
+        time.sleep(0.1)
+        self.worker.get_new_checks(self.to_queue, self.from_queue)
+        assert 8 == self.worker.processes_by_worker
+        assert self.worker.stopping
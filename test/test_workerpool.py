@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2016: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+This file tests the workers pool controller decisions
+"""
+
+from alignak_test import AlignakTest
+from alignak.workerpool import WorkerPoolController
+
+
+class TestWorkerPool(AlignakTest):
+    """
+    This class tests the workers pool controller decisions
+    """
+
+    @staticmethod
+    def run_period(pool, now, results, latency, execution_time, queued):
+        """Feed the controller with a period of results
+
+        :return: the controller decision
+        """
+        for _ in range(results):
+            pool.add_result(latency, execution_time)
+        return pool.update(queued, now)
+
+    def test_no_decision_before_period(self):
+        """ The controller decides once per period
+
+        :return: None
+        """
+        self.print_header()
+        pool = WorkerPoolController(1, 4, 10, period=10)
+        assert pool.update(0, 1000) is None
+        assert pool.update(100, 1005) is None
+        assert 'hold' == pool.update(0, 1010)
+        # A time change starts a new period
+        assert pool.update(0, 500) is None
+        assert pool.update(0, 505) is None
+
+    def test_grow(self):
+        """ The pool grows when the latency is over the target
+
+        :return: None
+        """
+        self.print_header()
+        pool = WorkerPoolController(1, 4, 10, max_processes_by_worker=40, target_latency=2)
+        pool.update(0, 1000)
+
+        # Latency under the target: hold
+        assert 'hold' == self.run_period(pool, 1010, 50, 1.5, 0.2, 8)
+        assert 1 == pool.workers
+
+        # Processes are available, but the latency is high: one more worker
+        assert 'grow-workers' == self.run_period(pool, 1020, 50, 3, 0.2, 8)
+        assert 2 == pool.workers
+        assert 10 == pool.processes_by_worker
+
+        # The actions wait for a process: as many workers as needed, up to max_workers
+        assert 'grow-workers' == self.run_period(pool, 1030, 50, 3, 5, 35)
+        assert 4 == pool.workers
+        assert 'grow-processes' == self.run_period(pool, 1040, 50, 3, 5, 100)
+        assert 4 == pool.workers
+        assert 25 == pool.processes_by_worker
+        assert 'grow-processes' == self.run_period(pool, 1050, 50, 3, 5, 500)
+        assert 40 == pool.processes_by_worker
+
+        # Max bounds are reached
+        assert 'hold' == self.run_period(pool, 1060, 50, 3, 5, 500)
+        assert 4 == pool.workers
+        assert 40 == pool.processes_by_worker
+
+    def test_shrink(self):
+        """ The pool shrinks when its load is low for several periods
+
+        :return: None
+        """
+        self.print_header()
+        pool = WorkerPoolController(1, 4, 10, max_processes_by_worker=40, target_latency=2,
+                                    shrink_periods=2)
+        pool.workers = 3
+        pool.processes_by_worker = 40
+        pool.update(0, 1000)
+
+        # Busy pool: 10 results per second running for 5 seconds, 50 busy processes
+        assert 'hold' == self.run_period(pool, 1010, 100, 0.5, 5, 50)
+        assert 50 == pool.busy
+        assert 0 == pool.idle_periods
+
+        # Low load: processes first, then workers, not under the min bounds
+        assert 'hold' == self.run_period(pool, 1020, 10, 0.5, 1, 2)
+        assert 1 == pool.idle_periods
+        assert 'shrink-processes' == self.run_period(pool, 1030, 10, 0.5, 1, 2)
+        assert 20 == pool.processes_by_worker
+        self.run_period(pool, 1040, 10, 0.5, 1, 2)
+        assert 'shrink-processes' == self.run_period(pool, 1050, 10, 0.5, 1, 2)
+        assert 10 == pool.processes_by_worker
+        self.run_period(pool, 1060, 10, 0.5, 1, 2)
+        assert 'shrink-workers' == self.run_period(pool, 1070, 10, 0.5, 1, 2)
+        assert 2 == pool.workers
+        self.run_period(pool, 1080, 0, 0, 0, 0)
+        assert 'shrink-workers' == self.run_period(pool, 1090, 0, 0, 0, 0)
+        assert 1 == pool.workers
+        self.run_period(pool, 1100, 0, 0, 0, 0)
+        assert 'hold' == self.run_period(pool, 1110, 0, 0, 0, 0)
+        assert 1 == pool.workers
+        assert 10 == pool.processes_by_worker
+
+        # A high latency period resets the low load periods count
+        pool.workers = 3
+        self.run_period(pool, 1120, 10, 0.5, 1, 2)
+        assert 1 == pool.idle_periods
+        self.run_period(pool, 1130, 10, 1.5, 1, 2)
+        assert 0 == pool.idle_periods
+        assert 3 == pool.workers
@@ -552,7 +552,7 @@ class AlignakTest(unittest.TestCase):
         @verified
         :return:
         """
-        self.schedulers['scheduler-master'].sched.actions = {}
+        self.schedulers['scheduler-master'].sched.actions.clear()
 
     def assert_actions_count(self, number):
         """
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2016: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+This file measures the timeperiods evaluation speed (operations per second) of
+is_time_valid, get_next_valid_time_from_t and get_next_invalid_time_from_t,
+with a cold cache (new transitions table for each operation) and a warm cache
+"""
+
+import time
+
+from alignak_test import AlignakTest
+from alignak.objects.timeperiod import Timeperiod
+
+# Operations count for each measure
+COLD_COUNT = 50
+WARM_COUNT = 500
+
+# Timeperiods definitions: name -> (dateranges, excluded timeperiods names)
+TIMEPERIODS = [
+    ('24x7', ['monday 00:00-24:00', 'tuesday 00:00-24:00', 'wednesday 00:00-24:00',
+              'thursday 00:00-24:00', 'friday 00:00-24:00', 'saturday 00:00-24:00',
+              'sunday 00:00-24:00'], []),
+    ('workhours', ['monday 09:00-17:00', 'tuesday 09:00-17:00', 'wednesday 09:00-17:00',
+                   'thursday 09:00-17:00', 'friday 09:00-17:00'], []),
+    ('lunch', ['monday 12:00-13:30', 'tuesday 12:00-13:30', 'wednesday 12:00-13:30',
+               'thursday 12:00-13:30', 'friday 12:00-13:30'], []),
+    ('workhours_no_lunch', ['monday 09:00-17:00', 'tuesday 09:00-17:00',
+                            'wednesday 09:00-17:00', 'thursday 09:00-17:00',
+                            'friday 09:00-17:00'], ['lunch']),
+    ('month_days', ['day 1 00:00-24:00', 'day 15 08:00-20:00', 'day -1 00:00-06:00'], []),
+    ('weekday_offsets', ['monday 1 00:00-24:00', 'tuesday -1 08:00-18:00',
+                         'thursday -1 november 00:00-24:00'], []),
+    ('holidays', ['january 1 00:00-24:00', 'december 25 00:00-24:00',
+                  'monday 1 september 00:00-24:00'], []),
+    ('workhours_no_holidays', ['monday 09:00-17:00', 'tuesday 09:00-17:00',
+                               'wednesday 09:00-17:00', 'thursday 09:00-17:00',
+                               'friday 09:00-17:00'], ['holidays', 'month_days']),
+    ('nested_excludes', ['monday 00:00-24:00', 'tuesday 00:00-24:00', 'wednesday 00:00-24:00',
+                         'thursday 00:00-24:00', 'friday 00:00-24:00'],
+     ['workhours_no_lunch']),
+]
+
+OPERATIONS = ['is_time_valid', 'get_next_valid_time_from_t', 'get_next_invalid_time_from_t']
+
+
+class TestTimeperiodBenchmark(AlignakTest):
+    """
+    This class measures the timeperiods evaluation speed
+    """
+
+    def get_timeperiods(self):
+        """Build the benchmark timeperiods
+
+        :return: dict of timeperiods, by name
+        """
+        timeperiods = {}
+        for name, dateranges, excludes in TIMEPERIODS:
+            timeperiod = Timeperiod()
+            timeperiod.timeperiod_name = name
+            for entry in dateranges:
+                timeperiod.resolve_daterange(timeperiod.dateranges, entry)
+            timeperiod.exclude = [timeperiods[exclude] for exclude in excludes]
+            timeperiods[name] = timeperiod
+        return timeperiods
+
+    @staticmethod
+    def measure(timeperiod, operation, timestamps, cold):
+        """Run an operation for all the timestamps
+
+        :param timeperiod: timeperiod to evaluate
+        :param operation: timeperiod method name
+        :param timestamps: times to evaluate the timeperiod at
+        :param cold: reset the timeperiods cache before each operation
+        :return: operations per second
+        :rtype: float
+        """
+        func = getattr(timeperiod, operation)
+        excludes = [timeperiod] + timeperiod.exclude
+        for exclude in timeperiod.exclude:
+            excludes.extend(exclude.exclude)
+        _t0 = time.time()
+        for timestamp in timestamps:
+            if cold:
+                for item in excludes:
+                    item.transitions = None
+            func(timestamp)
+        return len(timestamps) / max(time.time() - _t0, 1e-6)
+
+    def test_timeperiods(self):
+        """ Measure the timeperiods evaluation speed
+
+        :return: None
+        """
+        timeperiods = self.get_timeperiods()
+        now = int(time.time())
+        # Times spread over the next days, at an odd step to hit all the hours
+        cold_times = [now + idx * 15887 for idx in xrange(COLD_COUNT)]
+        warm_times = [now + idx * 967 for idx in xrange(WARM_COUNT)]
+
+        print("%-24s %-30s %14s %14s" % ('Timeperiod', 'Operation', 'Cold (op/s)',
+                                         'Warm (op/s)'))
+        for name, _, _ in TIMEPERIODS:
+            timeperiod = timeperiods[name]
+            for operation in OPERATIONS:
+                cold = self.measure(timeperiod, operation, cold_times, True)
+                # Fill the cache, then measure
+                self.measure(timeperiod, operation, warm_times, False)
+                warm = self.measure(timeperiod, operation, warm_times, False)
+                print("%-24s %-30s %14.0f %14.0f" % (name, operation, cold, warm))
+                assert cold > 0
+                assert warm > 0
+
+        # The cache does not change the results
+        timeperiod = timeperiods['workhours_no_lunch']
+        warm = [timeperiod.get_next_valid_time_from_t(t) for t in cold_times]
+        cold = []
+        for timestamp in cold_times:
+            timeperiod.transitions = None
+            cold.append(timeperiod.get_next_valid_time_from_t(timestamp))
+        assert cold == warm
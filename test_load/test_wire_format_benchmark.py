@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2015-2016: Alignak team, see AUTHORS.txt file for contributors
+#
+# This file is part of Alignak.
+#
+# Alignak is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Alignak is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with Alignak.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""
+This file compares the payload size and the encoding / decoding time of the
+inter-daemons wire formats for a batch of 10000 checks results
+"""
+
+import time
+import zlib
+
+from alignak_test import AlignakTest
+from alignak.check import Check
+from alignak.misc.serialization import serialize, unserialize, get_wire_formats, \
+    dump_wire, load_wire, JSON_CONTENT_TYPE, MSGPACK_CONTENT_TYPE
+
+CHECKS_COUNT = 10000
+
+
+class TestWireFormatBenchmark(AlignakTest):
+    """
+    This class compares the inter-daemons wire formats
+    """
+
+    def get_checks(self):
+        """Build a batch of checks results
+
+        :return: list of checks
+        """
+        checks = []
+        for idx in xrange(CHECKS_COUNT):
+            chk = Check({
+                'command': '/usr/lib/nagios/plugins/check_ping -H host-%d -w 100,20%% '
+                           '-c 500,60%%' % idx,
+                'ref': 'host-uuid-%d' % idx,
+                't_to_go': time.time(),
+                'timeout': 30,
+            })
+            chk.status = 'waitconsume'
+            chk.exit_status = idx % 4
+            chk.output = 'PING OK - Packet loss = 0%%, RTA = %d.25 ms' % (idx % 100)
+            chk.perf_data = 'rta=%d.25ms;100;500;0 pl=0%%;20;60;0' % (idx % 100)
+            chk.execution_time = 0.012
+            checks.append(chk)
+        return checks
+
+    def test_wire_formats(self):
+        """ Compare the payload size and the encoding / decoding time of the wire formats
+
+        :return: None
+        """
+        checks = self.get_checks()
+        results = {}
+        for content_type in get_wire_formats():
+            for compress in (False, True):
+                _t0 = time.time()
+                body = dump_wire(serialize(checks, True), content_type)
+                if compress:
+                    body = zlib.compress(body)
+                encode_time = time.time() - _t0
+
+                _t0 = time.time()
+                if compress:
+                    data = zlib.decompress(body)
+                else:
+                    data = body
+                res = unserialize(load_wire(data, content_type), True)
+                decode_time = time.time() - _t0
+
+                assert CHECKS_COUNT == len(res)
+                assert checks[-1].output == res[-1].output
+                results[(content_type, compress)] = (len(body), encode_time, decode_time)
+
+        print("%-24s %-10s %12s %12s %12s" % ('Format', 'Compressed', 'Size (kB)',
+                                              'Encode (s)', 'Decode (s)'))
+        for (content_type, compress), (size, encode_time, decode_time) in \
+                sorted(results.items()):
+            print("%-24s %-10s %12.1f %12.3f %12.3f" % (content_type, compress, size / 1024.0,
+                                                        encode_time, decode_time))
+
+        json_size = results[(JSON_CONTENT_TYPE, False)][0]
+        assert results[(JSON_CONTENT_TYPE, True)][0] < json_size
+        if MSGPACK_CONTENT_TYPE in get_wire_formats():
+            assert results[(MSGPACK_CONTENT_TYPE, False)][0] < json_size